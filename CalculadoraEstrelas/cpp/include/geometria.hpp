@@ -10,7 +10,9 @@
 #define GEOMETRIA_HPP
 
 #include "tipos.hpp"
+#include <algorithm>
 #include <cmath>
+#include <cstddef>
 #include <sstream>
 #include <iomanip>
 
@@ -82,7 +84,35 @@ public:
         double d2sq = distancia2 * distancia2;
         double produto = 2.0 * distancia1 * distancia2 * std::cos(separacaoAngular);
         
-        return std::sqrt(d1sq + d2sq - produto);
+        // Arredondamento pode gerar valores levemente negativos para estrelas coincidentes
+        double quadrado = d1sq + d2sq - produto;
+        return std::sqrt(quadrado > 0.0 ? quadrado : 0.0);
+    }
+    
+    /**
+     * Métodos 2 e 3 em lote: uma estrela de referência contra n estrelas
+     * 
+     * As colunas vêm em struct-of-arrays, com sin(δ) e cos(δ) já calculados
+     * (mesmos valores que calcularSeparacaoAngular obteria). O laço não tem
+     * desvios nem texto de equação, para o compilador vetorizá-lo.
+     * 
+     * @param separacao Saída: separação angular em radianos (n valores)
+     * @param distanciaReal Saída: distância real em parsecs (n valores)
+     */
+    static void calcularLinhaLote(
+        double alfaRef, double senoDeltaRef, double cossenoDeltaRef, double distanciaRef,
+        const double* alfa, const double* senoDelta, const double* cossenoDelta,
+        const double* distancia, std::size_t n,
+        double* separacao, double* distanciaReal
+    ) {
+        #pragma omp simd
+        for (std::size_t k = 0; k < n; ++k) {
+            double cosTeta = senoDeltaRef * senoDelta[k] +
+                             cossenoDeltaRef * cossenoDelta[k] * std::cos(alfaRef - alfa[k]);
+            cosTeta = cosTeta < -1.0 ? -1.0 : (cosTeta > 1.0 ? 1.0 : cosTeta);
+            separacao[k] = std::acos(cosTeta);
+            distanciaReal[k] = calcularDistanciaReal(distanciaRef, distancia[k], separacao[k]);
+        }
     }
     
     /**
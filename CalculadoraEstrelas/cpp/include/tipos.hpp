@@ -11,6 +11,7 @@
 
 #include <string>
 #include <cmath>
+#include <vector>
 
 namespace CalculadoraEstrelas {
 
@@ -131,6 +132,17 @@ struct ResultadoCalculo {
     std::string equacaoUsada;
 };
 
+/**
+ * Catálogo em colunas (struct-of-arrays) para os cálculos em lote
+ */
+struct CatalogoColunar {
+    std::vector<double> alfaRad;       // α em radianos
+    std::vector<double> deltaRad;      // δ em radianos
+    std::vector<double> paralaxeMas;   // paralaxe em mas
+    
+    std::size_t tamanho() const { return alfaRad.size(); }
+};
+
 /**
  * Cores para a renderização da interface
  */
@@ -0,0 +1,356 @@
+/**
+ * Calculadora Geométrica de Distância Entre Estrelas
+ * Cálculo em Lote de Todos os Pares (linha de comando, sem GTK)
+ *
+ * Autor: Luiz Tiago Wilcke
+ * Data: 2025
+ */
+
+#include <charconv>
+#include <chrono>
+#include <cstdint>
+#include <cstdio>
+#include <cstdlib>
+#include <cstring>
+#include <fstream>
+#include <iostream>
+#include <stdexcept>
+#include <string>
+#include <vector>
+#ifdef _OPENMP
+#include <omp.h>
+#endif
+#include "../include/tipos.hpp"
+#include "../include/geometria.hpp"
+
+using namespace CalculadoraEstrelas;
+
+// ============================================================================
+// Formatos
+// ============================================================================
+
+// Catálogo binário (escrito por CatalogoColunar.salvar_binario em Python):
+// "ESTRELAS", N (uint64) e as colunas alfa_rad, delta_rad e paralaxe_mas,
+// cada uma com N float64, tudo little-endian
+constexpr char MAGICO_BINARIO[8] = {'E', 'S', 'T', 'R', 'E', 'L', 'A', 'S'};
+
+// Registro de saída binária: i, j, separação (rad), distância real (pc)
+struct RegistroPar {
+    std::int64_t i;
+    std::int64_t j;
+    double separacaoRad;
+    double distanciaRealParsecs;
+};
+
+struct Opcoes {
+    std::string catalogo;
+    std::string saida;                 // vazio = saída padrão
+    bool saidaBinaria = false;
+    double limiteParsecs = -1.0;       // < 0 = escrever todos os pares
+    std::size_t paresPorBloco = 1 << 20;
+    int threads = 0;                   // 0 = padrão do OpenMP
+};
+
+// ============================================================================
+// Leitura do catálogo
+// ============================================================================
+
+CatalogoColunar lerCatalogoBinario(const std::string& caminho) {
+    std::ifstream arquivo(caminho, std::ios::binary);
+    if (!arquivo) throw std::runtime_error("não foi possível abrir " + caminho);
+
+    char magico[8];
+    std::uint64_t n = 0;
+    arquivo.read(magico, sizeof(magico));
+    arquivo.read(reinterpret_cast<char*>(&n), sizeof(n));
+    if (!arquivo || std::memcmp(magico, MAGICO_BINARIO, sizeof(magico)) != 0) {
+        throw std::runtime_error(caminho + " não é um catálogo binário");
+    }
+
+    CatalogoColunar catalogo;
+    for (auto* coluna : {&catalogo.alfaRad, &catalogo.deltaRad, &catalogo.paralaxeMas}) {
+        coluna->resize(n);
+        arquivo.read(reinterpret_cast<char*>(coluna->data()),
+                     static_cast<std::streamsize>(n * sizeof(double)));
+    }
+    if (!arquivo) throw std::runtime_error(caminho + " está truncado");
+    return catalogo;
+}
+
+/**
+ * Separar uma linha CSV em campos (aceita campos entre aspas)
+ */
+std::vector<std::string> separarCampos(const std::string& linha) {
+    std::vector<std::string> campos(1);
+    bool entreAspas = false;
+    for (std::size_t k = 0; k < linha.size(); ++k) {
+        char c = linha[k];
+        if (c == '"') {
+            if (entreAspas && k + 1 < linha.size() && linha[k + 1] == '"') {
+                campos.back() += '"';
+                ++k;
+            } else {
+                entreAspas = !entreAspas;
+            }
+        } else if (c == ',' && !entreAspas) {
+            campos.emplace_back();
+        } else if (c != '\r') {
+            campos.back() += c;
+        }
+    }
+    return campos;
+}
+
+double converterCampo(const std::string& campo, std::size_t numeroLinha) {
+    double valor = 0.0;
+    auto [fim, erro] = std::from_chars(campo.data(), campo.data() + campo.size(), valor);
+    if (erro != std::errc() || fim != campo.data() + campo.size()) {
+        throw std::runtime_error("valor inválido na linha " + std::to_string(numeroLinha) +
+                                 ": '" + campo + "'");
+    }
+    return valor;
+}
+
+/**
+ * CSV com cabeçalho; usa as colunas alfa_rad, delta_rad e paralaxe_mas
+ * (as demais, como nome, são ignoradas)
+ */
+CatalogoColunar lerCatalogoCsv(const std::string& caminho) {
+    std::ifstream arquivo(caminho);
+    if (!arquivo) throw std::runtime_error("não foi possível abrir " + caminho);
+
+    std::string linha;
+    std::getline(arquivo, linha);
+    std::vector<std::string> cabecalho = separarCampos(linha);
+    const char* nomes[3] = {"alfa_rad", "delta_rad", "paralaxe_mas"};
+    std::size_t posicoes[3];
+    for (int c = 0; c < 3; ++c) {
+        posicoes[c] = cabecalho.size();
+        for (std::size_t k = 0; k < cabecalho.size(); ++k) {
+            if (cabecalho[k] == nomes[c]) posicoes[c] = k;
+        }
+        if (posicoes[c] == cabecalho.size()) {
+            throw std::runtime_error(caminho + " não tem a coluna " + nomes[c]);
+        }
+    }
+
+    CatalogoColunar catalogo;
+    std::vector<double>* colunas[3] = {&catalogo.alfaRad, &catalogo.deltaRad, &catalogo.paralaxeMas};
+    std::size_t numeroLinha = 1;
+    while (std::getline(arquivo, linha)) {
+        ++numeroLinha;
+        if (linha.empty() || linha == "\r") continue;
+        std::vector<std::string> campos = separarCampos(linha);
+        for (int c = 0; c < 3; ++c) {
+            if (posicoes[c] >= campos.size()) {
+                throw std::runtime_error("linha " + std::to_string(numeroLinha) + " incompleta");
+            }
+            colunas[c]->push_back(converterCampo(campos[posicoes[c]], numeroLinha));
+        }
+    }
+    return catalogo;
+}
+
+CatalogoColunar lerCatalogo(const std::string& caminho) {
+    std::ifstream arquivo(caminho, std::ios::binary);
+    char magico[8] = {};
+    arquivo.read(magico, sizeof(magico));
+    if (arquivo && std::memcmp(magico, MAGICO_BINARIO, sizeof(magico)) == 0) {
+        return lerCatalogoBinario(caminho);
+    }
+    return lerCatalogoCsv(caminho);
+}
+
+// ============================================================================
+// Cálculo de todos os pares
+// ============================================================================
+
+/**
+ * Colunas derivadas do catálogo, calculadas uma vez: distância, sin(δ) e cos(δ)
+ */
+struct ColunasLote {
+    std::vector<double> alfa, senoDelta, cossenoDelta, distancia;
+
+    explicit ColunasLote(const CatalogoColunar& catalogo)
+        : alfa(catalogo.alfaRad), senoDelta(catalogo.tamanho()),
+          cossenoDelta(catalogo.tamanho()), distancia(catalogo.tamanho()) {
+        for (std::size_t k = 0; k < catalogo.tamanho(); ++k) {
+            senoDelta[k] = std::sin(catalogo.deltaRad[k]);
+            cossenoDelta[k] = std::cos(catalogo.deltaRad[k]);
+            distancia[k] = CalculadoraGeometrica::calcularDistanciaParalaxe(catalogo.paralaxeMas[k]);
+        }
+    }
+};
+
+/**
+ * Pares (i, j > i) da linha i, já no formato de saída
+ */
+void escreverLinha(std::size_t i, const ColunasLote& colunas, const Opcoes& opcoes,
+                   std::vector<double>& separacao, std::vector<double>& distanciaReal,
+                   std::string& destino, std::size_t& escritos) {
+    std::size_t inicio = i + 1;
+    std::size_t n = colunas.alfa.size() - inicio;
+    CalculadoraGeometrica::calcularLinhaLote(
+        colunas.alfa[i], colunas.senoDelta[i], colunas.cossenoDelta[i], colunas.distancia[i],
+        colunas.alfa.data() + inicio, colunas.senoDelta.data() + inicio,
+        colunas.cossenoDelta.data() + inicio, colunas.distancia.data() + inicio, n,
+        separacao.data(), distanciaReal.data());
+
+    // to_chars: a menor representação que volta exatamente ao mesmo double
+    auto acrescentar = [&destino](auto valor, char separador) {
+        char texto[32];
+        char* fim = std::to_chars(texto, texto + sizeof(texto) - 1, valor).ptr;
+        *fim++ = separador;
+        destino.append(texto, fim);
+    };
+    for (std::size_t k = 0; k < n; ++k) {
+        if (opcoes.limiteParsecs >= 0.0 && !(distanciaReal[k] <= opcoes.limiteParsecs)) continue;
+        ++escritos;
+        if (opcoes.saidaBinaria) {
+            RegistroPar registro{static_cast<std::int64_t>(i), static_cast<std::int64_t>(inicio + k),
+                                 separacao[k], distanciaReal[k]};
+            destino.append(reinterpret_cast<const char*>(&registro), sizeof(registro));
+            continue;
+        }
+        acrescentar(i, ',');
+        acrescentar(inicio + k, ',');
+        acrescentar(separacao[k], ',');
+        acrescentar(distanciaReal[k], '\n');
+    }
+}
+
+/**
+ * Percorrer as linhas em blocos de ~paresPorBloco pares. As linhas de um
+ * bloco são calculadas em paralelo (OpenMP) e escritas em ordem ao fim do
+ * bloco, então a memória usada não depende do tamanho do catálogo.
+ */
+std::size_t calcularTodosOsPares(const CatalogoColunar& catalogo, const Opcoes& opcoes,
+                                 std::FILE* saida) {
+    ColunasLote colunas(catalogo);
+    std::size_t n = catalogo.tamanho();
+    std::size_t escritos = 0;
+    std::vector<std::string> textos;
+
+    std::size_t linha = 0;
+    while (linha + 1 < n) {
+        std::size_t fim = linha, pares = 0;
+        while (fim + 1 < n && (pares == 0 || pares < opcoes.paresPorBloco)) {
+            pares += n - fim - 1;
+            ++fim;
+        }
+        textos.assign(fim - linha, std::string());
+        long long primeira = static_cast<long long>(linha), ultima = static_cast<long long>(fim);
+
+        #pragma omp parallel reduction(+ : escritos)
+        {
+            std::vector<double> separacao(n), distanciaReal(n);
+            #pragma omp for schedule(dynamic, 1)
+            for (long long i = primeira; i < ultima; ++i) {
+                escreverLinha(static_cast<std::size_t>(i), colunas, opcoes, separacao,
+                              distanciaReal, textos[static_cast<std::size_t>(i - primeira)], escritos);
+            }
+        }
+
+        for (const std::string& texto : textos) {
+            if (std::fwrite(texto.data(), 1, texto.size(), saida) != texto.size()) {
+                throw std::runtime_error("falha ao escrever a saída (disco cheio ou saída fechada?)");
+            }
+        }
+        linha = fim;
+    }
+    return escritos;
+}
+
+// ============================================================================
+// Linha de comando
+// ============================================================================
+
+void mostrarAjuda() {
+    std::cerr <<
+        "Uso: calculadora_lote [opções] CATALOGO\n"
+        "\n"
+        "Calcula a separação angular e a distância real de todos os pares (i < j)\n"
+        "de um catálogo binário (CatalogoColunar.salvar_binario) ou CSV com as\n"
+        "colunas alfa_rad, delta_rad e paralaxe_mas.\n"
+        "\n"
+        "Opções:\n"
+        "  -o, --saida ARQUIVO   escrever os resultados em ARQUIVO (padrão: saída padrão)\n"
+        "  -b, --binario         registros binários (int64 i, int64 j, float64 θ, float64 D)\n"
+        "                        em vez de CSV i,j,separacao_rad,distancia_real_pc\n"
+        "  -l, --limite PC       escrever só os pares com distância real <= PC\n"
+        "  -p, --pares N         pares por bloco (padrão 1048576)\n"
+        "  -t, --threads N       threads OpenMP (compilado com make lote OPENMP=1)\n"
+        "  -h, --ajuda           mostrar esta ajuda\n";
+}
+
+Opcoes lerOpcoes(int argc, char* argv[]) {
+    Opcoes opcoes;
+    for (int k = 1; k < argc; ++k) {
+        std::string arg = argv[k];
+        auto valor = [&]() -> std::string {
+            if (k + 1 >= argc) throw std::runtime_error("falta o valor de " + arg);
+            return argv[++k];
+        };
+        if (arg == "-h" || arg == "--ajuda") {
+            mostrarAjuda();
+            std::exit(0);
+        } else if (arg == "-o" || arg == "--saida") {
+            opcoes.saida = valor();
+        } else if (arg == "-b" || arg == "--binario") {
+            opcoes.saidaBinaria = true;
+        } else if (arg == "-l" || arg == "--limite") {
+            opcoes.limiteParsecs = std::stod(valor());
+        } else if (arg == "-p" || arg == "--pares") {
+            opcoes.paresPorBloco = std::stoull(valor());
+        } else if (arg == "-t" || arg == "--threads") {
+            opcoes.threads = std::stoi(valor());
+        } else if (!arg.empty() && arg[0] == '-') {
+            throw std::runtime_error("opção desconhecida: " + arg);
+        } else {
+            opcoes.catalogo = arg;
+        }
+    }
+    if (opcoes.catalogo.empty()) throw std::runtime_error("informe o arquivo do catálogo");
+    return opcoes;
+}
+
+int main(int argc, char* argv[]) {
+    try {
+        Opcoes opcoes = lerOpcoes(argc, argv);
+        int threads = 1;
+#ifdef _OPENMP
+        if (opcoes.threads > 0) omp_set_num_threads(opcoes.threads);
+        threads = omp_get_max_threads();
+#endif
+
+        auto inicio = std::chrono::steady_clock::now();
+        CatalogoColunar catalogo = lerCatalogo(opcoes.catalogo);
+        auto lido = std::chrono::steady_clock::now();
+
+        std::FILE* saida = opcoes.saida.empty() ? stdout : std::fopen(opcoes.saida.c_str(), "wb");
+        if (saida == nullptr) throw std::runtime_error("não foi possível criar " + opcoes.saida);
+        if (!opcoes.saidaBinaria && std::fputs("i,j,separacao_rad,distancia_real_pc\n", saida) < 0) {
+            throw std::runtime_error("falha ao escrever a saída");
+        }
+        std::size_t escritos = calcularTodosOsPares(catalogo, opcoes, saida);
+        // Os dados ainda no buffer só são gravados aqui: o resultado precisa ser conferido
+        bool falhou = saida != stdout ? std::fclose(saida) != 0
+                                      : std::fflush(saida) != 0 || std::ferror(saida);
+        if (falhou) throw std::runtime_error("falha ao gravar a saída (disco cheio ou saída fechada?)");
+        auto fim = std::chrono::steady_clock::now();
+
+        double leitura = std::chrono::duration<double>(lido - inicio).count();
+        double calculo = std::chrono::duration<double>(fim - lido).count();
+        std::size_t n = catalogo.tamanho();
+        double pares = n < 2 ? 0.0 : 0.5 * static_cast<double>(n) * static_cast<double>(n - 1);
+        std::fprintf(stderr, "%zu estrelas lidas em %.3f s; %.0f pares em %.3f s "
+                     "(%.1f M pares/s, %d thread(s)); %zu pares escritos\n",
+                     n, leitura, pares, calculo, calculo > 0 ? pares / calculo / 1e6 : 0.0,
+                     threads, escritos);
+    } catch (const std::exception& erro) {
+        std::cerr << "Erro: " << erro.what() << "\n";
+        std::cerr << "Use --ajuda para ver as opções.\n";
+        return 1;
+    }
+    return 0;
+}
@@ -0,0 +1,356 @@
+"""
+Calculadora Geométrica de Distância Entre Estrelas
+Animações em Paralelo (Rotação 3D e Evolução do Par no Tempo)
+
+Autor: Luiz Tiago Wilcke
+Data: 2025
+"""
+
+import math
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+import quadros
+from calculos import CalculadoraGeometrica, Estrela, GRAUS_POR_RADIANO
+from colunar import CatalogoColunar
+from movimento import posicoes_em
+
+# Extensões entregues ao ffmpeg; qualquer outro destino é um diretório de PNGs
+EXTENSOES_VIDEO = (".mp4", ".mkv", ".webm", ".mov", ".avi")
+
+# Frames em voo por processo (renderizando ou esperando a vez de ser escritos)
+FRAMES_EM_VOO_POR_PROCESSO = 2
+
+# Estado de cada processo de trabalho (definido pelo inicializador)
+_ESTADO = {}
+
+
+@dataclass
+class RelatorioAnimacao:
+    """Frames gerados, tempo total e vazão"""
+    frames: int
+    segundos: float
+    processos: int
+    destino: str
+
+    @property
+    def fps(self) -> float:
+        return self.frames / self.segundos if self.segundos > 0 else float("inf")
+
+    def __str__(self) -> str:
+        return (f"{self.frames} frames em {self.segundos:.2f} s = {self.fps:.1f} frames/s "
+                f"({self.processos} processo(s)) → {self.destino}")
+
+
+# ============================================================================
+# Renderização (executada em cada processo)
+# ============================================================================
+
+def _iniciar_trabalhador(especificacao: dict):
+    """Inicializador do pool: o backend só é trocado nos processos filhos"""
+    from visualizacao import plt
+    plt.switch_backend("Agg")
+    _iniciar_processo(especificacao)
+
+
+def _iniciar_processo(especificacao: dict):
+    """Montar a figura uma única vez por processo"""
+    from visualizacao import VisualizadorEstelar, usar_canvas_agg
+
+    e = especificacao
+    viz = VisualizadorEstelar()
+    if e["tipo"] == "3d":
+        fig = viz.criar_visualizacao_3d(e["estrela1"], e["estrela2"], e["resultado"], e["quadro"])
+        ax = fig.axes[0]
+        for definir, limites in zip((ax.set_xlim, ax.set_ylim, ax.set_zlim), e["limites"]):
+            definir(*limites)
+    else:
+        fig = viz.criar_mapa_celeste(e["estrela1"], e["estrela2"], e["resultado"], e["quadro"])
+    usar_canvas_agg(fig)
+    fig.set_dpi(e["dpi"])
+    legenda = fig.text(0.01, 0.01, "", fontsize=10, color=viz.cores['texto'],
+                       ha='left', va='bottom', gid='legenda_frame')
+
+    _ESTADO.clear()
+    _ESTADO.update(especificacao, viz=viz, fig=fig, legenda=legenda, fundo=None)
+
+
+def _encerrar_processo():
+    if "fig" in _ESTADO:
+        from visualizacao import plt
+        plt.close(_ESTADO["fig"])
+    _ESTADO.clear()
+
+
+def _renderizar(numero: int, estado: dict):
+    """
+    Atualizar só os artistas que mudam e devolver o frame
+
+    No mapa (câmera fixa) o fundo é desenhado uma vez e cada frame redesenha
+    apenas as estrelas, as linhas e os rótulos (blitting); no 3D a câmera
+    gira, então a cena inteira é rasterizada. Com 'diretorio' o PNG é gravado
+    aqui mesmo e só o número volta ao processo principal.
+    """
+    e = _ESTADO
+    fig, viz, canvas = e["fig"], e["viz"], e["fig"].canvas
+    e["legenda"].set_text(estado.get("legenda", ""))
+    if e["tipo"] == "3d":
+        viz.atualizar_visualizacao_3d(fig, estado["posicao1"], estado["posicao2"],
+                                      estado["distancia_real_pc"])
+        fig.axes[0].view_init(elev=estado["elevacao"], azim=estado["azimute"])
+        canvas.draw()
+    else:
+        animados = viz.atualizar_mapa_celeste(
+            fig, estado["lon_lat1"], estado["lon_lat2"], estado["distancia1_pc"],
+            estado["distancia2_pc"], estado["distancia_real_pc"], estado["separacao_graus"])
+        animados.append(e["legenda"])
+        if e["fundo"] is None:
+            for artista in animados:
+                artista.set_animated(True)
+            canvas.draw()
+            e["fundo"] = canvas.copy_from_bbox(fig.bbox)
+        canvas.restore_region(e["fundo"])
+        for artista in animados:
+            fig.draw_artist(artista)
+
+    imagem = np.asarray(canvas.buffer_rgba())
+    if e["diretorio"] is not None:
+        from matplotlib.image import imsave
+        imsave(os.path.join(e["diretorio"], f"frame_{numero:05d}.png"), imagem)
+        return numero, None
+    return numero, imagem.tobytes(), imagem.shape[1], imagem.shape[0]
+
+
+# ============================================================================
+# Destinos
+# ============================================================================
+
+class _VideoFfmpeg:
+    """Frames RGBA crus entregues em ordem ao ffmpeg pela entrada padrão"""
+
+    def __init__(self, caminho: str, fps: float):
+        if shutil.which("ffmpeg") is None:
+            raise RuntimeError("ffmpeg não encontrado: use um diretório para gravar PNGs")
+        self.caminho, self.fps, self.processo = caminho, fps, None
+
+    def escrever(self, dados: bytes, largura: int, altura: int):
+        if self.processo is None:
+            self.processo = subprocess.Popen(
+                ["ffmpeg", "-loglevel", "error", "-y", "-f", "rawvideo", "-pix_fmt", "rgba",
+                 "-s", f"{largura}x{altura}", "-r", str(self.fps), "-i", "-",
+                 "-pix_fmt", "yuv420p", "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", self.caminho],
+                stdin=subprocess.PIPE)
+        self.processo.stdin.write(dados)
+
+    def fechar(self):
+        if self.processo is not None:
+            self.processo.stdin.close()
+            if self.processo.wait() != 0:
+                raise RuntimeError(f"ffmpeg falhou ao gravar {self.caminho}")
+
+
+def renderizar_animacao(especificacao: dict, estados: Sequence[dict], destino: str,
+                        fps: float = 30.0, processos: Optional[int] = None) -> RelatorioAnimacao:
+    """
+    Renderizar os frames em vários processos, na ordem, para PNGs ou vídeo
+
+    destino: diretório (frame_00000.png, ...) ou arquivo .mp4/.mkv/.webm/...
+    gravado pelo ffmpeg. No máximo FRAMES_EM_VOO_POR_PROCESSO × processos
+    frames existem ao mesmo tempo, qualquer que seja o total.
+    """
+    processos = processos or os.cpu_count() or 1
+    video = destino.lower().endswith(EXTENSOES_VIDEO)
+    saida = _VideoFfmpeg(destino, fps) if video else None
+    if not video:
+        os.makedirs(destino, exist_ok=True)
+    especificacao = dict(especificacao, diretorio=None if video else destino)
+
+    def escrever(resultado):
+        if saida is not None:
+            _, dados, largura, altura = resultado
+            saida.escrever(dados, largura, altura)
+
+    inicio = time.perf_counter()
+    try:
+        if processos == 1:
+            _iniciar_processo(especificacao)
+            for numero, estado in enumerate(estados):
+                escrever(_renderizar(numero, estado))
+        else:
+            with ProcessPoolExecutor(processos, initializer=_iniciar_trabalhador,
+                                     initargs=(especificacao,)) as executor:
+                em_voo = deque()
+                for numero, estado in enumerate(estados):
+                    em_voo.append(executor.submit(_renderizar, numero, estado))
+                    if len(em_voo) >= FRAMES_EM_VOO_POR_PROCESSO * processos:
+                        escrever(em_voo.popleft().result())
+                while em_voo:
+                    escrever(em_voo.popleft().result())
+    finally:
+        if saida is not None:
+            saida.fechar()
+        _encerrar_processo()
+    return RelatorioAnimacao(len(estados), time.perf_counter() - inicio, processos, destino)
+
+
+# ============================================================================
+# Animações prontas
+# ============================================================================
+
+def _limites_cubicos(posicoes: np.ndarray) -> List[tuple]:
+    """Mesmos limites nos três eixos, incluindo o Sol, para a escala não variar"""
+    pontos = np.vstack([posicoes.reshape(-1, 3), np.zeros((1, 3))])
+    centro = (pontos.max(axis=0) + pontos.min(axis=0)) / 2
+    raio = max(float(np.max(pontos.max(axis=0) - pontos.min(axis=0))) / 2 * 1.1, 1e-9)
+    return [(c - raio, c + raio) for c in centro]
+
+
+def animar_rotacao_3d(estrela1: Estrela, estrela2: Estrela, destino: str, frames: int = 120,
+                      elevacao: float = 20.0, quadro: str = "equatorial", dpi: float = 100.0,
+                      fps: float = 30.0, processos: Optional[int] = None) -> RelatorioAnimacao:
+    """Volta completa da câmera em torno da visualização 3D do par"""
+    resultado = CalculadoraGeometrica.calcular_distancia_entre_estrelas(estrela1, estrela2)
+    posicoes = quadros.converter_vetores(
+        [[d * math.cos(e.delta_rad) * math.cos(e.alfa_rad), d * math.cos(e.delta_rad) * math.sin(e.alfa_rad),
+          d * math.sin(e.delta_rad)]
+         for e, d in [(estrela1, resultado.distancia1_parsecs), (estrela2, resultado.distancia2_parsecs)]],
+        "equatorial", quadro)
+    especificacao = dict(tipo="3d", estrela1=estrela1, estrela2=estrela2, resultado=resultado,
+                         quadro=quadro, dpi=dpi, limites=_limites_cubicos(posicoes))
+    estados = [dict(posicao1=posicoes[0], posicao2=posicoes[1],
+                    distancia_real_pc=resultado.distancia_real_parsecs,
+                    elevacao=elevacao, azimute=360.0 * k / frames, legenda=f"Azimute {360.0 * k / frames:5.1f}°")
+               for k in range(frames)]
+    return renderizar_animacao(especificacao, estados, destino, fps, processos)
+
+
+def animar_evolucao(catalogo: CatalogoColunar, i: int, j: int, epocas: Sequence[float],
+                    destino: str, tipo: str = "3d", quadro: str = "equatorial",
+                    elevacao: float = 20.0, giro_graus: float = 0.0, dpi: float = 100.0,
+                    fps: float = 30.0, processos: Optional[int] = None) -> RelatorioAnimacao:
+    """
+    Como o par (i, j) evolui ao longo das épocas (movimento próprio e
+    velocidade radial, ver movimento.py): em '3d' as estrelas se movem no
+    espaço (a câmera pode girar giro_graus ao longo da animação); em 'mapa'
+    elas se movem no céu visto do Sol
+    """
+    if tipo not in ("3d", "mapa"):
+        raise ValueError(f"Tipo de animação desconhecido: {tipo} (use '3d' ou 'mapa')")
+    epocas = np.asarray(epocas, dtype=np.float64)
+    posicoes = posicoes_em(catalogo, epocas, [i, j])          # (2, T, 3) equatorial
+    if np.isnan(posicoes).any():
+        raise ValueError("As duas estrelas precisam de paralaxe positiva")
+    no_quadro = quadros.converter_vetores(posicoes.reshape(-1, 3), "equatorial",
+                                          quadro).reshape(posicoes.shape)
+    distancias = np.linalg.norm(posicoes, axis=2)               # (2, T) do Sol
+    reais = np.linalg.norm(posicoes[0] - posicoes[1], axis=1)
+    lon, lat = (v * GRAUS_POR_RADIANO for v in quadros.vetores_para_esfericas(no_quadro))
+    cos_theta = np.einsum("tk,tk->t", posicoes[0], posicoes[1]) / (distancias[0] * distancias[1])
+    separacao = np.degrees(np.arccos(np.clip(cos_theta, -1.0, 1.0)))
+
+    estrela1, estrela2 = catalogo.estrela(i), catalogo.estrela(j)
+    especificacao = dict(tipo=tipo, estrela1=estrela1, estrela2=estrela2, quadro=quadro, dpi=dpi,
+                         resultado=CalculadoraGeometrica.calcular_distancia_entre_estrelas(
+                             estrela1, estrela2),
+                         limites=_limites_cubicos(no_quadro))
+    estados = []
+    for k, epoca in enumerate(epocas):
+        estado = dict(distancia_real_pc=float(reais[k]), legenda=f"Época {epoca:.0f}")
+        if tipo == "3d":
+            estado.update(posicao1=no_quadro[0, k], posicao2=no_quadro[1, k], elevacao=elevacao,
+                          azimute=-60.0 + giro_graus * k / max(len(epocas) - 1, 1))
+        else:
+            estado.update(lon_lat1=(lon[0, k], lat[0, k]), lon_lat2=(lon[1, k], lat[1, k]),
+                          distancia1_pc=float(distancias[0, k]), distancia2_pc=float(distancias[1, k]),
+                          separacao_graus=float(separacao[k]))
+        estados.append(estado)
+    return renderizar_animacao(especificacao, estados, destino, fps, processos)
+
+
+def demonstracao_animacao():
+    """Rotação 3D e evolução de um par, com 1 e vários processos, e conferência dos frames"""
+    print("=" * 60)
+    print("DEMONSTRAÇÃO: Animações em Paralelo")
+    print("=" * 60)
+
+    from matplotlib.image import imread
+
+    catalogo = CatalogoColunar.de_registros()
+    sirius, betelgeuse = catalogo.nomes.index("Sirius"), catalogo.nomes.index("Betelgeuse")
+    alfa_cen = next(k for k, nome in enumerate(catalogo.nomes) if "Centauri" in nome)
+    processos = max(2, os.cpu_count() or 1)
+
+    with tempfile.TemporaryDirectory(prefix="animacao_") as temporario:
+        print()
+        sequencias = {}
+        from visualizacao import plt
+        anterior = plt.get_backend()
+        for n in (1, processos):
+            # Com 1 processo a renderização roda aqui mesmo: o backend de
+            # quem chamou (aqui, svg) não muda
+            plt.switch_backend("svg" if n == 1 else anterior)
+            destino = os.path.join(temporario, f"rotacao_{n}")
+            relatorio = animar_rotacao_3d(catalogo.estrela(sirius), catalogo.estrela(betelgeuse),
+                                          destino, frames=36, processos=n)
+            assert plt.get_backend() == ("svg" if n == 1 else anterior)
+            print(f"Rotação 3D:       {relatorio}")
+            sequencias[n] = sorted(os.listdir(destino))
+        # Mesma sequência, na mesma ordem, com qualquer número de processos
+        assert sequencias[1] == sequencias[processos] == [f"frame_{k:05d}.png" for k in range(36)]
+        for nome in sequencias[1][::7]:
+            assert np.array_equal(imread(os.path.join(temporario, "rotacao_1", nome)),
+                                  imread(os.path.join(temporario, f"rotacao_{processos}", nome)))
+
+        epocas = np.linspace(-20000.0, 20000.0, 48)
+        destino = os.path.join(temporario, "evolucao_mapa")
+        relatorio = animar_evolucao(catalogo, alfa_cen, sirius, epocas, destino, tipo="mapa",
+                                    processos=processos)
+        print(f"Evolução no mapa: {relatorio}")
+
+        # O frame com blitting é igual ao redesenho completo da mesma figura
+        _iniciar_processo(dict(tipo="mapa", estrela1=catalogo.estrela(alfa_cen),
+                               estrela2=catalogo.estrela(sirius), quadro="equatorial", dpi=100.0,
+                               resultado=CalculadoraGeometrica.calcular_distancia_entre_estrelas(
+                                   catalogo.estrela(alfa_cen), catalogo.estrela(sirius)),
+                               diretorio=None))
+        estado = dict(lon_lat1=(200.0, -50.0), lon_lat2=(110.0, -10.0), distancia1_pc=1.3,
+                      distancia2_pc=2.6, distancia_real_pc=3.0, separacao_graus=90.0, legenda="teste")
+        _, blit, largura, altura = _renderizar(0, estado)
+        fig = _ESTADO["fig"]
+        for artista in fig.findobj(lambda a: a.get_animated()):
+            artista.set_animated(False)
+        fig.canvas.draw()
+        completo = np.asarray(fig.canvas.buffer_rgba()).tobytes()
+        diferentes = np.count_nonzero(np.frombuffer(blit, np.uint8) != np.frombuffer(completo, np.uint8))
+        assert diferentes <= 0.001 * len(completo), diferentes
+        print(f"Frame {largura}×{altura} com blitting igual ao redesenho completo "
+              f"({diferentes} bytes diferentes por antisserrilhado)")
+        _encerrar_processo()
+
+        destino = os.path.join(temporario, "evolucao_3d")
+        relatorio = animar_evolucao(catalogo, alfa_cen, sirius, epocas, destino, giro_graus=90.0,
+                                    processos=processos)
+        print(f"Evolução em 3D:   {relatorio}")
+
+        if shutil.which("ffmpeg"):
+            relatorio = animar_rotacao_3d(catalogo.estrela(sirius), catalogo.estrela(betelgeuse),
+                                          os.path.join(temporario, "rotacao.mp4"), frames=36,
+                                          processos=processos)
+            print(f"Vídeo:            {relatorio}")
+        else:
+            print("ffmpeg não instalado: vídeo não gerado")
+
+    print("\n✅ Demonstração concluída!")
+
+
+if __name__ == "__main__":
+    demonstracao_animacao()
@@ -15,6 +15,7 @@ PI = math.pi
 RADIANOS_POR_GRAU = PI / 180.0
 GRAUS_POR_RADIANO = 180.0 / PI
 SEGUNDOS_POR_GRAU = 3600.0
+RADIANOS_POR_MAS = RADIANOS_POR_GRAU / (SEGUNDOS_POR_GRAU * 1000.0)
 PARSEC_PARA_ANOS_LUZ = 3.26156
 
 
@@ -34,6 +35,15 @@ class CoordenadaHMS:
         """Converte para radianos"""
         return self.para_graus() * RADIANOS_POR_GRAU
     
+    @classmethod
+    def de_graus(cls, graus: float) -> "CoordenadaHMS":
+        """Cria a coordenada a partir de graus decimais (360° = 24h)"""
+        horas_decimais = (graus % 360.0) / 15.0
+        horas = int(horas_decimais)
+        minutos = int((horas_decimais - horas) * 60.0)
+        segundos = (horas_decimais - horas - minutos / 60.0) * 3600.0
+        return cls(horas, minutos, segundos)
+    
     def __str__(self) -> str:
         return f"{self.horas}h {self.minutos}m {self.segundos:.2f}s"
 
@@ -55,6 +65,15 @@ class CoordenadaDMS:
         """Converte para radianos"""
         return self.para_graus() * RADIANOS_POR_GRAU
     
+    @classmethod
+    def de_graus(cls, graus: float) -> "CoordenadaDMS":
+        """Cria a coordenada a partir de graus decimais"""
+        absoluto = abs(graus)
+        inteiro = int(absoluto)
+        minutos = int((absoluto - inteiro) * 60.0)
+        segundos = (absoluto - inteiro - minutos / 60.0) * 3600.0
+        return cls(inteiro, minutos, segundos, graus >= 0)
+    
     def __str__(self) -> str:
         sinal = "+" if self.positivo else "-"
         return f"{sinal}{abs(self.graus)}° {self.minutos}' {self.segundos:.2f}\""
@@ -67,6 +86,11 @@ class Estrela:
     ascensao_reta: CoordenadaHMS = None
     declinacao: CoordenadaDMS = None
     paralaxe_mas: float = 0.0  # milissegundos de arco
+    erro_paralaxe_mas: float = 0.0  # incerteza (1σ) da paralaxe
+    erro_posicao_mas: float = 0.0  # incerteza (1σ) da posição em cada eixo do céu
+    movimento_proprio_ar_mas_ano: float = 0.0  # μα* = μα·cos(δ)
+    movimento_proprio_dec_mas_ano: float = 0.0  # μδ
+    velocidade_radial_kms: float = 0.0  # positiva = afastando-se
     
     def __post_init__(self):
         if self.ascensao_reta is None:
@@ -175,7 +199,8 @@ class CalculadoraGeometrica:
         d2_sq = distancia2 ** 2
         produto = 2.0 * distancia1 * distancia2 * math.cos(separacao_angular)
         
-        return math.sqrt(d1_sq + d2_sq - produto)
+        # Arredondamento pode gerar valores levemente negativos para estrelas coincidentes
+        return math.sqrt(max(d1_sq + d2_sq - produto, 0.0))
     
     @classmethod
     def calcular_distancia_entre_estrelas(cls, estrela1: Estrela, 
@@ -0,0 +1,174 @@
+"""
+Calculadora Geométrica de Distância Entre Estrelas
+Catálogo de Estrelas e Índice de Busca
+
+Autor: Luiz Tiago Wilcke
+Data: 2025
+"""
+
+import bisect
+from array import array
+from typing import Dict, List, Optional, Sequence
+
+from calculos import (
+    Estrela, CoordenadaHMS, CoordenadaDMS,
+    CalculadoraGeometrica, PARSEC_PARA_ANOS_LUZ
+)
+
+# Catálogo de estrelas conhecidas
+CATALOGO_ESTRELAS = [
+    {"nome": "Sirius", "ar_h": 6, "ar_m": 45, "ar_s": 8.9, "dec_sinal": "-", "dec_g": 16, "dec_m": 42, "dec_s": 58, "paralaxe": 379.21},
+    {"nome": "Betelgeuse", "ar_h": 5, "ar_m": 55, "ar_s": 10.3, "dec_sinal": "+", "dec_g": 7, "dec_m": 24, "dec_s": 25, "paralaxe": 4.51},
+    {"nome": "Proxima Centauri", "ar_h": 14, "ar_m": 29, "ar_s": 42.9, "dec_sinal": "-", "dec_g": 62, "dec_m": 40, "dec_s": 46, "paralaxe": 768.07},
+    {"nome": "Alpha Centauri A", "ar_h": 14, "ar_m": 39, "ar_s": 36.5, "dec_sinal": "-", "dec_g": 60, "dec_m": 50, "dec_s": 2, "paralaxe": 747.1},
+    {"nome": "Vega", "ar_h": 18, "ar_m": 36, "ar_s": 56.3, "dec_sinal": "+", "dec_g": 38, "dec_m": 47, "dec_s": 1, "paralaxe": 130.23},
+    {"nome": "Arcturus", "ar_h": 14, "ar_m": 15, "ar_s": 39.7, "dec_sinal": "+", "dec_g": 19, "dec_m": 10, "dec_s": 57, "paralaxe": 88.83},
+    {"nome": "Rigel", "ar_h": 5, "ar_m": 14, "ar_s": 32.3, "dec_sinal": "-", "dec_g": 8, "dec_m": 12, "dec_s": 6, "paralaxe": 3.78},
+    {"nome": "Canopus", "ar_h": 6, "ar_m": 23, "ar_s": 57.1, "dec_sinal": "-", "dec_g": 52, "dec_m": 41, "dec_s": 44, "paralaxe": 10.55},
+    {"nome": "Aldebaran", "ar_h": 4, "ar_m": 35, "ar_s": 55.2, "dec_sinal": "+", "dec_g": 16, "dec_m": 30, "dec_s": 33, "paralaxe": 48.94},
+    {"nome": "Capella", "ar_h": 5, "ar_m": 16, "ar_s": 41.4, "dec_sinal": "+", "dec_g": 45, "dec_m": 59, "dec_s": 53, "paralaxe": 76.20},
+    {"nome": "Polaris", "ar_h": 2, "ar_m": 31, "ar_s": 49.1, "dec_sinal": "+", "dec_g": 89, "dec_m": 15, "dec_s": 51, "paralaxe": 7.54},
+    {"nome": "Antares", "ar_h": 16, "ar_m": 29, "ar_s": 24.5, "dec_sinal": "-", "dec_g": 26, "dec_m": 25, "dec_s": 55, "paralaxe": 5.40},
+    {"nome": "Spica", "ar_h": 13, "ar_m": 25, "ar_s": 11.6, "dec_sinal": "-", "dec_g": 11, "dec_m": 9, "dec_s": 41, "paralaxe": 13.06},
+    {"nome": "Deneb", "ar_h": 20, "ar_m": 41, "ar_s": 25.9, "dec_sinal": "+", "dec_g": 45, "dec_m": 16, "dec_s": 49, "paralaxe": 2.31},
+    {"nome": "Altair", "ar_h": 19, "ar_m": 50, "ar_s": 47.0, "dec_sinal": "+", "dec_g": 8, "dec_m": 52, "dec_s": 6, "paralaxe": 194.95},
+    {"nome": "Procyon", "ar_h": 7, "ar_m": 39, "ar_s": 18.1, "dec_sinal": "+", "dec_g": 5, "dec_m": 13, "dec_s": 30, "paralaxe": 284.56},
+    {"nome": "Regulus", "ar_h": 10, "ar_m": 8, "ar_s": 22.3, "dec_sinal": "+", "dec_g": 11, "dec_m": 58, "dec_s": 2, "paralaxe": 41.13},
+    {"nome": "Fomalhaut", "ar_h": 22, "ar_m": 57, "ar_s": 39.0, "dec_sinal": "-", "dec_g": 29, "dec_m": 37, "dec_s": 20, "paralaxe": 129.81},
+]
+
+
+def estrela_de_registro(registro: dict) -> Estrela:
+    """Converter um registro do catálogo em Estrela"""
+    return Estrela(
+        nome=registro["nome"],
+        ascensao_reta=CoordenadaHMS(registro["ar_h"], registro["ar_m"], registro["ar_s"]),
+        declinacao=CoordenadaDMS(registro["dec_g"], registro["dec_m"], registro["dec_s"],
+                                 registro["dec_sinal"] != "-"),
+        paralaxe_mas=registro["paralaxe"],
+        erro_paralaxe_mas=registro.get("erro_paralaxe", 0.0),
+        erro_posicao_mas=registro.get("erro_posicao", 0.0),
+        movimento_proprio_ar_mas_ano=registro.get("mp_ar", 0.0),
+        movimento_proprio_dec_mas_ano=registro.get("mp_dec", 0.0),
+        velocidade_radial_kms=registro.get("vel_radial", 0.0)
+    )
+
+
+def normalizar_nome(nome: str) -> str:
+    """Forma canônica usada nas buscas (sem diferenciar maiúsculas)"""
+    return " ".join(nome.casefold().split())
+
+
+class IndiceCatalogo:
+    """
+    Índice de nomes e distâncias para busca incremental no catálogo
+
+    - Prefixo: nomes normalizados ordenados, respondidos com busca binária
+    - Substring: índice invertido de trigramas (listas de postagem ordenadas)
+    - Distância: permutação pré-ordenada e posto de cada estrela
+
+    As consultas devolvem índices de CATALOGO_ESTRELAS, de modo que a
+    estrela escolhida é obtida por acesso direto, sem varrer o catálogo.
+    """
+
+    TAMANHO_NGRAMA = 3
+
+    def __init__(self, registros: Sequence[dict] = CATALOGO_ESTRELAS):
+        self.registros = registros
+        self.nomes = [normalizar_nome(r["nome"]) for r in registros]
+
+        # Distâncias (mesma regra de calcular_distancia_paralaxe)
+        self.distancias = array("d", (
+            CalculadoraGeometrica.calcular_distancia_paralaxe(r["paralaxe"])
+            for r in registros
+        ))
+
+        # Ordem por nome e por distância
+        self.ordem_nome = array("l", sorted(range(len(registros)), key=self.nomes.__getitem__))
+        self._nomes_ordenados = [self.nomes[i] for i in self.ordem_nome]
+        self.ordem_distancia = array("l", sorted(range(len(registros)),
+                                                 key=self.distancias.__getitem__))
+        self._posto_distancia = array("l", [0]) * len(registros)
+        for posto, i in enumerate(self.ordem_distancia):
+            self._posto_distancia[i] = posto
+        self._posto_nome = array("l", [0]) * len(registros)
+        for posto, i in enumerate(self.ordem_nome):
+            self._posto_nome[i] = posto
+
+        # Índice invertido de trigramas
+        self._ngramas: Dict[str, array] = {}
+        for i, nome in enumerate(self.nomes):
+            for ngrama in set(self._ngramas_de(nome)):
+                lista = self._ngramas.get(ngrama)
+                if lista is None:
+                    lista = self._ngramas[ngrama] = array("l")
+                lista.append(i)
+
+        # Última consulta, reaproveitada quando o texto apenas cresce
+        self._ultima_consulta: Optional[str] = None
+        self._ultimo_resultado: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.registros)
+
+    @classmethod
+    def _ngramas_de(cls, texto: str):
+        n = cls.TAMANHO_NGRAMA
+        return (texto[k:k + n] for k in range(len(texto) - n + 1))
+
+    def distancia_anos_luz(self, indice: int) -> float:
+        """Distância da estrela em anos-luz"""
+        return self.distancias[indice] * PARSEC_PARA_ANOS_LUZ
+
+    def buscar_prefixo(self, prefixo: str) -> List[int]:
+        """Índices das estrelas cujo nome começa com o prefixo"""
+        prefixo = normalizar_nome(prefixo)
+        inicio = bisect.bisect_left(self._nomes_ordenados, prefixo)
+        fim = bisect.bisect_left(self._nomes_ordenados, prefixo + "\U0010ffff")
+        return list(self.ordem_nome[inicio:fim])
+
+    def buscar_substring(self, texto: str) -> List[int]:
+        """Índices das estrelas cujo nome contém o texto"""
+        texto = normalizar_nome(texto)
+        if not texto:
+            return list(range(len(self.registros)))
+        if len(texto) < self.TAMANHO_NGRAMA:
+            # Curto demais para o índice de trigramas: verificar cada nome
+            return [i for i, nome in enumerate(self.nomes) if texto in nome]
+
+        # Interseção das listas de postagem, começando pela menor
+        listas = sorted((self._ngramas.get(g) for g in set(self._ngramas_de(texto))),
+                        key=lambda lista: 0 if lista is None else len(lista))
+        if listas[0] is None:
+            return []
+        candidatos = set(listas[0])
+        for lista in listas[1:]:
+            candidatos.intersection_update(lista)
+            if not candidatos:
+                return []
+        return [i for i in sorted(candidatos) if texto in self.nomes[i]]
+
+    def buscar(self, texto: str = "", ordenar_por: str = "distancia") -> List[int]:
+        """
+        Busca incremental (digitar para filtrar)
+
+        Se o novo texto estende o anterior, apenas o resultado anterior é
+        refiltrado. O resultado vem ordenado por 'distancia' ou 'nome'.
+        """
+        texto = normalizar_nome(texto)
+        if not texto:
+            resultado = list(self.ordem_distancia if ordenar_por == "distancia"
+                             else self.ordem_nome)
+            self._ultima_consulta, self._ultimo_resultado = texto, resultado
+            return resultado
+
+        anterior = self._ultima_consulta
+        if anterior and texto.startswith(anterior):
+            indices = [i for i in self._ultimo_resultado if texto in self.nomes[i]]
+        else:
+            indices = self.buscar_substring(texto)
+
+        posto = self._posto_distancia if ordenar_por == "distancia" else self._posto_nome
+        indices.sort(key=posto.__getitem__)
+        self._ultima_consulta, self._ultimo_resultado = texto, indices
+        return indices
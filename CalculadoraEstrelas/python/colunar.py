@@ -0,0 +1,202 @@
+"""
+Calculadora Geométrica de Distância Entre Estrelas
+Catálogo Colunar e Cálculos em Lote
+
+Autor: Luiz Tiago Wilcke
+Data: 2025
+"""
+
+import csv
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Optional, Sequence
+
+import numpy as np
+
+from calculos import (
+    Estrela, CoordenadaHMS, CoordenadaDMS,
+    GRAUS_POR_RADIANO, PARSEC_PARA_ANOS_LUZ
+)
+from motores import executar
+
+# Registro binário escrito por calculadora_lote --binario
+TIPO_REGISTRO_LOTE = np.dtype([("i", "<i8"), ("j", "<i8"),
+                               ("separacao_rad", "<f8"), ("distancia_real_pc", "<f8")])
+
+
+# ============================================================================
+# Versões vetorizadas dos métodos de CalculadoraGeometrica
+# (executadas pelo motor escolhido em motores.py; NumPy por padrão)
+# ============================================================================
+
+def calcular_distancia_paralaxe_lote(paralaxe_mas: np.ndarray) -> np.ndarray:
+    """Método 1 em lote: d = 1000 / p (0 quando p <= 0)"""
+    return executar("distancia_paralaxe", paralaxe_mas)
+
+
+def calcular_separacao_angular_lote(alfa1: np.ndarray, delta1: np.ndarray,
+                                    alfa2: np.ndarray, delta2: np.ndarray) -> np.ndarray:
+    """Método 2 em lote: Lei dos Cossenos Esférica (radianos)"""
+    return executar("separacao_angular", alfa1, delta1, alfa2, delta2)
+
+
+def calcular_distancia_real_lote(distancia1: np.ndarray, distancia2: np.ndarray,
+                                 separacao_angular: np.ndarray) -> np.ndarray:
+    """Método 3 em lote: D = √(d₁² + d₂² - 2·d₁·d₂·cos(θ))"""
+    return executar("distancia_real", distancia1, distancia2, separacao_angular)
+
+
+def esfericas_para_cartesianas(alfa: np.ndarray, delta: np.ndarray,
+                               distancia: np.ndarray) -> np.ndarray:
+    """Converter (α, δ, d) para posições (N, 3) com o Sol na origem"""
+    cos_delta = np.cos(delta)
+    return np.stack([distancia * cos_delta * np.cos(alfa),
+                     distancia * cos_delta * np.sin(alfa),
+                     distancia * np.sin(delta)], axis=-1)
+
+
+# ============================================================================
+# Catálogo em colunas
+# ============================================================================
+
+# Arquivo binário lido por cpp/src/lote.cpp: este cabeçalho, N (uint64) e
+# as colunas abaixo, cada uma com N float64, tudo little-endian
+MAGICO_BINARIO = b"ESTRELAS"
+COLUNAS_BINARIO = ("alfa_rad", "delta_rad", "paralaxe_mas")
+
+
+@dataclass
+class CatalogoColunar:
+    """
+    Catálogo armazenado em colunas numpy (uma posição por estrela)
+
+    As grandezas derivadas (distância, posições cartesianas, vetores
+    unitários) são calculadas uma única vez, no primeiro acesso.
+    """
+    nomes: Sequence[str] = field(default_factory=list)
+    alfa_rad: np.ndarray = None
+    delta_rad: np.ndarray = None
+    paralaxe_mas: np.ndarray = None
+    erro_paralaxe_mas: np.ndarray = None
+    erro_posicao_mas: np.ndarray = None
+    movimento_proprio_ar_mas_ano: np.ndarray = None
+    movimento_proprio_dec_mas_ano: np.ndarray = None
+    velocidade_radial_kms: np.ndarray = None
+
+    # Colunas numéricas e o atributo correspondente de Estrela
+    COLUNAS = {
+        "alfa_rad": "alfa_rad",
+        "delta_rad": "delta_rad",
+        "paralaxe_mas": "paralaxe_mas",
+        "erro_paralaxe_mas": "erro_paralaxe_mas",
+        "erro_posicao_mas": "erro_posicao_mas",
+        "movimento_proprio_ar_mas_ano": "movimento_proprio_ar_mas_ano",
+        "movimento_proprio_dec_mas_ano": "movimento_proprio_dec_mas_ano",
+        "velocidade_radial_kms": "velocidade_radial_kms",
+    }
+
+    def __post_init__(self):
+        n = len(self.nomes)
+        for nome in self.COLUNAS:
+            coluna = self._coluna(getattr(self, nome), n)
+            if len(coluna) != n:
+                raise ValueError(f"Coluna {nome} tem {len(coluna)} valores, esperado {n}")
+            setattr(self, nome, coluna)
+
+    @staticmethod
+    def _coluna(valores, n: int) -> np.ndarray:
+        if valores is None:
+            return np.zeros(n)
+        return np.ascontiguousarray(valores, dtype=np.float64)
+
+    @classmethod
+    def de_estrelas(cls, estrelas: Sequence[Estrela]) -> "CatalogoColunar":
+        """Montar o catálogo a partir de objetos Estrela"""
+        return cls(nomes=[e.nome for e in estrelas], **{
+            coluna: np.fromiter((getattr(e, atributo) for e in estrelas), np.float64, len(estrelas))
+            for coluna, atributo in cls.COLUNAS.items()
+        })
+
+    @classmethod
+    def de_registros(cls, registros: Optional[Sequence[dict]] = None) -> "CatalogoColunar":
+        """Montar o catálogo a partir de registros no formato de CATALOGO_ESTRELAS"""
+        from catalogo import CATALOGO_ESTRELAS, estrela_de_registro
+        if registros is None:
+            registros = CATALOGO_ESTRELAS
+        return cls.de_estrelas([estrela_de_registro(r) for r in registros])
+
+    @classmethod
+    def de_binario(cls, caminho: str) -> "CatalogoColunar":
+        """Ler um catálogo gravado por salvar_binario (sem os nomes)"""
+        with open(caminho, "rb") as arquivo:
+            if arquivo.read(len(MAGICO_BINARIO)) != MAGICO_BINARIO:
+                raise ValueError(f"{caminho} não é um catálogo binário")
+            n = int(np.fromfile(arquivo, dtype="<u8", count=1)[0])
+            colunas = {coluna: np.fromfile(arquivo, dtype="<f8", count=n)
+                       for coluna in COLUNAS_BINARIO}
+        return cls(nomes=[""] * n, **colunas)
+
+    def salvar_binario(self, caminho: str):
+        """Gravar α, δ e paralaxe no formato binário da versão C++ em lote"""
+        with open(caminho, "wb") as arquivo:
+            arquivo.write(MAGICO_BINARIO)
+            np.array([len(self)], dtype="<u8").tofile(arquivo)
+            for coluna in COLUNAS_BINARIO:
+                getattr(self, coluna).astype("<f8", copy=False).tofile(arquivo)
+
+    def salvar_csv(self, caminho: str):
+        """Gravar nome e todas as colunas em CSV (valores exatos, repr do float)"""
+        with open(caminho, "w", newline="", encoding="utf-8") as arquivo:
+            escritor = csv.writer(arquivo)
+            escritor.writerow(["nome", *self.COLUNAS])
+            colunas = [getattr(self, coluna).tolist() for coluna in self.COLUNAS]
+            escritor.writerows(zip(self.nomes, *colunas))
+
+    def __len__(self) -> int:
+        return len(self.nomes)
+
+    @cached_property
+    def distancia_parsecs(self) -> np.ndarray:
+        """Distância de cada estrela (d = 1000 / p)"""
+        return calcular_distancia_paralaxe_lote(self.paralaxe_mas)
+
+    @property
+    def distancia_anos_luz(self) -> np.ndarray:
+        return self.distancia_parsecs * PARSEC_PARA_ANOS_LUZ
+
+    @cached_property
+    def cartesianas(self) -> np.ndarray:
+        """Posições (N, 3) em parsecs, Sol na origem"""
+        return esfericas_para_cartesianas(self.alfa_rad, self.delta_rad, self.distancia_parsecs)
+
+    @cached_property
+    def vetores_unitarios(self) -> np.ndarray:
+        """Direções (N, 3) na esfera celeste"""
+        return esfericas_para_cartesianas(self.alfa_rad, self.delta_rad, 1.0)
+
+    def estrela(self, indice: int) -> Estrela:
+        """Reconstruir a Estrela de uma linha do catálogo"""
+        return Estrela(
+            nome=self.nomes[indice],
+            ascensao_reta=CoordenadaHMS.de_graus(float(self.alfa_rad[indice]) * GRAUS_POR_RADIANO),
+            declinacao=CoordenadaDMS.de_graus(float(self.delta_rad[indice]) * GRAUS_POR_RADIANO),
+            **{atributo: float(getattr(self, coluna)[indice])
+               for coluna, atributo in self.COLUNAS.items()
+               if coluna not in ("alfa_rad", "delta_rad")}
+        )
+
+    def subconjunto(self, indices) -> "CatalogoColunar":
+        """Novo catálogo com as linhas indicadas (índices ou máscara)"""
+        indices = np.asarray(indices)
+        if indices.dtype == bool:
+            indices = np.flatnonzero(indices)
+        return type(self)(nomes=[self.nomes[i] for i in indices],
+                          **{coluna: getattr(self, coluna)[indices] for coluna in self.COLUNAS})
+
+    def pares(self, i: np.ndarray, j: np.ndarray):
+        """Separação angular (rad) e distância real (pc) dos pares (i, j)"""
+        theta = calcular_separacao_angular_lote(self.alfa_rad[i], self.delta_rad[i],
+                                                self.alfa_rad[j], self.delta_rad[j])
+        distancia = calcular_distancia_real_lote(self.distancia_parsecs[i],
+                                                 self.distancia_parsecs[j], theta)
+        return theta, distancia
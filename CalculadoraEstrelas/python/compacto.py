@@ -0,0 +1,422 @@
+"""
+Calculadora Geométrica de Distância Entre Estrelas
+Armazenamento Compacto do Catálogo (coordenadas em ponto fixo)
+
+Autor: Luiz Tiago Wilcke
+Data: 2025
+"""
+
+import math
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+
+from calculos import CalculadoraGeometrica
+from colunar import (
+    CatalogoColunar, calcular_distancia_paralaxe_lote,
+    calcular_separacao_angular_lote, calcular_distancia_real_lote, esfericas_para_cartesianas
+)
+
+# ----------------------------------------------------------------------------
+# Precisão documentada
+#
+#   α: uint32 em ponto fixo sobre [0, 2π)  → passo 2π/2³² = 1,46 nrad = 0,302 mas,
+#      erro máximo meio passo = 0,151 mas (no céu, × cos δ)
+#   δ: uint32 em ponto fixo sobre [-π/2, π/2] → passo π/(2³² - 1) = 0,151 mas,
+#      erro máximo 0,0755 mas
+#   paralaxe: int32 × 2^expoente (int8), com o passo escolhido pelo erro da
+#      própria estrela: passo <= σ_p / FRACAO_ERRO_PARALAXE, então o erro de
+#      quantização é <= σ_p / 64 (desprezível diante da medida). Sem σ_p, o
+#      passo acompanha o valor como um float32 (erro relativo <= 2⁻²⁴).
+#   erros (σ_p, σ_pos): float16 (3 algarismos); movimentos e velocidade radial: float32
+# ----------------------------------------------------------------------------
+ESCALA_ALFA = 2.0 ** 32 / (2.0 * math.pi)
+ESCALA_DELTA = (2.0 ** 32 - 1.0) / math.pi
+PASSO_ALFA_RAD = 1.0 / ESCALA_ALFA
+PASSO_DELTA_RAD = 1.0 / ESCALA_DELTA
+ERRO_MAXIMO_ALFA_RAD = PASSO_ALFA_RAD / 2
+ERRO_MAXIMO_DELTA_RAD = PASSO_DELTA_RAD / 2
+
+FRACAO_ERRO_PARALAXE = 32
+BITS_SEM_ERRO = 24          # bits significativos da paralaxe quando σ_p não é conhecido
+BITS_MAXIMOS = 30           # o inteiro da paralaxe cabe em int32 com folga
+
+MAS_POR_RAD = 180.0 / math.pi * 3.6e6
+
+# Estrelas decodificadas por vez nas operações em blocos
+LINHAS_POR_BLOCO = 1 << 20
+
+# Colunas gravadas e tipo de cada uma
+TIPOS_COLUNAS = {
+    "alfa_q": np.uint32,
+    "delta_q": np.uint32,
+    "paralaxe_q": np.int32,
+    "paralaxe_expoente": np.int8,
+    "erro_paralaxe_mas": np.float16,
+    "erro_posicao_mas": np.float16,
+    "movimento_proprio_ar_mas_ano": np.float32,
+    "movimento_proprio_dec_mas_ano": np.float32,
+    "velocidade_radial_kms": np.float32,
+}
+
+
+# ============================================================================
+# Codificação vetorizada
+# ============================================================================
+
+def codificar_alfa(alfa_rad: np.ndarray) -> np.ndarray:
+    codigo = np.rint(np.mod(alfa_rad, 2.0 * math.pi) * ESCALA_ALFA)
+    # 2π - meio passo arredonda para 2³², que é o mesmo ponto que 0
+    return np.mod(codigo, 2.0 ** 32).astype(np.uint32)
+
+
+def decodificar_alfa(codigo: np.ndarray) -> np.ndarray:
+    return codigo.astype(np.float64) * PASSO_ALFA_RAD
+
+
+def codificar_delta(delta_rad: np.ndarray) -> np.ndarray:
+    codigo = np.rint((np.clip(delta_rad, -math.pi / 2, math.pi / 2) + math.pi / 2) * ESCALA_DELTA)
+    return np.clip(codigo, 0, 2.0 ** 32 - 1).astype(np.uint32)
+
+
+def decodificar_delta(codigo: np.ndarray) -> np.ndarray:
+    return codigo.astype(np.float64) * PASSO_DELTA_RAD - math.pi / 2
+
+
+def codificar_paralaxe(paralaxe_mas: np.ndarray, erro_paralaxe_mas: np.ndarray
+                       ) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Paralaxe como inteiro × 2^expoente, com passo <= σ_p / FRACAO_ERRO_PARALAXE
+
+    O expoente nunca é menor que o necessário para o inteiro caber em
+    BITS_MAXIMOS bits, nem maior que o de um float32 do mesmo valor quando
+    σ_p não é positivo. Também nunca passa de |p|/2: com σ_p >= 64·|p|
+    (fontes pouco significativas) o passo do erro arredondaria a paralaxe
+    para 0, e a estrela sairia das consultas de distância; assim o inteiro
+    é sempre ±1 ou ±2, com o sinal da paralaxe. Abaixo do menor expoente
+    (|p| < 2⁻¹²⁷ mas) a paralaxe vira a menor magnitude representável,
+    ±1 × 2⁻¹²⁷, com o mesmo sinal.
+    """
+    paralaxe = np.nan_to_num(np.asarray(paralaxe_mas, dtype=np.float64))
+    erro = np.nan_to_num(np.asarray(erro_paralaxe_mas, dtype=np.float64))
+    with np.errstate(divide="ignore"):
+        _, expoente_valor = np.frexp(paralaxe)      # |p| = m·2^e, 0,5 <= m < 1
+        expoente_erro = np.floor(np.log2(erro / FRACAO_ERRO_PARALAXE))
+    expoente = np.where(erro > 0, expoente_erro, expoente_valor - BITS_SEM_ERRO)
+    expoente = np.minimum(expoente, expoente_valor - 1)
+    expoente = np.maximum(expoente, expoente_valor - BITS_MAXIMOS)
+    expoente = np.where(paralaxe == 0, 0, np.clip(expoente, -127, 127)).astype(np.int8)
+    inteiro = np.rint(np.ldexp(paralaxe, -expoente.astype(np.int32))).astype(np.int32)
+    minusculas = (inteiro == 0) & (paralaxe != 0)
+    inteiro[minusculas] = np.sign(paralaxe[minusculas])
+    expoente[minusculas] = -127
+    return inteiro, expoente
+
+
+def decodificar_paralaxe(inteiro: np.ndarray, expoente: np.ndarray) -> np.ndarray:
+    return np.ldexp(inteiro.astype(np.float64), expoente.astype(np.int32))
+
+
+# ============================================================================
+# Catálogo compacto
+# ============================================================================
+
+@dataclass
+class CatalogoCompacto:
+    """
+    Catálogo com 29 bytes por estrela (o CatalogoColunar usa 64)
+
+    As colunas podem ser arrays em memória ou mapeadas do disco (abrir).
+    Os módulos trabalham direto sobre ele de duas formas, sempre
+    decodificando só o necessário:
+      - pares(i, j): decodifica apenas as linhas dos pares pedidos
+        (usado por limiares.AvaliadorLimiar e pelos laços em lote);
+      - blocos(): CatalogoColunar de LINHAS_POR_BLOCO estrelas por vez
+        (aceito por grupos.agrupar_fluxo e pelas operações em fluxo).
+    """
+    nomes: Sequence[str] = field(default_factory=list)
+    alfa_q: np.ndarray = None
+    delta_q: np.ndarray = None
+    paralaxe_q: np.ndarray = None
+    paralaxe_expoente: np.ndarray = None
+    erro_paralaxe_mas: np.ndarray = None
+    erro_posicao_mas: np.ndarray = None
+    movimento_proprio_ar_mas_ano: np.ndarray = None
+    movimento_proprio_dec_mas_ano: np.ndarray = None
+    velocidade_radial_kms: np.ndarray = None
+
+    @classmethod
+    def de_colunar(cls, catalogo: CatalogoColunar) -> "CatalogoCompacto":
+        """Codificar um CatalogoColunar"""
+        paralaxe_q, paralaxe_expoente = codificar_paralaxe(catalogo.paralaxe_mas,
+                                                           catalogo.erro_paralaxe_mas)
+        return cls(
+            nomes=catalogo.nomes,
+            alfa_q=codificar_alfa(catalogo.alfa_rad),
+            delta_q=codificar_delta(catalogo.delta_rad),
+            paralaxe_q=paralaxe_q,
+            paralaxe_expoente=paralaxe_expoente,
+            **{coluna: getattr(catalogo, coluna).astype(TIPOS_COLUNAS[coluna])
+               for coluna in ("erro_paralaxe_mas", "erro_posicao_mas", "movimento_proprio_ar_mas_ano",
+                              "movimento_proprio_dec_mas_ano", "velocidade_radial_kms")},
+        )
+
+    @classmethod
+    def de_blocos(cls, blocos) -> "CatalogoCompacto":
+        """Codificar um catálogo que chega em blocos (CatalogoColunar), sem juntá-lo em float64"""
+        partes = [cls.de_colunar(bloco) for bloco in blocos]
+        if not partes:
+            return cls.de_colunar(CatalogoColunar())
+        return cls(nomes=[nome for parte in partes for nome in parte.nomes],
+                   **{coluna: np.concatenate([getattr(parte, coluna) for parte in partes])
+                      for coluna in TIPOS_COLUNAS})
+
+    def __len__(self) -> int:
+        return len(self.alfa_q)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes das colunas numéricas"""
+        return sum(getattr(self, coluna).nbytes for coluna in TIPOS_COLUNAS)
+
+    # ------------------------------------------------------------------
+    # Gravação (uma coluna .npy por arquivo, aberta com np.memmap)
+    # ------------------------------------------------------------------
+
+    def salvar(self, diretorio: str):
+        """Gravar as colunas em 'diretorio' (nomes em nomes.txt, uma linha por estrela)"""
+        os.makedirs(diretorio, exist_ok=True)
+        for coluna in TIPOS_COLUNAS:
+            np.save(os.path.join(diretorio, f"{coluna}.npy"), getattr(self, coluna))
+        with open(os.path.join(diretorio, "nomes.txt"), "w", encoding="utf-8") as arquivo:
+            arquivo.writelines(f"{nome}\n" for nome in self.nomes)
+
+    @classmethod
+    def abrir(cls, diretorio: str, mapear: bool = True) -> "CatalogoCompacto":
+        """Abrir um catálogo gravado por salvar (colunas mapeadas do disco por padrão)"""
+        colunas = {coluna: np.load(os.path.join(diretorio, f"{coluna}.npy"),
+                                   mmap_mode="r" if mapear else None)
+                   for coluna in TIPOS_COLUNAS}
+        with open(os.path.join(diretorio, "nomes.txt"), encoding="utf-8") as arquivo:
+            nomes = arquivo.read().splitlines()
+        return cls(nomes=nomes, **colunas)
+
+    # ------------------------------------------------------------------
+    # Decodificação
+    # ------------------------------------------------------------------
+
+    def _colunas(self, linhas) -> dict:
+        """Colunas float64 do CatalogoColunar para as linhas (fatia ou índices)"""
+        return dict(
+            alfa_rad=decodificar_alfa(self.alfa_q[linhas]),
+            delta_rad=decodificar_delta(self.delta_q[linhas]),
+            paralaxe_mas=decodificar_paralaxe(self.paralaxe_q[linhas], self.paralaxe_expoente[linhas]),
+            **{coluna: np.asarray(getattr(self, coluna)[linhas], dtype=np.float64)
+               for coluna in ("erro_paralaxe_mas", "erro_posicao_mas", "movimento_proprio_ar_mas_ano",
+                              "movimento_proprio_dec_mas_ano", "velocidade_radial_kms")},
+        )
+
+    def decodificar(self, inicio: int = 0, fim: Optional[int] = None) -> CatalogoColunar:
+        """Linhas [inicio, fim) como CatalogoColunar"""
+        fim = len(self) if fim is None else min(fim, len(self))
+        return CatalogoColunar(nomes=list(self.nomes[inicio:fim]), **self._colunas(slice(inicio, fim)))
+
+    def blocos(self, linhas: int = LINHAS_POR_BLOCO) -> Iterator[CatalogoColunar]:
+        """O catálogo inteiro, decodificado em blocos consecutivos"""
+        for inicio in range(0, len(self), linhas):
+            yield self.decodificar(inicio, inicio + linhas)
+
+    def estrela(self, indice: int):
+        return self.decodificar(indice, indice + 1).estrela(0)
+
+    def pares(self, i: np.ndarray, j: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Separação angular (rad) e distância real (pc) dos pares, decodificando só essas linhas"""
+        alfa1, delta1 = decodificar_alfa(self.alfa_q[i]), decodificar_delta(self.delta_q[i])
+        alfa2, delta2 = decodificar_alfa(self.alfa_q[j]), decodificar_delta(self.delta_q[j])
+        theta = calcular_separacao_angular_lote(alfa1, delta1, alfa2, delta2)
+        distancia1 = calcular_distancia_paralaxe_lote(
+            decodificar_paralaxe(self.paralaxe_q[i], self.paralaxe_expoente[i]))
+        distancia2 = calcular_distancia_paralaxe_lote(
+            decodificar_paralaxe(self.paralaxe_q[j], self.paralaxe_expoente[j]))
+        return theta, calcular_distancia_real_lote(distancia1, distancia2, theta)
+
+
+# ============================================================================
+# Relatório de precisão
+# ============================================================================
+
+@dataclass
+class RelatorioPrecisao:
+    """Erros do catálogo compacto em relação ao caminho de precisão total (calculos.py)"""
+    estrelas: int
+    pares: int
+    bytes_compacto: int
+    bytes_completo: int
+    erro_posicao_max_mas: float
+    erro_paralaxe_max_sigma: float
+    erro_paralaxe_relativo_max: float
+    erro_separacao_max_mas: float
+    erro_distancia_relativo_max: float
+    erro_distancia_relativo_mediana: float
+
+    def __str__(self) -> str:
+        linhas = [
+            f"{self.estrelas} estrelas: {self.bytes_compacto / self.estrelas:.0f} bytes/estrela "
+            f"(completo: {self.bytes_completo / self.estrelas:.0f}, "
+            f"{self.bytes_completo / self.bytes_compacto:.1f}× menor)",
+            f"  posição no céu:     erro máximo {self.erro_posicao_max_mas:.4f} mas "
+            f"(limite {math.hypot(ERRO_MAXIMO_ALFA_RAD, ERRO_MAXIMO_DELTA_RAD) * MAS_POR_RAD:.4f} mas)",
+            f"  paralaxe:           erro máximo {self.erro_paralaxe_max_sigma:.4f} σ_p "
+            f"(limite {0.5 / FRACAO_ERRO_PARALAXE:.4f} σ_p), relativo {self.erro_paralaxe_relativo_max:.2e}",
+            f"  separação ({self.pares} pares): erro máximo {self.erro_separacao_max_mas:.4f} mas",
+            f"  distância real:     erro relativo máximo {self.erro_distancia_relativo_max:.2e}, "
+            f"mediana {self.erro_distancia_relativo_mediana:.2e}",
+        ]
+        return "\n".join(linhas)
+
+
+def relatorio_precisao(catalogo: CatalogoColunar, compacto: Optional[CatalogoCompacto] = None,
+                       pares: int = 2000, semente: int = 45) -> RelatorioPrecisao:
+    """
+    Comparar o catálogo compacto com o original: posições e paralaxes de todas
+    as estrelas e, para 'pares' pares sorteados, θ e D de CatalogoCompacto.pares
+    contra CalculadoraGeometrica (calculos.py) aplicada aos valores originais
+    """
+    compacto = compacto if compacto is not None else CatalogoCompacto.de_colunar(catalogo)
+    n = len(catalogo)
+
+    erro_posicao = erro_sigma = erro_relativo = 0.0
+    for inicio in range(0, n, LINHAS_POR_BLOCO):
+        bloco = slice(inicio, min(inicio + LINHAS_POR_BLOCO, n))
+        decodificado = compacto._colunas(bloco)
+        # Corda entre as direções (acos perderia a precisão abaixo de ~3 mas)
+        corda = np.linalg.norm(esfericas_para_cartesianas(catalogo.alfa_rad[bloco], catalogo.delta_rad[bloco], 1.0)
+                               - esfericas_para_cartesianas(decodificado["alfa_rad"],
+                                                            decodificado["delta_rad"], 1.0), axis=1)
+        erro_posicao = max(erro_posicao, float(2.0 * np.arcsin(corda / 2.0).max(initial=0.0)) * MAS_POR_RAD)
+        original = catalogo.paralaxe_mas[bloco]
+        diferenca = np.abs(decodificado["paralaxe_mas"] - original)
+        sigma = catalogo.erro_paralaxe_mas[bloco]
+        if (sigma > 0).any():
+            erro_sigma = max(erro_sigma, float((diferenca[sigma > 0] / sigma[sigma > 0]).max()))
+        if (original != 0).any():
+            erro_relativo = max(erro_relativo,
+                                float((diferenca[original != 0] / np.abs(original[original != 0])).max()))
+
+    gerador = np.random.default_rng(semente)
+    validas = np.flatnonzero(catalogo.paralaxe_mas > 0)
+    i = gerador.choice(validas, pares)
+    j = gerador.choice(validas, pares)
+    distinto = i != j
+    i, j = i[distinto], j[distinto]
+    theta_compacto, distancia_compacta = compacto.pares(i, j)
+    g = CalculadoraGeometrica
+    theta_exato = np.array([g.calcular_separacao_angular(catalogo.alfa_rad[a], catalogo.delta_rad[a],
+                                                         catalogo.alfa_rad[b], catalogo.delta_rad[b])
+                            for a, b in zip(i.tolist(), j.tolist())])
+    distancia_exata = np.array([g.calcular_distancia_real(g.calcular_distancia_paralaxe(catalogo.paralaxe_mas[a]),
+                                                          g.calcular_distancia_paralaxe(catalogo.paralaxe_mas[b]),
+                                                          t)
+                                for a, b, t in zip(i.tolist(), j.tolist(), theta_exato)])
+    relativo = np.abs(distancia_compacta - distancia_exata) / np.maximum(distancia_exata, 1e-300)
+
+    return RelatorioPrecisao(
+        estrelas=n, pares=len(i),
+        bytes_compacto=compacto.nbytes,
+        bytes_completo=sum(getattr(catalogo, coluna).nbytes for coluna in CatalogoColunar.COLUNAS),
+        erro_posicao_max_mas=erro_posicao,
+        erro_paralaxe_max_sigma=erro_sigma,
+        erro_paralaxe_relativo_max=erro_relativo,
+        erro_separacao_max_mas=float(np.abs(theta_compacto - theta_exato).max(initial=0.0)) * MAS_POR_RAD,
+        erro_distancia_relativo_max=float(relativo.max(initial=0.0)),
+        erro_distancia_relativo_mediana=float(np.median(relativo)) if len(relativo) else 0.0,
+    )
+
+
+# ============================================================================
+# Testes
+# ============================================================================
+
+def teste_compacto():
+    """Limites de precisão, vazão, motores sobre o formato compacto e memmap"""
+    print("=" * 60)
+    print("TESTE: Armazenamento Compacto")
+    print("=" * 60)
+
+    import tempfile
+    from grupos import agrupar_fluxo
+    from limiares import AvaliadorLimiar
+    from paridade import catalogo_bordas, catalogo_sintetico
+
+    # Casos de borda: α = 2π, polos, paralaxe zero/negativa, σ_p = 0
+    bordas = catalogo_bordas()
+    # Paralaxes pouco significativas (σ_p >= 64·|p|) não podem virar zero
+    # (nem abaixo do menor expoente, 2⁻¹²⁷)
+    fracas = CatalogoColunar(nomes=["fraca +", "fraca -", "fraca mínima", "minúscula +", "minúscula -",
+                                    "minúscula limite"],
+                             alfa_rad=np.array([1.0, 2.0, 3.0, 4.0, 5.0, 6.0]), delta_rad=np.zeros(6),
+                             paralaxe_mas=np.array([0.05, -0.05, 1e-30, 1e-40, -1e-40, 3e-39]),
+                             erro_paralaxe_mas=np.array([5.0, 5.0, 1.0, 1.0, 1.0, 1.0]))
+    bordas = CatalogoColunar(nomes=bordas.nomes + fracas.nomes,
+                             **{coluna: np.concatenate([getattr(bordas, coluna), getattr(fracas, coluna)])
+                                for coluna in CatalogoColunar.COLUNAS})
+    compacto = CatalogoCompacto.de_colunar(bordas)
+    volta = compacto.decodificar()
+    assert np.all(np.abs(np.angle(np.exp(1j * (volta.alfa_rad - bordas.alfa_rad)))) <= ERRO_MAXIMO_ALFA_RAD * 1.001)
+    assert np.all(np.abs(volta.delta_rad - bordas.delta_rad) <= ERRO_MAXIMO_DELTA_RAD * 1.001)
+    assert np.array_equal(volta.paralaxe_mas == 0, bordas.paralaxe_mas == 0)
+    assert np.array_equal(np.sign(volta.paralaxe_mas), np.sign(bordas.paralaxe_mas))
+    representaveis = np.abs(bordas.paralaxe_mas) >= 2.0 ** -127
+    assert np.all(np.abs(volta.paralaxe_mas - bordas.paralaxe_mas)[representaveis]
+                  <= np.abs(bordas.paralaxe_mas)[representaveis] / 2)
+    assert np.all(np.abs(volta.paralaxe_mas[~representaveis & (bordas.paralaxe_mas != 0)]) == 2.0 ** -127)
+    assert np.array_equal(AvaliadorLimiar(compacto, limite_pc=1e9).validas, bordas.paralaxe_mas > 0)
+    print("\nCasos de borda: dentro dos limites documentados")
+
+    # Um milhão de estrelas: limites e vazão de codificação/decodificação
+    grande = catalogo_sintetico(1_000_000)
+    # Erros de paralaxe no estilo do Gaia: 0,02 a 0,5 mas
+    grande.erro_paralaxe_mas = np.random.default_rng(45).uniform(0.02, 0.5, len(grande))
+    inicio = time.perf_counter()
+    compacto = CatalogoCompacto.de_colunar(grande)
+    codificar = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    volta = compacto.decodificar()
+    decodificar = time.perf_counter() - inicio
+    sigma = grande.erro_paralaxe_mas
+    erro_paralaxe = np.abs(volta.paralaxe_mas - grande.paralaxe_mas)
+    assert np.all(erro_paralaxe[sigma > 0] <= sigma[sigma > 0] / (2 * FRACAO_ERRO_PARALAXE))
+    assert np.all(np.abs(volta.delta_rad - grande.delta_rad) <= ERRO_MAXIMO_DELTA_RAD * 1.001)
+    print(f"\n{len(grande)} estrelas: codificação {len(grande) / codificar / 1e6:.1f} M/s, "
+          f"decodificação {len(grande) / decodificar / 1e6:.1f} M/s")
+    print(relatorio_precisao(grande, compacto))
+
+    # Motores sobre o formato compacto = os mesmos motores sobre o decodificado
+    catalogo = catalogo_sintetico(3000)
+    compacto = CatalogoCompacto.de_colunar(catalogo)
+    decodificado = compacto.decodificar()
+    for limite_pc, limite_graus in [(3.0, None), (None, 1.0), (50.0, 5.0)]:
+        direto = AvaliadorLimiar(compacto, limite_pc, limite_graus).todos_os_pares()
+        esperado = AvaliadorLimiar(decodificado, limite_pc, limite_graus).todos_os_pares()
+        assert all(np.array_equal(a, b, equal_nan=True) for a, b in zip(direto, esperado))
+    print("\nLimiares sobre o formato compacto: iguais aos do catálogo decodificado")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        compacto.salvar(diretorio)
+        mapeado = CatalogoCompacto.abrir(diretorio)
+        assert isinstance(mapeado.alfa_q, np.memmap) and mapeado.nomes == list(compacto.nomes)
+        assert all(np.array_equal(getattr(mapeado, coluna), getattr(compacto, coluna))
+                   for coluna in TIPOS_COLUNAS)
+        rotulos_fluxo = agrupar_fluxo(mapeado.blocos(700), 1.0, 5.0, diretorio)
+        rotulos = agrupar_fluxo([decodificado], 1.0, 5.0, diretorio)
+        assert np.array_equal(rotulos_fluxo.rotulos, rotulos.rotulos)
+    print("Memmap e grupos em fluxo (blocos de 700 estrelas): iguais ao catálogo decodificado")
+
+    print("\n✅ Teste concluído com sucesso!")
+
+
+if __name__ == "__main__":
+    teste_compacto()
@@ -0,0 +1,315 @@
+"""
+Calculadora Geométrica de Distância Entre Estrelas
+Consultas Indexadas sobre o Catálogo Colunar
+
+Autor: Luiz Tiago Wilcke
+Data: 2025
+"""
+
+import math
+import time
+from collections import abc
+from functools import cached_property
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from calculos import RADIANOS_POR_GRAU
+from catalogo import normalizar_nome
+from colunar import CatalogoColunar
+
+
+class IndiceColunar:
+    """
+    Índices ordenados de um CatalogoColunar
+
+    Para cada coluna indexada guarda a permutação que a ordena, os valores
+    já ordenados (para a busca binária) e o posto de cada estrela (para
+    testar se ela está em um intervalo sem outra busca). Cada índice é
+    montado no primeiro uso.
+
+    Estrelas sem paralaxe positiva não entram no índice de distância: um
+    filtro de distância nunca as seleciona.
+    """
+
+    def __init__(self, catalogo: CatalogoColunar):
+        self.catalogo = catalogo
+
+    def __len__(self) -> int:
+        return len(self.catalogo)
+
+    @staticmethod
+    def _montar(valores: np.ndarray, validas: Optional[np.ndarray] = None):
+        ordem = np.argsort(valores, kind="stable")
+        if validas is not None:
+            ordem = ordem[validas[ordem]]
+        posto = np.full(len(valores), -1, dtype=np.int64)
+        posto[ordem] = np.arange(len(ordem))
+        return ordem, valores[ordem], posto
+
+    @cached_property
+    def distancia(self):
+        return self._montar(self.catalogo.distancia_parsecs, self.catalogo.paralaxe_mas > 0)
+
+    @cached_property
+    def alfa(self):
+        return self._montar(self.catalogo.alfa_rad)
+
+    @cached_property
+    def delta(self):
+        return self._montar(self.catalogo.delta_rad)
+
+    @cached_property
+    def nomes_normalizados(self) -> Sequence[str]:
+        return [normalizar_nome(nome) for nome in self.catalogo.nomes]
+
+    def intervalo(self, coluna: str, minimo: Optional[float],
+                  maximo: Optional[float]) -> Tuple[int, int]:
+        """Postos [inicio, fim) da coluna com minimo <= valor <= maximo"""
+        _, valores, _ = getattr(self, coluna)
+        inicio = 0 if minimo is None else int(np.searchsorted(valores, minimo, side="left"))
+        fim = len(valores) if maximo is None else int(np.searchsorted(valores, maximo, side="right"))
+        return inicio, max(inicio, fim)
+
+    def consulta(self) -> "Consulta":
+        """Consulta vazia (todas as estrelas), para encadear filtros"""
+        return Consulta(self)
+
+
+class Consulta:
+    """
+    Filtros combináveis, avaliados apenas quando o resultado é pedido
+
+    Cada método devolve uma nova consulta:
+        indice.consulta().distancia(10, 100).declinacao(-30, None).nome("cen")
+
+    Intervalos são fechados e None deixa o limite em aberto. Os filtros de
+    intervalo viram faixas de postos por busca binária; a menor faixa dá os
+    candidatos e as demais são verificadas pelo posto de cada candidato.
+    O filtro de nome é aplicado por último, só aos candidatos restantes.
+    """
+
+    def __init__(self, indice: IndiceColunar, intervalos: tuple = (), textos: tuple = ()):
+        self.indice = indice
+        # (coluna, [(inicio, fim), ...]) — a estrela passa se cair em alguma faixa
+        self._intervalos = intervalos
+        self._textos = textos
+
+    def _com_faixas(self, coluna: str, faixas) -> "Consulta":
+        return Consulta(self.indice, self._intervalos + ((coluna, tuple(faixas)),), self._textos)
+
+    def distancia(self, minimo_pc: Optional[float] = None,
+                  maximo_pc: Optional[float] = None) -> "Consulta":
+        """Distância (parsecs, d = 1000 / p) entre minimo_pc e maximo_pc"""
+        return self._com_faixas("distancia", [self.indice.intervalo("distancia", minimo_pc,
+                                                                     maximo_pc)])
+
+    def declinacao(self, minimo_graus: Optional[float] = None,
+                   maximo_graus: Optional[float] = None) -> "Consulta":
+        """Declinação (graus) entre os limites"""
+        return self._com_faixas("delta", [self.indice.intervalo("delta", *_radianos(
+            minimo_graus, maximo_graus))])
+
+    def ascensao_reta(self, minimo_graus: Optional[float] = None,
+                      maximo_graus: Optional[float] = None) -> "Consulta":
+        """Ascensão reta (graus); se minimo > maximo, o intervalo passa por 0° (ex.: 350 a 10)"""
+        if minimo_graus is not None and maximo_graus is not None and minimo_graus > maximo_graus:
+            faixas = [self.indice.intervalo("alfa", *_radianos(minimo_graus, None)),
+                      self.indice.intervalo("alfa", *_radianos(None, maximo_graus))]
+        else:
+            faixas = [self.indice.intervalo("alfa", *_radianos(minimo_graus, maximo_graus))]
+        return self._com_faixas("alfa", faixas)
+
+    def nome(self, texto: str) -> "Consulta":
+        """Nome contendo o texto (mesma normalização da busca do catálogo)"""
+        return Consulta(self.indice, self._intervalos, self._textos + (normalizar_nome(texto),))
+
+    def indices(self) -> np.ndarray:
+        """Índices (no catálogo) das estrelas que satisfazem todos os filtros, em ordem"""
+        indice = self.indice
+        if self._intervalos:
+            # Candidatos da coluna com menos estrelas nas suas faixas
+            tamanhos = [sum(fim - inicio for inicio, fim in faixas) for _, faixas in self._intervalos]
+            primeira = int(np.argmin(tamanhos))
+            coluna, faixas = self._intervalos[primeira]
+            ordem = getattr(indice, coluna)[0]
+            candidatos = np.concatenate([ordem[inicio:fim] for inicio, fim in faixas])
+            for k, (coluna, faixas) in enumerate(self._intervalos):
+                if k == primeira or not len(candidatos):
+                    continue
+                posto = getattr(indice, coluna)[2][candidatos]
+                dentro = np.zeros(len(candidatos), dtype=bool)
+                for inicio, fim in faixas:
+                    dentro |= (posto >= inicio) & (posto < fim)
+                candidatos = candidatos[dentro]
+            candidatos = np.sort(candidatos)
+        else:
+            candidatos = np.arange(len(indice), dtype=np.int64)
+
+        for texto in self._textos:
+            nomes = indice.nomes_normalizados
+            candidatos = candidatos[np.fromiter((texto in nomes[i] for i in candidatos.tolist()),
+                                                dtype=bool, count=len(candidatos))]
+        return candidatos.astype(np.int64)
+
+    def contar(self) -> int:
+        return len(self.indices())
+
+    def visao(self) -> "VisaoCatalogo":
+        """Visão preguiçosa do resultado (a consulta roda no primeiro acesso)"""
+        return VisaoCatalogo(self.indice.catalogo, self)
+
+
+def _radianos(minimo_graus, maximo_graus):
+    return (None if minimo_graus is None else minimo_graus * RADIANOS_POR_GRAU,
+            None if maximo_graus is None else maximo_graus * RADIANOS_POR_GRAU)
+
+
+class _NomesVisao(abc.Sequence):
+    """Nomes de uma visão, lidos do catálogo base sem copiar a lista"""
+
+    def __init__(self, nomes: Sequence[str], indices: np.ndarray):
+        self._nomes = nomes
+        self._indices = indices
+
+    def __len__(self) -> int:
+        return len(self._indices)
+
+    def __getitem__(self, k):
+        if isinstance(k, slice):
+            return [self._nomes[i] for i in self._indices[k].tolist()]
+        return self._nomes[int(self._indices[k])]
+
+
+class VisaoCatalogo:
+    """
+    Subconjunto de um CatalogoColunar sem cópia antecipada
+
+    Tem as mesmas colunas e grandezas derivadas do catálogo (lidas do
+    catálogo base apenas no primeiro acesso a cada uma), de modo que os
+    módulos em lote (proximidade, grupos, contagem_pares, incerteza,
+    movimento, ...) a aceitam no lugar de um CatalogoColunar.
+    indices_base leva cada linha da visão de volta ao catálogo original.
+    """
+
+    COLUNAS = CatalogoColunar.COLUNAS
+
+    def __init__(self, base: CatalogoColunar, consulta_ou_indices):
+        self.base = base
+        self._origem = consulta_ou_indices
+
+    @cached_property
+    def indices_base(self) -> np.ndarray:
+        if isinstance(self._origem, Consulta):
+            return self._origem.indices()
+        return np.asarray(self._origem, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.indices_base)
+
+    def __getattr__(self, nome: str):
+        # Colunas numéricas: coletadas do catálogo base no primeiro acesso
+        if nome in CatalogoColunar.COLUNAS:
+            valores = getattr(self.base, nome)[self.indices_base]
+            self.__dict__[nome] = valores
+            return valores
+        raise AttributeError(nome)
+
+    @cached_property
+    def nomes(self) -> Sequence[str]:
+        return _NomesVisao(self.base.nomes, self.indices_base)
+
+    @cached_property
+    def distancia_parsecs(self) -> np.ndarray:
+        return self.base.distancia_parsecs[self.indices_base]
+
+    @property
+    def distancia_anos_luz(self) -> np.ndarray:
+        return CatalogoColunar.distancia_anos_luz.fget(self)
+
+    @cached_property
+    def cartesianas(self) -> np.ndarray:
+        return self.base.cartesianas[self.indices_base]
+
+    @cached_property
+    def vetores_unitarios(self) -> np.ndarray:
+        return self.base.vetores_unitarios[self.indices_base]
+
+    estrela = CatalogoColunar.estrela
+    pares = CatalogoColunar.pares
+
+    def subconjunto(self, indices) -> "VisaoCatalogo":
+        """Visão das linhas indicadas (índices ou máscara) desta visão"""
+        indices = np.asarray(indices)
+        if indices.dtype == bool:
+            indices = np.flatnonzero(indices)
+        return VisaoCatalogo(self.base, self.indices_base[indices])
+
+    def materializar(self) -> CatalogoColunar:
+        """Cópia independente como CatalogoColunar"""
+        return self.base.subconjunto(self.indices_base)
+
+
+def teste_consultas():
+    """Comparar com a filtragem por máscara e usar a visão nos módulos em lote"""
+    print("=" * 60)
+    print("TESTE: Consultas Indexadas")
+    print("=" * 60)
+
+    catalogo = CatalogoColunar.de_registros()
+    indice = IndiceColunar(catalogo)
+    visao = indice.consulta().distancia(10, 100).declinacao(-30, None).visao()
+    print("\n10–100 pc, δ > −30°: " + ", ".join(visao.nomes[k] for k in range(len(visao))))
+
+    gerador = np.random.default_rng(13)
+    n = 300_000
+    sintetico = CatalogoColunar(
+        nomes=[f"HIP {k}" for k in range(n)],
+        alfa_rad=gerador.uniform(0, 2 * math.pi, n),
+        delta_rad=np.arcsin(gerador.uniform(-1, 1, n)),
+        paralaxe_mas=np.where(gerador.random(n) < 0.02, 0.0, gerador.uniform(1, 200, n)),
+    )
+    indice = IndiceColunar(sintetico)
+    distancia = sintetico.distancia_parsecs
+    validas = sintetico.paralaxe_mas > 0
+    alfa_graus = np.degrees(sintetico.alfa_rad)
+    delta_graus = np.degrees(sintetico.delta_rad)
+    nome_contem = np.array(["77" in nome for nome in sintetico.nomes])
+
+    casos = [
+        (indice.consulta().distancia(10, 100).declinacao(-30, None),
+         validas & (distancia >= 10) & (distancia <= 100) & (delta_graus >= -30)),
+        (indice.consulta().ascensao_reta(350, 10).declinacao(-5, 5),
+         ((alfa_graus >= 350) | (alfa_graus <= 10)) & (delta_graus >= -5) & (delta_graus <= 5)),
+        (indice.consulta().distancia(None, 20).ascensao_reta(90, 180).nome("77"),
+         validas & (distancia <= 20) & (alfa_graus >= 90) & (alfa_graus <= 180) & nome_contem),
+        (indice.consulta().nome("hip 12"),
+         np.array([nome.startswith("HIP 12") for nome in sintetico.nomes])),
+        (indice.consulta().distancia(50, 40), np.zeros(n, dtype=bool)),
+    ]
+    for consulta, esperado in casos:
+        inicio = time.perf_counter()
+        obtido = consulta.indices()
+        duracao = time.perf_counter() - inicio
+        assert np.array_equal(obtido, np.flatnonzero(esperado)), (len(obtido), esperado.sum())
+        print(f"{len(obtido):7d} estrelas em {duracao * 1000:6.1f} ms: ok")
+
+    # A visão funciona diretamente nos módulos em lote
+    from proximidade import pares_mais_proximos_indices
+    from contagem_pares import histograma_distancia_real
+    consulta = indice.consulta().distancia(5, 8).declinacao(0, 30)
+    visao, copia = consulta.visao(), sintetico.subconjunto(consulta.indices())
+    assert np.array_equal(pares_mais_proximos_indices(visao, 5)[2],
+                          pares_mais_proximos_indices(copia, 5)[2])
+    bordas = [0.0, 0.5, 1.0, 2.0]
+    assert np.array_equal(histograma_distancia_real(visao, bordas, processos=1),
+                          histograma_distancia_real(copia, bordas, processos=1))
+    assert visao.estrela(0) == copia.estrela(0)
+    assert np.array_equal(visao.subconjunto([1, 2]).indices_base, visao.indices_base[[1, 2]])
+    print(f"Visão de {len(visao)} estrelas usada em proximidade e contagem_pares: ok")
+
+    print("\n✅ Teste concluído com sucesso!")
+
+
+if __name__ == "__main__":
+    teste_consultas()
@@ -0,0 +1,205 @@
+"""
+Calculadora Geométrica de Distância Entre Estrelas
+Histogramas de Separação entre Pares (Estatística de Dois Pontos)
+
+Autor: Luiz Tiago Wilcke
+Data: 2025
+"""
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Sequence
+
+import numpy as np
+
+from calculos import GRAUS_POR_RADIANO, RADIANOS_POR_GRAU
+from colunar import (
+    CatalogoColunar, calcular_separacao_angular_lote, calcular_distancia_real_lote
+)
+from espacial import GradeEspacial, PARES_POR_BLOCO
+
+METRICAS = ("separacao_angular", "distancia_real")
+
+# Folga do raio da grade; a classificação nos intervalos usa a métrica exata
+FOLGA_GRADE = 1e-9
+
+# Estado de cada processo de trabalho (definido pelo inicializador)
+_ESTADO = {}
+
+
+def _iniciar_processo(estado: dict):
+    _ESTADO.clear()
+    _ESTADO.update(estado)
+
+
+def _contar_trecho(inicio: int, fim: int) -> np.ndarray:
+    """Contar os pares candidatos [inicio, fim) nos intervalos"""
+    e = _ESTADO
+    contagem = np.zeros(len(e["bordas"]) - 1, dtype=np.int64)
+    alfa_a, delta_a, dist_a = e["colunas_a"]
+    alfa_b, delta_b, dist_b = e["colunas_b"]
+    for i, j, _ in e["grade_a"].pares_no_raio(e["raio"], e["bloco"], e["grade_b"], inicio, fim):
+        theta = calcular_separacao_angular_lote(alfa_a[i], delta_a[i], alfa_b[j], delta_b[j])
+        if e["metrica"] == "separacao_angular":
+            valores = theta * GRAUS_POR_RADIANO
+        else:
+            valores = calcular_distancia_real_lote(dist_a[i], dist_b[j], theta)
+        contagem += np.histogram(valores, bins=e["bordas"])[0]
+    return contagem
+
+
+def contar_pares(catalogo: CatalogoColunar, bordas: Sequence[float],
+                 metrica: str = "distancia_real", outro: Optional[CatalogoColunar] = None,
+                 processos: Optional[int] = None, bloco: int = PARES_POR_BLOCO) -> np.ndarray:
+    """
+    Histograma das separações de todos os pares sem materializar a lista de pares
+
+    Args:
+        catalogo: Catálogo de estrelas
+        bordas: Bordas dos intervalos (graus para 'separacao_angular',
+                parsecs para 'distancia_real'); mesma convenção de np.histogram
+        metrica: 'separacao_angular' (calcular_separacao_angular) ou
+                 'distancia_real' (calcular_distancia_real)
+        outro: Se informado, conta os pares cruzados catalogo × outro
+        processos: Número de processos (None = todos os núcleos, 1 = sem paralelismo)
+        bloco: Pares avaliados por vez em cada processo (limita a memória)
+
+    Returns:
+        Contagem de pares em cada intervalo
+
+    A busca usa uma grade de células do tamanho da maior borda: na métrica
+    angular sobre os vetores unitários (corda 2·sin(θ/2)), na métrica 3D
+    sobre as posições cartesianas. Na métrica 3D, estrelas sem paralaxe
+    positiva são ignoradas.
+    """
+    if metrica not in METRICAS:
+        raise ValueError(f"Métrica desconhecida: {metrica} (use {', '.join(METRICAS)})")
+    bordas = np.asarray(bordas, dtype=np.float64)
+    if bordas.ndim != 1 or len(bordas) < 2 or np.any(np.diff(bordas) < 0):
+        raise ValueError("bordas deve ser uma sequência crescente com pelo menos 2 valores")
+
+    cruzado = outro is not None
+    catalogos = [catalogo, outro] if cruzado else [catalogo]
+    colunas, posicoes = [], []
+    for cat in catalogos:
+        if metrica == "distancia_real":
+            validas = np.flatnonzero(cat.paralaxe_mas > 0)
+            posicoes.append(cat.cartesianas[validas])
+        else:
+            validas = np.arange(len(cat))
+            posicoes.append(cat.vetores_unitarios)
+        colunas.append((cat.alfa_rad[validas], cat.delta_rad[validas],
+                        cat.distancia_parsecs[validas]))
+
+    if metrica == "separacao_angular":
+        theta_max = min(float(bordas[-1]), 180.0) * RADIANOS_POR_GRAU
+        raio = 2.0 * math.sin(theta_max / 2.0)
+    else:
+        raio = float(bordas[-1])
+    raio = raio * (1.0 + FOLGA_GRADE) + 1e-12
+
+    if cruzado:
+        grade_a, grade_b = GradeEspacial.cruzadas(posicoes[0], posicoes[1], raio)
+    else:
+        grade_a, grade_b = GradeEspacial(posicoes[0], raio), None
+
+    estado = {
+        "grade_a": grade_a, "grade_b": grade_b, "raio": raio, "bloco": bloco,
+        "bordas": bordas, "metrica": metrica,
+        "colunas_a": colunas[0], "colunas_b": colunas[-1],
+    }
+    total = grade_a.contar_candidatos(grade_b)
+    processos = processos or os.cpu_count() or 1
+    processos = max(1, min(processos, -(-total // bloco)))
+
+    if processos == 1:
+        _iniciar_processo(estado)
+        try:
+            return _contar_trecho(0, total)
+        finally:
+            _ESTADO.clear()
+
+    # Trechos contíguos da sequência de candidatos, alguns por processo
+    passo = max(bloco, -(-total // (4 * processos)))
+    trechos = [(k, min(k + passo, total)) for k in range(0, total, passo)]
+    with ProcessPoolExecutor(processos, initializer=_iniciar_processo,
+                             initargs=(estado,)) as executor:
+        parciais = executor.map(_contar_trecho, *zip(*trechos))
+        return np.sum(list(parciais), axis=0)
+
+
+def histograma_separacao_angular(catalogo: CatalogoColunar, bordas_graus: Sequence[float],
+                                 outro: Optional[CatalogoColunar] = None,
+                                 **opcoes) -> np.ndarray:
+    """Contagem de pares por intervalo de separação angular (graus)"""
+    return contar_pares(catalogo, bordas_graus, "separacao_angular", outro, **opcoes)
+
+
+def histograma_distancia_real(catalogo: CatalogoColunar, bordas_pc: Sequence[float],
+                              outro: Optional[CatalogoColunar] = None,
+                              **opcoes) -> np.ndarray:
+    """Contagem de pares por intervalo de distância real (parsecs)"""
+    return contar_pares(catalogo, bordas_pc, "distancia_real", outro, **opcoes)
+
+
+def _forca_bruta(catalogo, bordas, metrica, outro=None) -> np.ndarray:
+    """Referência: todos os pares explicitamente (apenas catálogos pequenos)"""
+    if metrica == "distancia_real":
+        catalogo = catalogo.subconjunto(catalogo.paralaxe_mas > 0)
+        outro = None if outro is None else outro.subconjunto(outro.paralaxe_mas > 0)
+    if outro is None:
+        i, j = np.triu_indices(len(catalogo), 1)
+        b = catalogo
+    else:
+        i, j = (m.ravel() for m in np.meshgrid(np.arange(len(catalogo)), np.arange(len(outro)),
+                                               indexing="ij"))
+        b = outro
+    theta = calcular_separacao_angular_lote(catalogo.alfa_rad[i], catalogo.delta_rad[i],
+                                            b.alfa_rad[j], b.delta_rad[j])
+    if metrica == "separacao_angular":
+        valores = theta * GRAUS_POR_RADIANO
+    else:
+        valores = calcular_distancia_real_lote(catalogo.distancia_parsecs[i],
+                                               b.distancia_parsecs[j], theta)
+    return np.histogram(valores, bins=bordas)[0]
+
+
+def teste_contagem_pares():
+    """Contagens exatas comparadas com a força bruta em catálogos pequenos"""
+    print("=" * 60)
+    print("TESTE: Histogramas de Pares")
+    print("=" * 60)
+
+    gerador = np.random.default_rng(3)
+
+    def sintetico(n):
+        return CatalogoColunar(
+            nomes=[f"S{i}" for i in range(n)],
+            alfa_rad=gerador.uniform(0, 2 * math.pi, n),
+            delta_rad=np.arcsin(gerador.uniform(-1, 1, n)),
+            paralaxe_mas=np.where(gerador.random(n) < 0.03, 0.0, gerador.uniform(3, 150, n)),
+        )
+
+    a, b = sintetico(700), sintetico(400)
+    casos = [
+        ("separacao_angular", np.array([0.0, 1.0, 2.5, 5.0, 10.0, 20.0])),
+        ("separacao_angular", np.linspace(0.0, 180.0, 13)),
+        ("distancia_real", np.array([0.0, 2.0, 5.0, 10.0, 25.0])),
+        ("distancia_real", np.array([1.0, 50.0, 400.0])),
+    ]
+    for metrica, bordas in casos:
+        for outro in (None, b):
+            for processos in (1, 2):
+                obtido = contar_pares(a, bordas, metrica, outro, processos=processos, bloco=5000)
+                esperado = _forca_bruta(a, bordas, metrica, outro)
+                assert np.array_equal(obtido, esperado), (metrica, obtido, esperado)
+            tipo = "cruzado" if outro is not None else "auto"
+            print(f"{metrica:18s} {tipo:8s} bordas até {bordas[-1]:6.1f}: "
+                  f"{int(obtido.sum())} pares: ok")
+
+    print("\n✅ Teste concluído com sucesso!")
+
+
+if __name__ == "__main__":
+    teste_contagem_pares()
@@ -0,0 +1,308 @@
+"""
+Calculadora Geométrica de Distância Entre Estrelas
+Correspondência Cruzada de Catálogos por Separação Angular
+
+Autor: Luiz Tiago Wilcke
+Data: 2025
+"""
+
+import math
+import time
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Tuple
+
+import numpy as np
+
+from calculos import GRAUS_POR_RADIANO, SEGUNDOS_POR_GRAU
+from colunar import CatalogoColunar, calcular_separacao_angular_lote
+
+RADIANOS_POR_SEGUNDO = 1.0 / (GRAUS_POR_RADIANO * SEGUNDOS_POR_GRAU)
+
+# Candidatos (estrela, vizinha) avaliados por vez
+CANDIDATOS_POR_BLOCO = 1 << 20
+
+# Margem das buscas binárias na chave zona·8 + α (erro de arredondamento da chave)
+MARGEM_CHAVE = 1e-8
+
+# Largura da chave de cada zona (maior que 2π)
+LARGURA_ZONA = 8.0
+
+
+def separacao_haversine_lote(alfa1: np.ndarray, delta1: np.ndarray,
+                             alfa2: np.ndarray, delta2: np.ndarray) -> np.ndarray:
+    """
+    Separação angular (rad) pela fórmula do haversine
+
+    Mesmo ângulo de calcular_separacao_angular, mas sem a perda de precisão
+    do arccos perto de θ = 0 (da ordem de 1 mas), importante para raios de
+    correspondência de poucos segundos de arco.
+    """
+    seno_dd = np.sin((delta2 - delta1) / 2.0)
+    seno_da = np.sin((alfa2 - alfa1) / 2.0)
+    h = seno_dd * seno_dd + np.cos(delta1) * np.cos(delta2) * seno_da * seno_da
+    return 2.0 * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))
+
+
+@dataclass
+class ResultadoCorrespondencia:
+    """
+    Todas as correspondências dentro do raio
+
+    Ordenadas por estrela de A e, para cada uma, por separação crescente:
+    a primeira linha de cada estrela de A é a melhor correspondência.
+    """
+    indices_a: np.ndarray
+    indices_b: np.ndarray
+    separacao_rad: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.indices_a)
+
+    @property
+    def separacao_arcsec(self) -> np.ndarray:
+        return self.separacao_rad / RADIANOS_POR_SEGUNDO
+
+    def melhores(self) -> "ResultadoCorrespondencia":
+        """Apenas a correspondência mais próxima de cada estrela de A"""
+        primeiras = np.ones(len(self), dtype=bool)
+        primeiras[1:] = self.indices_a[1:] != self.indices_a[:-1]
+        return ResultadoCorrespondencia(self.indices_a[primeiras], self.indices_b[primeiras],
+                                        self.separacao_rad[primeiras])
+
+    @classmethod
+    def juntar(cls, partes: Iterable["ResultadoCorrespondencia"]) -> "ResultadoCorrespondencia":
+        """Concatenar resultados de blocos consecutivos de A"""
+        partes = list(partes)
+        if not partes:
+            vazio = np.zeros(0, dtype=np.int64)
+            return cls(vazio, vazio.copy(), np.zeros(0))
+        return cls(np.concatenate([p.indices_a for p in partes]),
+                   np.concatenate([p.indices_b for p in partes]),
+                   np.concatenate([p.separacao_rad for p in partes]))
+
+
+class IndiceZonas:
+    """
+    Catálogo de referência em zonas de declinação de altura igual ao raio
+
+    As estrelas são ordenadas pela chave zona·8 + α. Para cada estrela
+    consultada bastam as zonas vizinhas (±1) e, em cada uma, o intervalo
+    de α ± Δα, com Δα = asin(sin r / cos δ). São 3 zonas × 3 trechos de α
+    (o principal e os dois que dão a volta em α = 0, vazios na maioria das
+    estrelas) = 9 intervalos [inicio, fim), ou seja 18 buscas binárias por
+    estrela, em vez de comparar com todo o catálogo.
+    """
+
+    def __init__(self, alfa_rad: np.ndarray, delta_rad: np.ndarray, raio_rad: float):
+        if raio_rad <= 0:
+            raise ValueError("O raio de correspondência deve ser positivo")
+        self.raio = float(raio_rad)
+        self.altura_zona = min(self.raio, math.pi)
+        alfa = np.mod(np.asarray(alfa_rad, dtype=np.float64), 2.0 * math.pi)
+        delta = np.asarray(delta_rad, dtype=np.float64)
+        chave = self._zona(delta) * LARGURA_ZONA + alfa
+        self.ordem = np.argsort(chave, kind="stable")
+        self.chave = chave[self.ordem]
+        self.alfa = alfa[self.ordem]
+        self.delta = delta[self.ordem]
+
+    @classmethod
+    def de_catalogo(cls, catalogo: CatalogoColunar, raio_arcsec: float) -> "IndiceZonas":
+        return cls(catalogo.alfa_rad, catalogo.delta_rad, raio_arcsec * RADIANOS_POR_SEGUNDO)
+
+    def __len__(self) -> int:
+        return len(self.ordem)
+
+    def _zona(self, delta: np.ndarray) -> np.ndarray:
+        return np.floor((delta + math.pi / 2.0) / self.altura_zona)
+
+    def _intervalos(self, alfa: np.ndarray, delta: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Intervalos [inicio, fim) do índice ordenado: 3 zonas × 3 trechos = 9 por estrela (alguns vazios)"""
+        r = self.raio
+        cos_delta = np.cos(delta)
+        # Perto dos polos (|δ| + r >= 90°) todo o círculo de α é candidato
+        with np.errstate(divide="ignore", invalid="ignore"):
+            delta_alfa = np.arcsin(np.minimum(math.sin(min(r, math.pi / 2)) / cos_delta, 1.0))
+        delta_alfa = np.where(np.abs(delta) + r >= math.pi / 2, math.pi, delta_alfa)
+        delta_alfa = delta_alfa + MARGEM_CHAVE
+
+        baixo, alto = alfa - delta_alfa, alfa + delta_alfa
+        completo = delta_alfa >= math.pi
+        # Trecho principal recortado a [0, 2π) e o trecho que dá a volta em α = 0
+        trechos = [
+            (np.where(completo, 0.0, np.maximum(baixo, 0.0)),
+             np.where(completo, 2.0 * math.pi, np.minimum(alto, 2.0 * math.pi))),
+            (np.where(~completo & (baixo < 0), baixo + 2.0 * math.pi, 0.0),
+             np.where(~completo & (baixo < 0), 2.0 * math.pi, 0.0)),
+            (np.zeros_like(alfa),
+             np.where(~completo & (alto > 2.0 * math.pi), alto - 2.0 * math.pi, 0.0)),
+        ]
+        inicios, fins = [], []
+        zona = self._zona(delta)
+        for deslocamento in (-1.0, 0.0, 1.0):
+            base = (zona + deslocamento) * LARGURA_ZONA
+            for de, ate in trechos:
+                vazio = ate <= de
+                i = np.searchsorted(self.chave, base + de - MARGEM_CHAVE, side="left")
+                f = np.searchsorted(self.chave, base + ate + MARGEM_CHAVE, side="right")
+                inicios.append(i)
+                fins.append(np.where(vazio, i, f))
+        return np.stack(inicios, axis=1), np.stack(fins, axis=1)
+
+    def consultar(self, alfa_rad: np.ndarray, delta_rad: np.ndarray,
+                  bloco: int = CANDIDATOS_POR_BLOCO) -> ResultadoCorrespondencia:
+        """Todas as estrelas do índice a até 'raio' de cada posição consultada"""
+        alfa = np.mod(np.asarray(alfa_rad, dtype=np.float64), 2.0 * math.pi)
+        delta = np.asarray(delta_rad, dtype=np.float64)
+        inicios, fins = self._intervalos(alfa, delta)
+        contagens = (fins - inicios).sum(axis=1)
+        acumulado = np.cumsum(contagens)
+
+        partes = []
+        primeira = 0
+        while primeira < len(alfa):
+            # Estrelas consultadas cujo total de candidatos cabe no bloco
+            limite = (acumulado[primeira - 1] if primeira else 0) + bloco
+            ultima = max(int(np.searchsorted(acumulado, limite, side="right")), primeira + 1)
+            partes.append(self._avaliar(alfa, delta, inicios, fins, primeira, ultima))
+            primeira = ultima
+        return ResultadoCorrespondencia.juntar(partes)
+
+    def _avaliar(self, alfa, delta, inicios, fins, primeira, ultima) -> ResultadoCorrespondencia:
+        por_estrela = inicios.shape[1]
+        inicios, fins = inicios[primeira:ultima].ravel(), fins[primeira:ultima].ravel()
+        tamanhos = fins - inicios
+        estrela = np.repeat(np.repeat(np.arange(primeira, ultima), por_estrela), tamanhos)
+        # Posição de cada candidato: início do seu intervalo + deslocamento dentro dele
+        deslocamento = np.arange(tamanhos.sum()) - np.repeat(np.cumsum(tamanhos) - tamanhos, tamanhos)
+        candidato = np.repeat(inicios, tamanhos) + deslocamento
+
+        separacao = separacao_haversine_lote(alfa[estrela], delta[estrela],
+                                             self.alfa[candidato], self.delta[candidato])
+        dentro = separacao <= self.raio
+        estrela, candidato, separacao = estrela[dentro], candidato[dentro], separacao[dentro]
+        # Zonas e trechos de α não se sobrepõem: cada par aparece uma única vez
+        vizinha = self.ordem[candidato]
+        ordem = np.lexsort((vizinha, separacao, estrela))
+        return ResultadoCorrespondencia(estrela[ordem].astype(np.int64),
+                                        vizinha[ordem].astype(np.int64), separacao[ordem])
+
+
+def corresponder(catalogo_a: CatalogoColunar, catalogo_b: CatalogoColunar,
+                 raio_arcsec: float) -> ResultadoCorrespondencia:
+    """
+    Correspondências entre dois catálogos com separação <= raio_arcsec
+
+    O índice de zonas é montado sobre o menor catálogo; o resultado é sempre
+    expresso como (índice em A, índice em B, separação), ordenado por A.
+    """
+    if len(catalogo_b) <= len(catalogo_a):
+        indice = IndiceZonas.de_catalogo(catalogo_b, raio_arcsec)
+        return indice.consultar(catalogo_a.alfa_rad, catalogo_a.delta_rad)
+
+    invertido = IndiceZonas.de_catalogo(catalogo_a, raio_arcsec).consultar(
+        catalogo_b.alfa_rad, catalogo_b.delta_rad)
+    ordem = np.lexsort((invertido.indices_a, invertido.separacao_rad, invertido.indices_b))
+    return ResultadoCorrespondencia(invertido.indices_b[ordem], invertido.indices_a[ordem],
+                                    invertido.separacao_rad[ordem])
+
+
+def corresponder_fluxo(blocos_a: Iterable[CatalogoColunar], catalogo_b: CatalogoColunar,
+                       raio_arcsec: float) -> Iterator[ResultadoCorrespondencia]:
+    """
+    Correspondência de um catálogo grande lido em blocos contra B em memória
+
+    Cada bloco produz um resultado com índices de A globais (posição da
+    estrela na sequência completa de blocos).
+    """
+    indice = IndiceZonas.de_catalogo(catalogo_b, raio_arcsec)
+    deslocamento = 0
+    for bloco in blocos_a:
+        parcial = indice.consultar(bloco.alfa_rad, bloco.delta_rad)
+        parcial.indices_a += deslocamento
+        deslocamento += len(bloco)
+        yield parcial
+
+
+def _forca_bruta(a: CatalogoColunar, b: CatalogoColunar, raio_rad: float):
+    i, j = (m.ravel() for m in np.meshgrid(np.arange(len(a)), np.arange(len(b)), indexing="ij"))
+    separacao = separacao_haversine_lote(a.alfa_rad[i], a.delta_rad[i], b.alfa_rad[j], b.delta_rad[j])
+    dentro = separacao <= raio_rad
+    return set(zip(i[dentro].tolist(), j[dentro].tolist())), separacao[dentro]
+
+
+def teste_correspondencia():
+    """Comparar com a força bruta, incluindo a volta em α = 0 e os polos"""
+    print("=" * 60)
+    print("TESTE: Correspondência Cruzada de Catálogos")
+    print("=" * 60)
+
+    gerador = np.random.default_rng(21)
+
+    def catalogo(alfa, delta):
+        return CatalogoColunar(nomes=[""] * len(alfa), alfa_rad=np.mod(alfa, 2 * math.pi),
+                               delta_rad=np.clip(delta, -math.pi / 2, math.pi / 2))
+
+    for raio_arcsec in (5.0, 600.0, 7200.0):
+        raio = raio_arcsec * RADIANOS_POR_SEGUNDO
+        n = 1500
+        # Campos concentrados em α ≈ 0 (volta) e perto dos dois polos, mais o céu inteiro
+        alfa = np.concatenate([gerador.normal(0, 20 * raio, n), gerador.uniform(0, 2 * math.pi, 3 * n)])
+        delta = np.concatenate([gerador.normal(0, 20 * raio, n),
+                                math.pi / 2 - np.abs(gerador.normal(0, 20 * raio, n)),
+                                -math.pi / 2 + np.abs(gerador.normal(0, 20 * raio, n)),
+                                np.arcsin(gerador.uniform(-1, 1, n))])
+        alfa[n:3 * n] = gerador.uniform(0, 2 * math.pi, 2 * n)
+        a = catalogo(alfa, delta)
+        # B: parte deslocada de A (dentro e fora do raio) e parte aleatória
+        desvio = gerador.normal(0, raio, (2, len(a)))
+        b = catalogo(np.concatenate([alfa + desvio[0] / np.maximum(np.cos(delta), 1e-3),
+                                     alfa[:n]]),
+                     np.concatenate([delta + desvio[1], delta[:n] + gerador.normal(0, 3 * raio, n)]))
+
+        esperado, _ = _forca_bruta(a, b, raio)
+        pares_a = np.arange(0, len(a), 2)
+        esperado_metade = {(ia // 2, jb) for ia, jb in esperado if ia % 2 == 0}
+        direto = corresponder(a, b, raio_arcsec)
+        casos = [
+            ("A × B", direto, esperado),
+            # A menor que B: o índice é montado sobre A e o resultado reordenado
+            ("A/2 × B", corresponder(a.subconjunto(pares_a), b, raio_arcsec), esperado_metade),
+            ("fluxo", ResultadoCorrespondencia.juntar(corresponder_fluxo(
+                (a.subconjunto(np.arange(k, min(k + 700, len(a)))) for k in range(0, len(a), 700)),
+                b, raio_arcsec)), esperado),
+        ]
+        for nome, obtido, referencia in casos:
+            pares = list(zip(obtido.indices_a.tolist(), obtido.indices_b.tolist()))
+            assert len(pares) == len(set(pares)) and set(pares) == referencia, nome
+            assert np.all(np.diff(obtido.indices_a) >= 0), nome
+            melhores = obtido.melhores()
+            assert np.array_equal(melhores.indices_a, np.unique(obtido.indices_a)), nome
+            for k in range(len(melhores)):
+                assert melhores.separacao_rad[k] == obtido.separacao_rad[
+                    obtido.indices_a == melhores.indices_a[k]].min()
+            print(f"raio {raio_arcsec:6.0f}″ {nome:8s}: {len(obtido):5d} correspondências, "
+                  f"{len(melhores):5d} melhores: ok")
+
+        # Mesma separação da Lei dos Cossenos (a menos da precisão do arccos)
+        cossenos = calcular_separacao_angular_lote(
+            a.alfa_rad[direto.indices_a], a.delta_rad[direto.indices_a],
+            b.alfa_rad[direto.indices_b], b.delta_rad[direto.indices_b])
+        assert np.allclose(cossenos, direto.separacao_rad, atol=1e-7)
+
+    # Vazão: 10^6 × 10^6 estrelas com raio de 1″
+    n = 1_000_000
+    alfa, delta = gerador.uniform(0, 2 * math.pi, n), np.arcsin(gerador.uniform(-1, 1, n))
+    a = catalogo(alfa, delta)
+    b = catalogo(alfa + gerador.normal(0, 5e-7, n), delta + gerador.normal(0, 5e-7, n))
+    inicio = time.perf_counter()
+    resultado = corresponder(a, b, 1.0)
+    duracao = time.perf_counter() - inicio
+    print(f"\n{n:,} × {n:,} estrelas, raio 1″: {len(resultado.melhores()):,} com correspondência "
+          f"em {duracao:.2f} s")
+
+    print("\n✅ Teste concluído com sucesso!")
+
+
+if __name__ == "__main__":
+    teste_correspondencia()
@@ -0,0 +1,278 @@
+"""
+Calculadora Geométrica de Distância Entre Estrelas
+Índice Espacial em Grade Uniforme
+
+Autor: Luiz Tiago Wilcke
+Data: 2025
+"""
+
+import itertools
+from typing import Iterator, Tuple
+
+import numpy as np
+
+# Cada eixo usa 21 bits da chave da célula (3 × 21 = 63 bits)
+BITS_POR_EIXO = 21
+MAX_CELULAS_POR_EIXO = 1 << BITS_POR_EIXO
+
+# Pares candidatos gerados por bloco (limita a memória de cada iteração)
+PARES_POR_BLOCO = 1 << 21
+
+# Os 27 deslocamentos vizinhos e a metade usada para pares dentro de uma
+# grade (cada par de células é visitado uma vez)
+DESLOCAMENTOS_TODOS = list(itertools.product((-1, 0, 1), repeat=3))
+DESLOCAMENTOS_METADE = [d for d in DESLOCAMENTOS_TODOS if d > (0, 0, 0)]
+
+
+def blocos_de_pares(n: int, pares_por_bloco: int = PARES_POR_BLOCO
+                    ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """Todos os pares i < j, na ordem de np.triu_indices, em blocos de linhas"""
+    inicio = 0
+    while inicio < n - 1:
+        fim, pares = inicio, 0
+        while fim < n - 1 and (pares == 0 or pares < pares_por_bloco):
+            pares += n - fim - 1
+            fim += 1
+        tamanhos = n - 1 - np.arange(inicio, fim)
+        i = np.repeat(np.arange(inicio, fim), tamanhos)
+        # j = i + 1, i + 2, ... dentro de cada linha
+        j = np.arange(len(i)) - np.repeat(np.cumsum(tamanhos) - tamanhos, tamanhos) + i + 1
+        yield i, j
+        inicio = fim
+
+
+class GradeEspacial:
+    """
+    Grade de células cúbicas sobre posições cartesianas (N, dim)
+
+    Os pontos são ordenados pela chave da célula; cada célula ocupada é um
+    intervalo contíguo dessa ordem. Se o tamanho da célula for pelo menos o
+    raio de busca, todo par a distância <= raio está na mesma célula ou em
+    células vizinhas. Posições com dim < 3 são completadas com zeros.
+    """
+
+    def __init__(self, posicoes: np.ndarray, tamanho_celula: float, origem=None):
+        posicoes = self._completar(posicoes)
+        self.posicoes = posicoes
+        # Colunas contíguas tornam a coleta por índice mais barata
+        self._eixos = [np.ascontiguousarray(posicoes[:, k]) for k in range(3)]
+
+        if origem is not None:
+            self.minimo = np.asarray(origem, dtype=np.float64)
+        elif len(posicoes):
+            self.minimo = posicoes.min(axis=0)
+        else:
+            self.minimo = np.zeros(3)
+        extensao = float((posicoes.max(axis=0) - self.minimo).max()) if len(posicoes) else 0.0
+        # Células maiores que o pedido mantêm a chave dentro de 63 bits
+        self.tamanho_celula = max(float(tamanho_celula),
+                                  extensao / (MAX_CELULAS_POR_EIXO - 2),
+                                  np.finfo(np.float64).tiny)
+
+        celulas = self._celulas_de(posicoes)
+        chaves = self._chave(celulas)
+        self.ordem = np.argsort(chaves, kind="stable")
+        chaves_ordenadas = chaves[self.ordem]
+        self.chaves, self.inicios, self.contagens = np.unique(
+            chaves_ordenadas, return_index=True, return_counts=True
+        )
+        self.coordenadas = self._decodificar(self.chaves)
+        self._pares_de_celulas = None
+
+    @staticmethod
+    def _completar(posicoes) -> np.ndarray:
+        posicoes = np.asarray(posicoes, dtype=np.float64)
+        if posicoes.ndim != 2 or posicoes.shape[1] > 3:
+            raise ValueError("posicoes deve ter forma (N, 1..3)")
+        if posicoes.shape[1] < 3:
+            posicoes = np.hstack([posicoes, np.zeros((len(posicoes), 3 - posicoes.shape[1]))])
+        return posicoes
+
+    @classmethod
+    def cruzadas(cls, posicoes_a, posicoes_b, tamanho_celula: float
+                 ) -> Tuple["GradeEspacial", "GradeEspacial"]:
+        """Duas grades com a mesma geometria, para pares entre dois conjuntos"""
+        posicoes_a, posicoes_b = cls._completar(posicoes_a), cls._completar(posicoes_b)
+        juntas = np.vstack([posicoes_a, posicoes_b])
+        if not len(juntas):
+            return cls(posicoes_a, tamanho_celula), cls(posicoes_b, tamanho_celula)
+        origem = juntas.min(axis=0)
+        extensao = float((juntas.max(axis=0) - origem).max())
+        tamanho = max(float(tamanho_celula), extensao / (MAX_CELULAS_POR_EIXO - 2))
+        return cls(posicoes_a, tamanho, origem), cls(posicoes_b, tamanho, origem)
+
+    def __len__(self) -> int:
+        return len(self.posicoes)
+
+    @property
+    def num_celulas(self) -> int:
+        return len(self.chaves)
+
+    def _celulas_de(self, posicoes: np.ndarray) -> np.ndarray:
+        celulas = np.floor((posicoes - self.minimo) / self.tamanho_celula).astype(np.int64)
+        return np.clip(celulas, 0, MAX_CELULAS_POR_EIXO - 1)
+
+    @staticmethod
+    def _chave(celulas: np.ndarray) -> np.ndarray:
+        return ((celulas[..., 0] << (2 * BITS_POR_EIXO)) |
+                (celulas[..., 1] << BITS_POR_EIXO) | celulas[..., 2])
+
+    @staticmethod
+    def _decodificar(chaves: np.ndarray) -> np.ndarray:
+        mascara = MAX_CELULAS_POR_EIXO - 1
+        return np.stack([(chaves >> (2 * BITS_POR_EIXO)) & mascara,
+                         (chaves >> BITS_POR_EIXO) & mascara,
+                         chaves & mascara], axis=-1)
+
+    def _localizar(self, coordenadas: np.ndarray) -> np.ndarray:
+        """Índice da célula ocupada com essas coordenadas, ou -1"""
+        validas = np.all((coordenadas >= 0) & (coordenadas < MAX_CELULAS_POR_EIXO), axis=-1)
+        chaves = self._chave(np.where(validas[..., None], coordenadas, 0))
+        posicao = np.searchsorted(self.chaves, chaves)
+        posicao = np.minimum(posicao, len(self.chaves) - 1)
+        encontrada = validas & (self.chaves[posicao] == chaves)
+        return np.where(encontrada, posicao, -1)
+
+    # ------------------------------------------------------------------
+    # Pares de células vizinhas
+    # ------------------------------------------------------------------
+
+    def pares_de_celulas(self, outra: "GradeEspacial" = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Pares (A, B) de células ocupadas vizinhas
+
+        Sem 'outra': células desta grade, incluindo A == B, cada par uma vez.
+        Com 'outra': A desta grade e B da outra (grades de mesma geometria).
+        """
+        if outra is not None:
+            return self._calcular_pares_de_celulas(outra)
+        if self._pares_de_celulas is None:
+            self._pares_de_celulas = self._calcular_pares_de_celulas()
+        return self._pares_de_celulas
+
+    def _calcular_pares_de_celulas(self, outra: "GradeEspacial" = None
+                                   ) -> Tuple[np.ndarray, np.ndarray]:
+        if outra is None:
+            destino, deslocamentos = self, DESLOCAMENTOS_METADE
+            celulas_a = [np.arange(self.num_celulas)]
+            celulas_b = [np.arange(self.num_celulas)]
+        else:
+            if (outra.tamanho_celula != self.tamanho_celula or
+                    not np.array_equal(outra.minimo, self.minimo)):
+                raise ValueError("As grades devem ter a mesma origem e tamanho de célula "
+                                 "(use GradeEspacial.cruzadas)")
+            destino, deslocamentos = outra, DESLOCAMENTOS_TODOS
+            celulas_a, celulas_b = [], []
+        if not self.num_celulas or not destino.num_celulas:
+            vazio = np.zeros(0, dtype=np.int64)
+            return vazio, vazio
+        for deslocamento in deslocamentos:
+            vizinha = destino._localizar(self.coordenadas + np.array(deslocamento))
+            existe = vizinha >= 0
+            celulas_a.append(np.flatnonzero(existe))
+            celulas_b.append(vizinha[existe])
+        return np.concatenate(celulas_a), np.concatenate(celulas_b)
+
+    def _trabalho(self, outra: "GradeEspacial" = None):
+        """Pares de células e número de pares de pontos em cada um"""
+        a, b = self.pares_de_celulas(outra)
+        destino = self if outra is None else outra
+        ca, cb = self.contagens[a], destino.contagens[b]
+        if outra is None:
+            mesma = a == b
+        else:
+            mesma = np.zeros(len(a), dtype=bool)
+        # Na própria célula, enumerar apenas i < j (k = índice triangular)
+        trabalho = np.where(mesma, ca * (ca - 1) // 2, ca * cb)
+        return a, b, cb, mesma, trabalho, np.cumsum(trabalho)
+
+    def contar_candidatos(self, outra: "GradeEspacial" = None) -> int:
+        """Número de pares candidatos que pares_candidatos() irá gerar"""
+        acumulado = self._trabalho(outra)[-1]
+        return int(acumulado[-1]) if len(acumulado) else 0
+
+    def pares_candidatos(self, bloco: int = PARES_POR_BLOCO, outra: "GradeEspacial" = None,
+                         inicio: int = 0, fim: int = None
+                         ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Gerar, em blocos de até 'bloco' pares, todos os pares (i, j) de
+        pontos em células vizinhas. Cada par não ordenado aparece uma vez.
+
+        Com 'outra', i indexa esta grade e j a outra. 'inicio' e 'fim'
+        restringem a enumeração a um trecho [inicio, fim) da sequência
+        completa de candidatos, o que permite dividi-la entre processos.
+        """
+        a, b, cb, mesma, trabalho, acumulado = self._trabalho(outra)
+        destino = self if outra is None else outra
+        total = int(acumulado[-1]) if len(acumulado) else 0
+        fim = total if fim is None else min(fim, total)
+
+        for k0 in range(inicio, fim, bloco):
+            k = np.arange(k0, min(k0 + bloco, fim), dtype=np.int64)
+            par = np.searchsorted(acumulado, k, side="right")
+            local = k - (acumulado[par] - trabalho[par])
+            largura = cb[par]
+
+            # Pares entre células distintas: produto cartesiano
+            ia = local // np.maximum(largura, 1)
+            ib = local % np.maximum(largura, 1)
+
+            # Pares na mesma célula: inverter o índice triangular
+            m = mesma[par]
+            if m.any():
+                lm = local[m].astype(np.float64)
+                linha = np.floor((1.0 + np.sqrt(1.0 + 8.0 * lm)) / 2.0).astype(np.int64)
+                linha -= (linha * (linha - 1) // 2) > local[m]
+                linha += ((linha + 1) * linha // 2) <= local[m]
+                ia_m = local[m] - linha * (linha - 1) // 2
+                ia[m] = ia_m
+                ib[m] = linha
+
+            i = self.ordem[self.inicios[a[par]] + ia]
+            j = destino.ordem[destino.inicios[b[par]] + ib]
+            yield i, j
+
+    def pares_no_raio(self, raio: float, bloco: int = PARES_POR_BLOCO,
+                      outra: "GradeEspacial" = None, inicio: int = 0, fim: int = None
+                      ) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Pares (i, j, distância) com distância euclidiana <= raio"""
+        if raio > self.tamanho_celula:
+            raise ValueError("O raio não pode exceder o tamanho da célula")
+        eixos_j = self._eixos if outra is None else outra._eixos
+        raio2 = raio * raio
+        for i, j in self.pares_candidatos(bloco, outra, inicio, fim):
+            quadrado = np.zeros(len(i))
+            for eixo_i, eixo_j in zip(self._eixos, eixos_j):
+                diferenca = eixo_i[i] - eixo_j[j]
+                quadrado += diferenca * diferenca
+            dentro = quadrado <= raio2
+            yield i[dentro], j[dentro], np.sqrt(quadrado[dentro])
+
+    # ------------------------------------------------------------------
+    # Consultas pontuais
+    # ------------------------------------------------------------------
+
+    def vizinhos(self, ponto, raio: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Índices e distâncias dos pontos a no máximo 'raio' de 'ponto'"""
+        ponto = np.zeros(3) + np.asarray(ponto, dtype=np.float64)
+        inferior = np.floor((ponto - raio - self.minimo) / self.tamanho_celula).astype(np.int64)
+        superior = np.floor((ponto + raio - self.minimo) / self.tamanho_celula).astype(np.int64)
+        inferior = np.maximum(inferior, 0)
+        superior = np.minimum(superior, MAX_CELULAS_POR_EIXO - 1)
+        if np.any(superior < inferior):
+            vazio = np.zeros(0, dtype=np.int64)
+            return vazio, np.zeros(0)
+
+        eixos = [np.arange(inferior[k], superior[k] + 1) for k in range(3)]
+        grade = np.stack(np.meshgrid(*eixos, indexing="ij"), axis=-1).reshape(-1, 3)
+        celulas = self._localizar(grade)
+        celulas = celulas[celulas >= 0]
+        if not len(celulas):
+            vazio = np.zeros(0, dtype=np.int64)
+            return vazio, np.zeros(0)
+
+        indices = np.concatenate([self.ordem[self.inicios[c]:self.inicios[c] + self.contagens[c]]
+                                  for c in celulas])
+        distancia = np.linalg.norm(self.posicoes[indices] - ponto, axis=1)
+        dentro = distancia <= raio
+        return indices[dentro], distancia[dentro]
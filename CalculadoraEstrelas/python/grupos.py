@@ -0,0 +1,256 @@
+"""
+Calculadora Geométrica de Distância Entre Estrelas
+Agrupamento Amigos-de-Amigos (Friends-of-Friends)
+
+Autor: Luiz Tiago Wilcke
+Data: 2025
+"""
+
+import math
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Tuple
+
+import numpy as np
+
+from colunar import (
+    CatalogoColunar, calcular_distancia_paralaxe_lote,
+    calcular_separacao_angular_lote, calcular_distancia_real_lote,
+    esfericas_para_cartesianas
+)
+from espacial import GradeEspacial
+
+# Folga relativa do raio da grade (a decisão final usa a distância real exata)
+FOLGA_GRADE = 1e-9
+
+# Registro das fatias gravadas em disco no modo de fluxo
+TIPO_REGISTRO_FATIA = np.dtype([("indice", np.int64), ("alfa", np.float64),
+                                ("delta", np.float64), ("paralaxe", np.float64)])
+
+
+class UniaoBusca:
+    """Union-find vetorizado (cada raiz é o menor índice do seu grupo)"""
+
+    def __init__(self, n: int = 0):
+        self.pais = np.arange(n, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.pais)
+
+    def crescer(self, n: int):
+        """Garantir espaço para n elementos"""
+        if n > len(self.pais):
+            self.pais = np.concatenate([self.pais, np.arange(len(self.pais), n, dtype=np.int64)])
+
+    def raizes(self, x: np.ndarray) -> np.ndarray:
+        """Raiz de cada elemento de x (comprime os caminhos percorridos)"""
+        raiz = self.pais[x]
+        while True:
+            acima = self.pais[raiz]
+            if np.array_equal(acima, raiz):
+                break
+            raiz = acima
+        self.pais[x] = raiz
+        return raiz
+
+    def unir(self, i: np.ndarray, j: np.ndarray):
+        """Unir os grupos de cada par (i[k], j[k])"""
+        while len(i):
+            ri, rj = self.raizes(i), self.raizes(j)
+            diferentes = ri != rj
+            if not diferentes.any():
+                break
+            i, j, ri, rj = i[diferentes], j[diferentes], ri[diferentes], rj[diferentes]
+            # Pendurar a raiz maior na menor; arestas não aplicadas voltam no laço
+            np.minimum.at(self.pais, np.maximum(ri, rj), np.minimum(ri, rj))
+
+    def rotulos(self) -> np.ndarray:
+        """Raiz de todos os elementos"""
+        return self.raizes(np.arange(len(self.pais)))
+
+
+@dataclass
+class ResultadoGrupos:
+    """
+    Grupos encontrados
+
+    rotulos[i] é o grupo da estrela i (-1 se ela não tem paralaxe positiva).
+    Os membros ficam em formato CSR: os do grupo g são
+    ordem_membros[inicios[g]:inicios[g] + tamanhos[g]].
+    """
+    rotulos: np.ndarray
+    tamanhos: np.ndarray
+    ordem_membros: np.ndarray
+    inicios: np.ndarray
+    ligacao_pc: float
+
+    @classmethod
+    def de_raizes(cls, raizes: np.ndarray, validas: np.ndarray,
+                  ligacao_pc: float) -> "ResultadoGrupos":
+        rotulos = np.full(len(raizes), -1, dtype=np.int64)
+        _, rotulos_validos, tamanhos = np.unique(raizes[validas], return_inverse=True,
+                                                 return_counts=True)
+        rotulos[validas] = rotulos_validos
+        indices_validos = np.flatnonzero(validas)
+        ordem = indices_validos[np.argsort(rotulos_validos, kind="stable")]
+        inicios = np.concatenate([[0], np.cumsum(tamanhos)[:-1]]).astype(np.int64)
+        return cls(rotulos, tamanhos, ordem, inicios, ligacao_pc)
+
+    @property
+    def num_grupos(self) -> int:
+        return len(self.tamanhos)
+
+    def membros(self, grupo: int) -> np.ndarray:
+        """Índices das estrelas do grupo"""
+        inicio = self.inicios[grupo]
+        return self.ordem_membros[inicio:inicio + self.tamanhos[grupo]]
+
+    def grupos(self, tamanho_minimo: int = 2) -> Iterator[Tuple[int, np.ndarray]]:
+        """(grupo, membros) dos grupos com pelo menos tamanho_minimo estrelas"""
+        for grupo in np.flatnonzero(self.tamanhos >= tamanho_minimo):
+            yield int(grupo), self.membros(grupo)
+
+    def binarias_candidatas(self) -> List[Tuple[int, int]]:
+        """Pares isolados (grupos de exatamente duas estrelas)"""
+        return [tuple(int(m) for m in membros) for _, membros in self.grupos(2)
+                if len(membros) == 2]
+
+
+def _unir_pares_proximos(uniao: UniaoBusca, indices: np.ndarray, alfa: np.ndarray,
+                         delta: np.ndarray, distancia: np.ndarray, ligacao_pc: float):
+    """Unir todos os pares com distância real <= ligacao_pc"""
+    if len(indices) < 2:
+        return
+    posicoes = esfericas_para_cartesianas(alfa, delta, distancia)
+    raio = ligacao_pc * (1.0 + FOLGA_GRADE) + 1e-12
+    grade = GradeEspacial(posicoes, raio)
+    for i, j, _ in grade.pares_no_raio(raio):
+        theta = calcular_separacao_angular_lote(alfa[i], delta[i], alfa[j], delta[j])
+        distancia_real = calcular_distancia_real_lote(distancia[i], distancia[j], theta)
+        ligados = distancia_real <= ligacao_pc
+        uniao.unir(indices[i[ligados]], indices[j[ligados]])
+
+
+def agrupar_amigos_de_amigos(catalogo: CatalogoColunar, ligacao_pc: float) -> ResultadoGrupos:
+    """
+    Grupos amigos-de-amigos com comprimento de ligação em parsecs
+
+    Duas estrelas pertencem ao mesmo grupo se existe uma cadeia de estrelas
+    em que cada passo tem distância real (calcular_distancia_real) <= ligação.
+    """
+    if ligacao_pc <= 0:
+        raise ValueError("O comprimento de ligação deve ser positivo")
+    validas = catalogo.paralaxe_mas > 0
+    indices = np.flatnonzero(validas)
+
+    uniao = UniaoBusca(len(catalogo))
+    _unir_pares_proximos(uniao, indices, catalogo.alfa_rad[indices], catalogo.delta_rad[indices],
+                         catalogo.distancia_parsecs[indices], ligacao_pc)
+    return ResultadoGrupos.de_raizes(uniao.rotulos(), validas, ligacao_pc)
+
+
+def agrupar_fluxo(blocos: Iterable[CatalogoColunar], ligacao_pc: float,
+                  largura_fatia_pc: float = 100.0, diretorio: str = None) -> ResultadoGrupos:
+    """
+    Amigos-de-amigos para catálogos que não cabem na memória
+
+    1ª passagem: cada bloco é distribuído em fatias de largura fixa no eixo X,
+    gravadas em disco. 2ª passagem: as fatias são processadas em ordem,
+    cada uma junto com a borda (faixa de largura 'ligacao_pc') da anterior.
+    Em memória ficam apenas uma fatia, uma borda e os rótulos (8 bytes/estrela).
+    """
+    if ligacao_pc <= 0:
+        raise ValueError("O comprimento de ligação deve ser positivo")
+    largura = max(largura_fatia_pc, ligacao_pc * (1.0 + FOLGA_GRADE) + 1e-12)
+
+    with tempfile.TemporaryDirectory(dir=diretorio, prefix="fof_") as temporario:
+        # 1ª passagem: distribuir em fatias
+        total = 0
+        validas_blocos = []
+        fatias = set()
+        for bloco in blocos:
+            n = len(bloco)
+            validas = bloco.paralaxe_mas > 0
+            validas_blocos.append(validas)
+            locais = np.flatnonzero(validas)
+            x = bloco.cartesianas[locais, 0]
+            numero_fatia = np.floor(x / largura).astype(np.int64)
+
+            registros = np.empty(len(locais), dtype=TIPO_REGISTRO_FATIA)
+            registros["indice"] = total + locais
+            registros["alfa"] = bloco.alfa_rad[locais]
+            registros["delta"] = bloco.delta_rad[locais]
+            registros["paralaxe"] = bloco.paralaxe_mas[locais]
+            for fatia in np.unique(numero_fatia):
+                with open(os.path.join(temporario, f"{fatia}.bin"), "ab") as arquivo:
+                    registros[numero_fatia == fatia].tofile(arquivo)
+                fatias.add(int(fatia))
+            total += n
+
+        # 2ª passagem: fatias em ordem, com a borda da anterior
+        uniao = UniaoBusca(total)
+        borda = np.empty(0, dtype=TIPO_REGISTRO_FATIA)
+        anterior = None
+        for fatia in sorted(fatias):
+            atual = np.fromfile(os.path.join(temporario, f"{fatia}.bin"), dtype=TIPO_REGISTRO_FATIA)
+            if anterior is not None and anterior == fatia - 1:
+                juntos = np.concatenate([borda, atual])
+            else:
+                juntos = atual
+            distancia = calcular_distancia_paralaxe_lote(juntos["paralaxe"])
+            _unir_pares_proximos(uniao, juntos["indice"], juntos["alfa"], juntos["delta"],
+                                 distancia, ligacao_pc)
+
+            x = (distancia * np.cos(juntos["delta"]) * np.cos(juntos["alfa"]))[len(juntos) - len(atual):]
+            borda = atual[x >= (fatia + 1) * largura - ligacao_pc * (1.0 + FOLGA_GRADE) - 1e-12]
+            anterior = fatia
+
+    validas = np.concatenate(validas_blocos) if validas_blocos else np.zeros(0, dtype=bool)
+    return ResultadoGrupos.de_raizes(uniao.rotulos(), validas, ligacao_pc)
+
+
+def teste_grupos():
+    """Comparar com a força bruta e verificar o modo de fluxo"""
+    print("=" * 60)
+    print("TESTE: Agrupamento Amigos-de-Amigos")
+    print("=" * 60)
+
+    catalogo = CatalogoColunar.de_registros()
+    resultado = agrupar_amigos_de_amigos(catalogo, 1.0)
+    for grupo, membros in resultado.grupos():
+        print(f"\nGrupo {grupo} (ligação 1 pc): {', '.join(catalogo.nomes[m] for m in membros)}")
+
+    gerador = np.random.default_rng(11)
+    n = 600
+    sintetico = CatalogoColunar(
+        nomes=[f"S{i}" for i in range(n)],
+        alfa_rad=gerador.uniform(0, 2 * math.pi, n),
+        delta_rad=np.arcsin(gerador.uniform(-1, 1, n)),
+        paralaxe_mas=np.where(gerador.random(n) < 0.02, 0.0, gerador.uniform(5, 100, n)),
+    )
+    ligacao = 6.0
+
+    # Força bruta: componentes conexas da matriz completa de distâncias
+    i, j = np.triu_indices(n, 1)
+    _, distancia = sintetico.pares(i, j)
+    validas = sintetico.paralaxe_mas > 0
+    ligados = (distancia <= ligacao) & validas[i] & validas[j]
+    bruta = UniaoBusca(n)
+    bruta.unir(i[ligados], j[ligados])
+    esperado = ResultadoGrupos.de_raizes(bruta.rotulos(), validas, ligacao)
+
+    obtido = agrupar_amigos_de_amigos(sintetico, ligacao)
+    fluxo = agrupar_fluxo((sintetico.subconjunto(np.arange(k, min(k + 97, n)))
+                           for k in range(0, n, 97)), ligacao, largura_fatia_pc=15.0)
+    for nome, resultado in [("memória", obtido), ("fluxo", fluxo)]:
+        assert np.array_equal(resultado.rotulos, esperado.rotulos), nome
+        assert np.array_equal(resultado.tamanhos, esperado.tamanhos), nome
+        print(f"N={n}, ligação={ligacao} pc, modo {nome}: {resultado.num_grupos} grupos, "
+              f"maior com {resultado.tamanhos.max()} estrelas: ok")
+
+    print("\n✅ Teste concluído com sucesso!")
+
+
+if __name__ == "__main__":
+    teste_grupos()
@@ -0,0 +1,215 @@
+"""
+Calculadora Geométrica de Distância Entre Estrelas
+Propagação de Incertezas por Monte Carlo
+
+Autor: Luiz Tiago Wilcke
+Data: 2025
+"""
+
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+import numpy as np
+
+from calculos import RADIANOS_POR_MAS
+from motores import relatorio_motor
+from colunar import (
+    CatalogoColunar, calcular_separacao_angular_lote, calcular_distancia_real_lote
+)
+
+PERCENTIS_PADRAO = (2.5, 16.0, 50.0, 84.0, 97.5)
+
+# Arrays (amostras × linhas) mantidos vivos ao mesmo tempo em cada bloco
+ARRAYS_POR_AMOSTRA = 12
+
+
+@dataclass
+class ResumoDistribuicao:
+    """
+    Resumo das distribuições amostradas (uma coluna por estrela ou par)
+
+    Amostras com paralaxe <= 0 não definem distância e são descartadas;
+    fracao_valida indica a parcela aproveitada.
+    """
+    percentis: Sequence[float]
+    valores_percentis: np.ndarray  # (len(percentis), N)
+    mediana: np.ndarray
+    media: np.ndarray
+    desvio: np.ndarray
+    fracao_valida: np.ndarray
+
+    def percentil(self, q: float) -> np.ndarray:
+        """Valores de um dos percentis calculados"""
+        return self.valores_percentis[list(self.percentis).index(q)]
+
+
+def _linhas_por_bloco(amostras: int, memoria_mb: float) -> int:
+    """Quantas estrelas/pares cabem no orçamento de memória"""
+    bytes_por_linha = amostras * 8 * ARRAYS_POR_AMOSTRA
+    return max(1, int(memoria_mb * 1024 * 1024 // bytes_por_linha))
+
+
+def _resumir(valores: np.ndarray, validas: np.ndarray, percentis: Sequence[float]):
+    """Percentis, média e desvio por linha usando apenas amostras válidas"""
+    validos = validas.sum(axis=1)
+    ordenados = np.sort(np.where(validas, valores, np.inf), axis=1)
+
+    resultado = np.full((len(percentis), len(valores)), np.nan)
+    linhas = np.arange(len(valores))
+    tem = validos > 0
+    for k, q in enumerate(percentis):
+        # Interpolação linear (mesma convenção de np.percentile)
+        posicao = q / 100.0 * np.maximum(validos - 1, 0)
+        abaixo = np.floor(posicao).astype(np.int64)
+        acima = np.minimum(abaixo + 1, np.maximum(validos - 1, 0))
+        fracao = posicao - abaixo
+        v_abaixo = ordenados[linhas, abaixo]
+        v_acima = ordenados[linhas, acima]
+        resultado[k, tem] = (v_abaixo + (v_acima - v_abaixo) * fracao)[tem]
+
+    zerados = np.where(validas, valores, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        media = zerados.sum(axis=1) / validos
+        desvio = np.sqrt(np.maximum((zerados ** 2).sum(axis=1) / validos - media ** 2, 0.0))
+    return resultado, media, desvio, validos / valores.shape[1]
+
+
+def _amostrar_estrelas(gerador: np.random.Generator, catalogo: CatalogoColunar,
+                       indices: np.ndarray, amostras: int, com_posicao: bool):
+    """Amostras (linhas × amostras) de α, δ e paralaxe das estrelas indicadas"""
+    forma = (len(indices), amostras)
+    paralaxe = (catalogo.paralaxe_mas[indices, None] +
+                catalogo.erro_paralaxe_mas[indices, None] * gerador.standard_normal(forma))
+    alfa = np.broadcast_to(catalogo.alfa_rad[indices, None], forma)
+    delta = np.broadcast_to(catalogo.delta_rad[indices, None], forma)
+    if com_posicao:
+        sigma = catalogo.erro_posicao_mas[indices, None] * RADIANOS_POR_MAS
+        delta = delta + sigma * gerador.standard_normal(forma)
+        # O erro em α·cos(δ) é o mesmo do eixo δ na esfera
+        alfa = alfa + sigma / np.maximum(np.cos(delta), 1e-12) * gerador.standard_normal(forma)
+    return alfa, delta, paralaxe
+
+
+def _distancia(paralaxe: np.ndarray):
+    validas = paralaxe > 0
+    return np.where(validas, 1000.0 / np.where(validas, paralaxe, 1.0), np.nan), validas
+
+
+def distribuicao_distancias(catalogo: CatalogoColunar, indices=None, amostras: int = 10000,
+                            percentis: Sequence[float] = PERCENTIS_PADRAO,
+                            semente: Optional[int] = None,
+                            memoria_mb: float = 256.0) -> ResumoDistribuicao:
+    """
+    Distribuição da distância de cada estrela (d = 1000 / p, p ~ N(p, σp))
+
+    O trabalho é feito em blocos de estrelas dimensionados por memoria_mb;
+    a mesma semente e o mesmo orçamento reproduzem os mesmos resultados.
+    """
+    indices = np.arange(len(catalogo)) if indices is None else np.asarray(indices)
+    gerador = np.random.default_rng(semente)
+    resumo = _alocar(len(indices), percentis)
+    passo = _linhas_por_bloco(amostras, memoria_mb)
+    for inicio in range(0, len(indices), passo):
+        bloco = indices[inicio:inicio + passo]
+        _, _, paralaxe = _amostrar_estrelas(gerador, catalogo, bloco, amostras, False)
+        distancia, validas = _distancia(paralaxe)
+        _guardar(resumo, slice(inicio, inicio + len(bloco)),
+                 _resumir(distancia, validas, _com_mediana(percentis)))
+    return resumo
+
+
+def distribuicao_distancias_pares(catalogo: CatalogoColunar, i, j, amostras: int = 10000,
+                                  percentis: Sequence[float] = PERCENTIS_PADRAO,
+                                  semente: Optional[int] = None, memoria_mb: float = 256.0,
+                                  com_posicao: bool = True) -> ResumoDistribuicao:
+    """
+    Distribuição da distância real entre as estrelas de cada par (i[k], j[k])
+
+    Cada amostra sorteia as paralaxes (e, se com_posicao, as posições) das
+    duas estrelas e aplica as Leis dos Cossenos de calculos.py.
+    """
+    i, j = np.asarray(i), np.asarray(j)
+    if i.shape != j.shape:
+        raise ValueError("i e j devem ter o mesmo tamanho")
+    gerador = np.random.default_rng(semente)
+    resumo = _alocar(len(i), percentis)
+    passo = _linhas_por_bloco(amostras, memoria_mb)
+    for inicio in range(0, len(i), passo):
+        bi, bj = i[inicio:inicio + passo], j[inicio:inicio + passo]
+        alfa1, delta1, paralaxe1 = _amostrar_estrelas(gerador, catalogo, bi, amostras, com_posicao)
+        alfa2, delta2, paralaxe2 = _amostrar_estrelas(gerador, catalogo, bj, amostras, com_posicao)
+        d1, validas1 = _distancia(paralaxe1)
+        d2, validas2 = _distancia(paralaxe2)
+        theta = calcular_separacao_angular_lote(alfa1, delta1, alfa2, delta2)
+        distancia = calcular_distancia_real_lote(d1, d2, theta)
+        _guardar(resumo, slice(inicio, inicio + len(bi)),
+                 _resumir(distancia, validas1 & validas2, _com_mediana(percentis)))
+    return resumo
+
+
+def _alocar(n: int, percentis: Sequence[float]) -> ResumoDistribuicao:
+    return ResumoDistribuicao(
+        percentis=tuple(percentis),
+        valores_percentis=np.full((len(percentis), n), np.nan),
+        mediana=np.full(n, np.nan), media=np.full(n, np.nan),
+        desvio=np.full(n, np.nan), fracao_valida=np.zeros(n),
+    )
+
+
+def _guardar(resumo: ResumoDistribuicao, fatia: slice, parcial):
+    valores, media, desvio, fracao = parcial
+    resumo.valores_percentis[:, fatia] = valores[:len(resumo.percentis)]
+    resumo.mediana[fatia] = valores[list(_com_mediana(resumo.percentis)).index(50.0)]
+    resumo.media[fatia] = media
+    resumo.desvio[fatia] = desvio
+    resumo.fracao_valida[fatia] = fracao
+
+
+def _com_mediana(percentis: Sequence[float]) -> tuple:
+    """Percentis pedidos, acrescidos da mediana se ela não estiver entre eles"""
+    percentis = tuple(percentis)
+    return percentis if 50.0 in percentis else percentis + (50.0,)
+
+
+def demonstracao_incerteza():
+    """Exemplo: distância de Deneb e de Deneb–Vega com incerteza na paralaxe"""
+    print("=" * 60)
+    print("DEMONSTRAÇÃO: Incerteza da Paralaxe por Monte Carlo")
+    print("=" * 60)
+
+    catalogo = CatalogoColunar.de_registros()
+    deneb, vega = catalogo.nomes.index("Deneb"), catalogo.nomes.index("Vega")
+    # Incertezas ilustrativas (1σ) para o exemplo
+    catalogo.erro_paralaxe_mas[deneb] = 0.32
+    catalogo.erro_paralaxe_mas[vega] = 0.36
+    catalogo.erro_posicao_mas[[deneb, vega]] = 0.5
+
+    estrelas = distribuicao_distancias(catalogo, [deneb, vega], amostras=200000, semente=1)
+    for k, nome in enumerate(["Deneb", "Vega"]):
+        indice = [deneb, vega][k]
+        print(f"\n{nome}: p = {catalogo.paralaxe_mas[indice]} ± "
+              f"{catalogo.erro_paralaxe_mas[indice]} mas")
+        print(f"  1000/p          = {catalogo.distancia_parsecs[indice]:.1f} pc")
+        print(f"  mediana         = {estrelas.mediana[k]:.1f} pc")
+        print(f"  intervalo 68%   = [{estrelas.percentil(16.0)[k]:.1f}, "
+              f"{estrelas.percentil(84.0)[k]:.1f}] pc")
+        print(f"  média amostral  = {estrelas.media[k]:.1f} pc (viés de 1/p)")
+
+    par = distribuicao_distancias_pares(catalogo, [deneb], [vega], amostras=200000, semente=1)
+    print(f"\nDeneb ↔ Vega: mediana {par.mediana[0]:.1f} pc, "
+          f"95% em [{par.percentil(2.5)[0]:.1f}, {par.percentil(97.5)[0]:.1f}] pc")
+    print(relatorio_motor())
+
+    # Verificação: percentis iguais aos de np.percentile sem amostras inválidas
+    gerador = np.random.default_rng(5)
+    valores = gerador.normal(10, 2, (7, 501))
+    validas = gerador.random((7, 501)) > 0.1
+    obtido = _resumir(valores, validas, PERCENTIS_PADRAO)[0]
+    for linha in range(7):
+        esperado = np.percentile(valores[linha][validas[linha]], PERCENTIS_PADRAO)
+        assert np.allclose(obtido[:, linha], esperado)
+    print("\n✅ Demonstração concluída!")
+
+
+if __name__ == "__main__":
+    demonstracao_incerteza()
@@ -0,0 +1,221 @@
+"""
+Calculadora Geométrica de Distância Entre Estrelas
+Recálculo Incremental (apenas as etapas afetadas por cada campo)
+
+Autor: Luiz Tiago Wilcke
+Data: 2025
+"""
+
+from collections import Counter
+from typing import Dict, Optional, Set
+
+from calculos import (
+    Estrela, CoordenadaHMS, CoordenadaDMS,
+    CalculadoraGeometrica, ResultadoCalculo,
+    GRAUS_POR_RADIANO, PARSEC_PARA_ANOS_LUZ
+)
+
+# Etapa de cada estrela que depende de cada campo de entrada
+ETAPA_DO_CAMPO = {
+    'nome': 'nome',
+    'ar_h': 'coordenadas', 'ar_m': 'coordenadas', 'ar_s': 'coordenadas',
+    'dec_sinal': 'coordenadas', 'dec_g': 'coordenadas', 'dec_m': 'coordenadas',
+    'dec_s': 'coordenadas',
+    'paralaxe': 'distancia',
+}
+
+# Painéis da interface e as etapas que cada um exibe
+PAINEIS = {
+    'resultados': {'nome', 'distancia', 'separacao', 'distancia_real'},
+    'plano': {'nome', 'coordenadas', 'distancia_real'},
+    'equacoes': {'distancia', 'separacao', 'distancia_real'},
+}
+
+
+def converter_real(texto: str, padrao: float = 0.0) -> float:
+    """Texto de um campo para float (padrão se vazio ou inválido)"""
+    try:
+        texto = texto.strip()
+        return float(texto) if texto else padrao
+    except ValueError:
+        return padrao
+
+
+def converter_inteiro(texto: str, padrao: int = 0) -> int:
+    """Texto de um campo para int (aceita '5.0'; padrão se vazio ou inválido)"""
+    try:
+        texto = texto.strip()
+        return int(float(texto)) if texto else padrao
+    except ValueError:
+        return padrao
+
+
+class CalculoIncremental:
+    """
+    Estado do cálculo de um par de estrelas, atualizado campo a campo
+
+    Etapas e dependências:
+        campos de α/δ da estrela k → coordenadas k ─┐
+                                                    ├→ separação ─┐
+        paralaxe da estrela k      → distância k ───┼─────────────┴→ distância real
+        nome da estrela k          → nome k
+
+    definir_campo só marca a etapa da própria estrela; recalcular refaz as
+    etapas marcadas e só propaga quando o valor realmente mudou (trocar
+    '5' por '5.0' refaz apenas a leitura do campo). 'execucoes' conta cada
+    etapa executada.
+    """
+
+    def __init__(self):
+        self.campos: Dict[int, Dict[str, str]] = {1: {}, 2: {}}
+        self.nomes = {1: "Estrela 1", 2: "Estrela 2"}
+        self.coordenadas = {1: (CoordenadaHMS(0, 0, 0.0), CoordenadaDMS(0, 0, 0.0)),
+                            2: (CoordenadaHMS(0, 0, 0.0), CoordenadaDMS(0, 0, 0.0))}
+        self.paralaxes = {1: 0.0, 2: 0.0}
+        self.distancias = {1: 0.0, 2: 0.0}
+        self.separacao_rad = 0.0
+        self.distancia_real: Optional[float] = None
+        self.execucoes = Counter()
+        self._sujas = set()
+
+    def definir_campo(self, numero: int, campo: str, texto: str):
+        """Registrar o texto de um campo; só marca a etapa se o texto mudou"""
+        if self.campos[numero].get(campo) != texto:
+            self.campos[numero][campo] = texto
+            self._sujas.add((numero, ETAPA_DO_CAMPO[campo]))
+
+    @property
+    def pendente(self) -> bool:
+        return bool(self._sujas)
+
+    def _texto(self, numero: int, campo: str) -> str:
+        return self.campos[numero].get(campo, "")
+
+    def _etapa_nome(self, numero: int) -> bool:
+        nome = self._texto(numero, 'nome').strip() or f"Estrela {numero}"
+        mudou, self.nomes[numero] = nome != self.nomes[numero], nome
+        return mudou
+
+    def _etapa_coordenadas(self, numero: int) -> bool:
+        texto = self._texto
+        coordenadas = (
+            CoordenadaHMS(horas=converter_inteiro(texto(numero, 'ar_h')),
+                          minutos=converter_inteiro(texto(numero, 'ar_m')),
+                          segundos=converter_real(texto(numero, 'ar_s'))),
+            CoordenadaDMS(graus=converter_inteiro(texto(numero, 'dec_g')),
+                          minutos=converter_inteiro(texto(numero, 'dec_m')),
+                          segundos=converter_real(texto(numero, 'dec_s')),
+                          positivo=(texto(numero, 'dec_sinal') or "+") == "+"),
+        )
+        mudou, self.coordenadas[numero] = coordenadas != self.coordenadas[numero], coordenadas
+        return mudou
+
+    def _etapa_distancia(self, numero: int) -> bool:
+        self.paralaxes[numero] = converter_real(self._texto(numero, 'paralaxe'))
+        distancia = CalculadoraGeometrica.calcular_distancia_paralaxe(self.paralaxes[numero])
+        mudou, self.distancias[numero] = distancia != self.distancias[numero], distancia
+        return mudou
+
+    def recalcular(self) -> Set[str]:
+        """Refazer as etapas afetadas e devolver os painéis que precisam ser redesenhados"""
+        mudaram = set()
+        for numero, etapa in sorted(self._sujas):
+            self.execucoes[f"{etapa}{numero}"] += 1
+            if getattr(self, f"_etapa_{etapa}")(numero):
+                mudaram.add(etapa)
+        self._sujas.clear()
+
+        if 'coordenadas' in mudaram:
+            self.execucoes['separacao'] += 1
+            (ar1, dec1), (ar2, dec2) = self.coordenadas[1], self.coordenadas[2]
+            separacao = CalculadoraGeometrica.calcular_separacao_angular(
+                ar1.para_radianos(), dec1.para_radianos(),
+                ar2.para_radianos(), dec2.para_radianos())
+            if separacao != self.separacao_rad:
+                self.separacao_rad = separacao
+                mudaram.add('separacao')
+
+        if mudaram & {'distancia', 'separacao'}:
+            self.execucoes['distancia_real'] += 1
+            if self.valido:
+                distancia_real = CalculadoraGeometrica.calcular_distancia_real(
+                    self.distancias[1], self.distancias[2], self.separacao_rad)
+            else:
+                distancia_real = None
+            if distancia_real != self.distancia_real:
+                self.distancia_real = distancia_real
+                mudaram.add('distancia_real')
+
+        return {painel for painel, etapas in PAINEIS.items() if etapas & mudaram}
+
+    @property
+    def valido(self) -> bool:
+        """As duas paralaxes são positivas (mesma exigência do botão Calcular)"""
+        return self.paralaxes[1] > 0 and self.paralaxes[2] > 0
+
+    def estrela(self, numero: int) -> Estrela:
+        ascensao_reta, declinacao = self.coordenadas[numero]
+        return Estrela(nome=self.nomes[numero], ascensao_reta=ascensao_reta,
+                       declinacao=declinacao, paralaxe_mas=self.paralaxes[numero])
+
+    def resultado(self) -> Optional[ResultadoCalculo]:
+        """ResultadoCalculo montado com os valores guardados (None se inválido)"""
+        if not self.valido or self.distancia_real is None:
+            return None
+        resultado = ResultadoCalculo(
+            nome_estrela1=self.nomes[1], nome_estrela2=self.nomes[2],
+            separacao_angular_rad=self.separacao_rad,
+            separacao_angular_graus=self.separacao_rad * GRAUS_POR_RADIANO,
+            distancia1_parsecs=self.distancias[1], distancia2_parsecs=self.distancias[2],
+            distancia_real_parsecs=self.distancia_real,
+            distancia_real_anos_luz=self.distancia_real * PARSEC_PARA_ANOS_LUZ,
+            metodo_usado="Lei dos Cossenos Esférica + Distância 3D",
+        )
+        resultado.equacao_usada = CalculadoraGeometrica._gerar_texto_equacao(resultado)
+        return resultado
+
+
+def teste_incremental():
+    """Verificar quais etapas e painéis cada edição dispara"""
+    print("=" * 60)
+    print("TESTE: Recálculo Incremental")
+    print("=" * 60)
+
+    from catalogo import CATALOGO_ESTRELAS, estrela_de_registro
+
+    calculo = CalculoIncremental()
+    registros = {r['nome']: r for r in CATALOGO_ESTRELAS}
+    for numero, nome in [(1, "Sirius"), (2, "Betelgeuse")]:
+        # Os campos da interface têm os mesmos nomes das chaves do catálogo
+        for campo in ETAPA_DO_CAMPO:
+            calculo.definir_campo(numero, campo, str(registros[nome][campo]))
+    assert calculo.recalcular() == set(PAINEIS)
+    esperado = CalculadoraGeometrica.calcular_distancia_entre_estrelas(
+        estrela_de_registro(registros["Sirius"]), estrela_de_registro(registros["Betelgeuse"]))
+    assert calculo.resultado() == esperado
+    print(f"\nSirius ↔ Betelgeuse: {calculo.resultado().distancia_real_parsecs:.4f} pc "
+          f"(igual a calcular_distancia_entre_estrelas)")
+
+    def editar(numero, campo, texto):
+        antes = Counter(calculo.execucoes)
+        calculo.definir_campo(numero, campo, texto)
+        paineis = calculo.recalcular()
+        etapas = calculo.execucoes - antes
+        print(f"  estrela {numero} {campo:9s} = {texto!r:8s} → etapas {sorted(etapas)}, "
+              f"painéis {sorted(paineis)}")
+        return set(etapas), paineis
+
+    print()
+    assert editar(2, 'paralaxe', "4.6") == ({'distancia2', 'distancia_real'}, set(PAINEIS))
+    assert editar(2, 'paralaxe', "4.60") == ({'distancia2'}, set())
+    assert editar(1, 'nome', "Alpha CMa") == ({'nome1'}, {'resultados', 'plano'})
+    assert editar(1, 'ar_s', "9.0") == ({'coordenadas1', 'separacao', 'distancia_real'},
+                                        set(PAINEIS))
+    assert editar(2, 'paralaxe', "0") == ({'distancia2', 'distancia_real'}, set(PAINEIS))
+    assert calculo.resultado() is None
+
+    print("\n✅ Teste concluído com sucesso!")
+
+
+if __name__ == "__main__":
+    teste_incremental()
@@ -6,47 +6,139 @@ Autor: Luiz Tiago Wilcke
 Data: 2025
 """
 
+import sys
 import tkinter as tk
 from tkinter import ttk, messagebox
-import matplotlib
-matplotlib.use('TkAgg')
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
-import numpy as np
+import tkinter.font as tkfont
+from typing import Optional
 
+from preguicoso import ModuloPreguicoso
 from calculos import (
     Estrela, CoordenadaHMS, CoordenadaDMS, 
     CalculadoraGeometrica, ResultadoCalculo,
     PARSEC_PARA_ANOS_LUZ
 )
+from catalogo import CATALOGO_ESTRELAS, IndiceCatalogo
+from incremental import CalculoIncremental, converter_real, converter_inteiro
 
-# Catálogo de estrelas conhecidas
-CATALOGO_ESTRELAS = [
-    {"nome": "Sirius", "ar_h": 6, "ar_m": 45, "ar_s": 8.9, "dec_sinal": "-", "dec_g": 16, "dec_m": 42, "dec_s": 58, "paralaxe": 379.21},
-    {"nome": "Betelgeuse", "ar_h": 5, "ar_m": 55, "ar_s": 10.3, "dec_sinal": "+", "dec_g": 7, "dec_m": 24, "dec_s": 25, "paralaxe": 4.51},
-    {"nome": "Proxima Centauri", "ar_h": 14, "ar_m": 29, "ar_s": 42.9, "dec_sinal": "-", "dec_g": 62, "dec_m": 40, "dec_s": 46, "paralaxe": 768.07},
-    {"nome": "Alpha Centauri A", "ar_h": 14, "ar_m": 39, "ar_s": 36.5, "dec_sinal": "-", "dec_g": 60, "dec_m": 50, "dec_s": 2, "paralaxe": 747.1},
-    {"nome": "Vega", "ar_h": 18, "ar_m": 36, "ar_s": 56.3, "dec_sinal": "+", "dec_g": 38, "dec_m": 47, "dec_s": 1, "paralaxe": 130.23},
-    {"nome": "Arcturus", "ar_h": 14, "ar_m": 15, "ar_s": 39.7, "dec_sinal": "+", "dec_g": 19, "dec_m": 10, "dec_s": 57, "paralaxe": 88.83},
-    {"nome": "Rigel", "ar_h": 5, "ar_m": 14, "ar_s": 32.3, "dec_sinal": "-", "dec_g": 8, "dec_m": 12, "dec_s": 6, "paralaxe": 3.78},
-    {"nome": "Canopus", "ar_h": 6, "ar_m": 23, "ar_s": 57.1, "dec_sinal": "-", "dec_g": 52, "dec_m": 41, "dec_s": 44, "paralaxe": 10.55},
-    {"nome": "Aldebaran", "ar_h": 4, "ar_m": 35, "ar_s": 55.2, "dec_sinal": "+", "dec_g": 16, "dec_m": 30, "dec_s": 33, "paralaxe": 48.94},
-    {"nome": "Capella", "ar_h": 5, "ar_m": 16, "ar_s": 41.4, "dec_sinal": "+", "dec_g": 45, "dec_m": 59, "dec_s": 53, "paralaxe": 76.20},
-    {"nome": "Polaris", "ar_h": 2, "ar_m": 31, "ar_s": 49.1, "dec_sinal": "+", "dec_g": 89, "dec_m": 15, "dec_s": 51, "paralaxe": 7.54},
-    {"nome": "Antares", "ar_h": 16, "ar_m": 29, "ar_s": 24.5, "dec_sinal": "-", "dec_g": 26, "dec_m": 25, "dec_s": 55, "paralaxe": 5.40},
-    {"nome": "Spica", "ar_h": 13, "ar_m": 25, "ar_s": 11.6, "dec_sinal": "-", "dec_g": 11, "dec_m": 9, "dec_s": 41, "paralaxe": 13.06},
-    {"nome": "Deneb", "ar_h": 20, "ar_m": 41, "ar_s": 25.9, "dec_sinal": "+", "dec_g": 45, "dec_m": 16, "dec_s": 49, "paralaxe": 2.31},
-    {"nome": "Altair", "ar_h": 19, "ar_m": 50, "ar_s": 47.0, "dec_sinal": "+", "dec_g": 8, "dec_m": 52, "dec_s": 6, "paralaxe": 194.95},
-    {"nome": "Procyon", "ar_h": 7, "ar_m": 39, "ar_s": 18.1, "dec_sinal": "+", "dec_g": 5, "dec_m": 13, "dec_s": 30, "paralaxe": 284.56},
-    {"nome": "Regulus", "ar_h": 10, "ar_m": 8, "ar_s": 22.3, "dec_sinal": "+", "dec_g": 11, "dec_m": 58, "dec_s": 2, "paralaxe": 41.13},
-    {"nome": "Fomalhaut", "ar_h": 22, "ar_m": 57, "ar_s": 39.0, "dec_sinal": "-", "dec_g": 29, "dec_m": 37, "dec_s": 20, "paralaxe": 129.81},
-]
+# numpy é carregado junto com o plano estelar, depois que a janela aparece
+np = ModuloPreguicoso("numpy")
+
+# Espera após a última tecla antes do recálculo no modo ao vivo
+ATRASO_AO_VIVO_MS = 250
+
+# Vista inicial do plano estelar e fator de cada passo da roda do mouse
+VISTA_PLANO_COMPLETA = (-180.0, 180.0, -90.0, 90.0)
+FATOR_ZOOM_PLANO = 1.25
+
+
+class ListaVirtual(ttk.Frame):
+    """
+    Lista virtualizada: apenas as linhas visíveis existem no Listbox
+
+    Os itens são índices do catálogo; o texto de cada linha é gerado sob
+    demanda por 'formatar', de modo que o custo de desenho não depende do
+    tamanho do catálogo.
+    """
+    
+    def __init__(self, parent, formatar, linhas: int = 15, **opcoes_lista):
+        super().__init__(parent, style='TFrame')
+        self.formatar = formatar
+        self.itens = []
+        self.topo = 0
+        self.linhas = linhas
+        self.selecionado = None
+        self._posicao_selecionada = None
+        
+        self.lista = tk.Listbox(self, height=linhas, exportselection=False,
+                                activestyle='none', **opcoes_lista)
+        self.barra = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._rolar)
+        self.barra.pack(side=tk.RIGHT, fill=tk.Y)
+        self.lista.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        
+        self.lista.bind('<<ListboxSelect>>', self._ao_selecionar)
+        self.lista.bind('<Configure>', self._ao_redimensionar)
+        self.lista.bind('<MouseWheel>', lambda e: self._rolar('scroll', -e.delta // 120, 'units'))
+        self.lista.bind('<Button-4>', lambda e: self._rolar('scroll', -3, 'units'))
+        self.lista.bind('<Button-5>', lambda e: self._rolar('scroll', 3, 'units'))
+        self.lista.bind('<Up>', lambda e: self._mover_selecao(-1))
+        self.lista.bind('<Down>', lambda e: self._mover_selecao(1))
+    
+    def definir_itens(self, itens):
+        """Substituir os itens exibidos (sequência de índices do catálogo)"""
+        self.itens = itens
+        self.topo = 0
+        self.selecionado = None
+        self._posicao_selecionada = None
+        self._materializar()
+    
+    def item_selecionado(self):
+        """Índice do catálogo selecionado, ou None"""
+        return self.selecionado
+    
+    def _materializar(self):
+        """Recriar somente as linhas da janela visível"""
+        total = len(self.itens)
+        self.topo = max(0, min(self.topo, total - self.linhas))
+        visiveis = self.itens[self.topo:self.topo + self.linhas]
+        
+        self.lista.delete(0, tk.END)
+        for indice in visiveis:
+            self.lista.insert(tk.END, self.formatar(indice))
+        if self._posicao_selecionada is not None:
+            posicao = self._posicao_selecionada - self.topo
+            if 0 <= posicao < len(visiveis):
+                self.lista.selection_set(posicao)
+        
+        if total:
+            self.barra.set(self.topo / total, (self.topo + len(visiveis)) / total)
+        else:
+            self.barra.set(0.0, 1.0)
+    
+    def _rolar(self, acao, valor, unidade=None):
+        if acao == 'moveto':
+            self.topo = int(float(valor) * len(self.itens))
+        elif acao == 'scroll':
+            passo = self.linhas if unidade == 'pages' else 1
+            self.topo += int(valor) * passo
+        self._materializar()
+        return 'break'
+    
+    def _mover_selecao(self, delta):
+        if not self.itens:
+            return 'break'
+        if self._posicao_selecionada is None:
+            posicao = self.topo
+        else:
+            posicao = self._posicao_selecionada + delta
+        posicao = max(0, min(posicao, len(self.itens) - 1))
+        self._posicao_selecionada = posicao
+        self.selecionado = self.itens[posicao]
+        if posicao < self.topo:
+            self.topo = posicao
+        elif posicao >= self.topo + self.linhas:
+            self.topo = posicao - self.linhas + 1
+        self._materializar()
+        return 'break'
+    
+    def _ao_selecionar(self, evento=None):
+        selecao = self.lista.curselection()
+        if selecao and self.topo + selecao[0] < len(self.itens):
+            self._posicao_selecionada = self.topo + selecao[0]
+            self.selecionado = self.itens[self._posicao_selecionada]
+    
+    def _ao_redimensionar(self, evento):
+        altura_linha = tkfont.Font(font=self.lista['font']).metrics('linespace') + 1
+        linhas = max(1, evento.height // altura_linha)
+        if linhas != self.linhas:
+            self.linhas = linhas
+            self._materializar()
 
 
 class InterfaceCalculadora:
     """Interface gráfica principal da calculadora de distância estelar"""
     
-    def __init__(self, raiz: tk.Tk):
+    def __init__(self, raiz: tk.Tk, diretorio_piramide: Optional[str] = None):
         self.raiz = raiz
         self.raiz.title("Calculadora Geométrica de Distância Entre Estrelas - Autor: Luiz Tiago Wilcke")
         self.raiz.geometry("1400x950")
@@ -57,6 +149,19 @@ class InterfaceCalculadora:
         self.estrela1 = None
         self.estrela2 = None
         
+        # Modo ao vivo: campos editados desde o último recálculo
+        self.calculo_incremental = CalculoIncremental()
+        self.ao_vivo = tk.BooleanVar(value=False)
+        self.campos_editados = {}
+        self.recalculo_agendado = None
+        
+        # Plano estelar: vista atual (pan/zoom) e pirâmide de ladrilhos opcional
+        self.diretorio_piramide = diretorio_piramide
+        self.piramide = None
+        self.vista_plano = VISTA_PLANO_COMPLETA
+        self.arraste_plano = None
+        self.ladrilhos_agendados = False
+        
         # Configurar estilo
         self.configurar_estilo()
         
@@ -143,6 +248,12 @@ class InterfaceCalculadora:
                  bg='#e53e3e', fg='white', font=('Segoe UI', 10, 'bold'),
                  relief=tk.FLAT, padx=10, pady=8).pack(side=tk.LEFT, padx=3)
         
+        tk.Checkbutton(frame_botoes, text="Ao vivo", variable=self.ao_vivo,
+                       command=self.alternar_ao_vivo, bg=self.cores['frame'],
+                       fg=self.cores['texto'], selectcolor='#2d3748',
+                       activebackground=self.cores['frame'],
+                       font=('Segoe UI', 10)).pack(side=tk.LEFT, padx=3)
+        
         # Resultados em texto
         frame_res = ttk.LabelFrame(painel_esq, text="📊 Resultados", padding=5)
         frame_res.pack(fill=tk.BOTH, expand=True, pady=5)
@@ -159,11 +270,10 @@ class InterfaceCalculadora:
         frame_plano = ttk.LabelFrame(painel_dir, text="🌌 Plano Estelar", padding=3)
         frame_plano.pack(fill=tk.BOTH, expand=True, pady=(0, 5))
         
-        self.fig_plano = Figure(figsize=(7, 3.5), facecolor='#0a0a1a')
-        self.ax_plano = self.fig_plano.add_subplot(111)
-        self.canvas_plano = FigureCanvasTkAgg(self.fig_plano, master=frame_plano)
-        self.canvas_plano.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-        self.desenhar_plano_inicial()
+        # A figura (matplotlib + TkAgg) é criada após a janela ser exibida
+        self.frame_plano = frame_plano
+        self.fig_plano = self.ax_plano = self.canvas_plano = None
+        self.raiz.after_idle(self.desenhar_plano_inicial)
         
         # Equações em texto simples (não matplotlib)
         frame_eq = ttk.LabelFrame(painel_dir, text="📐 Método Geométrico e Equações", padding=5)
@@ -189,71 +299,84 @@ class InterfaceCalculadora:
         ttk.Label(parent, text="Clique em uma estrela para carregar seus dados na calculadora",
                  foreground='#a0aec0').pack(pady=(0, 10))
         
+        # Índice compartilhado pelas duas listas
+        self.indice_catalogo = IndiceCatalogo(CATALOGO_ESTRELAS)
+        self.listas_catalogo = {}
+        
         # Frame com duas colunas de listas
         frame_listas = ttk.Frame(parent, style='TFrame')
         frame_listas.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
         
-        # Lista para Estrela 1
-        frame_e1 = ttk.LabelFrame(frame_listas, text="Selecionar para Estrela 1", padding=10)
-        frame_e1.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 10))
-        
-        self.lista_catalogo1 = tk.Listbox(frame_e1, bg='#1a202c', fg='#ffd700',
-                                          font=('Segoe UI', 11), height=15,
-                                          selectbackground='#667eea', relief=tk.FLAT)
-        self.lista_catalogo1.pack(fill=tk.BOTH, expand=True)
-        for estrela in CATALOGO_ESTRELAS:
-            dist_al = (1000 / estrela['paralaxe']) * PARSEC_PARA_ANOS_LUZ
-            self.lista_catalogo1.insert(tk.END, f"{estrela['nome']} ({dist_al:.1f} a.l.)")
-        self.lista_catalogo1.bind('<Double-Button-1>', lambda e: self.carregar_do_catalogo(1))
-        
-        tk.Button(frame_e1, text="📥 Carregar para Estrela 1", 
-                 command=lambda: self.carregar_do_catalogo(1),
-                 bg='#ffd700', fg='black', font=('Segoe UI', 10, 'bold'),
-                 relief=tk.FLAT, pady=5).pack(fill=tk.X, pady=(10, 0))
-        
-        # Lista para Estrela 2
-        frame_e2 = ttk.LabelFrame(frame_listas, text="Selecionar para Estrela 2", padding=10)
-        frame_e2.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(10, 0))
-        
-        self.lista_catalogo2 = tk.Listbox(frame_e2, bg='#1a202c', fg='#4a90d9',
-                                          font=('Segoe UI', 11), height=15,
-                                          selectbackground='#667eea', relief=tk.FLAT)
-        self.lista_catalogo2.pack(fill=tk.BOTH, expand=True)
-        for estrela in CATALOGO_ESTRELAS:
-            dist_al = (1000 / estrela['paralaxe']) * PARSEC_PARA_ANOS_LUZ
-            self.lista_catalogo2.insert(tk.END, f"{estrela['nome']} ({dist_al:.1f} a.l.)")
-        self.lista_catalogo2.bind('<Double-Button-1>', lambda e: self.carregar_do_catalogo(2))
-        
-        tk.Button(frame_e2, text="📥 Carregar para Estrela 2",
-                 command=lambda: self.carregar_do_catalogo(2),
-                 bg='#4a90d9', fg='white', font=('Segoe UI', 10, 'bold'),
-                 relief=tk.FLAT, pady=5).pack(fill=tk.X, pady=(10, 0))
+        for numero, cor_texto, cor_botao, cor_fonte_botao, padx in [
+            (1, '#ffd700', '#ffd700', 'black', (0, 10)),
+            (2, '#4a90d9', '#4a90d9', 'white', (10, 0)),
+        ]:
+            frame = ttk.LabelFrame(frame_listas, text=f"Selecionar para Estrela {numero}", padding=10)
+            frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=padx)
+            self.listas_catalogo[numero] = self.criar_lista_catalogo(
+                frame, numero, cor_texto, cor_botao, cor_fonte_botao
+            )
         
         # Informações adicionais
         frame_info = ttk.LabelFrame(parent, text="ℹ️ Informações do Catálogo", padding=10)
         frame_info.pack(fill=tk.X, padx=20, pady=10)
         
-        info_texto = """Este catálogo contém 18 estrelas brilhantes visíveis da Terra.
+        info_texto = f"""Este catálogo contém {len(CATALOGO_ESTRELAS)} estrelas brilhantes visíveis da Terra.
 Os dados incluem: Ascensão Reta (α), Declinação (δ) e Paralaxe em milissegundos de arco.
 A distância é calculada pela fórmula: d = 1000/p (em parsecs).
 
+Digite parte do nome para filtrar; a lista pode ser ordenada por distância ou nome.
 Duplo-clique ou use os botões para carregar uma estrela na calculadora."""
         
         ttk.Label(frame_info, text=info_texto, foreground='#a0aec0',
                  justify=tk.LEFT).pack(anchor='w')
     
+    def criar_lista_catalogo(self, frame, numero, cor_texto, cor_botao, cor_fonte_botao):
+        """Criar campo de busca, ordenação e lista virtualizada de uma coluna"""
+        frame_busca = ttk.Frame(frame, style='TFrame')
+        frame_busca.pack(fill=tk.X, pady=(0, 5))
+        ttk.Label(frame_busca, text="🔍").pack(side=tk.LEFT)
+        
+        texto_busca = tk.StringVar()
+        tk.Entry(frame_busca, textvariable=texto_busca, bg='#2d3748', fg='white',
+                 insertbackground='white', relief=tk.FLAT).pack(side=tk.LEFT, fill=tk.X,
+                                                                expand=True, padx=5)
+        ordem = ttk.Combobox(frame_busca, values=["Distância", "Nome"], width=9, state='readonly')
+        ordem.set("Distância")
+        ordem.pack(side=tk.LEFT)
+        
+        indice = self.indice_catalogo
+        lista = ListaVirtual(
+            frame,
+            lambda i: f"{CATALOGO_ESTRELAS[i]['nome']} ({indice.distancia_anos_luz(i):.1f} a.l.)",
+            bg='#1a202c', fg=cor_texto, font=('Segoe UI', 11),
+            selectbackground='#667eea', relief=tk.FLAT
+        )
+        lista.pack(fill=tk.BOTH, expand=True)
+        lista.lista.bind('<Double-Button-1>', lambda e: self.carregar_do_catalogo(numero))
+        
+        def filtrar(*_):
+            ordenar_por = 'distancia' if ordem.get() == "Distância" else 'nome'
+            lista.definir_itens(indice.buscar(texto_busca.get(), ordenar_por))
+        
+        texto_busca.trace_add('write', filtrar)
+        ordem.bind('<<ComboboxSelected>>', filtrar)
+        filtrar()
+        
+        tk.Button(frame, text=f"📥 Carregar para Estrela {numero}",
+                 command=lambda: self.carregar_do_catalogo(numero),
+                 bg=cor_botao, fg=cor_fonte_botao, font=('Segoe UI', 10, 'bold'),
+                 relief=tk.FLAT, pady=5).pack(fill=tk.X, pady=(10, 0))
+        return lista
+    
     def carregar_do_catalogo(self, numero_estrela):
         """Carregar dados de uma estrela do catálogo"""
-        if numero_estrela == 1:
-            selecao = self.lista_catalogo1.curselection()
-        else:
-            selecao = self.lista_catalogo2.curselection()
+        idx = self.listas_catalogo[numero_estrela].item_selecionado()
         
-        if not selecao:
+        if idx is None:
             messagebox.showinfo("Aviso", f"Selecione uma estrela para Estrela {numero_estrela}")
             return
         
-        idx = selecao[0]
         estrela = CATALOGO_ESTRELAS[idx]
         entradas = self.entradas1 if numero_estrela == 1 else self.entradas2
         
@@ -304,7 +427,8 @@ Duplo-clique ou use os botões para carregar uma estrela na calculadora."""
         frame_nome.pack(fill=tk.X, pady=2)
         ttk.Label(frame_nome, text="Nome:").pack(side=tk.LEFT)
         entradas['nome'] = tk.Entry(frame_nome, width=25, bg='#2d3748', fg='white',
-                                   insertbackground='white', relief=tk.FLAT)
+                                   insertbackground='white', relief=tk.FLAT,
+                                   textvariable=self.variavel_campo(numero, 'nome'))
         entradas['nome'].pack(side=tk.LEFT, padx=5)
         
         # Ascensão Reta
@@ -314,7 +438,8 @@ Duplo-clique ou use os botões para carregar uma estrela na calculadora."""
         
         for campo, label, w in [('ar_h', 'h', 4), ('ar_m', 'm', 4), ('ar_s', 's', 6)]:
             entradas[campo] = tk.Entry(frame_ar, width=w, bg='#2d3748', fg='white',
-                                       insertbackground='white', relief=tk.FLAT)
+                                       insertbackground='white', relief=tk.FLAT,
+                                       textvariable=self.variavel_campo(numero, campo))
             entradas[campo].pack(side=tk.LEFT, padx=1)
             ttk.Label(frame_ar, text=label).pack(side=tk.LEFT)
         
@@ -323,13 +448,15 @@ Duplo-clique ou use os botões para carregar uma estrela na calculadora."""
         frame_dec.pack(fill=tk.X, pady=2)
         ttk.Label(frame_dec, text="Declinação (δ):").pack(side=tk.LEFT)
         
-        entradas['dec_sinal'] = ttk.Combobox(frame_dec, values=["+", "-"], width=2, state='readonly')
+        entradas['dec_sinal'] = ttk.Combobox(frame_dec, values=["+", "-"], width=2, state='readonly',
+                                             textvariable=self.variavel_campo(numero, 'dec_sinal'))
         entradas['dec_sinal'].set("+")
         entradas['dec_sinal'].pack(side=tk.LEFT, padx=1)
         
         for campo, label, w in [('dec_g', '°', 4), ('dec_m', "'", 4), ('dec_s', '"', 6)]:
             entradas[campo] = tk.Entry(frame_dec, width=w, bg='#2d3748', fg='white',
-                                       insertbackground='white', relief=tk.FLAT)
+                                       insertbackground='white', relief=tk.FLAT,
+                                       textvariable=self.variavel_campo(numero, campo))
             entradas[campo].pack(side=tk.LEFT, padx=1)
             ttk.Label(frame_dec, text=label).pack(side=tk.LEFT)
         
@@ -338,11 +465,58 @@ Duplo-clique ou use os botões para carregar uma estrela na calculadora."""
         frame_par.pack(fill=tk.X, pady=2)
         ttk.Label(frame_par, text="Paralaxe (mas):").pack(side=tk.LEFT)
         entradas['paralaxe'] = tk.Entry(frame_par, width=10, bg='#2d3748', fg='white',
-                                        insertbackground='white', relief=tk.FLAT)
+                                        insertbackground='white', relief=tk.FLAT,
+                                        textvariable=self.variavel_campo(numero, 'paralaxe'))
         entradas['paralaxe'].pack(side=tk.LEFT, padx=5)
         
         return entradas
     
+    def variavel_campo(self, numero: int, campo: str) -> tk.StringVar:
+        """Variável de um campo de entrada, observada pelo modo ao vivo"""
+        variavel = tk.StringVar()
+        variavel.trace_add('write', lambda *_: self.ao_editar(numero, campo, variavel))
+        return variavel
+    
+    def ao_editar(self, numero: int, campo: str, variavel: tk.StringVar):
+        """Registrar o campo editado e adiar o recálculo (uma vez por rajada de teclas)"""
+        self.campos_editados[(numero, campo)] = variavel
+        if not self.ao_vivo.get():
+            return
+        if self.recalculo_agendado is not None:
+            self.raiz.after_cancel(self.recalculo_agendado)
+        self.recalculo_agendado = self.raiz.after(ATRASO_AO_VIVO_MS, self.recalcular_ao_vivo)
+    
+    def alternar_ao_vivo(self):
+        """Ao ligar o modo ao vivo, calcular com os campos atuais"""
+        if self.ao_vivo.get():
+            self.recalcular_ao_vivo()
+    
+    def recalcular_ao_vivo(self):
+        """Ler só os campos editados e redesenhar só os painéis afetados"""
+        self.recalculo_agendado = None
+        for (numero, campo), variavel in self.campos_editados.items():
+            self.calculo_incremental.definir_campo(numero, campo, variavel.get())
+        self.campos_editados.clear()
+        
+        paineis = self.calculo_incremental.recalcular()
+        resultado = self.calculo_incremental.resultado()
+        if resultado is None:
+            if paineis:
+                self.texto_resultados.delete(1.0, tk.END)
+                self.texto_resultados.insert(
+                    tk.END, "Aguardando paralaxe maior que zero para ambas as estrelas.")
+            return
+        
+        self.resultado_atual = resultado
+        self.estrela1 = self.calculo_incremental.estrela(1)
+        self.estrela2 = self.calculo_incremental.estrela(2)
+        if 'resultados' in paineis:
+            self.atualizar_resultados()
+        if 'plano' in paineis:
+            self.atualizar_plano()
+        if 'equacoes' in paineis:
+            self.atualizar_equacoes()
+    
     def mostrar_equacoes_iniciais(self):
         """Mostrar equações iniciais"""
         self.texto_equacoes.config(state=tk.NORMAL)
@@ -362,19 +536,119 @@ Duplo-clique ou use os botões para carregar uma estrela na calculadora."""
         
         self.texto_equacoes.config(state=tk.DISABLED)
     
+    def criar_figura_plano(self):
+        """Criar a figura do plano estelar, carregando matplotlib no primeiro uso"""
+        if self.canvas_plano is not None:
+            return
+        
+        import matplotlib
+        matplotlib.use('TkAgg')
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib.figure import Figure
+        
+        self.fig_plano = Figure(figsize=(7, 3.5), facecolor='#0a0a1a')
+        self.ax_plano = self.fig_plano.add_subplot(111)
+        self.canvas_plano = FigureCanvasTkAgg(self.fig_plano, master=self.frame_plano)
+        self.canvas_plano.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        
+        # Roda do mouse aproxima em torno do cursor; arrastar desloca a vista
+        self.canvas_plano.mpl_connect('scroll_event', self.zoom_plano)
+        self.canvas_plano.mpl_connect('button_press_event', self.iniciar_arraste_plano)
+        self.canvas_plano.mpl_connect('motion_notify_event', self.arrastar_plano)
+        self.canvas_plano.mpl_connect('button_release_event', self.soltar_plano)
+        
+        if self.diretorio_piramide:
+            from ladrilhos import PiramideLadrilhos
+            self.piramide = PiramideLadrilhos(self.diretorio_piramide)
+    
+    def desenhar_fundo_plano(self):
+        """Fundo do plano: ladrilhos visíveis da pirâmide ou estrelas decorativas"""
+        if self.piramide is None:
+            np.random.seed(42)
+            x_bg = np.random.uniform(-180, 180, 100)
+            y_bg = np.random.uniform(-90, 90, 100)
+            sizes = np.random.uniform(1, 20, 100)
+            self.ax_plano.scatter(x_bg, y_bg, c='white', s=sizes, alpha=0.3)
+            return
+        
+        self.imagem_ladrilhos = self.ax_plano.imshow(
+            np.zeros((1, 1)), origin='lower', cmap='bone', alpha=0.8,
+            interpolation='nearest', aspect='auto', extent=VISTA_PLANO_COMPLETA, visible=False)
+        self.estrelas_ladrilhos = self.ax_plano.scatter(
+            [], [], c='white', s=2, alpha=0.6, linewidths=0)
+        self.atualizar_ladrilhos()
+    
+    def atualizar_ladrilhos(self):
+        """Trocar o fundo pelos ladrilhos que cobrem a vista atual"""
+        self.ladrilhos_agendados = False
+        if self.piramide is None:
+            return
+        vista = self.vista_plano
+        nivel = self.piramide.nivel_para_vista(vista[1] - vista[0], self.ax_plano.bbox.width)
+        ladrilhos = self.piramide.visiveis(vista, nivel)
+        
+        imagem, extensao = self.piramide.mosaico(ladrilhos)
+        if imagem is None:
+            self.imagem_ladrilhos.set_visible(False)
+        else:
+            imagem = np.log1p(imagem)
+            self.imagem_ladrilhos.set_data(imagem)
+            self.imagem_ladrilhos.set_extent(extensao)
+            self.imagem_ladrilhos.set_clim(0, max(float(np.nanmax(imagem)), 1.0))
+            self.imagem_ladrilhos.set_visible(True)
+        
+        estrelas = self.piramide.estrelas(ladrilhos, vista)
+        self.estrelas_ladrilhos.set_offsets(np.column_stack([estrelas['longitude'],
+                                                             estrelas['latitude']]))
+        self.canvas_plano.draw_idle()
+    
+    def aplicar_vista_plano(self, vista):
+        """Mudar os limites do plano e buscar os ladrilhos no próximo ciclo ocioso"""
+        from ladrilhos import limitar_vista
+        self.vista_plano = limitar_vista(vista)
+        self.ax_plano.set_xlim(*self.vista_plano[:2])
+        self.ax_plano.set_ylim(*self.vista_plano[2:])
+        if self.piramide is not None and not self.ladrilhos_agendados:
+            self.ladrilhos_agendados = True
+            self.raiz.after_idle(self.atualizar_ladrilhos)
+        self.canvas_plano.draw_idle()
+    
+    def zoom_plano(self, evento):
+        if evento.inaxes is not self.ax_plano:
+            return
+        fator = 1 / FATOR_ZOOM_PLANO if evento.button == 'up' else FATOR_ZOOM_PLANO
+        lon0, lon1, lat0, lat1 = self.vista_plano
+        x, y = evento.xdata, evento.ydata
+        self.aplicar_vista_plano((x + (lon0 - x) * fator, x + (lon1 - x) * fator,
+                                  y + (lat0 - y) * fator, y + (lat1 - y) * fator))
+    
+    def iniciar_arraste_plano(self, evento):
+        if evento.inaxes is self.ax_plano and evento.button == 1:
+            self.arraste_plano = (evento.x, evento.y, self.vista_plano)
+    
+    def arrastar_plano(self, evento):
+        if self.arraste_plano is None:
+            return
+        # Em pixels, porque os limites (e as coordenadas de dados) mudam durante o arraste
+        x, y, (lon0, lon1, lat0, lat1) = self.arraste_plano
+        caixa = self.ax_plano.bbox
+        dx = (evento.x - x) * (lon1 - lon0) / caixa.width
+        dy = (evento.y - y) * (lat1 - lat0) / caixa.height
+        self.aplicar_vista_plano((lon0 - dx, lon1 - dx, lat0 - dy, lat1 - dy))
+    
+    def soltar_plano(self, evento):
+        self.arraste_plano = None
+    
     def desenhar_plano_inicial(self):
         """Desenhar plano estelar inicial"""
+        self.criar_figura_plano()
         self.ax_plano.clear()
         self.ax_plano.set_facecolor('#0a0a1a')
         
-        np.random.seed(42)
-        x_bg = np.random.uniform(-180, 180, 100)
-        y_bg = np.random.uniform(-90, 90, 100)
-        sizes = np.random.uniform(1, 20, 100)
-        self.ax_plano.scatter(x_bg, y_bg, c='white', s=sizes, alpha=0.3)
+        self.desenhar_fundo_plano()
         
-        self.ax_plano.set_xlim(-180, 180)
-        self.ax_plano.set_ylim(-90, 90)
+        self.ax_plano.set_xlim(*self.vista_plano[:2])
+        self.ax_plano.set_ylim(*self.vista_plano[2:])
         self.ax_plano.set_xlabel('Ascensão Reta (°)', color='#a0aec0', fontsize=8)
         self.ax_plano.set_ylabel('Declinação (°)', color='#a0aec0', fontsize=8)
         self.ax_plano.tick_params(colors='#a0aec0', labelsize=7)
@@ -388,22 +662,10 @@ Duplo-clique ou use os botões para carregar uma estrela na calculadora."""
         self.canvas_plano.draw()
     
     def obter_float(self, entrada, padrao: float = 0.0) -> float:
-        try:
-            valor = entrada.get().strip()
-            if not valor:
-                return padrao
-            return float(valor)
-        except ValueError:
-            return padrao
+        return converter_real(entrada.get(), padrao)
     
     def obter_int(self, entrada, padrao: int = 0) -> int:
-        try:
-            valor = entrada.get().strip()
-            if not valor:
-                return padrao
-            return int(float(valor))
-        except ValueError:
-            return padrao
+        return converter_inteiro(entrada.get(), padrao)
     
     def ler_estrela(self, entradas: dict, numero: int) -> Estrela:
         nome = entradas['nome'].get().strip() or f"Estrela {numero}"
@@ -470,19 +732,16 @@ Duplo-clique ou use os botões para carregar uma estrela na calculadora."""
         self.texto_resultados.insert(tk.END, texto)
     
     def atualizar_plano(self):
+        self.criar_figura_plano()
         self.ax_plano.clear()
         self.ax_plano.set_facecolor('#0a0a1a')
         
-        np.random.seed(42)
-        x_bg = np.random.uniform(-180, 180, 100)
-        y_bg = np.random.uniform(-90, 90, 100)
-        sizes = np.random.uniform(1, 20, 100)
-        self.ax_plano.scatter(x_bg, y_bg, c='white', s=sizes, alpha=0.3)
+        self.desenhar_fundo_plano()
         
-        x1, y1 = self.estrela1.ascensao_reta.para_graus(), self.estrela1.declinacao.para_graus()
-        x2, y2 = self.estrela2.ascensao_reta.para_graus(), self.estrela2.declinacao.para_graus()
-        if x1 > 180: x1 -= 360
-        if x2 > 180: x2 -= 360
+        # Mesma convenção de longitude dos ladrilhos ([-180, 180))
+        from ladrilhos import longitude_plano
+        x1, y1 = float(longitude_plano(self.estrela1.alfa_rad)), self.estrela1.declinacao.para_graus()
+        x2, y2 = float(longitude_plano(self.estrela2.alfa_rad)), self.estrela2.declinacao.para_graus()
         
         self.ax_plano.plot([x1, x2], [y1, y2], color='#4fc3f7', linewidth=2, alpha=0.7)
         self.ax_plano.scatter([x1], [y1], c='#ffd700', s=150, marker='*', zorder=5)
@@ -498,8 +757,8 @@ Duplo-clique ou use os botões para carregar uma estrela na calculadora."""
                               (mx, my), xytext=(0, -12), textcoords='offset points',
                               fontsize=9, color='#68d391', ha='center')
         
-        self.ax_plano.set_xlim(-180, 180)
-        self.ax_plano.set_ylim(-90, 90)
+        self.ax_plano.set_xlim(*self.vista_plano[:2])
+        self.ax_plano.set_ylim(*self.vista_plano[2:])
         self.ax_plano.set_xlabel('Ascensão Reta (°)', color='#a0aec0', fontsize=8)
         self.ax_plano.set_ylabel('Declinação (°)', color='#a0aec0', fontsize=8)
         self.ax_plano.tick_params(colors='#a0aec0', labelsize=7)
@@ -545,13 +804,16 @@ Duplo-clique ou use os botões para carregar uma estrela na calculadora."""
         
         self.texto_resultados.delete(1.0, tk.END)
         self.resultado_atual = None
+        self.vista_plano = VISTA_PLANO_COMPLETA
         self.desenhar_plano_inicial()
         self.mostrar_equacoes_iniciais()
 
 
 def main():
+    # Opcional: diretório de uma pirâmide gravada por ladrilhos.construir_piramide
+    diretorio_piramide = sys.argv[1] if len(sys.argv) > 1 else None
     raiz = tk.Tk()
-    app = InterfaceCalculadora(raiz)
+    app = InterfaceCalculadora(raiz, diretorio_piramide)
     raiz.mainloop()
 
 
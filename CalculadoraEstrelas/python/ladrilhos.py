@@ -0,0 +1,379 @@
+"""
+Calculadora Geométrica de Distância Entre Estrelas
+Pirâmide de Ladrilhos do Mapa Celeste (vários níveis de resolução)
+
+Autor: Luiz Tiago Wilcke
+Data: 2025
+"""
+
+import json
+import math
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from colunar import CatalogoColunar
+
+ARQUIVO_MANIFESTO = "piramide.json"
+
+NIVEL_MAXIMO_PADRAO = 9
+RESOLUCAO_PADRAO = 64            # pixels por lado de um ladrilho de densidade
+LIMITE_ESTRELAS_PADRAO = 2000    # acima disso o ladrilho guarda densidade
+CAPACIDADE_CACHE_PADRAO = 256    # ladrilhos decodificados mantidos em memória
+
+# Um pixel de densidade pode cobrir até este número de pixels da tela
+FATOR_RESOLUCAO = 2.0
+
+DENSIDADE = "d"
+ESTRELAS = "e"
+
+# Registro de uma estrela em um ladrilho fino
+TIPO_REGISTRO_LADRILHO = np.dtype([("indice", "<i8"), ("longitude", "<f4"),
+                                   ("latitude", "<f4"), ("paralaxe_mas", "<f4")])
+
+# Vista do plano: (lon_min, lon_max, lat_min, lat_max) em graus
+Vista = Tuple[float, float, float, float]
+VISTA_COMPLETA: Vista = (-180.0, 180.0, -90.0, 90.0)
+
+
+def tamanho_ladrilho_graus(nivel: int) -> float:
+    """Lado de um ladrilho do nível (o nível 0 tem 2 × 1 ladrilhos de 180°)"""
+    return 180.0 / (1 << nivel)
+
+
+def ladrilhos_por_eixo(nivel: int) -> Tuple[int, int]:
+    return 2 << nivel, 1 << nivel
+
+
+def longitude_plano(alfa_rad: np.ndarray) -> np.ndarray:
+    """Ascensão reta em graus no intervalo [-180, 180) usado pelo plano estelar"""
+    return (np.degrees(alfa_rad) + 180.0) % 360.0 - 180.0
+
+
+def limitar_vista(vista: Vista, largura_minima: float = 0.05) -> Vista:
+    """
+    Manter a vista dentro do céu: largura entre 'largura_minima' e 360°,
+    proporção preservada e deslocamento empurrado de volta para as bordas
+    """
+    lon0, lon1, lat0, lat1 = vista
+    largura, altura = lon1 - lon0, lat1 - lat0
+    escala = min(max(largura, largura_minima), 360.0) / largura
+    largura, altura = largura * escala, min(altura * escala, 180.0)
+    centro_lon = min(max((lon0 + lon1) / 2, -180.0 + largura / 2), 180.0 - largura / 2)
+    centro_lat = min(max((lat0 + lat1) / 2, -90.0 + altura / 2), 90.0 - altura / 2)
+    return (centro_lon - largura / 2, centro_lon + largura / 2,
+            centro_lat - altura / 2, centro_lat + altura / 2)
+
+
+@dataclass
+class Ladrilho:
+    """Um ladrilho decodificado: grade de contagens ou lista de estrelas"""
+    nivel: int
+    x: int
+    y: int
+    densidade: Optional[np.ndarray] = None
+    estrelas: Optional[np.ndarray] = None
+
+    @property
+    def tipo(self) -> str:
+        return DENSIDADE if self.densidade is not None else ESTRELAS
+
+    @property
+    def limites(self) -> Vista:
+        tamanho = tamanho_ladrilho_graus(self.nivel)
+        return (-180.0 + self.x * tamanho, -180.0 + (self.x + 1) * tamanho,
+                -90.0 + self.y * tamanho, -90.0 + (self.y + 1) * tamanho)
+
+
+class CacheLRU:
+    """Dicionário limitado que descarta o item usado há mais tempo"""
+
+    def __init__(self, capacidade: int):
+        if capacidade < 1:
+            raise ValueError("A capacidade do cache deve ser positiva")
+        self.capacidade = capacidade
+        self.itens: "OrderedDict" = OrderedDict()
+        self.acertos = 0
+        self.faltas = 0
+
+    def obter(self, chave, carregar: Callable):
+        if chave in self.itens:
+            self.acertos += 1
+            self.itens.move_to_end(chave)
+            return self.itens[chave]
+        self.faltas += 1
+        valor = self.itens[chave] = carregar()
+        if len(self.itens) > self.capacidade:
+            self.itens.popitem(last=False)
+        return valor
+
+    def __len__(self) -> int:
+        return len(self.itens)
+
+
+def _caminho_ladrilho(diretorio: str, nivel: int, x: int, y: int) -> str:
+    return os.path.join(diretorio, str(nivel), f"{x}_{y}.npy")
+
+
+def construir_piramide(catalogo: CatalogoColunar, diretorio: str,
+                       nivel_maximo: int = NIVEL_MAXIMO_PADRAO,
+                       resolucao: int = RESOLUCAO_PADRAO,
+                       limite_estrelas: int = LIMITE_ESTRELAS_PADRAO) -> "PiramideLadrilhos":
+    """
+    Gravar a pirâmide de ladrilhos do catálogo em 'diretorio'
+
+    Em cada nível, um ladrilho com mais de 'limite_estrelas' estrelas guarda
+    uma grade resolucao × resolucao de contagens e é subdividido em quatro
+    no nível seguinte; os demais guardam as próprias estrelas e não têm
+    filhos (no nível máximo todos guardam estrelas). Cada estrela aparece em
+    exatamente um ladrilho de estrelas. Ladrilhos vazios não são gravados.
+    """
+    longitude = longitude_plano(catalogo.alfa_rad).astype(np.float32)
+    latitude = np.degrees(catalogo.delta_rad).astype(np.float32)
+    paralaxe = catalogo.paralaxe_mas.astype(np.float32)
+
+    tipos = {}
+    ativos = np.arange(len(catalogo))
+    for nivel in range(nivel_maximo + 1):
+        if len(ativos) == 0:
+            break
+        os.makedirs(os.path.join(diretorio, str(nivel)), exist_ok=True)
+        tamanho = tamanho_ladrilho_graus(nivel)
+        nx, ny = ladrilhos_por_eixo(nivel)
+        tx = np.clip(((longitude[ativos] + 180.0) / tamanho).astype(np.int64), 0, nx - 1)
+        ty = np.clip(((latitude[ativos] + 90.0) / tamanho).astype(np.int64), 0, ny - 1)
+        chave = ty * nx + tx
+        ordem = np.argsort(chave, kind="stable")
+        unicas, inicios, contagens = np.unique(chave[ordem], return_index=True, return_counts=True)
+
+        proximos = []
+        for chave_ladrilho, inicio, contagem in zip(unicas.tolist(), inicios, contagens):
+            y, x = divmod(chave_ladrilho, nx)
+            membros = ativos[ordem[inicio:inicio + contagem]]
+            caminho = _caminho_ladrilho(diretorio, nivel, x, y)
+            if contagem > limite_estrelas and nivel < nivel_maximo:
+                px = np.clip(((longitude[membros] + 180.0 - x * tamanho) / tamanho
+                              * resolucao).astype(np.int64), 0, resolucao - 1)
+                py = np.clip(((latitude[membros] + 90.0 - y * tamanho) / tamanho
+                              * resolucao).astype(np.int64), 0, resolucao - 1)
+                densidade = np.bincount(py * resolucao + px, minlength=resolucao * resolucao)
+                np.save(caminho, densidade.reshape(resolucao, resolucao).astype(np.uint32))
+                tipos[f"{nivel}/{x}/{y}"] = DENSIDADE
+                proximos.append(membros)
+            else:
+                registros = np.empty(len(membros), dtype=TIPO_REGISTRO_LADRILHO)
+                registros["indice"] = membros
+                registros["longitude"] = longitude[membros]
+                registros["latitude"] = latitude[membros]
+                registros["paralaxe_mas"] = paralaxe[membros]
+                np.save(caminho, registros)
+                tipos[f"{nivel}/{x}/{y}"] = ESTRELAS
+        ativos = np.concatenate(proximos) if proximos else ativos[:0]
+
+    manifesto = {
+        "estrelas": len(catalogo),
+        "nivel_maximo": nivel_maximo,
+        "resolucao": resolucao,
+        "limite_estrelas": limite_estrelas,
+        "ladrilhos": tipos,
+    }
+    with open(os.path.join(diretorio, ARQUIVO_MANIFESTO), "w", encoding="utf-8") as arquivo:
+        json.dump(manifesto, arquivo)
+    return PiramideLadrilhos(diretorio)
+
+
+class PiramideLadrilhos:
+    """
+    Pirâmide gravada por construir_piramide, lida sob demanda
+
+    Só o manifesto (o tipo de cada ladrilho existente) fica inteiro em
+    memória; os ladrilhos são lidos do disco quando uma vista precisa deles
+    e guardados já decodificados em um cache LRU.
+    """
+
+    def __init__(self, diretorio: str, capacidade_cache: int = CAPACIDADE_CACHE_PADRAO):
+        self.diretorio = diretorio
+        with open(os.path.join(diretorio, ARQUIVO_MANIFESTO), encoding="utf-8") as arquivo:
+            manifesto = json.load(arquivo)
+        self.estrelas_total = manifesto["estrelas"]
+        self.nivel_maximo = manifesto["nivel_maximo"]
+        self.resolucao = manifesto["resolucao"]
+        self.limite_estrelas = manifesto["limite_estrelas"]
+        self.tipos: Dict[Tuple[int, int, int], str] = {
+            tuple(int(parte) for parte in chave.split("/")): tipo
+            for chave, tipo in manifesto["ladrilhos"].items()
+        }
+        self.cache = CacheLRU(capacidade_cache)
+
+    def ladrilho(self, nivel: int, x: int, y: int) -> Ladrilho:
+        """Ladrilho existente (do cache ou do disco)"""
+        def carregar():
+            dados = np.load(_caminho_ladrilho(self.diretorio, nivel, x, y))
+            if self.tipos[nivel, x, y] == DENSIDADE:
+                return Ladrilho(nivel, x, y, densidade=dados)
+            return Ladrilho(nivel, x, y, estrelas=dados)
+        return self.cache.obter((nivel, x, y), carregar)
+
+    def nivel_para_vista(self, largura_graus: float, largura_pixels: float) -> int:
+        """Nível mais grosso cujo pixel de densidade cobre até FATOR_RESOLUCAO pixels da tela"""
+        graus_por_pixel = largura_graus / max(largura_pixels, 1.0)
+        for nivel in range(self.nivel_maximo + 1):
+            if tamanho_ladrilho_graus(nivel) / self.resolucao <= FATOR_RESOLUCAO * graus_por_pixel:
+                return nivel
+        return self.nivel_maximo
+
+    def _cobertura(self, nivel: int, x: int, y: int) -> Optional[Tuple[int, int, int]]:
+        """
+        Ladrilho que representa a célula (nivel, x, y): ela mesma, ou o
+        ancestral de estrelas que a contém; None se a região estiver vazia
+        """
+        pedido = nivel
+        while nivel >= 0:
+            tipo = self.tipos.get((nivel, x, y))
+            if tipo is not None:
+                return (nivel, x, y) if tipo == ESTRELAS or nivel == pedido else None
+            nivel, x, y = nivel - 1, x // 2, y // 2
+        return None
+
+    def visiveis(self, vista: Vista, nivel: int) -> List[Ladrilho]:
+        """Ladrilhos que cobrem a vista no nível dado (densidade nesse nível, estrelas em qualquer nível acima)"""
+        lon0, lon1, lat0, lat1 = vista
+        tamanho = tamanho_ladrilho_graus(nivel)
+        nx, ny = ladrilhos_por_eixo(nivel)
+        x0, x1 = (min(max(int(math.floor((valor + 180.0) / tamanho)), 0), nx - 1)
+                  for valor in (lon0, lon1))
+        y0, y1 = (min(max(int(math.floor((valor + 90.0) / tamanho)), 0), ny - 1)
+                  for valor in (lat0, lat1))
+        chaves = {self._cobertura(nivel, x, y)
+                  for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)}
+        chaves.discard(None)
+        return [self.ladrilho(*chave) for chave in sorted(chaves)]
+
+    def mosaico(self, ladrilhos: List[Ladrilho]) -> Tuple[Optional[np.ndarray], Optional[Vista]]:
+        """
+        Grades de densidade dos ladrilhos (todos do mesmo nível) montadas em
+        uma imagem única; NaN onde não há ladrilho de densidade. Devolve
+        (imagem, extensão em graus), ou (None, None) sem ladrilhos de densidade.
+        """
+        densos = [ladrilho for ladrilho in ladrilhos if ladrilho.tipo == DENSIDADE]
+        if not densos:
+            return None, None
+        r = self.resolucao
+        x0, x1 = min(l.x for l in densos), max(l.x for l in densos)
+        y0, y1 = min(l.y for l in densos), max(l.y for l in densos)
+        imagem = np.full(((y1 - y0 + 1) * r, (x1 - x0 + 1) * r), np.nan, dtype=np.float32)
+        for ladrilho in densos:
+            linha, coluna = (ladrilho.y - y0) * r, (ladrilho.x - x0) * r
+            imagem[linha:linha + r, coluna:coluna + r] = ladrilho.densidade
+        tamanho = tamanho_ladrilho_graus(densos[0].nivel)
+        extensao = (-180.0 + x0 * tamanho, -180.0 + (x1 + 1) * tamanho,
+                    -90.0 + y0 * tamanho, -90.0 + (y1 + 1) * tamanho)
+        return imagem, extensao
+
+    @staticmethod
+    def estrelas(ladrilhos: List[Ladrilho], vista: Vista) -> np.ndarray:
+        """Estrelas dos ladrilhos de estrelas que caem dentro da vista"""
+        partes = [ladrilho.estrelas for ladrilho in ladrilhos if ladrilho.tipo == ESTRELAS]
+        if not partes:
+            return np.empty(0, dtype=TIPO_REGISTRO_LADRILHO)
+        registros = np.concatenate(partes)
+        lon0, lon1, lat0, lat1 = vista
+        dentro = ((registros["longitude"] >= lon0) & (registros["longitude"] <= lon1) &
+                  (registros["latitude"] >= lat0) & (registros["latitude"] <= lat1))
+        return registros[dentro]
+
+
+def teste_ladrilhos(n: int = 500_000):
+    """Conferir a pirâmide contra o catálogo e medir vistas com e sem o cache"""
+    print("=" * 60)
+    print("TESTE: Pirâmide de Ladrilhos")
+    print("=" * 60)
+
+    # Fundo uniforme mais um aglomerado denso, para que os níveis se misturem
+    gerador = np.random.default_rng(42)
+    metade = n // 2
+    alfa = np.concatenate([gerador.uniform(0, 2 * math.pi, metade),
+                           np.radians(30.0 + gerador.normal(0, 1.5, n - metade)) % (2 * math.pi)])
+    delta = np.concatenate([np.arcsin(gerador.uniform(-1, 1, metade)),
+                            np.radians(np.clip(-20.0 + gerador.normal(0, 1.5, n - metade), -90, 90))])
+    catalogo = CatalogoColunar(nomes=[""] * n, alfa_rad=alfa, delta_rad=delta,
+                               paralaxe_mas=gerador.uniform(1, 200, n))
+    longitude = longitude_plano(catalogo.alfa_rad).astype(np.float32)
+    latitude = np.degrees(catalogo.delta_rad).astype(np.float32)
+
+    with tempfile.TemporaryDirectory(prefix="ladrilhos_") as diretorio:
+        inicio = time.perf_counter()
+        piramide = construir_piramide(catalogo, diretorio)
+        duracao = time.perf_counter() - inicio
+        por_tipo = {tipo: sum(1 for t in piramide.tipos.values() if t == tipo)
+                    for tipo in (DENSIDADE, ESTRELAS)}
+        print(f"\n{n} estrelas → {por_tipo[DENSIDADE]} ladrilhos de densidade e "
+              f"{por_tipo[ESTRELAS]} de estrelas em {duracao:.2f} s")
+
+        # Cada estrela está em exatamente um ladrilho de estrelas
+        indices = np.concatenate([piramide.ladrilho(*chave).estrelas["indice"]
+                                  for chave, tipo in piramide.tipos.items() if tipo == ESTRELAS])
+        assert np.array_equal(np.sort(indices), np.arange(n))
+
+        # Em qualquer nível, densidade desse nível + estrelas até ele = catálogo inteiro
+        for nivel in range(piramide.nivel_maximo + 1):
+            total = 0
+            for (nivel_chave, x, y), tipo in piramide.tipos.items():
+                if tipo == DENSIDADE and nivel_chave == nivel:
+                    total += int(piramide.ladrilho(nivel_chave, x, y).densidade.sum())
+                elif tipo == ESTRELAS and nivel_chave <= nivel:
+                    total += len(piramide.ladrilho(nivel_chave, x, y).estrelas)
+            assert total == n, (nivel, total)
+        print("Contagens conservadas em todos os níveis: ok")
+
+        # Vistas: a completa e aproximações sucessivas do aglomerado
+        piramide = PiramideLadrilhos(diretorio, capacidade_cache=64)
+        vistas = [VISTA_COMPLETA]
+        for largura in [90.0, 20.0, 4.0, 1.0]:
+            vistas.append(limitar_vista((30.0 - largura / 2, 30.0 + largura / 2,
+                                         -20.0 - largura / 4, -20.0 + largura / 4)))
+        print(f"\n{'vista (°)':>10s} {'nível':>5s} {'ladrilhos':>9s} {'estrelas':>9s} "
+              f"{'frio (ms)':>9s} {'quente (ms)':>11s} {'varredura (ms)':>14s}")
+        for vista in vistas:
+            nivel = piramide.nivel_para_vista(vista[1] - vista[0], 600)
+            tempos = []
+            for _ in range(2):
+                inicio = time.perf_counter()
+                ladrilhos = piramide.visiveis(vista, nivel)
+                imagem, extensao = piramide.mosaico(ladrilhos)
+                estrelas = piramide.estrelas(ladrilhos, vista)
+                tempos.append(time.perf_counter() - inicio)
+
+            inicio = time.perf_counter()
+            lon0, lon1, lat0, lat1 = vista
+            dentro = np.flatnonzero((longitude >= lon0) & (longitude <= lon1) &
+                                    (latitude >= lat0) & (latitude <= lat1))
+            varredura = time.perf_counter() - inicio
+
+            # O que a vista mostra (densidade + estrelas) cobre tudo o que está nela
+            if imagem is None:
+                assert np.array_equal(np.sort(estrelas["indice"]), dentro)
+            else:
+                assert np.nansum(imagem) + len(estrelas) >= len(dentro)
+            print(f"{vista[1] - vista[0]:10.1f} {nivel:5d} {len(ladrilhos):9d} {len(estrelas):9d} "
+                  f"{tempos[0] * 1000:9.1f} {tempos[1] * 1000:11.1f} {varredura * 1000:14.1f}")
+
+        assert len(piramide.cache) <= piramide.cache.capacidade
+        print(f"\nCache: {len(piramide.cache)} ladrilhos, {piramide.cache.acertos} acertos, "
+              f"{piramide.cache.faltas} leituras do disco")
+
+    # Vista limitada ao céu, com proporção preservada
+    assert limitar_vista((150.0, 250.0, 0.0, 50.0)) == (80.0, 180.0, 0.0, 50.0)
+    assert limitar_vista((-400.0, 400.0, -200.0, 200.0)) == VISTA_COMPLETA
+    print("limitar_vista: ok")
+
+    print("\n✅ Teste concluído com sucesso!")
+
+
+if __name__ == "__main__":
+    teste_ladrilhos()
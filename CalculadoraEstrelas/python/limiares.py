@@ -0,0 +1,313 @@
+"""
+Calculadora Geométrica de Distância Entre Estrelas
+Consultas de Limiar em Dois Estágios (triagem float32 + cálculo exato)
+
+Autor: Luiz Tiago Wilcke
+Data: 2025
+"""
+
+import math
+import time
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional, Tuple
+
+import numpy as np
+
+from calculos import RADIANOS_POR_GRAU
+from colunar import CatalogoColunar, calcular_separacao_angular_lote
+from espacial import blocos_de_pares, PARES_POR_BLOCO
+
+# Arredondamento de um valor float32 (2⁻²⁴)
+U32 = float(np.finfo(np.float32).eps) / 2
+
+# Erro relativo admitido em cada operação do estágio exato, como em paridade.py
+# (as funções da libm e os motores JIT erram alguns ulp)
+EPSILON = 16 * float(np.finfo(np.float64).eps)
+
+
+def _arredondar_para_cima(valor: float) -> np.float32:
+    """Menor float32 >= valor (infinito se valor passa do maior float32)"""
+    if valor >= float(np.finfo(np.float32).max):
+        return np.float32(np.inf)
+    aproximado = np.float32(valor)
+    if float(aproximado) < valor:
+        aproximado = np.nextafter(aproximado, np.float32(np.inf))
+    return aproximado
+
+
+@dataclass
+class EstatisticasLimiar:
+    """Candidatos eliminados por estágio e tempo gasto em cada um"""
+    candidatos: int = 0
+    eliminados_triagem: int = 0
+    eliminados_exato: int = 0
+    aceitos: int = 0
+    segundos_triagem: float = 0.0
+    segundos_exato: float = 0.0
+
+    @property
+    def refinados(self) -> int:
+        """Candidatos que passaram pela triagem e foram calculados exatamente"""
+        return self.candidatos - self.eliminados_triagem
+
+    def __str__(self) -> str:
+        fracao = self.eliminados_triagem / self.candidatos if self.candidatos else 0.0
+        return (f"{self.candidatos} candidatos → triagem eliminou {self.eliminados_triagem} "
+                f"({fracao:.2%}, {self.segundos_triagem:.3f} s) → cálculo exato de "
+                f"{self.refinados} eliminou {self.eliminados_exato} "
+                f"({self.segundos_exato:.3f} s) → {self.aceitos} aceitos")
+
+
+class AvaliadorLimiar:
+    """
+    Pares com distância real <= limite_pc e/ou separação <= limite_graus
+
+    1º estágio (triagem): distâncias euclidianas em float32 entre posições
+    cartesianas (para limite_pc) e cordas entre vetores unitários (para
+    limite_graus). Cada limite da triagem é o limite pedido acrescido de uma
+    folga que cobre, com sobra:
+      - o arredondamento das posições e da soma de quadrados em float32
+        (erro relativo 2⁻²⁴ por operação, aplicado à maior distância R);
+      - o erro do próprio estágio exato: o radicando de D² erra até
+        8·ε·R² e θ = acos(c) erra até ε + √ε (ver paridade.tolerancia_*).
+    Logo todo par que o estágio exato aceitaria passa pela triagem: não há
+    falsos negativos, só candidatos extras que o estágio exato descarta.
+
+    2º estágio (exato): os sobreviventes passam por
+    calcular_separacao_angular_lote / calcular_distancia_real_lote (as
+    fórmulas de calcular_separacao_angular e calcular_distancia_real, no
+    motor ativo). Limites de distância exigem paralaxe positiva nas duas
+    estrelas, como em proximidade.py e grupos.py.
+    """
+
+    def __init__(self, catalogo: CatalogoColunar, limite_pc: Optional[float] = None,
+                 limite_graus: Optional[float] = None):
+        if limite_pc is None and limite_graus is None:
+            raise ValueError("Informe limite_pc e/ou limite_graus")
+        self.catalogo = catalogo
+        self.limite_pc = limite_pc
+        self.limite_rad = None if limite_graus is None else limite_graus * RADIANOS_POR_GRAU
+        self.estatisticas = EstatisticasLimiar()
+
+        # Catálogos com blocos() (compacto.CatalogoCompacto) são lidos bloco a
+        # bloco: só as colunas float32 da triagem ficam inteiras na memória
+        n = len(catalogo)
+        blocos = catalogo.blocos() if hasattr(catalogo, "blocos") else [catalogo]
+        self.validas = np.zeros(n, dtype=bool)
+        precisa_corda = False
+        if self.limite_rad is not None:
+            maximo_rad = self.limite_rad + EPSILON + math.sqrt(EPSILON)
+            precisa_corda = maximo_rad < math.pi
+        self._eixos = [np.empty(n, dtype=np.float32) for _ in range(3)] if limite_pc is not None else None
+        self._eixos_corda = [np.empty(n, dtype=np.float32) for _ in range(3)] if precisa_corda else None
+        self._sem_triagem = np.zeros(n, dtype=bool)
+        raio = 0.0
+        inicio = 0
+        for bloco in blocos:
+            fim = inicio + len(bloco)
+            validas = bloco.paralaxe_mas > 0
+            self.validas[inicio:fim] = validas
+            if self._eixos is not None:
+                # Estrelas sem paralaxe ficam em NaN: qualquer comparação é falsa
+                posicoes = np.where(validas[:, None], bloco.cartesianas, np.nan)
+                with np.errstate(over="ignore"):
+                    for k in range(3):
+                        self._eixos[k][inicio:fim] = posicoes[:, k]
+                if validas.any():
+                    raio = max(raio, float(bloco.distancia_parsecs[validas].max()))
+                # Posições além do maior float32 (paralaxes minúsculas) não
+                # podem ser triadas: essas estrelas vão direto ao estágio exato
+                self._sem_triagem[inicio:fim] = validas & ~(np.isfinite(self._eixos[0][inicio:fim])
+                                                            & np.isfinite(self._eixos[1][inicio:fim])
+                                                            & np.isfinite(self._eixos[2][inicio:fim]))
+            if self._eixos_corda is not None:
+                unitarios = bloco.vetores_unitarios
+                for k in range(3):
+                    self._eixos_corda[k][inicio:fim] = unitarios[:, k]
+            inicio = fim
+
+        if self.limite_pc is not None:
+            self._limiar_quadrado = None
+            if self.limite_pc >= 0:
+                maximo = math.sqrt(self.limite_pc ** 2 + 8.0 * EPSILON * raio ** 2)
+                limiar = (1.0 + 4.0 * U32) * (maximo + (4.0 * U32 + 8.0 * EPSILON) * raio)
+                self._limiar_quadrado = _arredondar_para_cima(limiar * limiar)
+
+        if self._eixos_corda is not None:
+            corda = (1.0 + 4.0 * U32) * (2.0 * math.sin(max(maximo_rad, 0.0) / 2.0)
+                                         + 4.0 * U32 + 8.0 * EPSILON)
+            self._limiar_corda = _arredondar_para_cima(corda * corda)
+
+    @staticmethod
+    def _quadrado(eixos, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+        quadrado = np.zeros(len(i), dtype=np.float32)
+        # Um quadrado que passa do maior float32 vira infinito, acima de
+        # qualquer limiar finito (o limiar infinito nem chega a calculá-lo)
+        with np.errstate(over="ignore"):
+            for eixo in eixos:
+                diferenca = eixo[i] - eixo[j]
+                quadrado += diferenca * diferenca
+        return quadrado
+
+    def triagem(self, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+        """Máscara dos pares que podem satisfazer o limite (1º estágio)"""
+        passa = np.ones(len(i), dtype=bool)
+        if self.limite_pc is not None:
+            if self._limiar_quadrado is None:
+                passa[:] = False
+            elif np.isfinite(self._limiar_quadrado):
+                passa &= (self._quadrado(self._eixos, i, j) <= self._limiar_quadrado) \
+                    | self._sem_triagem[i] | self._sem_triagem[j]
+        if self._eixos_corda is not None:
+            k = np.flatnonzero(passa)
+            passa[k] = self._quadrado(self._eixos_corda, i[k], j[k]) <= self._limiar_corda
+        return passa
+
+    def exato(self, i: np.ndarray, j: np.ndarray
+              ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Máscara do limite calculado exatamente (2º estágio), θ (rad) e D (pc)"""
+        if self.limite_pc is None:
+            c = self.catalogo
+            if hasattr(c, "alfa_rad"):
+                theta = calcular_separacao_angular_lote(c.alfa_rad[i], c.delta_rad[i],
+                                                        c.alfa_rad[j], c.delta_rad[j])
+            else:
+                theta, _ = c.pares(i, j)
+            distancia = np.full(len(i), np.nan)
+            aceita = theta <= self.limite_rad
+        else:
+            theta, distancia = self.catalogo.pares(i, j)
+            aceita = self.validas[i] & self.validas[j] & (distancia <= self.limite_pc)
+            if self.limite_rad is not None:
+                aceita &= theta <= self.limite_rad
+        return aceita, theta, distancia
+
+    def avaliar(self, i: np.ndarray, j: np.ndarray
+                ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Pares (i, j, θ rad, D pc) que satisfazem o limite; acumula as estatísticas"""
+        i, j = np.asarray(i, dtype=np.int64), np.asarray(j, dtype=np.int64)
+        e = self.estatisticas
+        e.candidatos += len(i)
+
+        inicio = time.perf_counter()
+        k = np.flatnonzero(self.triagem(i, j))
+        e.segundos_triagem += time.perf_counter() - inicio
+        e.eliminados_triagem += len(i) - len(k)
+
+        inicio = time.perf_counter()
+        i, j = i[k], j[k]
+        aceita, theta, distancia = self.exato(i, j)
+        e.segundos_exato += time.perf_counter() - inicio
+
+        aceitos = int(np.count_nonzero(aceita))
+        e.eliminados_exato += len(k) - aceitos
+        e.aceitos += aceitos
+        return i[aceita], j[aceita], theta[aceita], distancia[aceita]
+
+    def avaliar_blocos(self, blocos: Iterable[Tuple[np.ndarray, np.ndarray]]
+                       ) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+        for i, j in blocos:
+            yield self.avaliar(i, j)
+
+    def todos_os_pares(self, pares_por_bloco: int = PARES_POR_BLOCO
+                       ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Todos os pares i < j do catálogo que satisfazem o limite"""
+        partes = list(self.avaliar_blocos(blocos_de_pares(len(self.catalogo), pares_por_bloco)))
+        if not partes:
+            vazio = np.zeros(0, dtype=np.int64)
+            return vazio, vazio, np.zeros(0), np.zeros(0)
+        return tuple(np.concatenate(coluna) for coluna in zip(*partes))
+
+
+def teste_limiares():
+    """Comparar com o cálculo exato de todos os pares, inclusive nos limites"""
+    print("=" * 60)
+    print("TESTE: Consultas de Limiar em Dois Estágios")
+    print("=" * 60)
+
+    from paridade import catalogo_bordas, catalogo_sintetico
+
+    def forca_bruta(catalogo):
+        i, j = np.triu_indices(len(catalogo), 1)
+        theta, distancia = catalogo.pares(i, j)
+        return i, j, theta, distancia
+
+    def conferir(catalogo, todos, limite_pc=None, limite_graus=None, mostrar=True):
+        avaliador = AvaliadorLimiar(catalogo, limite_pc, limite_graus)
+        i, j, theta, distancia = avaliador.todos_os_pares(pares_por_bloco=1 << 20)
+        ti, tj, ttheta, tdistancia = todos
+        esperado = np.ones(len(ti), dtype=bool)
+        if limite_pc is not None:
+            validas = avaliador.validas
+            esperado &= validas[ti] & validas[tj] & (tdistancia <= limite_pc)
+        if limite_graus is not None:
+            esperado &= ttheta <= avaliador.limite_rad
+        assert np.array_equal(i, ti[esperado]) and np.array_equal(j, tj[esperado]), \
+            (limite_pc, limite_graus, len(i), int(esperado.sum()))
+        assert np.array_equal(theta, ttheta[esperado])
+        e = avaliador.estatisticas
+        assert e.candidatos == len(ti) and e.aceitos == len(i)
+        assert e.eliminados_triagem + e.eliminados_exato + e.aceitos == e.candidatos
+        if mostrar:
+            rotulo = " e ".join(filter(None, [limite_pc is not None and f"D <= {limite_pc:.6g} pc",
+                                              limite_graus is not None and f"θ <= {limite_graus:.6g}°"]))
+            print(f"  {rotulo:30s} {e}")
+        return avaliador
+
+    # Casos de borda: estrelas idênticas, antípodas, polos, paralaxe zero
+    bordas = catalogo_bordas()
+    todos = forca_bruta(bordas)
+    for limite_pc, limite_graus in [(0.0, None), (10.0, None), (None, 0.0), (None, 1e-6),
+                                    (None, 180.0), (20.0, 180.0), (-1.0, None)]:
+        conferir(bordas, todos, limite_pc, limite_graus, mostrar=False)
+    print("\nCasos de borda: igual ao cálculo exato de todos os pares")
+
+    # Paralaxes minúsculas: limiar ou posições além do maior float32 não
+    # podem descartar pares (nem gerar avisos de overflow)
+    import warnings
+    colunas = {coluna: np.append(getattr(bordas, coluna), [0.1, 0.2, 0.3])
+               for coluna in CatalogoColunar.COLUNAS}
+    colunas["paralaxe_mas"][-3:] = [1e-30, 1e-42, 2e-42]
+    minusculas = CatalogoColunar(nomes=list(bordas.nomes) + ["p1", "p2", "p3"], **colunas)
+    todos = forca_bruta(minusculas)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", RuntimeWarning)
+        for limite_pc in (10.0, 1e9, 1e33, 1e46):
+            avaliador = conferir(minusculas, todos, limite_pc, mostrar=False)
+    assert avaliador.estatisticas.aceitos == int(np.count_nonzero(avaliador.validas[todos[0]]
+                                                                  & avaliador.validas[todos[1]]))
+    print("Paralaxes minúsculas (1e-30 e 1e-42 mas): sem falsos negativos")
+
+    catalogo = catalogo_sintetico(3000)
+    todos = forca_bruta(catalogo)
+    _, _, theta_todos, distancia_todos = todos
+    validas = catalogo.paralaxe_mas > 0
+    i_todos, j_todos = todos[0], todos[1]
+    distancias_validas = np.sort(distancia_todos[validas[i_todos] & validas[j_todos]])
+    print(f"\n{len(catalogo)} estrelas, {len(i_todos)} pares:")
+    casos = [(3.0, None), (None, 1.0), (50.0, 5.0),
+             # Limites iguais a valores exatos de pares (o par no limite deve ser aceito)
+             (float(distancias_validas[1000]), None),
+             (None, float(np.sort(theta_todos)[500]) / RADIANOS_POR_GRAU)]
+    for limite_pc, limite_graus in casos:
+        conferir(catalogo, todos, limite_pc, limite_graus)
+
+    # Só o estágio exato sobre todos os pares × os dois estágios
+    inicio = time.perf_counter()
+    aceitos = 0
+    for i, j in blocos_de_pares(len(catalogo), 1 << 20):
+        _, distancia = catalogo.pares(i, j)
+        aceitos += int(np.count_nonzero(validas[i] & validas[j] & (distancia <= 3.0)))
+    so_exato = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    avaliador = AvaliadorLimiar(catalogo, limite_pc=3.0)
+    assert len(avaliador.todos_os_pares(pares_por_bloco=1 << 20)[0]) == aceitos
+    dois_estagios = time.perf_counter() - inicio
+    print(f"\nD <= 3 pc: só cálculo exato {so_exato:.2f} s, dois estágios {dois_estagios:.2f} s "
+          f"({so_exato / dois_estagios:.1f}× mais rápido)")
+
+    print("\n✅ Teste concluído com sucesso!")
+
+
+if __name__ == "__main__":
+    teste_limiares()
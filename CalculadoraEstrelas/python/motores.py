@@ -0,0 +1,348 @@
+"""
+Calculadora Geométrica de Distância Entre Estrelas
+Motores de Cálculo (Python puro, NumPy e JIT opcional)
+
+Autor: Luiz Tiago Wilcke
+Data: 2025
+"""
+
+import importlib.util
+import math
+import os
+import time
+from array import array
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+from calculos import CalculadoraGeometrica
+from preguicoso import ModuloPreguicoso
+
+np = ModuloPreguicoso("numpy")
+
+# Motor escolhido ao importar (pode ser trocado com selecionar_motor)
+MOTOR_AMBIENTE = os.environ.get("CALCULADORA_MOTOR", "")
+
+# Núcleos que todo motor implementa (mesmos nomes dos métodos 1, 2 e 3)
+NUCLEOS = ("distancia_paralaxe", "separacao_angular", "distancia_real")
+
+
+class Motor:
+    """
+    Implementação dos três métodos de CalculadoraGeometrica sobre lotes
+
+    Motores com 'difusao' aceitam arrays de qualquer forma compatível
+    (broadcasting do NumPy); os demais recebem sequências 1-D de mesmo
+    tamanho e colunar.py faz o achatamento. As chamadas feitas por
+    colunar.py são contadas em 'chamadas', 'elementos' e 'segundos'.
+    """
+    nome = ""
+    difusao = False
+
+    def __init__(self):
+        self.chamadas = Counter()
+        self.elementos = Counter()
+        self.segundos = Counter()
+
+    @staticmethod
+    def disponivel() -> bool:
+        return True
+
+    def registrar(self, nucleo: str, elementos: int, segundos: float):
+        self.chamadas[nucleo] += 1
+        self.elementos[nucleo] += elementos
+        self.segundos[nucleo] += segundos
+
+    def zerar(self):
+        self.chamadas.clear()
+        self.elementos.clear()
+        self.segundos.clear()
+
+    def relatorio(self) -> str:
+        """Resumo de uso: qual motor rodou, quantas vezes e com quantos elementos"""
+        if not self.chamadas:
+            return f"Motor {self.nome}: nenhuma chamada"
+        partes = [f"{nucleo} {self.chamadas[nucleo]}× {self.elementos[nucleo]:,} el. "
+                  f"{self.segundos[nucleo]:.3f} s" for nucleo in NUCLEOS if self.chamadas[nucleo]]
+        return f"Motor {self.nome}: " + "; ".join(partes)
+
+
+class MotorPython(Motor):
+    """Referência: chama CalculadoraGeometrica elemento a elemento"""
+    nome = "python"
+
+    def distancia_paralaxe(self, paralaxe_mas) -> array:
+        metodo = CalculadoraGeometrica.calcular_distancia_paralaxe
+        return array("d", map(metodo, paralaxe_mas))
+
+    def separacao_angular(self, alfa1, delta1, alfa2, delta2) -> array:
+        metodo = CalculadoraGeometrica.calcular_separacao_angular
+        return array("d", map(metodo, alfa1, delta1, alfa2, delta2))
+
+    def distancia_real(self, distancia1, distancia2, separacao_angular) -> array:
+        metodo = CalculadoraGeometrica.calcular_distancia_real
+        return array("d", map(metodo, distancia1, distancia2, separacao_angular))
+
+
+class MotorNumpy(Motor):
+    """Operações vetorizadas do NumPy (com broadcasting)"""
+    nome = "numpy"
+    difusao = True
+
+    @staticmethod
+    def disponivel() -> bool:
+        return importlib.util.find_spec("numpy") is not None
+
+    def distancia_paralaxe(self, paralaxe_mas):
+        paralaxe_mas = np.asarray(paralaxe_mas, dtype=np.float64)
+        positiva = paralaxe_mas > 0
+        return np.where(positiva, 1000.0 / np.where(positiva, paralaxe_mas, 1.0), 0.0)
+
+    def separacao_angular(self, alfa1, delta1, alfa2, delta2):
+        cos_theta = (np.sin(delta1) * np.sin(delta2) +
+                     np.cos(delta1) * np.cos(delta2) * np.cos(np.subtract(alfa1, alfa2)))
+        return np.arccos(np.clip(cos_theta, -1.0, 1.0))
+
+    def distancia_real(self, distancia1, distancia2, separacao_angular):
+        distancia1 = np.asarray(distancia1, dtype=np.float64)
+        distancia2 = np.asarray(distancia2, dtype=np.float64)
+        quadrado = (distancia1 ** 2 + distancia2 ** 2 -
+                    2.0 * distancia1 * distancia2 * np.cos(separacao_angular))
+        # Arredondamento pode gerar valores levemente negativos para estrelas coincidentes
+        return np.sqrt(np.maximum(quadrado, 0.0))
+
+
+def _compilar_nucleos_jit():
+    """Compilar os laços com numba (só chamado se o pacote estiver instalado)"""
+    import numba
+
+    @numba.njit(parallel=True, cache=True)
+    def distancia_paralaxe(paralaxe, saida):
+        for k in numba.prange(paralaxe.shape[0]):
+            saida[k] = 1000.0 / paralaxe[k] if paralaxe[k] > 0.0 else 0.0
+
+    @numba.njit(parallel=True, cache=True)
+    def separacao_angular(alfa1, delta1, alfa2, delta2, saida):
+        for k in numba.prange(alfa1.shape[0]):
+            cos_theta = (math.sin(delta1[k]) * math.sin(delta2[k]) +
+                         math.cos(delta1[k]) * math.cos(delta2[k]) * math.cos(alfa1[k] - alfa2[k]))
+            saida[k] = math.acos(max(-1.0, min(1.0, cos_theta)))
+
+    @numba.njit(parallel=True, cache=True)
+    def distancia_real(distancia1, distancia2, separacao, saida):
+        for k in numba.prange(distancia1.shape[0]):
+            d1, d2 = distancia1[k], distancia2[k]
+            quadrado = d1 * d1 + d2 * d2 - 2.0 * d1 * d2 * math.cos(separacao[k])
+            saida[k] = math.sqrt(max(quadrado, 0.0))
+
+    return distancia_paralaxe, separacao_angular, distancia_real
+
+
+class MotorJit(Motor):
+    """Laços compilados pelo numba (paralelos, sem arrays temporários)"""
+    nome = "jit"
+
+    @staticmethod
+    def disponivel() -> bool:
+        return (importlib.util.find_spec("numba") is not None and
+                importlib.util.find_spec("numpy") is not None)
+
+    def __init__(self):
+        super().__init__()
+        self._paralaxe, self._separacao, self._distancia_real = _compilar_nucleos_jit()
+
+    @staticmethod
+    def _entradas(*colunas):
+        return [np.ascontiguousarray(c, dtype=np.float64) for c in colunas]
+
+    def distancia_paralaxe(self, paralaxe_mas):
+        paralaxe, = self._entradas(paralaxe_mas)
+        saida = np.empty_like(paralaxe)
+        self._paralaxe(paralaxe, saida)
+        return saida
+
+    def separacao_angular(self, alfa1, delta1, alfa2, delta2):
+        colunas = self._entradas(alfa1, delta1, alfa2, delta2)
+        saida = np.empty_like(colunas[0])
+        self._separacao(*colunas, saida)
+        return saida
+
+    def distancia_real(self, distancia1, distancia2, separacao_angular):
+        colunas = self._entradas(distancia1, distancia2, separacao_angular)
+        saida = np.empty_like(colunas[0])
+        self._distancia_real(*colunas, saida)
+        return saida
+
+
+MOTORES = {classe.nome: classe for classe in (MotorPython, MotorNumpy, MotorJit)}
+
+_instancias: Dict[str, Motor] = {}
+_atual = None
+
+
+def motores_disponiveis() -> List[str]:
+    """Nomes dos motores cujas dependências estão instaladas"""
+    return [nome for nome, classe in MOTORES.items() if classe.disponivel()]
+
+
+def obter_motor(nome: str) -> Motor:
+    """Instância (única) do motor pedido; ValueError se desconhecido ou indisponível"""
+    if nome not in MOTORES:
+        raise ValueError(f"Motor desconhecido: {nome} (use {', '.join(MOTORES)})")
+    if not MOTORES[nome].disponivel():
+        raise ValueError(f"Motor {nome} indisponível: dependência não instalada")
+    if nome not in _instancias:
+        _instancias[nome] = MOTORES[nome]()
+    return _instancias[nome]
+
+
+def selecionar_motor(nome: str) -> Motor:
+    """Trocar o motor usado pelos cálculos em lote de colunar.py"""
+    global _atual
+    _atual = obter_motor(nome)
+    return _atual
+
+
+def motor_atual() -> Motor:
+    """
+    Motor em uso: o escolhido com selecionar_motor, senão CALCULADORA_MOTOR,
+    senão NumPy (os caminhos em lote já eram vetorizados) ou, sem NumPy, Python
+    """
+    if _atual is None:
+        selecionar_motor(MOTOR_AMBIENTE or ("numpy" if MotorNumpy.disponivel() else "python"))
+    return _atual
+
+
+@contextmanager
+def usando_motor(nome: str) -> Iterator[Motor]:
+    """Usar outro motor dentro de um bloco 'with' e depois voltar ao anterior"""
+    global _atual
+    anterior = _atual
+    try:
+        yield selecionar_motor(nome)
+    finally:
+        _atual = anterior
+
+
+def relatorio_motor() -> str:
+    return motor_atual().relatorio()
+
+
+def executar(nucleo: str, *colunas):
+    """
+    Rodar um núcleo no motor atual, com a medição de tempo
+
+    Para motores sem broadcasting as colunas são combinadas e achatadas
+    aqui e o resultado volta com a forma combinada.
+    """
+    motor = motor_atual()
+    inicio = time.perf_counter()
+    if motor.difusao:
+        saida = getattr(motor, nucleo)(*colunas)
+        elementos = int(np.size(saida))
+    else:
+        colunas = np.broadcast_arrays(*[np.asarray(c, dtype=np.float64) for c in colunas])
+        forma = colunas[0].shape
+        planas = [c.ravel() for c in colunas]
+        if not isinstance(motor, MotorJit):
+            planas = [c.tolist() for c in planas]
+        saida = np.asarray(getattr(motor, nucleo)(*planas), dtype=np.float64).reshape(forma)
+        elementos = saida.size
+    motor.registrar(nucleo, elementos, time.perf_counter() - inicio)
+    return saida
+
+
+def teste_motores(n_vazao: int = 1_000_000):
+    """Mesma bateria de conformidade para cada motor disponível, e vazão de cada um"""
+    print("=" * 60)
+    print("TESTE: Motores de Cálculo")
+    print("=" * 60)
+
+    # O registro usado por colunar.py (este arquivo rodado como script é outro módulo)
+    import motores
+    from colunar import (CatalogoColunar, calcular_distancia_paralaxe_lote,
+                         calcular_separacao_angular_lote, calcular_distancia_real_lote)
+
+    disponiveis = motores_disponiveis()
+    print(f"\nDisponíveis: {', '.join(disponiveis)} "
+          f"(ausentes: {', '.join(sorted(set(MOTORES) - set(disponiveis))) or 'nenhum'})")
+
+    calc = CalculadoraGeometrica
+    polo = math.pi / 2
+    # (α₁, δ₁, α₂, δ₂) incluindo estrelas coincidentes, antípodas e polos
+    angulos = [
+        (1.0, 0.3, 1.0, 0.3),
+        (0.0, 0.0, math.pi, 0.0),
+        (0.2, polo, 4.0, -polo),
+        (0.5, polo, 2.5, polo),
+        (6.0, -0.7, 0.1, -0.7),
+        (1e-9, 0.0, 0.0, 0.0),
+    ]
+    paralaxes = [379.21, 4.51, 0.0, -1.2, 1e-6, 768.5]
+    gerador = np.random.default_rng(38)
+    aleatorios = [gerador.uniform(0, 2 * math.pi, 500), np.arcsin(gerador.uniform(-1, 1, 500)),
+                  gerador.uniform(0, 2 * math.pi, 500), np.arcsin(gerador.uniform(-1, 1, 500))]
+    paralaxe_aleatoria = gerador.uniform(-5, 800, 500)
+
+    # Valores esperados a partir dos métodos escalares de calculos.py
+    colunas_angulos = [np.array(c) for c in zip(*angulos)]
+    theta_esperado = np.array([calc.calcular_separacao_angular(*a) for a in angulos])
+    d_esperado = np.array([calc.calcular_distancia_paralaxe(p) for p in paralaxes])
+    theta_aleatorio = np.array([calc.calcular_separacao_angular(*a) for a in zip(*aleatorios)])
+    d_aleatorio = np.array([calc.calcular_distancia_paralaxe(p) for p in paralaxe_aleatoria])
+    real_esperado = np.array([calc.calcular_distancia_real(a, b, t) for a, b, t in
+                              zip(d_aleatorio, d_aleatorio[::-1], theta_aleatorio)])
+
+    catalogo = CatalogoColunar.de_registros()
+    i, j = np.triu_indices(len(catalogo), 1)
+    pares_esperados = [(r.separacao_angular_rad, r.distancia_real_parsecs) for r in (
+        calc.calcular_distancia_entre_estrelas(catalogo.estrela(a), catalogo.estrela(b))
+        for a, b in zip(i, j))]
+
+    def conferir(obtido, esperado, rotulo, tolerancia=1e-12):
+        obtido = np.asarray(obtido)
+        assert obtido.shape == np.shape(esperado), (rotulo, obtido.shape)
+        assert np.allclose(obtido, esperado, rtol=tolerancia, atol=tolerancia), rotulo
+
+    for nome in disponiveis:
+        with motores.usando_motor(nome) as motor:
+            motor.zerar()
+            # Casos de borda: acos limitado a [-1, 1], paralaxes <= 0 e sqrt de ~0
+            conferir(calcular_separacao_angular_lote(*colunas_angulos), theta_esperado, "bordas θ")
+            conferir(calcular_distancia_paralaxe_lote(paralaxes), d_esperado, "bordas d")
+            assert calcular_separacao_angular_lote(*colunas_angulos)[0] == 0.0
+            coincidentes = calcular_distancia_real_lote([7.3, 1e6], [7.3, 1e6], [0.0, 0.0])
+            assert np.all(coincidentes >= 0.0) and np.all(coincidentes < 1e-6), coincidentes
+            # Lotes aleatórios, broadcasting 2-D e pares do catálogo
+            conferir(calcular_separacao_angular_lote(*aleatorios), theta_aleatorio, "θ")
+            conferir(calcular_distancia_paralaxe_lote(paralaxe_aleatoria), d_aleatorio, "d")
+            conferir(calcular_distancia_real_lote(d_aleatorio, d_aleatorio[::-1], theta_aleatorio),
+                     real_esperado, "D", 1e-9)
+            grade = calcular_separacao_angular_lote(aleatorios[0][:, None], aleatorios[1][:, None],
+                                                    aleatorios[2][None, :8], aleatorios[3][None, :8])
+            conferir(grade[:8].diagonal(), theta_aleatorio[:8], "θ 2-D")
+            theta, distancia = catalogo.pares(i, j)
+            conferir(np.column_stack([theta, distancia]), pares_esperados, "pares", 1e-9)
+            print(f"  {motor.relatorio()}")
+    print("Conformidade: todos os motores disponíveis iguais a CalculadoraGeometrica")
+
+    # Vazão de cada motor (Python puro só com uma fração do lote)
+    print()
+    for nome in disponiveis:
+        n = n_vazao if nome != "python" else n_vazao // 20
+        colunas = [c[:n] for c in (gerador.uniform(0, 2 * math.pi, n_vazao),
+                                   np.arcsin(gerador.uniform(-1, 1, n_vazao)),
+                                   gerador.uniform(0, 2 * math.pi, n_vazao),
+                                   np.arcsin(gerador.uniform(-1, 1, n_vazao)))]
+        with motores.usando_motor(nome) as motor:
+            calcular_separacao_angular_lote(*[c[:10] for c in colunas])   # compilação do JIT
+            motor.zerar()
+            calcular_separacao_angular_lote(*colunas)
+            print(f"  {nome:7s}: separação angular {n / motor.segundos['separacao_angular'] / 1e6:8.2f} M/s"
+                  f" ({n:,} pares)")
+
+    print("\n✅ Teste concluído com sucesso!")
+
+
+if __name__ == "__main__":
+    teste_motores()
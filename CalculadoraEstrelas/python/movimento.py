@@ -0,0 +1,198 @@
+"""
+Calculadora Geométrica de Distância Entre Estrelas
+Propagação de Época por Movimento Próprio e Velocidade Radial
+
+Autor: Luiz Tiago Wilcke
+Data: 2025
+"""
+
+from dataclasses import dataclass
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+from calculos import RADIANOS_POR_MAS
+from colunar import CatalogoColunar
+
+# 1 km/s em parsecs por ano
+KMS_PARA_PC_ANO = 1.0227121650537077e-6
+
+# Época das coordenadas do catálogo (anos)
+EPOCA_CATALOGO = 2000.0
+
+# Orçamento padrão para os arrays (pares × épocas × 3) de cada bloco
+MEMORIA_PADRAO_MB = 256.0
+
+
+def estados(catalogo: CatalogoColunar, indices=None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Posição (pc) e velocidade (pc/ano) cartesianas de cada estrela, Sol na origem
+
+    v = vr·r̂ + d·(μα*·êα + μδ·êδ), movimento retilíneo uniforme.
+    Estrelas sem paralaxe positiva ficam com posição e velocidade NaN.
+    """
+    indices = slice(None) if indices is None else np.asarray(indices)
+    alfa = catalogo.alfa_rad[indices]
+    delta = catalogo.delta_rad[indices]
+    distancia = catalogo.distancia_parsecs[indices]
+    sin_a, cos_a = np.sin(alfa), np.cos(alfa)
+    sin_d, cos_d = np.sin(delta), np.cos(delta)
+
+    radial = np.stack([cos_d * cos_a, cos_d * sin_a, sin_d], axis=-1)
+    e_alfa = np.stack([-sin_a, cos_a, np.zeros_like(alfa)], axis=-1)
+    e_delta = np.stack([-sin_d * cos_a, -sin_d * sin_a, cos_d], axis=-1)
+
+    mu_alfa = catalogo.movimento_proprio_ar_mas_ano[indices] * RADIANOS_POR_MAS
+    mu_delta = catalogo.movimento_proprio_dec_mas_ano[indices] * RADIANOS_POR_MAS
+    vr = catalogo.velocidade_radial_kms[indices] * KMS_PARA_PC_ANO
+
+    posicao = distancia[:, None] * radial
+    velocidade = (vr[:, None] * radial +
+                  distancia[:, None] * (mu_alfa[:, None] * e_alfa + mu_delta[:, None] * e_delta))
+    invalidas = catalogo.paralaxe_mas[indices] <= 0
+    posicao[invalidas] = np.nan
+    velocidade[invalidas] = np.nan
+    return posicao, velocidade
+
+
+def posicoes_em(catalogo: CatalogoColunar, epocas, indices=None,
+                epoca_referencia: float = EPOCA_CATALOGO) -> np.ndarray:
+    """Posições (N, T, 3) das estrelas em cada época (anos)"""
+    posicao, velocidade = estados(catalogo, indices)
+    t = np.asarray(epocas, dtype=np.float64) - epoca_referencia
+    return posicao[:, None, :] + velocidade[:, None, :] * t[None, :, None]
+
+
+def _pares_por_bloco(num_epocas: int, memoria_mb: float) -> int:
+    # Δr(t) em float64 (3 componentes) mais a distância e temporários
+    return max(1, int(memoria_mb * 1024 * 1024 // (num_epocas * 8 * 6)))
+
+
+def blocos_distancias_no_tempo(catalogo: CatalogoColunar, i, j, epocas,
+                               epoca_referencia: float = EPOCA_CATALOGO,
+                               memoria_mb: float = MEMORIA_PADRAO_MB
+                               ) -> Iterator[Tuple[slice, np.ndarray]]:
+    """
+    Séries distância × tempo em blocos de pares: (fatia dos pares, (n, T))
+
+    Δr(t) = Δr₀ + Δv·t é avaliado por broadcast (pares × épocas) em blocos
+    dimensionados por memoria_mb. Em t = 0 a distância coincide com a de
+    calcular_distancia_real.
+    """
+    i, j = np.asarray(i), np.asarray(j)
+    t = np.asarray(epocas, dtype=np.float64) - epoca_referencia
+    passo = _pares_por_bloco(len(t), memoria_mb)
+    for inicio in range(0, len(i), passo):
+        fatia = slice(inicio, min(inicio + passo, len(i)))
+        ri, vi = estados(catalogo, i[fatia])
+        rj, vj = estados(catalogo, j[fatia])
+        dr, dv = rj - ri, vj - vi
+        relativa = dr[:, None, :] + dv[:, None, :] * t[None, :, None]
+        yield fatia, np.sqrt(np.einsum("ptk,ptk->pt", relativa, relativa))
+
+
+def distancias_no_tempo(catalogo: CatalogoColunar, i, j, epocas,
+                        epoca_referencia: float = EPOCA_CATALOGO,
+                        memoria_mb: float = MEMORIA_PADRAO_MB) -> np.ndarray:
+    """Distância (pc) entre as estrelas de cada par em cada época: (pares, T)"""
+    resultado = np.empty((len(i), len(epocas)))
+    for fatia, bloco in blocos_distancias_no_tempo(catalogo, i, j, epocas,
+                                                   epoca_referencia, memoria_mb):
+        resultado[fatia] = bloco
+    return resultado
+
+
+@dataclass
+class AproximacaoMaxima:
+    """Época e distância da máxima aproximação de cada par"""
+    epoca: np.ndarray
+    distancia_pc: np.ndarray
+    velocidade_relativa_kms: np.ndarray
+
+
+def aproximacao_maxima_relativa(dr: np.ndarray, dv: np.ndarray,
+                                epoca_referencia: float = EPOCA_CATALOGO,
+                                intervalo: Optional[Tuple[float, float]] = None
+                                ) -> AproximacaoMaxima:
+    """
+    Mínimo de |Δr + Δv·t| de forma analítica: t* = -Δr·Δv / |Δv|²
+
+    Sem amostragem densa no tempo. Com 'intervalo' (épocas inicial e final),
+    t* é limitado a ele. Pares sem movimento relativo ficam na época de
+    referência.
+    """
+    v2 = np.einsum("pk,pk->p", dv, dv)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t = np.where(v2 > 0, -np.einsum("pk,pk->p", dr, dv) / v2, 0.0)
+    if intervalo is not None:
+        t = np.clip(t, intervalo[0] - epoca_referencia, intervalo[1] - epoca_referencia)
+    minimo = dr + dv * t[:, None]
+    return AproximacaoMaxima(
+        epoca=epoca_referencia + t,
+        distancia_pc=np.sqrt(np.einsum("pk,pk->p", minimo, minimo)),
+        velocidade_relativa_kms=np.sqrt(v2) / KMS_PARA_PC_ANO,
+    )
+
+
+def aproximacao_maxima(catalogo: CatalogoColunar, i, j,
+                       epoca_referencia: float = EPOCA_CATALOGO,
+                       intervalo: Optional[Tuple[float, float]] = None) -> AproximacaoMaxima:
+    """Máxima aproximação entre as estrelas de cada par (i[k], j[k])"""
+    ri, vi = estados(catalogo, i)
+    rj, vj = estados(catalogo, j)
+    return aproximacao_maxima_relativa(rj - ri, vj - vi, epoca_referencia, intervalo)
+
+
+def aproximacao_maxima_do_sol(catalogo: CatalogoColunar, indices=None,
+                              epoca_referencia: float = EPOCA_CATALOGO,
+                              intervalo: Optional[Tuple[float, float]] = None
+                              ) -> AproximacaoMaxima:
+    """Máxima aproximação de cada estrela ao Sol"""
+    posicao, velocidade = estados(catalogo, indices)
+    return aproximacao_maxima_relativa(posicao, velocidade, epoca_referencia, intervalo)
+
+
+def demonstracao_movimento():
+    """Exemplo com Alpha Centauri A e Sirius (movimentos aproximados)"""
+    print("=" * 60)
+    print("DEMONSTRAÇÃO: Evolução Temporal das Distâncias")
+    print("=" * 60)
+
+    catalogo = CatalogoColunar.de_registros()
+    # Movimentos próprios (mas/ano) e velocidades radiais (km/s) aproximados
+    for nome, mp_ar, mp_dec, vr in [("Alpha Centauri A", -3679.25, 473.67, -21.4),
+                                    ("Proxima Centauri", -3781.74, 769.47, -22.4),
+                                    ("Sirius", -546.01, -1223.07, -5.5)]:
+        k = catalogo.nomes.index(nome)
+        catalogo.movimento_proprio_ar_mas_ano[k] = mp_ar
+        catalogo.movimento_proprio_dec_mas_ano[k] = mp_dec
+        catalogo.velocidade_radial_kms[k] = vr
+
+    alfa_cen = catalogo.nomes.index("Alpha Centauri A")
+    sirius = catalogo.nomes.index("Sirius")
+    sol = aproximacao_maxima_do_sol(catalogo, [alfa_cen, sirius])
+    for k, nome in enumerate(["Alpha Centauri A", "Sirius"]):
+        print(f"\n{nome}: máxima aproximação ao Sol em {sol.epoca[k]:,.0f} "
+              f"a {sol.distancia_pc[k]:.3f} pc")
+
+    epocas = np.linspace(-50000, 50000, 11) + EPOCA_CATALOGO
+    serie = distancias_no_tempo(catalogo, [alfa_cen], [sirius], epocas)[0]
+    print("\nAlpha Centauri A ↔ Sirius:")
+    for epoca, distancia in zip(epocas, serie):
+        print(f"  {epoca:>9,.0f}: {distancia:7.3f} pc")
+    par = aproximacao_maxima(catalogo, [alfa_cen], [sirius])
+    print(f"  mínimo em {par.epoca[0]:,.0f}: {par.distancia_pc[0]:.3f} pc")
+
+    # Verificação: o mínimo analítico coincide com uma amostragem densa
+    densas = np.linspace(par.epoca[0] - 1000, par.epoca[0] + 1000, 20001)
+    minimo_denso = distancias_no_tempo(catalogo, [alfa_cen], [sirius], densas).min()
+    assert abs(minimo_denso - par.distancia_pc[0]) < 1e-6
+    # Na época do catálogo, a mesma distância de calcular_distancia_real
+    _, distancia_real = catalogo.pares(np.array([alfa_cen]), np.array([sirius]))
+    assert np.isclose(distancias_no_tempo(catalogo, [alfa_cen], [sirius], [EPOCA_CATALOGO])[0, 0],
+                      distancia_real[0])
+    print("\n✅ Demonstração concluída!")
+
+
+if __name__ == "__main__":
+    demonstracao_movimento()
@@ -0,0 +1,217 @@
+"""
+Calculadora Geométrica de Distância Entre Estrelas
+Céu Visto de Outra Estrela (mudança de origem do catálogo)
+
+Autor: Luiz Tiago Wilcke
+Data: 2025
+"""
+
+import math
+from typing import Union
+
+import numpy as np
+
+from calculos import RADIANOS_POR_MAS
+from catalogo import normalizar_nome
+from colunar import CatalogoColunar
+from ladrilhos import CacheLRU
+from movimento import estados, KMS_PARA_PC_ANO
+from quadros import vetores_para_esfericas
+
+# Observadores mantidos em cache (cada um é um catálogo completo)
+CAPACIDADE_OBSERVADORES = 8
+
+NOME_SOL = "Sol"
+
+
+def catalogo_visto_de(catalogo: CatalogoColunar, observador: int,
+                      incluir_sol: bool = True) -> CatalogoColunar:
+    """
+    O catálogo como seria medido de outra estrela, em uma passagem vetorizada
+
+    As posições e velocidades cartesianas (movimento.estados) são deslocadas
+    para a estrela 'observador' e convertidas de volta em α, δ, paralaxe
+    (1000 / distância), movimentos próprios e velocidade radial aparentes, com
+    os eixos equatoriais de sempre. O resultado é um CatalogoColunar comum:
+    calcular_distancia_entre_estrelas, criar_mapa_celeste,
+    criar_visualizacao_3d e os motores em lote passam a usar o observador
+    como origem sem nenhuma mudança.
+
+    - Estrelas sem paralaxe positiva (distância desconhecida) ficam como
+      estão: tratadas como muito distantes, sua direção não muda.
+    - O próprio observador fica com paralaxe 0 (distância 0).
+    - incluir_sol acrescenta o Sol como última linha.
+    """
+    if not -len(catalogo) <= observador < len(catalogo):
+        raise IndexError(observador)
+    observador = int(observador) % len(catalogo)
+    if not catalogo.paralaxe_mas[observador] > 0:
+        raise ValueError(f"A estrela {observador} não tem paralaxe positiva: posição desconhecida")
+    posicao, velocidade = estados(catalogo)
+    if incluir_sol:
+        posicao = np.vstack([posicao, np.zeros((1, 3))])
+        velocidade = np.vstack([velocidade, np.zeros((1, 3))])
+    posicao -= posicao[observador].copy()
+    velocidade -= velocidade[observador].copy()
+
+    distancia = np.linalg.norm(posicao, axis=1)
+    conhecidas = np.isfinite(distancia) & (distancia > 0)
+    alfa, delta = vetores_para_esfericas(posicao[conhecidas])
+    sin_a, cos_a = np.sin(alfa), np.cos(alfa)
+    sin_d, cos_d = np.sin(delta), np.cos(delta)
+    v = velocidade[conhecidas]
+    d = distancia[conhecidas]
+    # Componentes da velocidade relativa na base (r̂, êα, êδ) do novo observador
+    radial = (v[:, 0] * cos_a + v[:, 1] * sin_a) * cos_d + v[:, 2] * sin_d
+    ao_longo_alfa = -v[:, 0] * sin_a + v[:, 1] * cos_a
+    ao_longo_delta = -(v[:, 0] * cos_a + v[:, 1] * sin_a) * sin_d + v[:, 2] * cos_d
+
+    colunas = {coluna: getattr(catalogo, coluna).copy() for coluna in CatalogoColunar.COLUNAS}
+    nomes = list(catalogo.nomes)
+    if incluir_sol:
+        # Sol: posição e velocidade já estão em 'posicao'/'velocidade'; o resto é zero
+        colunas = {coluna: np.append(valores, 0.0) for coluna, valores in colunas.items()}
+        nomes.append(NOME_SOL)
+    colunas["alfa_rad"][conhecidas] = alfa
+    colunas["delta_rad"][conhecidas] = delta
+    colunas["paralaxe_mas"][conhecidas] = 1000.0 / d
+    colunas["paralaxe_mas"][observador] = 0.0
+    colunas["movimento_proprio_ar_mas_ano"][conhecidas] = ao_longo_alfa / d / RADIANOS_POR_MAS
+    colunas["movimento_proprio_dec_mas_ano"][conhecidas] = ao_longo_delta / d / RADIANOS_POR_MAS
+    colunas["velocidade_radial_kms"][conhecidas] = radial / KMS_PARA_PC_ANO
+    return CatalogoColunar(nomes=nomes, **colunas)
+
+
+class Observadores:
+    """
+    Catálogos vistos de várias estrelas, com os mais recentes em cache
+
+    visto_de aceita o índice ou o nome (sem diferenciar maiúsculas) do
+    observador; o nome do Sol devolve o próprio catálogo.
+    """
+
+    def __init__(self, catalogo: CatalogoColunar, capacidade: int = CAPACIDADE_OBSERVADORES,
+                 incluir_sol: bool = True):
+        self.catalogo = catalogo
+        self.incluir_sol = incluir_sol
+        self.cache = CacheLRU(capacidade)
+        self._indices = {}
+        for indice, nome in enumerate(catalogo.nomes):
+            self._indices.setdefault(normalizar_nome(nome), indice)
+
+    def indice(self, observador: Union[int, str]) -> int:
+        if isinstance(observador, str):
+            try:
+                return self._indices[normalizar_nome(observador)]
+            except KeyError:
+                raise ValueError(f"Estrela não encontrada no catálogo: {observador}") from None
+        if not -len(self.catalogo) <= observador < len(self.catalogo):
+            raise IndexError(observador)
+        return int(observador) % len(self.catalogo)
+
+    def visto_de(self, observador: Union[int, str]) -> CatalogoColunar:
+        if isinstance(observador, str) and normalizar_nome(observador) == normalizar_nome(NOME_SOL) \
+                and normalizar_nome(NOME_SOL) not in self._indices:
+            return self.catalogo
+        indice = self.indice(observador)
+        return self.cache.obter(indice, lambda: catalogo_visto_de(self.catalogo, indice, self.incluir_sol))
+
+
+# ============================================================================
+# Testes
+# ============================================================================
+
+def teste_observadores():
+    """Invariantes geométricos, ida e volta, cache e figuras a partir de Proxima Centauri"""
+    print("=" * 60)
+    print("TESTE: Céu Visto de Outra Estrela")
+    print("=" * 60)
+
+    import time
+    from calculos import CalculadoraGeometrica
+    from paridade import catalogo_sintetico
+
+    # Distância real (Sol) entre o observador e cada estrela = distância vista do observador
+    catalogo = CatalogoColunar.de_registros()
+    observadores = Observadores(catalogo)
+    proxima = observadores.indice("proxima centauri")
+    visto = observadores.visto_de("Proxima Centauri")
+    g = CalculadoraGeometrica
+    for k in range(len(catalogo)):
+        if k == proxima:
+            continue
+        esperado = g.calcular_distancia_entre_estrelas(catalogo.estrela(proxima), catalogo.estrela(k))
+        assert math.isclose(visto.distancia_parsecs[k], esperado.distancia_real_parsecs, rel_tol=1e-9)
+    # Distâncias entre pares não dependem do observador
+    i, j = np.triu_indices(len(catalogo), 1)
+    validos = (i != proxima) & (j != proxima)
+    _, antes = catalogo.pares(i[validos], j[validos])
+    _, depois = visto.pares(i[validos], j[validos])
+    assert np.allclose(antes, depois, rtol=1e-9)
+    # O Sol visto de Proxima: na direção oposta, à mesma distância
+    sol = visto.estrela(len(catalogo))
+    assert sol.nome == NOME_SOL
+    oposto = -catalogo.vetores_unitarios[proxima]
+    assert np.allclose(visto.vetores_unitarios[-1], oposto)
+    assert math.isclose(sol.distancia_parsecs, catalogo.distancia_parsecs[proxima], rel_tol=1e-12)
+    print(f"\nDe Proxima Centauri: Sol a {sol.distancia_parsecs:.3f} pc em "
+          f"α = {sol.ascensao_reta}, δ = {sol.declinacao}; "
+          f"Alpha Centauri A a {visto.distancia_parsecs[observadores.indice('Alpha Centauri A')]:.3f} pc")
+
+    # Ida e volta: visto do Sol a partir do catálogo visto de uma estrela
+    sintetico = catalogo_sintetico(200_000)
+    gerador = np.random.default_rng(48)
+    sintetico.movimento_proprio_ar_mas_ano = gerador.normal(0, 50, len(sintetico))
+    sintetico.movimento_proprio_dec_mas_ano = gerador.normal(0, 50, len(sintetico))
+    sintetico.velocidade_radial_kms = gerador.normal(0, 30, len(sintetico))
+    observador = int(np.flatnonzero(sintetico.paralaxe_mas > 0)[7])
+    inicio = time.perf_counter()
+    outro = catalogo_visto_de(sintetico, observador)
+    segundos = time.perf_counter() - inicio
+    volta = catalogo_visto_de(outro, len(sintetico), incluir_sol=False)
+    validas = sintetico.paralaxe_mas > 0
+    validas[observador] = False
+    for coluna in CatalogoColunar.COLUNAS:
+        assert np.allclose(getattr(volta, coluna)[:len(sintetico)][validas],
+                           getattr(sintetico, coluna)[validas], rtol=1e-7, atol=1e-9), coluna
+    assert np.array_equal(outro.alfa_rad[:len(sintetico)][~validas & (np.arange(len(sintetico)) != observador)],
+                          sintetico.alfa_rad[~validas & (np.arange(len(sintetico)) != observador)])
+    # Índice negativo conta do fim, como nas listas
+    ultimo = int(np.flatnonzero(catalogo.paralaxe_mas > 0)[-1]) - len(catalogo)
+    assert np.array_equal(catalogo_visto_de(catalogo, ultimo).paralaxe_mas,
+                          catalogo_visto_de(catalogo, ultimo + len(catalogo)).paralaxe_mas)
+    print(f"{len(sintetico)} estrelas re-centradas em {segundos * 1e3:.0f} ms; "
+          f"ida e volta reproduz α, δ, paralaxe, movimentos e velocidade radial")
+
+    # Cache dos observadores recentes
+    observadores = Observadores(sintetico, capacidade=2)
+    assert observadores.visto_de(observador) is observadores.visto_de(observador)
+    observadores.visto_de(observador + 1)
+    observadores.visto_de(observador + 2)
+    observadores.visto_de(observador)
+    assert (observadores.cache.acertos, observadores.cache.faltas) == (1, 4)
+    print(f"Cache: {observadores.cache.acertos} acerto, {observadores.cache.faltas} faltas")
+
+    # As figuras de sempre, com o observador como origem
+    import matplotlib
+    matplotlib.use("Agg")
+    from visualizacao import VisualizadorEstelar
+    estrela1, estrela2 = visto.estrela(len(catalogo)), visto.estrela(0)
+    resultado = g.calcular_distancia_entre_estrelas(estrela1, estrela2)
+    visualizador = VisualizadorEstelar()
+    mapa = visualizador.criar_mapa_celeste(estrela1, estrela2, resultado, observador="Proxima Centauri")
+    figura_3d = visualizador.criar_visualizacao_3d(estrela1, estrela2, resultado,
+                                                   observador="Proxima Centauri")
+    diagrama = visualizador.criar_diagrama_geometrico(resultado, observador="Proxima Centauri")
+    assert "Triângulo Proxima Centauri-" in diagrama.axes[0].get_title()
+    assert any(texto.get_text() == "Proxima Centauri" for texto in diagrama.axes[0].texts)
+    assert "Proxima Centauri" in mapa.axes[0].get_title()
+    assert any(texto.get_text() == "Proxima Centauri"
+               for texto in figura_3d.axes[0].get_legend().get_texts())
+    print(f"Mapa celeste, 3D e diagrama de Proxima Centauri: Sol ↔ Sirius = {resultado.distancia_real_parsecs:.3f} pc")
+
+    print("\n✅ Teste concluído com sucesso!")
+
+
+if __name__ == "__main__":
+    teste_observadores()
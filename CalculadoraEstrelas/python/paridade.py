@@ -0,0 +1,262 @@
+"""
+Calculadora Geométrica de Distância Entre Estrelas
+Paridade e Vazão: calculos.py × geometria.hpp
+
+Autor: Luiz Tiago Wilcke
+Data: 2025
+"""
+
+import math
+import os
+import re
+import subprocess
+import tempfile
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import motores
+from colunar import CatalogoColunar, TIPO_REGISTRO_LOTE
+from espacial import blocos_de_pares
+
+DIRETORIO_CPP = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "cpp")
+EXECUTAVEL_LOTE = os.path.join(DIRETORIO_CPP, "calculadora_lote")
+
+# Erro relativo admitido em cada operação, em unidades de arredondamento
+# (as funções vetoriais da libm usadas pelo C++ erram até ~4 ulp)
+EPSILON = 16 * np.finfo(np.float64).eps
+
+
+def tolerancia_separacao(theta: np.ndarray) -> np.ndarray:
+    """
+    Erro admissível de θ = acos(c): um erro ε em c vira ε / sin θ, limitado
+    por √ε perto de 0 e de π (onde o limite de acos a [-1, 1] atua)
+    """
+    return EPSILON + EPSILON / np.maximum(np.sin(theta), math.sqrt(EPSILON))
+
+
+def tolerancia_distancia(d1: np.ndarray, d2: np.ndarray, theta: np.ndarray,
+                         distancia: np.ndarray) -> np.ndarray:
+    """
+    Erro admissível de D = √(d₁² + d₂² - 2·d₁·d₂·cos θ): o radicando erra
+    até ε·(d₁ + d₂)² mais o efeito do erro de θ; para D ≈ 0 a raiz
+    amplifica o erro (√ em vez de divisão por 2D)
+    """
+    radicando = EPSILON * (d1 + d2) ** 2 + 2.0 * d1 * d2 * np.sin(theta) * tolerancia_separacao(theta)
+    return EPSILON * distancia + np.minimum(radicando / np.maximum(2.0 * distancia, 1e-300),
+                                            np.sqrt(radicando))
+
+
+def construir_lote(openmp: bool = False) -> str:
+    """Compilar calculadora_lote (make lote) se preciso e devolver o caminho"""
+    comando = ["make", "-C", DIRETORIO_CPP, "--quiet", "lote"] + (["OPENMP=1"] if openmp else [])
+    try:
+        subprocess.run(comando, check=True, capture_output=True, text=True)
+    except FileNotFoundError:
+        raise RuntimeError("make não encontrado: instale build-essential") from None
+    except subprocess.CalledProcessError as erro:
+        raise RuntimeError(f"Falha ao compilar calculadora_lote:\n{erro.stderr}") from None
+    return EXECUTAVEL_LOTE
+
+
+# ============================================================================
+# Catálogos de teste
+# ============================================================================
+
+def catalogo_bordas() -> CatalogoColunar:
+    """Estrelas escolhidas para exercitar os casos de borda das fórmulas"""
+    polo = math.pi / 2
+    estrelas = [
+        # nome,                  α,                     δ,            paralaxe (mas)
+        ("referência",           1.0,                   0.3,          100.0),
+        ("idêntica",             1.0,                   0.3,          100.0),    # θ = 0, D = 0
+        ("mesma direção",        1.0,                   0.3,          50.0),     # θ = 0, D = 10 pc
+        ("antípoda",             1.0 + math.pi,         -0.3,         100.0),    # θ = π, D = 20 pc
+        ("polo norte α=0,2",     0.2,                   polo,         10.0),
+        ("polo norte α=4",       4.0,                   polo,         10.0),     # mesmo ponto, outro α
+        ("polo sul",             0.0,                   -polo,        20.0),     # antípoda dos polos norte
+        ("paralaxe zero",        2.0,                   -0.5,         0.0),      # d = 0
+        ("paralaxe negativa",    2.5,                   0.7,          -3.0),     # d = 0
+        ("α = 0",                0.0,                   0.1,          1.0),
+        ("α = 2π - 1 nrad",      2 * math.pi - 1e-9,    0.1,          1.0),      # volta em α
+        ("a 1 mas da ref.",      1.0 + 1e-3 / 3.6e6 * math.pi / 180, 0.3, 100.0),
+        ("muito distante",       3.0,                   -1.2,         1e-4),     # 10 Mpc
+        ("muito próxima",        3.0,                   -1.2,         768.5),
+    ]
+    nomes, alfa, delta, paralaxe = zip(*estrelas)
+    return CatalogoColunar(nomes=list(nomes), alfa_rad=alfa, delta_rad=delta, paralaxe_mas=paralaxe)
+
+
+def catalogo_sintetico(n: int, semente: int = 40) -> CatalogoColunar:
+    """Direções uniformes na esfera, 5% sem paralaxe positiva e alguns pares muito próximos"""
+    gerador = np.random.default_rng(semente)
+    alfa = gerador.uniform(0, 2 * math.pi, n)
+    delta = np.arcsin(gerador.uniform(-1, 1, n))
+    paralaxe = 1000.0 / gerador.uniform(1.0, 5000.0, n)
+    paralaxe[gerador.random(n) < 0.05] = 0.0
+    # Um décimo das estrelas copia a direção de outra, deslocada de alguns mas
+    copias = gerador.choice(n, n // 10, replace=False)
+    alfa[copias[1:]] = alfa[copias[:-1]] + gerador.normal(0, 1e-8, len(copias) - 1)
+    delta[copias[1:]] = delta[copias[:-1]]
+    return CatalogoColunar(nomes=[""] * n, alfa_rad=alfa, delta_rad=delta, paralaxe_mas=paralaxe)
+
+
+# ============================================================================
+# Execução de cada implementação sobre todos os pares (i < j)
+# ============================================================================
+
+def executar_python(catalogo: CatalogoColunar, motor: str, guardar: bool = True
+                    ) -> Optional[Dict[str, np.ndarray]]:
+    """Todos os pares pelo motor pedido de motores.py ('python' é calculos.py)"""
+    # Cópia para que a distância em cache seja calculada por este motor
+    catalogo = catalogo.subconjunto(np.arange(len(catalogo)))
+    partes: List[Tuple[np.ndarray, ...]] = []
+    with motores.usando_motor(motor):
+        for i, j in blocos_de_pares(len(catalogo)):
+            theta, distancia = catalogo.pares(i, j)
+            if guardar:
+                partes.append((i, j, theta, distancia))
+    if not guardar:
+        return None
+    colunas = [np.concatenate(c) for c in zip(*partes)] if partes else [np.empty(0)] * 4
+    return dict(zip(TIPO_REGISTRO_LOTE.names, colunas))
+
+
+def executar_cpp(catalogo: CatalogoColunar, executavel: str, guardar: bool = True,
+                 threads: Optional[int] = None) -> Tuple[Optional[Dict[str, np.ndarray]], float]:
+    """
+    Todos os pares por calculadora_lote; devolve os registros e o tempo de
+    cálculo informado pelo próprio executável (sem leitura nem processo)
+    """
+    with tempfile.TemporaryDirectory(prefix="paridade_") as temporario:
+        entrada = os.path.join(temporario, "catalogo.bin")
+        saida = os.path.join(temporario, "pares.bin")
+        catalogo.salvar_binario(entrada)
+        comando = [executavel, entrada, "--binario", "-o", saida]
+        if not guardar:
+            comando += ["--limite", "0"]     # só os pares coincidentes são escritos
+        if threads:
+            comando += ["--threads", str(threads)]
+        processo = subprocess.run(comando, check=True, capture_output=True, text=True)
+        segundos = float(re.search(r"pares em ([\d.]+) s", processo.stderr).group(1))
+        if not guardar:
+            return None, segundos
+        registros = np.fromfile(saida, dtype=TIPO_REGISTRO_LOTE)
+    return {campo: registros[campo] for campo in TIPO_REGISTRO_LOTE.names}, segundos
+
+
+# ============================================================================
+# Comparação campo a campo
+# ============================================================================
+
+def comparar(referencia: Dict[str, np.ndarray], obtido: Dict[str, np.ndarray],
+             catalogo: CatalogoColunar) -> Dict[str, Tuple[float, float, int]]:
+    """
+    Comparar dois conjuntos de pares campo a campo
+
+    Retorna, para cada campo: (maior erro absoluto, maior erro / tolerância,
+    número de pares fora da tolerância). i e j devem ser idênticos.
+    """
+    for campo in ("i", "j"):
+        if not np.array_equal(referencia[campo], obtido[campo]):
+            raise AssertionError(f"Pares diferentes no campo {campo}")
+    theta = referencia["separacao_rad"]
+    d1 = catalogo.distancia_parsecs[referencia["i"]]
+    d2 = catalogo.distancia_parsecs[referencia["j"]]
+    tolerancias = {
+        "separacao_rad": tolerancia_separacao(theta),
+        "distancia_real_pc": tolerancia_distancia(d1, d2, theta, referencia["distancia_real_pc"]),
+    }
+    resultado = {}
+    for campo, tolerancia in tolerancias.items():
+        erro = np.abs(obtido[campo] - referencia[campo])
+        # Tolerância zero (d₁ = d₂ = 0) só aceita erro zero
+        razao = np.divide(erro, tolerancia, out=np.where(erro > 0, np.inf, 0.0), where=tolerancia > 0)
+        resultado[campo] = (float(erro.max(initial=0.0)), float(razao.max(initial=0.0)),
+                            int(np.count_nonzero(~(razao <= 1.0))))
+    return resultado
+
+
+def verificar_paridade(catalogo: CatalogoColunar, executavel: str, rotulo: str) -> bool:
+    """Cada implementação contra calculos.py sobre todos os pares do catálogo"""
+    referencia = executar_python(catalogo, "python")
+    implementacoes = {nome: (lambda nome=nome: executar_python(catalogo, nome))
+                      for nome in motores.motores_disponiveis() if nome != "python"}
+    implementacoes["c++"] = lambda: executar_cpp(catalogo, executavel)[0]
+    tudo_ok = True
+    print(f"\n{rotulo}: {len(catalogo):,} estrelas, {len(referencia['i']):,} pares")
+    for nome, executar in implementacoes.items():
+        for campo, (erro, razao, fora) in comparar(referencia, executar(), catalogo).items():
+            estado = "ok" if fora == 0 else f"{fora} FORA DA TOLERÂNCIA"
+            print(f"  {nome:6s} {campo:18s} erro máx {erro:9.2e}  ({razao:5.2f} × tolerância) {estado}")
+            tudo_ok &= fora == 0
+    return tudo_ok
+
+
+def tabela_vazao(tamanhos: Sequence[int] = (1_000, 4_000, 16_000), executavel: Optional[str] = None,
+                 pares_python: int = 2_000_000, threads: Optional[int] = None):
+    """
+    Vazão (milhões de pares por segundo) de cada implementação por tamanho
+
+    Os resultados são descartados, para medir só o cálculo; o motor Python
+    puro só roda até 'pares_python' pares.
+    """
+    executavel = executavel or construir_lote()
+    nomes = ["python", *(m for m in motores.motores_disponiveis() if m != "python"), "c++"]
+    print(f"\n{'implementação':14s}" + "".join(f"{f'N={n:,}':>16s}" for n in tamanhos))
+    linhas = {nome: [] for nome in nomes}
+    for n in tamanhos:
+        catalogo = catalogo_sintetico(n)
+        pares = n * (n - 1) // 2
+        for nome in nomes:
+            if nome == "python" and pares > pares_python:
+                linhas[nome].append("—")
+                continue
+            if nome == "c++":
+                _, segundos = executar_cpp(catalogo, executavel, guardar=False, threads=threads)
+            else:
+                executar_python(catalogo, nome, guardar=False)     # aquecimento (JIT)
+                inicio = time.perf_counter()
+                executar_python(catalogo, nome, guardar=False)
+                segundos = time.perf_counter() - inicio
+            linhas[nome].append(f"{pares / max(segundos, 1e-9) / 1e6:.2f} M/s")
+    rotulos = {"python": "calculos.py", "c++": "geometria.hpp"}
+    for nome in nomes:
+        print(f"{rotulos.get(nome, nome):14s}" + "".join(f"{v:>16s}" for v in linhas[nome]))
+
+
+def teste_paridade():
+    """Casos de borda e catálogo sintético: todas as implementações iguais a calculos.py"""
+    print("=" * 60)
+    print("TESTE: Paridade entre calculos.py e geometria.hpp")
+    print("=" * 60)
+
+    executavel = construir_lote()
+    ok = verificar_paridade(catalogo_bordas(), executavel, "Casos de borda")
+    ok &= verificar_paridade(catalogo_sintetico(1500), executavel, "Catálogo sintético")
+    assert ok, "Há implementações fora da tolerância"
+
+    # Casos de borda com valor conhecido (além de iguais entre si)
+    bordas = catalogo_bordas()
+    pares = executar_cpp(bordas, executavel)[0]
+    indice = {(int(a), int(b)): k for k, (a, b) in enumerate(zip(pares["i"], pares["j"]))}
+    esperados = [((0, 1), 0.0, 0.0), ((0, 2), 0.0, 10.0), ((0, 3), math.pi, 20.0),
+                 ((4, 5), 0.0, 0.0), ((4, 6), math.pi, 150.0), ((0, 7), None, 10.0)]
+    # Tolerâncias das próprias fórmulas: sem -march=native (make lote NATIVO=1)
+    # as versões vetoriais SSE2 de cos/acos deixam θ ~ 1e-8 rad nos polos
+    d = bordas.distancia_parsecs
+    for (a, b), theta, distancia in esperados:
+        k = indice[(a, b)]
+        if theta is not None:
+            assert abs(pares["separacao_rad"][k] - theta) <= tolerancia_separacao(theta), (a, b)
+        tolerancia = tolerancia_distancia(d[a], d[b], theta if theta is not None else 0.0, distancia)
+        assert abs(pares["distancia_real_pc"][k] - distancia) <= max(tolerancia, 1e-12), (a, b)
+    print("\nValores conhecidos (θ = 0, θ = π, polos, paralaxe zero): ok")
+
+    tabela_vazao()
+    print("\n✅ Teste concluído com sucesso!")
+
+
+if __name__ == "__main__":
+    teste_paridade()
@@ -0,0 +1,112 @@
+"""
+Calculadora Geométrica de Distância Entre Estrelas
+Importação Preguiçosa de Dependências Pesadas
+
+Autor: Luiz Tiago Wilcke
+Data: 2025
+"""
+
+import importlib
+import os
+import subprocess
+import sys
+from typing import Callable, Optional
+
+# Limite para a importação a frio do núcleo de cálculo (milissegundos)
+LIMITE_IMPORTACAO_MS = float(os.environ.get("CALCULADORA_LIMITE_IMPORTACAO_MS", "100"))
+
+# Módulos que compõem o núcleo e dependências que ele não pode carregar
+MODULOS_NUCLEO = ("calculos", "catalogo")
+MODULOS_PESADOS = ("numpy", "matplotlib", "mpl_toolkits.mplot3d")
+
+
+class ModuloPreguicoso:
+    """
+    Substituto de um módulo que só é importado no primeiro acesso a atributo
+
+    Exemplo:
+        np = ModuloPreguicoso("numpy")
+        np.zeros(3)   # numpy é importado aqui
+    """
+
+    def __init__(self, nome: str, ao_carregar: Optional[Callable] = None):
+        self._nome = nome
+        self._ao_carregar = ao_carregar
+        self._modulo = None
+
+    def _carregar(self):
+        if self._modulo is None:
+            modulo = importlib.import_module(self._nome)
+            if self._ao_carregar is not None:
+                self._ao_carregar(modulo)
+            self._modulo = modulo
+        return self._modulo
+
+    @property
+    def carregado(self) -> bool:
+        """Indica se o módulo real já foi importado"""
+        return self._modulo is not None
+
+    def __getattr__(self, atributo):
+        return getattr(self._carregar(), atributo)
+
+    def __repr__(self) -> str:
+        estado = "carregado" if self.carregado else "não carregado"
+        return f"<ModuloPreguicoso {self._nome} ({estado})>"
+
+
+def _executar_em_processo_novo(codigo: str) -> str:
+    """Executar código em um interpretador novo, a partir deste diretório"""
+    diretorio = os.path.dirname(os.path.abspath(__file__))
+    saida = subprocess.run(
+        [sys.executable, "-c", f"import sys; sys.path.insert(0, {diretorio!r})\n{codigo}"],
+        cwd=diretorio, capture_output=True, text=True, check=True
+    )
+    return saida.stdout.strip()
+
+
+def medir_importacao_nucleo(repeticoes: int = 3) -> float:
+    """Menor tempo (ms) de importação a frio do núcleo entre várias execuções"""
+    codigo = (
+        "import time\n"
+        "inicio = time.perf_counter()\n"
+        f"for nome in {MODULOS_NUCLEO!r}: __import__(nome)\n"
+        "print((time.perf_counter() - inicio) * 1000.0)"
+    )
+    return min(float(_executar_em_processo_novo(codigo)) for _ in range(repeticoes))
+
+
+def modulos_pesados_carregados(modulos) -> list:
+    """Dependências pesadas presentes em sys.modules após importar 'modulos'"""
+    codigo = (
+        f"for nome in {tuple(modulos)!r}: __import__(nome)\n"
+        f"print(','.join(m for m in {MODULOS_PESADOS!r} if m in sys.modules))"
+    )
+    saida = _executar_em_processo_novo(codigo)
+    return [m for m in saida.split(",") if m]
+
+
+def teste_importacao(limite_ms: float = LIMITE_IMPORTACAO_MS):
+    """Teste do orçamento de tempo de importação (falha com AssertionError)"""
+    print("=" * 60)
+    print("TESTE: Tempo de Importação do Núcleo")
+    print("=" * 60)
+
+    tempo_ms = medir_importacao_nucleo()
+    print(f"\nImportação a frio de {', '.join(MODULOS_NUCLEO)}: {tempo_ms:.2f} ms "
+          f"(limite {limite_ms:.0f} ms)")
+    assert tempo_ms <= limite_ms, (
+        f"Importação do núcleo levou {tempo_ms:.2f} ms, acima do limite de {limite_ms:.0f} ms"
+    )
+
+    for modulos in [MODULOS_NUCLEO, ("visualizacao",), ("interface",)]:
+        pesados = modulos_pesados_carregados(modulos)
+        print(f"Dependências pesadas ao importar {', '.join(modulos)}: "
+              f"{', '.join(pesados) if pesados else 'nenhuma'}")
+        assert not pesados, f"{', '.join(modulos)} importou {', '.join(pesados)} antecipadamente"
+
+    print("\n✅ Teste concluído com sucesso!")
+
+
+if __name__ == "__main__":
+    teste_importacao()
@@ -0,0 +1,153 @@
+"""
+Calculadora Geométrica de Distância Entre Estrelas
+Par Mais Próximo e k Pares Mais Próximos
+
+Autor: Luiz Tiago Wilcke
+Data: 2025
+"""
+
+import math
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from calculos import CalculadoraGeometrica, ResultadoCalculo, RADIANOS_POR_GRAU
+from colunar import CatalogoColunar
+from espacial import GradeEspacial
+
+# Pares candidatos aceitos por estrela ao escolher o raio inicial da busca
+CANDIDATOS_POR_ESTRELA = 8
+
+
+def _raio_inicial(posicoes: np.ndarray, k: int) -> Tuple[float, GradeEspacial]:
+    """
+    Escolher um raio cuja grade gere O(N + k) pares candidatos
+
+    Parte do espaçamento médio (volume / N)^(1/3) e reduz o raio pela metade
+    enquanto a contagem de candidatos (calculada só com as ocupações das
+    células, sem enumerar pares) estiver acima do orçamento.
+    """
+    extensao = np.ptp(posicoes, axis=0)
+    volume = float(np.prod(np.maximum(extensao, extensao.max() * 1e-6 + 1e-12)))
+    raio = (volume / len(posicoes)) ** (1.0 / 3.0)
+    orcamento = CANDIDATOS_POR_ESTRELA * len(posicoes) + k
+
+    grade = GradeEspacial(posicoes, raio)
+    while grade.contar_candidatos() > orcamento and raio > 1e-12:
+        raio /= 2.0
+        grade = GradeEspacial(posicoes, raio)
+    return raio, grade
+
+
+def pares_mais_proximos_indices(catalogo: CatalogoColunar, k: int = 1,
+                                separacao_maxima_graus: Optional[float] = None,
+                                distancia_maxima_pc: Optional[float] = None
+                                ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Os k pares fisicamente mais próximos do catálogo, sem avaliar todos os pares
+
+    Estrelas sem paralaxe positiva são ignoradas. Restrições opcionais:
+    - separacao_maxima_graus: apenas pares com θ <= limite no céu
+    - distancia_maxima_pc: apenas pares com D <= limite
+
+    Retorna (i, j, D) ordenados por distância real crescente.
+    """
+    if k < 1:
+        raise ValueError("k deve ser pelo menos 1")
+    validas = np.flatnonzero(catalogo.paralaxe_mas > 0)
+    vazio = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0))
+    if len(validas) < 2:
+        return vazio
+
+    posicoes = catalogo.cartesianas[validas]
+    raio, grade = _raio_inicial(posicoes, k)
+    theta_max = None if separacao_maxima_graus is None else separacao_maxima_graus * RADIANOS_POR_GRAU
+
+    while True:
+        melhores_i = np.zeros(0, dtype=np.int64)
+        melhores_j = np.zeros(0, dtype=np.int64)
+        melhores_d = np.zeros(0)
+        limite = raio if distancia_maxima_pc is None else min(raio, distancia_maxima_pc)
+
+        for i, j, _ in grade.pares_no_raio(limite):
+            i, j = validas[i], validas[j]
+            theta, distancia = catalogo.pares(i, j)
+            aceitos = distancia <= limite
+            if theta_max is not None:
+                aceitos &= theta <= theta_max
+            melhores_i = np.concatenate([melhores_i, i[aceitos]])
+            melhores_j = np.concatenate([melhores_j, j[aceitos]])
+            melhores_d = np.concatenate([melhores_d, distancia[aceitos]])
+            if len(melhores_d) > k:
+                manter = np.argpartition(melhores_d, k - 1)[:k]
+                melhores_i, melhores_j, melhores_d = (melhores_i[manter], melhores_j[manter],
+                                                      melhores_d[manter])
+
+        # Todos os pares com D <= raio foram vistos: o resultado é exato
+        esgotado = distancia_maxima_pc is not None and raio >= distancia_maxima_pc
+        extensao = float(np.ptp(posicoes, axis=0).max()) if len(posicoes) else 0.0
+        if len(melhores_d) >= k or esgotado or raio > 2.0 * extensao:
+            ordem = np.lexsort((melhores_j, melhores_i, melhores_d))
+            return melhores_i[ordem], melhores_j[ordem], melhores_d[ordem]
+
+        raio *= 2.0
+        grade = GradeEspacial(posicoes, raio)
+
+
+def pares_mais_proximos(catalogo: CatalogoColunar, k: int = 1,
+                        separacao_maxima_graus: Optional[float] = None,
+                        distancia_maxima_pc: Optional[float] = None) -> List[ResultadoCalculo]:
+    """Os k pares mais próximos como ResultadoCalculo (mesmos campos do cálculo de um par)"""
+    i, j, _ = pares_mais_proximos_indices(catalogo, k, separacao_maxima_graus,
+                                          distancia_maxima_pc)
+    return [CalculadoraGeometrica.calcular_distancia_entre_estrelas(catalogo.estrela(a),
+                                                                    catalogo.estrela(b))
+            for a, b in zip(i, j)]
+
+
+def par_mais_proximo(catalogo: CatalogoColunar, **restricoes) -> Optional[ResultadoCalculo]:
+    """O par fisicamente mais próximo do catálogo (None se não houver)"""
+    resultado = pares_mais_proximos(catalogo, 1, **restricoes)
+    return resultado[0] if resultado else None
+
+
+def teste_proximidade():
+    """Comparar com a força bruta em catálogos sintéticos"""
+    print("=" * 60)
+    print("TESTE: Pares Mais Próximos")
+    print("=" * 60)
+
+    catalogo = CatalogoColunar.de_registros()
+    resultado = par_mais_proximo(catalogo)
+    print(f"\nCatálogo padrão: {resultado.nome_estrela1} ↔ {resultado.nome_estrela2} "
+          f"= {resultado.distancia_real_parsecs:.4f} pc")
+
+    gerador = np.random.default_rng(7)
+    for n, k, restricoes in [(300, 1, {}), (500, 10, {}), (400, 5, {"separacao_maxima_graus": 20.0}),
+                             (400, 50, {"distancia_maxima_pc": 30.0})]:
+        sintetico = CatalogoColunar(
+            nomes=[f"S{i}" for i in range(n)],
+            alfa_rad=gerador.uniform(0, 2 * math.pi, n),
+            delta_rad=np.arcsin(gerador.uniform(-1, 1, n)),
+            paralaxe_mas=gerador.uniform(2, 200, n),
+        )
+        i, j, d = pares_mais_proximos_indices(sintetico, k, **restricoes)
+
+        todos_i, todos_j = np.triu_indices(n, 1)
+        theta, distancia = sintetico.pares(todos_i, todos_j)
+        aceitos = np.ones(len(distancia), dtype=bool)
+        if "separacao_maxima_graus" in restricoes:
+            aceitos &= theta <= restricoes["separacao_maxima_graus"] * RADIANOS_POR_GRAU
+        if "distancia_maxima_pc" in restricoes:
+            aceitos &= distancia <= restricoes["distancia_maxima_pc"]
+        esperado = np.sort(distancia[aceitos])[:k]
+
+        assert len(d) == len(esperado), (len(d), len(esperado))
+        assert np.allclose(d, esperado, rtol=1e-12, atol=1e-12)
+        print(f"N={n}, k={k}, {restricoes or 'sem restrição'}: ok")
+
+    print("\n✅ Teste concluído com sucesso!")
+
+
+if __name__ == "__main__":
+    teste_proximidade()
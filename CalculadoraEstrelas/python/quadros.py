@@ -0,0 +1,209 @@
+"""
+Calculadora Geométrica de Distância Entre Estrelas
+Conversão entre Sistemas de Coordenadas (Equatorial, Galáctico, Eclíptico)
+
+Autor: Luiz Tiago Wilcke
+Data: 2025
+"""
+
+import math
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+
+from calculos import Estrela, GRAUS_POR_RADIANO, RADIANOS_POR_GRAU
+from colunar import CatalogoColunar
+
+QUADROS = ("equatorial", "galactico", "ecliptico")
+
+# Equatorial (ICRS) → galáctico, Hipparcos vol. 1, seção 1.5.3
+_EQUATORIAL_PARA_GALACTICO = np.array([
+    [-0.0548755604162154, -0.8734370902348850, -0.4838350155487132],
+    [+0.4941094278755837, -0.4448296299600112, +0.7469822444972189],
+    [-0.8676661490190047, -0.1980763734312015, +0.4559837761750669],
+])
+
+# Obliquidade média da eclíptica em J2000 (84381,448″)
+OBLIQUIDADE_J2000_RAD = 84381.448 / 3600.0 * RADIANOS_POR_GRAU
+
+# Equatorial → eclíptico: rotação de ε em torno do eixo X (equinócio)
+_EQUATORIAL_PARA_ECLIPTICO = np.array([
+    [1.0, 0.0, 0.0],
+    [0.0, math.cos(OBLIQUIDADE_J2000_RAD), math.sin(OBLIQUIDADE_J2000_RAD)],
+    [0.0, -math.sin(OBLIQUIDADE_J2000_RAD), math.cos(OBLIQUIDADE_J2000_RAD)],
+])
+
+_DO_EQUATORIAL = {
+    "equatorial": np.eye(3),
+    "galactico": _EQUATORIAL_PARA_GALACTICO,
+    "ecliptico": _EQUATORIAL_PARA_ECLIPTICO,
+}
+
+NOMES = {"equatorial": "Equatorial", "galactico": "Galáctico", "ecliptico": "Eclíptico"}
+
+# Nomes dos eixos de longitude e latitude de cada quadro (para gráficos)
+ROTULOS = {
+    "equatorial": ("Ascensão Reta", "Declinação"),
+    "galactico": ("Longitude Galáctica (l)", "Latitude Galáctica (b)"),
+    "ecliptico": ("Longitude Eclíptica (λ)", "Latitude Eclíptica (β)"),
+}
+
+# Vetores convertidos por vez (mantém os blocos no cache do processador)
+VETORES_POR_BLOCO = 1 << 16
+
+
+def _validar(quadro: str):
+    if quadro not in QUADROS:
+        raise ValueError(f"Quadro desconhecido: {quadro} (use {', '.join(QUADROS)})")
+
+
+def matriz_rotacao(origem: str, destino: str) -> np.ndarray:
+    """Matriz 3×3 que leva vetores do quadro 'origem' para o quadro 'destino'"""
+    _validar(origem)
+    _validar(destino)
+    # As matrizes são ortogonais: a inversa é a transposta
+    return _DO_EQUATORIAL[destino] @ _DO_EQUATORIAL[origem].T
+
+
+def converter_vetores(vetores: np.ndarray, origem: str, destino: str,
+                      saida: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Rotacionar vetores (N, 3) de um quadro para outro
+
+    Funciona para vetores unitários ou posições cartesianas (a rotação
+    preserva as distâncias). 'saida' pode ser o próprio array de entrada.
+    """
+    vetores = np.asarray(vetores, dtype=np.float64)
+    transposta = matriz_rotacao(origem, destino).T
+    if saida is None:
+        saida = np.empty_like(vetores)
+    for inicio in range(0, len(vetores), VETORES_POR_BLOCO):
+        fatia = slice(inicio, inicio + VETORES_POR_BLOCO)
+        # Cópia do bloco para permitir saida = vetores
+        np.matmul(vetores[fatia].copy() if saida is vetores else vetores[fatia],
+                  transposta, out=saida[fatia])
+    return saida
+
+
+def esfericas_para_vetores(longitude: np.ndarray, latitude: np.ndarray) -> np.ndarray:
+    """Vetores unitários (N, 3) a partir de longitude e latitude (radianos)"""
+    cos_lat = np.cos(latitude)
+    return np.stack([cos_lat * np.cos(longitude), cos_lat * np.sin(longitude),
+                     np.sin(latitude)], axis=-1)
+
+
+def vetores_para_esfericas(vetores: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Longitude em [0, 2π) e latitude em [-π/2, π/2] (radianos) de vetores (N, 3)"""
+    x, y, z = vetores[..., 0], vetores[..., 1], vetores[..., 2]
+    longitude = np.arctan2(y, x)
+    np.add(longitude, 2.0 * math.pi, out=longitude, where=longitude < 0)
+    # atan2 com a projeção no plano é estável também perto dos polos
+    rho = x * x
+    rho += y * y
+    latitude = np.arctan2(z, np.sqrt(rho, out=rho), out=rho)
+    return longitude, latitude
+
+
+def converter_coordenadas(longitude: np.ndarray, latitude: np.ndarray,
+                          origem: str, destino: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Converter longitude/latitude (radianos) entre quadros"""
+    vetores = esfericas_para_vetores(np.asarray(longitude, dtype=np.float64),
+                                     np.asarray(latitude, dtype=np.float64))
+    return vetores_para_esfericas(converter_vetores(vetores, origem, destino, saida=vetores))
+
+
+def coordenadas_catalogo(catalogo: CatalogoColunar,
+                         quadro: str = "galactico") -> Tuple[np.ndarray, np.ndarray]:
+    """Longitude e latitude (radianos) de todas as estrelas no quadro pedido"""
+    vetores = catalogo.vetores_unitarios
+    longitude, latitude = np.empty(len(vetores)), np.empty(len(vetores))
+    transposta = matriz_rotacao("equatorial", quadro).T
+    rotacionados = np.empty((min(len(vetores), VETORES_POR_BLOCO), 3))
+    # Rotação e ângulos no mesmo bloco, enquanto ele ainda está no cache
+    for inicio in range(0, len(vetores), VETORES_POR_BLOCO):
+        fatia = slice(inicio, inicio + VETORES_POR_BLOCO)
+        bloco = np.matmul(vetores[fatia], transposta, out=rotacionados[:len(vetores[fatia])])
+        longitude[fatia], latitude[fatia] = vetores_para_esfericas(bloco)
+    return longitude, latitude
+
+
+def cartesianas_catalogo(catalogo: CatalogoColunar, quadro: str = "galactico") -> np.ndarray:
+    """Posições (N, 3) em parsecs no quadro pedido, Sol na origem"""
+    return converter_vetores(catalogo.cartesianas, "equatorial", quadro)
+
+
+def coordenadas_estrela(estrela: Estrela, quadro: str) -> Tuple[float, float]:
+    """Longitude e latitude (graus) de uma estrela no quadro pedido"""
+    longitude, latitude = converter_coordenadas(
+        [estrela.ascensao_reta.para_radianos()], [estrela.declinacao.para_radianos()],
+        "equatorial", quadro)
+    return float(longitude[0]) * GRAUS_POR_RADIANO, float(latitude[0]) * GRAUS_POR_RADIANO
+
+
+def teste_quadros(n_vazao: int = 10_000_000):
+    """Pontos de referência, ida e volta entre quadros e vazão da conversão"""
+    print("=" * 60)
+    print("TESTE: Conversão entre Quadros de Coordenadas")
+    print("=" * 60)
+
+    for destino in QUADROS:
+        matriz = matriz_rotacao("equatorial", destino)
+        assert np.allclose(matriz @ matriz.T, np.eye(3), atol=1e-12)
+        assert np.isclose(np.linalg.det(matriz), 1.0)
+
+    # (quadro, α, δ em graus, longitude e latitude esperadas em graus, tolerância)
+    referencias = [
+        ("galactico", 192.85948, 27.12825, None, 90.0, 1e-4),   # polo norte galáctico
+        ("galactico", 266.40499, -28.93617, 0.0, 0.0, 1e-4),    # centro galáctico
+        ("ecliptico", 0.0, 0.0, 0.0, 0.0, 1e-12),                # ponto vernal
+        ("ecliptico", 270.0, 90.0 - 84381.448 / 3600.0, None, 90.0, 1e-9),  # polo eclíptico
+    ]
+    for quadro, alfa, delta, lon_esperada, lat_esperada, tolerancia in referencias:
+        lon, lat = converter_coordenadas([alfa * RADIANOS_POR_GRAU], [delta * RADIANOS_POR_GRAU],
+                                         "equatorial", quadro)
+        lon, lat = lon[0] * GRAUS_POR_RADIANO, lat[0] * GRAUS_POR_RADIANO
+        assert abs(lat - lat_esperada) < tolerancia, (quadro, lat)
+        if lon_esperada is not None:
+            assert abs((lon - lon_esperada + 180.0) % 360.0 - 180.0) < tolerancia, (quadro, lon)
+        print(f"α={alfa:9.5f}° δ={delta:9.5f}° → {quadro:10s} ({lon:9.5f}°, {lat:9.5f}°): ok")
+
+    # Ida e volta por todos os pares de quadros, incluindo os polos
+    gerador = np.random.default_rng(9)
+    n = 200_000
+    alfa = gerador.uniform(0, 2 * math.pi, n)
+    delta = np.arcsin(gerador.uniform(-1, 1, n))
+    delta[:2] = [math.pi / 2, -math.pi / 2]
+    original = esfericas_para_vetores(alfa, delta)
+    for origem in QUADROS:
+        for destino in QUADROS:
+            ida = converter_vetores(original, origem, destino)
+            volta = converter_vetores(ida, destino, origem)
+            assert np.max(np.abs(volta - original)) < 1e-14, (origem, destino)
+    lon, lat = converter_coordenadas(alfa, delta, "equatorial", "galactico")
+    alfa_volta, delta_volta = converter_coordenadas(lon, lat, "galactico", "equatorial")
+    # Corda entre a direção original e a reconstruída (≈ ângulo, sem perda do arccos)
+    theta = np.linalg.norm(esfericas_para_vetores(alfa_volta, delta_volta) - original, axis=1)
+    assert theta.max() < 1e-14, theta.max()
+    print(f"\nIda e volta em {n:,} direções: erro máximo {theta.max() * GRAUS_POR_RADIANO * 3.6e6:.2e} mas")
+
+    # Vazão sobre um catálogo inteiro (vetores unitários já calculados)
+    catalogo = CatalogoColunar(nomes=[""] * n_vazao, alfa_rad=gerador.uniform(0, 2 * math.pi, n_vazao),
+                               delta_rad=np.arcsin(gerador.uniform(-1, 1, n_vazao)),
+                               paralaxe_mas=np.ones(n_vazao))
+    catalogo.vetores_unitarios
+    saida = np.empty_like(catalogo.vetores_unitarios)
+    inicio = time.perf_counter()
+    converter_vetores(catalogo.vetores_unitarios, "equatorial", "galactico", saida=saida)
+    rotacao = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    coordenadas_catalogo(catalogo, "galactico")
+    angulos = time.perf_counter() - inicio
+    print(f"Vazão ({n_vazao:,} estrelas): vetores {n_vazao / rotacao / 1e6:.0f} M/s, "
+          f"longitude/latitude {n_vazao / angulos / 1e6:.0f} M/s")
+
+    print("\n✅ Teste concluído com sucesso!")
+
+
+if __name__ == "__main__":
+    teste_quadros()
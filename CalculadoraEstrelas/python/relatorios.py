@@ -0,0 +1,513 @@
+"""
+Calculadora Geométrica de Distância Entre Estrelas
+Relatórios em Lote (HTML e Markdown) Gravados em Fluxo
+
+Autor: Luiz Tiago Wilcke
+Data: 2025
+"""
+
+import hashlib
+import html
+import itertools
+import os
+import shutil
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Iterable, Optional, Sequence, Tuple
+
+from calculos import CalculadoraGeometrica, Estrela, ResultadoCalculo
+from colunar import CatalogoColunar
+
+FIGURAS = ("mapa", "3d", "diagrama")
+TITULOS_FIGURAS = {
+    "mapa": "Mapa celeste",
+    "3d": "Visualização 3D",
+    "diagrama": "Diagrama geométrico",
+}
+
+# Entra no hash das figuras: mudar o desenho invalida o cache
+VERSAO_FIGURAS = 2
+
+# Figuras em voo por processo (renderizando ou esperando na fila)
+FIGURAS_EM_VOO_POR_PROCESSO = 4
+
+# Estado de cada processo de trabalho (definido pelo inicializador)
+_ESTADO = {}
+
+
+@dataclass
+class ResumoRelatorio:
+    """Pares escritos, figuras geradas e reaproveitadas, tempo total"""
+    pares: int
+    figuras_geradas: int
+    figuras_reaproveitadas: int
+    segundos: float
+    processos: int
+    destino: str
+
+    @property
+    def pares_por_segundo(self) -> float:
+        return self.pares / self.segundos if self.segundos > 0 else float("inf")
+
+    def __str__(self) -> str:
+        return (f"{self.pares} pares em {self.segundos:.2f} s ({self.pares_por_segundo:.0f} pares/s, "
+                f"{self.processos} processo(s)); figuras: {self.figuras_geradas} geradas, "
+                f"{self.figuras_reaproveitadas} do cache → {self.destino}")
+
+
+def hash_figura(tipo: str, estrela1: Estrela, estrela2: Estrela,
+                resultado: ResultadoCalculo, quadro: str, dpi: float) -> str:
+    """Hash de tudo o que determina a imagem (mesmo hash → mesma figura)"""
+    conteudo = repr((VERSAO_FIGURAS, tipo, quadro, float(dpi), estrela1, estrela2, resultado))
+    return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()[:32]
+
+
+# ============================================================================
+# Renderização (executada em cada processo)
+# ============================================================================
+
+def _iniciar_trabalhador(quadro: str, dpi: float):
+    """Inicializador do pool: o backend só é trocado nos processos filhos"""
+    from visualizacao import plt
+    plt.switch_backend("Agg")
+    _iniciar_processo(quadro, dpi)
+
+
+def _iniciar_processo(quadro: str, dpi: float):
+    from visualizacao import VisualizadorEstelar
+    _ESTADO.clear()
+    _ESTADO.update(viz=VisualizadorEstelar(), quadro=quadro, dpi=dpi, mapa=None, fundo=None, fig_3d=None)
+
+
+def _encerrar_processo():
+    from visualizacao import plt
+    for chave in ("mapa", "fig_3d"):
+        if _ESTADO.get(chave) is not None:
+            plt.close(_ESTADO[chave])
+    _ESTADO.clear()
+
+
+def _imagem_mapa(estrela1: Estrela, estrela2: Estrela, resultado: ResultadoCalculo):
+    """
+    Mapa celeste do par como matriz RGBA
+
+    O mapa (fundo de 200 estrelas, eixos fixos em 0–360°) é o mesmo para
+    todos os pares: cada processo o desenha uma vez e, por par, só move as
+    estrelas e troca os rótulos (blitting, como em animacao.py).
+    """
+    import numpy as np
+    import quadros
+    from visualizacao import usar_canvas_agg
+
+    e = _ESTADO
+    viz = e["viz"]
+    if e["mapa"] is None:
+        e["mapa"] = usar_canvas_agg(viz.criar_mapa_celeste(estrela1, estrela2, resultado, e["quadro"]))
+        e["mapa"].set_dpi(e["dpi"])
+    fig = e["mapa"]
+    animados = viz.atualizar_mapa_celeste(
+        fig, quadros.coordenadas_estrela(estrela1, e["quadro"]),
+        quadros.coordenadas_estrela(estrela2, e["quadro"]),
+        resultado.distancia1_parsecs, resultado.distancia2_parsecs,
+        resultado.distancia_real_parsecs, resultado.separacao_angular_graus,
+        nomes=(estrela1.nome, estrela2.nome))
+    if e["fundo"] is None:
+        for artista in animados:
+            artista.set_animated(True)
+        fig.canvas.draw()
+        e["fundo"] = fig.canvas.copy_from_bbox(fig.bbox)
+    fig.canvas.restore_region(e["fundo"])
+    for artista in animados:
+        fig.draw_artist(artista)
+    return np.asarray(fig.canvas.buffer_rgba())
+
+
+def _imagem_3d(estrela1: Estrela, estrela2: Estrela, resultado: ResultadoCalculo):
+    """
+    Visualização 3D do par como matriz RGBA
+
+    Cada processo cria a figura uma vez; por par, move as estrelas e troca a
+    legenda (atualizar_visualizacao_3d) e reajusta os eixos aos pontos, como
+    o autoscale de uma figura nova. Os eixos mudam a cada par, então a
+    figura é redesenhada inteira (sem blitting), mas sem recriar eixos,
+    painéis e textos.
+    """
+    import numpy as np
+    import quadros
+    from visualizacao import usar_canvas_agg
+
+    e = _ESTADO
+    viz = e["viz"]
+    if e["fig_3d"] is None:
+        e["fig_3d"] = usar_canvas_agg(viz.criar_visualizacao_3d(estrela1, estrela2, resultado, e["quadro"]))
+        e["fig_3d"].set_dpi(e["dpi"])
+    fig = e["fig_3d"]
+    direcoes = quadros.esfericas_para_vetores(np.array([estrela1.alfa_rad, estrela2.alfa_rad]),
+                                              np.array([estrela1.delta_rad, estrela2.delta_rad]))
+    posicoes = direcoes * np.array([[resultado.distancia1_parsecs], [resultado.distancia2_parsecs]])
+    posicao1, posicao2 = quadros.converter_vetores(posicoes, "equatorial", e["quadro"])
+    viz.atualizar_visualizacao_3d(fig, posicao1, posicao2, resultado.distancia_real_parsecs,
+                                  nomes=(estrela1.nome, estrela2.nome))
+    ax = fig.axes[0]
+    pontos = np.vstack([np.zeros(3), posicao1, posicao2])
+    ax.auto_scale_xyz(pontos[:, 0], pontos[:, 1], pontos[:, 2], had_data=False)
+    fig.canvas.draw()
+    return np.asarray(fig.canvas.buffer_rgba())
+
+
+def _renderizar_figura(tipo: str, caminho: str, estrela1: Estrela, estrela2: Estrela,
+                       resultado: ResultadoCalculo) -> str:
+    """Gravar uma figura em 'caminho' (arquivo temporário + rename, seguro entre processos)"""
+    from matplotlib.image import imsave
+    from visualizacao import plt, usar_canvas_agg
+
+    e = _ESTADO
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    if tipo == "mapa":
+        imsave(temporario, _imagem_mapa(estrela1, estrela2, resultado), format="png")
+    elif tipo == "3d":
+        imsave(temporario, _imagem_3d(estrela1, estrela2, resultado), format="png")
+    else:
+        fig = usar_canvas_agg(e["viz"].criar_diagrama_geometrico(resultado))
+        fig.savefig(temporario, format="png", dpi=e["dpi"], facecolor=fig.get_facecolor())
+        plt.close(fig)
+    os.replace(temporario, caminho)
+    return caminho
+
+
+# ============================================================================
+# Formatos
+# ============================================================================
+
+class _FormatoMarkdown:
+    extensao = ".md"
+
+    def cabecalho(self, titulo: str, quadro: str) -> str:
+        return (f"# {titulo}\n\n"
+                f"*Calculadora Geométrica de Distância Entre Estrelas — Autor: Luiz Tiago Wilcke*\n\n"
+                "## Método\n\n"
+                "1. Distância por paralaxe: `d = 1000 / p` (parsecs)\n"
+                "2. Separação angular (Lei dos Cossenos Esférica): "
+                "`cos(θ) = sin(δ₁)·sin(δ₂) + cos(δ₁)·cos(δ₂)·cos(α₁-α₂)`\n"
+                "3. Distância real (Lei dos Cossenos): `D = √(d₁² + d₂² - 2·d₁·d₂·cos(θ))`\n\n"
+                f"Figuras no quadro {quadro}.\n\n"
+                "## Resumo\n\n"
+                "| # | Estrela 1 | Estrela 2 | d₁ (pc) | d₂ (pc) | θ (°) | D (pc) | D (a.l.) |\n"
+                "|---:|---|---|---:|---:|---:|---:|---:|\n")
+
+    @staticmethod
+    def _nome(nome: str) -> str:
+        return nome.replace("|", "\\|")
+
+    def linha(self, numero: int, r: ResultadoCalculo, valido: bool) -> str:
+        if not valido:
+            return (f"| {numero} | {self._nome(r.nome_estrela1)} | {self._nome(r.nome_estrela2)} "
+                    f"| — | — | — | paralaxe inválida | — |\n")
+        return (f"| [{numero}](#par-{numero}) | {self._nome(r.nome_estrela1)} | "
+                f"{self._nome(r.nome_estrela2)} | {r.distancia1_parsecs:.4f} | "
+                f"{r.distancia2_parsecs:.4f} | {r.separacao_angular_graus:.4f} | "
+                f"{r.distancia_real_parsecs:.4f} | {r.distancia_real_anos_luz:.2f} |\n")
+
+    def inicio_secoes(self) -> str:
+        return "\n## Pares\n"
+
+    def secao(self, numero: int, r: ResultadoCalculo, figuras: Sequence[Tuple[str, str]]) -> str:
+        partes = [f"\n### <a id=\"par-{numero}\"></a>{numero}. {r.nome_estrela1} ↔ {r.nome_estrela2}\n\n"
+                  f"```\n{r.equacao_usada}\n```\n"]
+        for tipo, caminho in figuras:
+            partes.append(f"\n![{TITULOS_FIGURAS[tipo]}]({caminho})\n")
+        return "".join(partes)
+
+    def rodape(self) -> str:
+        return ""
+
+
+class _FormatoHtml:
+    extensao = ".html"
+
+    # Pronto para impressão/PDF: quebra de página entre pares, figuras na largura da página
+    ESTILO = """
+body { font-family: 'Segoe UI', sans-serif; max-width: 1100px; margin: 2em auto; color: #1a202c; }
+h1, h2, h3 { color: #2b4c7e; }
+table { border-collapse: collapse; font-size: 0.85em; }
+th, td { border: 1px solid #cbd5e0; padding: 2px 6px; text-align: right; }
+td.nome { text-align: left; }
+pre { background: #f7fafc; border: 1px solid #e2e8f0; padding: 0.6em; }
+figure { margin: 0.5em 0; }
+figure img { max-width: 100%; }
+section.par { page-break-before: always; break-before: page; }
+"""
+
+    def cabecalho(self, titulo: str, quadro: str) -> str:
+        return (f"<!DOCTYPE html>\n<html lang=\"pt-BR\">\n<head>\n<meta charset=\"utf-8\">\n"
+                f"<title>{html.escape(titulo)}</title>\n<style>{self.ESTILO}</style>\n</head>\n<body>\n"
+                f"<h1>{html.escape(titulo)}</h1>\n"
+                "<p><em>Calculadora Geométrica de Distância Entre Estrelas — Autor: Luiz Tiago Wilcke</em></p>\n"
+                "<h2>Método</h2>\n<ol>\n"
+                "<li>Distância por paralaxe: <code>d = 1000 / p</code> (parsecs)</li>\n"
+                "<li>Separação angular (Lei dos Cossenos Esférica): "
+                "<code>cos(θ) = sin(δ₁)·sin(δ₂) + cos(δ₁)·cos(δ₂)·cos(α₁-α₂)</code></li>\n"
+                "<li>Distância real (Lei dos Cossenos): <code>D = √(d₁² + d₂² - 2·d₁·d₂·cos(θ))</code></li>\n"
+                f"</ol>\n<p>Figuras no quadro {html.escape(quadro)}.</p>\n"
+                "<h2>Resumo</h2>\n<table>\n"
+                "<tr><th>#</th><th>Estrela 1</th><th>Estrela 2</th><th>d₁ (pc)</th><th>d₂ (pc)</th>"
+                "<th>θ (°)</th><th>D (pc)</th><th>D (a.l.)</th></tr>\n")
+
+    def linha(self, numero: int, r: ResultadoCalculo, valido: bool) -> str:
+        nomes = (f"<td class=\"nome\">{html.escape(r.nome_estrela1)}</td>"
+                 f"<td class=\"nome\">{html.escape(r.nome_estrela2)}</td>")
+        if not valido:
+            return f"<tr><td>{numero}</td>{nomes}<td colspan=\"5\">paralaxe inválida</td></tr>\n"
+        return (f"<tr><td><a href=\"#par-{numero}\">{numero}</a></td>{nomes}"
+                f"<td>{r.distancia1_parsecs:.4f}</td><td>{r.distancia2_parsecs:.4f}</td>"
+                f"<td>{r.separacao_angular_graus:.4f}</td><td>{r.distancia_real_parsecs:.4f}</td>"
+                f"<td>{r.distancia_real_anos_luz:.2f}</td></tr>\n")
+
+    def inicio_secoes(self) -> str:
+        return "</table>\n<h2>Pares</h2>\n"
+
+    def secao(self, numero: int, r: ResultadoCalculo, figuras: Sequence[Tuple[str, str]]) -> str:
+        partes = [f"<section class=\"par\" id=\"par-{numero}\">\n"
+                  f"<h3>{numero}. {html.escape(r.nome_estrela1)} ↔ {html.escape(r.nome_estrela2)}</h3>\n"
+                  f"<pre>{html.escape(r.equacao_usada)}</pre>\n"]
+        for tipo, caminho in figuras:
+            titulo = TITULOS_FIGURAS[tipo]
+            partes.append(f"<figure><img src=\"{html.escape(caminho)}\" alt=\"{titulo}\" loading=\"lazy\">"
+                          f"<figcaption>{titulo}</figcaption></figure>\n")
+        partes.append("</section>\n")
+        return "".join(partes)
+
+    def rodape(self) -> str:
+        return "</body>\n</html>\n"
+
+
+FORMATOS = {".md": _FormatoMarkdown, ".markdown": _FormatoMarkdown,
+            ".html": _FormatoHtml, ".htm": _FormatoHtml}
+
+
+# ============================================================================
+# Geração
+# ============================================================================
+
+def gerar_relatorio(catalogo: CatalogoColunar, pares: Iterable[Tuple[int, int]], destino: str,
+                    titulo: str = "Relatório de Distâncias Entre Estrelas",
+                    figuras: Sequence[str] = FIGURAS, quadro: str = "equatorial",
+                    dpi: float = 72.0, diretorio_figuras: Optional[str] = None,
+                    processos: Optional[int] = None) -> ResumoRelatorio:
+    """
+    Relatório de muitos pares (índices do catálogo) em HTML ou Markdown
+
+    O formato vem da extensão de 'destino' (.html/.htm ou .md). Cada par é
+    calculado e escrito assim que chega: linha da tabela e seção (derivação
+    das equações e figuras) vão para dois arquivos temporários ao lado do
+    destino, que no final são concatenados. Em memória ficam só o par atual
+    e as figuras em voo (no máximo FIGURAS_EM_VOO_POR_PROCESSO × processos).
+
+    As figuras ficam em 'diretorio_figuras' (padrão: 'figuras' ao lado do
+    destino) com o hash do conteúdo como nome; uma figura que já existe,
+    de qualquer relatório anterior, não é desenhada de novo.
+    """
+    extensao = os.path.splitext(destino)[1].lower()
+    if extensao not in FORMATOS:
+        raise ValueError(f"Formato desconhecido: {extensao} (use .html ou .md)")
+    desconhecidas = set(figuras) - set(FIGURAS)
+    if desconhecidas:
+        raise ValueError(f"Figuras desconhecidas: {sorted(desconhecidas)} (use {FIGURAS})")
+    formato = FORMATOS[extensao]()
+    processos = processos or os.cpu_count() or 1
+    diretorio = os.path.dirname(os.path.abspath(destino))
+    diretorio_figuras = diretorio_figuras or os.path.join(diretorio, "figuras")
+    os.makedirs(diretorio_figuras, exist_ok=True)
+    prefixo_figuras = os.path.relpath(diretorio_figuras, diretorio).replace(os.sep, "/")
+
+    geradas = reaproveitadas = numero = 0
+    em_voo = deque()
+    hashes_em_voo = set()
+    executor = None
+    if figuras and processos > 1:
+        executor = ProcessPoolExecutor(processos, initializer=_iniciar_trabalhador,
+                                       initargs=(quadro, dpi))
+    elif figuras:
+        _iniciar_processo(quadro, dpi)
+
+    def concluir_mais_antiga():
+        hashes_em_voo.discard(em_voo[0][0])
+        em_voo.popleft()[1].result()
+
+    inicio = time.perf_counter()
+    try:
+        with tempfile.TemporaryDirectory(dir=diretorio, prefix=".relatorio_") as temporario:
+            caminho_tabela = os.path.join(temporario, "tabela")
+            caminho_secoes = os.path.join(temporario, "secoes")
+            with open(caminho_tabela, "w", encoding="utf-8") as tabela, \
+                    open(caminho_secoes, "w", encoding="utf-8") as secoes:
+                for numero, (i, j) in enumerate(pares, start=1):
+                    estrela1, estrela2 = catalogo.estrela(int(i)), catalogo.estrela(int(j))
+                    resultado = CalculadoraGeometrica.calcular_distancia_entre_estrelas(
+                        estrela1, estrela2)
+                    valido = estrela1.paralaxe_mas > 0 and estrela2.paralaxe_mas > 0
+                    tabela.write(formato.linha(numero, resultado, valido))
+                    if not valido:
+                        continue
+
+                    referencias = []
+                    for tipo in figuras:
+                        codigo = hash_figura(tipo, estrela1, estrela2, resultado, quadro, dpi)
+                        nome = f"{codigo}.png"
+                        referencias.append((tipo, f"{prefixo_figuras}/{nome}"))
+                        caminho = os.path.join(diretorio_figuras, nome)
+                        if codigo in hashes_em_voo or os.path.exists(caminho):
+                            reaproveitadas += 1
+                            continue
+                        geradas += 1
+                        if executor is None:
+                            _renderizar_figura(tipo, caminho, estrela1, estrela2, resultado)
+                            continue
+                        em_voo.append((codigo, executor.submit(
+                            _renderizar_figura, tipo, caminho, estrela1, estrela2, resultado)))
+                        hashes_em_voo.add(codigo)
+                        if len(em_voo) >= FIGURAS_EM_VOO_POR_PROCESSO * processos:
+                            concluir_mais_antiga()
+                    secoes.write(formato.secao(numero, resultado, referencias))
+            while em_voo:
+                concluir_mais_antiga()
+
+            # Montagem final: cabeçalho, tabela, seções (cópia em blocos)
+            parcial = os.path.join(temporario, "relatorio")
+            with open(parcial, "w", encoding="utf-8") as saida:
+                saida.write(formato.cabecalho(titulo, quadro))
+                for caminho in (caminho_tabela, caminho_secoes):
+                    if caminho == caminho_secoes:
+                        saida.write(formato.inicio_secoes())
+                    with open(caminho, encoding="utf-8") as parte:
+                        shutil.copyfileobj(parte, saida)
+                saida.write(formato.rodape())
+            os.replace(parcial, destino)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        _encerrar_processo()
+    return ResumoRelatorio(numero, geradas, reaproveitadas, time.perf_counter() - inicio,
+                           processos if executor is not None else 1, destino)
+
+
+def teste_relatorios():
+    """Relatórios HTML e Markdown, cache de figuras, memória constante e vazão"""
+    print("=" * 60)
+    print("TESTE: Relatórios em Lote")
+    print("=" * 60)
+
+    import tracemalloc
+    import numpy as np
+
+    catalogo = CatalogoColunar.de_registros()
+    n = len(catalogo)
+    processos = max(2, os.cpu_count() or 1)
+    pares = list(itertools.islice(itertools.combinations(range(n), 2), 30))
+
+    with tempfile.TemporaryDirectory(prefix="relatorios_") as temporario:
+        print()
+        html_destino = os.path.join(temporario, "pares.html")
+        resumo = gerar_relatorio(catalogo, pares + pares[:5], html_destino, processos=processos)
+        print(f"HTML:      {resumo}")
+        figuras = sorted(os.listdir(os.path.join(temporario, "figuras")))
+        assert resumo.figuras_geradas == len(figuras) == 3 * len(pares)
+        assert resumo.figuras_reaproveitadas == 3 * 5
+        with open(html_destino, encoding="utf-8") as arquivo:
+            conteudo = arquivo.read()
+        assert conteudo.count("<section class=\"par\"") == len(pares) + 5
+        assert conteudo.count("<tr>") == len(pares) + 5 + 1
+        assert all(nome in conteudo for nome in figuras)
+        assert not any(nome.startswith(".relatorio_") for nome in os.listdir(temporario))
+
+        # Segunda vez: todas as figuras vêm do cache e o relatório é idêntico
+        resumo = gerar_relatorio(catalogo, pares + pares[:5], html_destino, processos=processos)
+        print(f"De novo:   {resumo}")
+        assert resumo.figuras_geradas == 0
+        with open(html_destino, encoding="utf-8") as arquivo:
+            assert arquivo.read() == conteudo
+
+        # Markdown reaproveita as mesmas figuras
+        md_destino = os.path.join(temporario, "pares.md")
+        resumo = gerar_relatorio(catalogo, pares, md_destino, processos=1)
+        print(f"Markdown:  {resumo}")
+        assert resumo.figuras_geradas == 0
+        with open(md_destino, encoding="utf-8") as arquivo:
+            assert arquivo.read().count("](figuras/") == 3 * len(pares)
+
+        # processos=1 desenha aqui mesmo, sem trocar o backend de quem chamou
+        from visualizacao import plt
+        anterior = plt.get_backend()
+        plt.switch_backend("svg")
+        resumo = gerar_relatorio(catalogo, pares[:2], os.path.join(temporario, "svg.md"), dpi=50.0,
+                                 processos=1)
+        assert plt.get_backend() == "svg" and resumo.figuras_geradas == 6
+        plt.switch_backend(anterior)
+        print(f"Com o backend svg de quem chamou: {resumo.figuras_geradas} figuras, backend mantido")
+
+        # O mapa reaproveitado (blitting) é igual ao desenho da figura inteira
+        from matplotlib.image import imread
+        from visualizacao import usar_canvas_agg
+        _iniciar_processo("equatorial", 72.0)
+        r0 = CalculadoraGeometrica.calcular_distancia_entre_estrelas(catalogo.estrela(0), catalogo.estrela(1))
+        _imagem_mapa(catalogo.estrela(0), catalogo.estrela(1), r0)
+        e1, e2 = catalogo.estrela(2), catalogo.estrela(7)
+        r = CalculadoraGeometrica.calcular_distancia_entre_estrelas(e1, e2)
+        blit = _imagem_mapa(e1, e2, r).copy()
+        fig = _ESTADO["mapa"]
+        for artista in fig.findobj(lambda a: a.get_animated()):
+            artista.set_animated(False)
+        fig.canvas.draw()
+        completo = np.asarray(fig.canvas.buffer_rgba())
+        diferentes = np.count_nonzero(blit != completo)
+        assert diferentes <= 0.001 * completo.size, diferentes
+        print(f"Mapa com blitting igual ao redesenho completo ({diferentes} bytes diferentes)")
+
+        # A figura 3D reaproveitada é igual a uma figura nova do mesmo par
+        _imagem_3d(catalogo.estrela(0), catalogo.estrela(1), r0)
+        reaproveitada = _imagem_3d(e1, e2, r).copy()
+        nova = usar_canvas_agg(_ESTADO["viz"].criar_visualizacao_3d(e1, e2, r, _ESTADO["quadro"]))
+        nova.set_dpi(72.0)
+        nova.canvas.draw()
+        assert np.array_equal(reaproveitada, np.asarray(nova.canvas.buffer_rgba()))
+        plt.close(nova)
+        _encerrar_processo()
+        print("Figura 3D reaproveitada igual a uma figura nova")
+
+        # Memória: sem figuras, o pico não cresce com o número de pares
+        gerador = np.random.default_rng(43)
+        m = 400
+        sintetico = CatalogoColunar(nomes=[f"HIP {k}" for k in range(m)],
+                                    alfa_rad=gerador.uniform(0, 2 * np.pi, m),
+                                    delta_rad=np.arcsin(gerador.uniform(-1, 1, m)),
+                                    paralaxe_mas=gerador.uniform(1, 200, m))
+        picos = {}
+        for quantidade in (500, 5000):
+            tracemalloc.start()
+            resumo = gerar_relatorio(sintetico,
+                                     itertools.islice(itertools.combinations(range(m), 2), quantidade),
+                                     os.path.join(temporario, f"texto_{quantidade}.md"), figuras=())
+            picos[quantidade] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            assert resumo.pares == quantidade
+            print(f"Só texto:  {resumo} (pico {picos[quantidade] / 1024:.0f} KiB)")
+        assert picos[5000] < 2 * picos[500]
+
+        # Vazão das figuras, para estimar um relatório de 10 000 pares
+        amostra = list(itertools.islice(itertools.combinations(range(n - 12, n), 2), 12))
+        resumo = gerar_relatorio(catalogo, amostra, os.path.join(temporario, "vazao.html"),
+                                 diretorio_figuras=os.path.join(temporario, "vazao"),
+                                 processos=processos)
+        print(f"Vazão:     {resumo}")
+        estimativa = 10_000 / resumo.pares_por_segundo
+        print(f"Estimativa para 10 000 pares com {processos} processo(s) em {os.cpu_count()} núcleo(s): "
+              f"{estimativa / 60:.0f} min (inclui a criação das figuras em cada processo)")
+
+    print("\n✅ Teste concluído com sucesso!")
+
+
+if __name__ == "__main__":
+    teste_relatorios()
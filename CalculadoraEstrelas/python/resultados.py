@@ -0,0 +1,335 @@
+"""
+Calculadora Geométrica de Distância Entre Estrelas
+Resultados em Lote Colunares (exportação sem objetos por linha)
+
+Autor: Luiz Tiago Wilcke
+Data: 2025
+"""
+
+import importlib.util
+import json
+import math
+import os
+from typing import Optional, Sequence
+
+import numpy as np
+
+from calculos import (
+    CalculadoraGeometrica, ResultadoCalculo, GRAUS_POR_RADIANO, PARSEC_PARA_ANOS_LUZ
+)
+from colunar import CatalogoColunar
+from espacial import blocos_de_pares, PARES_POR_BLOCO
+
+# Colunas numéricas de ResultadoCalculo, mais os índices das estrelas no catálogo
+TIPOS_COLUNAS = {
+    "i": np.int64,
+    "j": np.int64,
+    "separacao_angular_rad": np.float64,
+    "separacao_angular_graus": np.float64,
+    "distancia1_parsecs": np.float64,
+    "distancia2_parsecs": np.float64,
+    "distancia_real_parsecs": np.float64,
+    "distancia_real_anos_luz": np.float64,
+}
+
+ARQUIVO_METADADOS = "resultados.json"
+VERSAO_FORMATO = 1
+METODO = "Lei dos Cossenos Esférica + Distância 3D"
+
+
+def arrow_disponivel() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def _gravar_metadados(diretorio: str, pares: int, nomes: Optional[Sequence[str]]):
+    metadados = {"versao": VERSAO_FORMATO, "pares": pares, "metodo": METODO}
+    with open(os.path.join(diretorio, ARQUIVO_METADADOS), "w", encoding="utf-8") as arquivo:
+        json.dump(metadados, arquivo)
+    if nomes is not None:
+        with open(os.path.join(diretorio, "nomes.txt"), "w", encoding="utf-8") as arquivo:
+            arquivo.writelines(f"{nome}\n" for nome in nomes)
+
+
+class ResultadosLote:
+    """
+    Resultados de muitos pares em colunas (uma por campo de ResultadoCalculo)
+
+    As colunas são alocadas uma vez, com a capacidade pedida, e os motores
+    em lote escrevem nelas por fatias (adicionar, preencher_pares): nenhum
+    objeto Python por par. Com 'diretorio', cada coluna é um .npy mapeado
+    do disco (np.lib.format.open_memmap), escrito no lugar; o mesmo
+    diretório é depois aberto com abrir() em tempo constante, por quantos
+    processos quiserem (as páginas são compartilhadas pelo sistema).
+    Os nomes não são copiados: i e j apontam para o catálogo.
+    """
+
+    def __init__(self, capacidade: int, diretorio: Optional[str] = None,
+                 nomes: Optional[Sequence[str]] = None):
+        self.diretorio = diretorio
+        self.nomes = nomes
+        self.tamanho = 0
+        if diretorio is None:
+            self.colunas = {campo: np.empty(capacidade, dtype=tipo) for campo, tipo in TIPOS_COLUNAS.items()}
+        else:
+            os.makedirs(diretorio, exist_ok=True)
+            self.colunas = {campo: np.lib.format.open_memmap(os.path.join(diretorio, f"{campo}.npy"), mode="w+",
+                                                             dtype=tipo, shape=(capacidade,))
+                            for campo, tipo in TIPOS_COLUNAS.items()}
+
+    @property
+    def capacidade(self) -> int:
+        return len(self.colunas["i"])
+
+    def __len__(self) -> int:
+        return self.tamanho
+
+    def __getattr__(self, campo: str) -> np.ndarray:
+        """Coluna preenchida (vista, sem cópia): resultados.distancia_real_parsecs"""
+        colunas = self.__dict__.get("colunas", {})
+        if campo in colunas:
+            return colunas[campo][:self.__dict__["tamanho"]]
+        raise AttributeError(campo)
+
+    # ------------------------------------------------------------------
+    # Preenchimento no lugar
+    # ------------------------------------------------------------------
+
+    def _reservar(self, quantidade: int) -> slice:
+        if self.tamanho + quantidade > self.capacidade:
+            if self.diretorio is not None:
+                raise ValueError(f"Capacidade de {self.capacidade} pares excedida")
+            nova = max(2 * self.capacidade, self.tamanho + quantidade)
+            for campo, coluna in self.colunas.items():
+                maior = np.empty(nova, dtype=coluna.dtype)
+                maior[:self.tamanho] = coluna[:self.tamanho]
+                self.colunas[campo] = maior
+        trecho = slice(self.tamanho, self.tamanho + quantidade)
+        self.tamanho += quantidade
+        return trecho
+
+    def adicionar(self, i: np.ndarray, j: np.ndarray, theta: np.ndarray, distancia_real: np.ndarray,
+                  distancia_parsecs: np.ndarray):
+        """Escrever um bloco de pares já calculados; distancia_parsecs é a coluna do catálogo"""
+        t = self._reservar(len(i))
+        c = self.colunas
+        c["i"][t] = i
+        c["j"][t] = j
+        c["separacao_angular_rad"][t] = theta
+        np.multiply(theta, GRAUS_POR_RADIANO, out=c["separacao_angular_graus"][t])
+        np.take(distancia_parsecs, i, out=c["distancia1_parsecs"][t])
+        np.take(distancia_parsecs, j, out=c["distancia2_parsecs"][t])
+        c["distancia_real_parsecs"][t] = distancia_real
+        np.multiply(distancia_real, PARSEC_PARA_ANOS_LUZ, out=c["distancia_real_anos_luz"][t])
+
+    def preencher_pares(self, catalogo: CatalogoColunar, i: np.ndarray, j: np.ndarray,
+                        pares_por_bloco: int = PARES_POR_BLOCO):
+        """Calcular os pares (i, j) no motor atual, bloco a bloco, direto nas colunas"""
+        for inicio in range(0, len(i), pares_por_bloco):
+            bi, bj = i[inicio:inicio + pares_por_bloco], j[inicio:inicio + pares_por_bloco]
+            theta, distancia = catalogo.pares(bi, bj)
+            self.adicionar(bi, bj, theta, distancia, catalogo.distancia_parsecs)
+
+    @classmethod
+    def de_pares(cls, catalogo: CatalogoColunar, i: np.ndarray, j: np.ndarray,
+                 diretorio: Optional[str] = None) -> "ResultadosLote":
+        resultados = cls(len(i), diretorio, catalogo.nomes)
+        resultados.preencher_pares(catalogo, np.asarray(i), np.asarray(j))
+        return resultados.finalizar()
+
+    @classmethod
+    def todos_os_pares(cls, catalogo: CatalogoColunar, diretorio: Optional[str] = None,
+                       pares_por_bloco: int = PARES_POR_BLOCO) -> "ResultadosLote":
+        """Todos os pares i < j, como calcular_distancia_entre_estrelas, sem materializar a lista de pares"""
+        n = len(catalogo)
+        resultados = cls(n * (n - 1) // 2, diretorio, catalogo.nomes)
+        for i, j in blocos_de_pares(n, pares_por_bloco):
+            theta, distancia = catalogo.pares(i, j)
+            resultados.adicionar(i, j, theta, distancia, catalogo.distancia_parsecs)
+        return resultados.finalizar()
+
+    def finalizar(self) -> "ResultadosLote":
+        """Gravar os metadados (no modo em disco) e devolver o próprio objeto"""
+        if self.diretorio is not None:
+            for coluna in self.colunas.values():
+                coluna.flush()
+            _gravar_metadados(self.diretorio, self.tamanho, self.nomes)
+        return self
+
+    # ------------------------------------------------------------------
+    # Acesso por linha (compatibilidade com ResultadoCalculo)
+    # ------------------------------------------------------------------
+
+    def resultado(self, k: int) -> ResultadoCalculo:
+        """ResultadoCalculo do k-ésimo par (criado só quando pedido)"""
+        if not 0 <= k < self.tamanho:
+            raise IndexError(k)
+        linha = {campo: coluna[k].item() for campo, coluna in self.colunas.items()}
+        i, j = linha.pop("i"), linha.pop("j")
+        nomes = self.nomes if self.nomes is not None else [""] * (max(i, j) + 1)
+        resultado = ResultadoCalculo(nome_estrela1=nomes[i], nome_estrela2=nomes[j],
+                                     metodo_usado=METODO, **linha)
+        resultado.equacao_usada = CalculadoraGeometrica._gerar_texto_equacao(resultado)
+        return resultado
+
+    # ------------------------------------------------------------------
+    # Exportação
+    # ------------------------------------------------------------------
+
+    def salvar(self, diretorio: str) -> "ResultadosLote":
+        """Copiar as colunas para 'diretorio' (um .npy por coluna) e abri-lo mapeado"""
+        os.makedirs(diretorio, exist_ok=True)
+        for campo in TIPOS_COLUNAS:
+            np.save(os.path.join(diretorio, f"{campo}.npy"), getattr(self, campo))
+        _gravar_metadados(diretorio, self.tamanho, self.nomes)
+        return type(self).abrir(diretorio)
+
+    @classmethod
+    def abrir(cls, diretorio: str, modo: str = "r") -> "ResultadosLote":
+        """Abrir um diretório de resultados sem ler os dados (memmap; modo 'r' ou 'r+')"""
+        with open(os.path.join(diretorio, ARQUIVO_METADADOS), encoding="utf-8") as arquivo:
+            metadados = json.load(arquivo)
+        if metadados.get("versao") != VERSAO_FORMATO:
+            raise ValueError(f"Versão de resultados não suportada: {metadados.get('versao')}")
+        caminho_nomes = os.path.join(diretorio, "nomes.txt")
+        nomes = None
+        if os.path.exists(caminho_nomes):
+            with open(caminho_nomes, encoding="utf-8") as arquivo:
+                nomes = arquivo.read().splitlines()
+        resultados = object.__new__(cls)
+        resultados.__dict__.update(
+            diretorio=diretorio, nomes=nomes, tamanho=metadados["pares"],
+            colunas={campo: np.load(os.path.join(diretorio, f"{campo}.npy"), mmap_mode=modo)
+                     for campo in TIPOS_COLUNAS})
+        return resultados
+
+    def salvar_npz(self, caminho: str, comprimir: bool = False):
+        """Todas as colunas em um .npz (np.load(caminho)[campo]); para transporte, não para mapear"""
+        salvar = np.savez_compressed if comprimir else np.savez
+        salvar(caminho, **{campo: getattr(self, campo) for campo in TIPOS_COLUNAS})
+
+    def tabela_arrow(self):
+        """pyarrow.Table com as colunas (sem cópia: os buffers são os próprios arrays)"""
+        if not arrow_disponivel():
+            raise ImportError("Exportação Arrow indisponível: pyarrow não instalado")
+        import pyarrow as pa
+        return pa.table({campo: pa.array(getattr(self, campo)) for campo in TIPOS_COLUNAS})
+
+    def salvar_arrow(self, caminho: str):
+        """Arquivo Arrow IPC (Feather v2), legível por pandas, polars, DuckDB etc."""
+        tabela = self.tabela_arrow()
+        import pyarrow as pa
+        with pa.OSFile(caminho, "wb") as arquivo, pa.ipc.new_file(arquivo, tabela.schema) as escritor:
+            escritor.write_table(tabela)
+
+    @staticmethod
+    def abrir_arrow(caminho: str):
+        """Tabela de um arquivo Arrow IPC, mapeada do disco (sem ler os dados)"""
+        if not arrow_disponivel():
+            raise ImportError("Leitura Arrow indisponível: pyarrow não instalado")
+        import pyarrow as pa
+        return pa.ipc.open_file(pa.memory_map(caminho, "r")).read_all()
+
+
+# ============================================================================
+# Testes
+# ============================================================================
+
+def _soma_distancias(diretorio: str) -> float:
+    """Usado pelo teste em outro processo: abre o diretório e soma uma coluna"""
+    return float(ResultadosLote.abrir(diretorio).distancia_real_parsecs.sum())
+
+
+def teste_resultados():
+    """Preenchimento no lugar, exportações e abertura instantânea em outro processo"""
+    print("=" * 60)
+    print("TESTE: Resultados em Lote Colunares")
+    print("=" * 60)
+
+    import tempfile
+    import time
+    from concurrent.futures import ProcessPoolExecutor
+    from catalogo import CATALOGO_ESTRELAS, estrela_de_registro
+    from paridade import catalogo_sintetico
+
+    # Igual a calcular_distancia_entre_estrelas, campo a campo
+    catalogo = CatalogoColunar.de_registros()
+    resultados = ResultadosLote.todos_os_pares(catalogo, pares_por_bloco=50)
+    estrelas = [estrela_de_registro(r) for r in CATALOGO_ESTRELAS]
+    for k in range(len(resultados)):
+        i, j = int(resultados.i[k]), int(resultados.j[k])
+        esperado = CalculadoraGeometrica.calcular_distancia_entre_estrelas(estrelas[i], estrelas[j])
+        obtido = resultados.resultado(k)
+        assert obtido.nome_estrela1 == esperado.nome_estrela1 and obtido.equacao_usada
+        for campo in TIPOS_COLUNAS:
+            if campo not in ("i", "j"):
+                assert math.isclose(getattr(obtido, campo), getattr(esperado, campo),
+                                    rel_tol=1e-12, abs_tol=1e-12), (campo, k)
+    print(f"\nCatálogo embutido: {len(resultados)} pares iguais a calcular_distancia_entre_estrelas")
+
+    # Colunas × lista de ResultadoCalculo
+    grande = catalogo_sintetico(2000)
+    inicio = time.perf_counter()
+    resultados = ResultadosLote.todos_os_pares(grande)
+    colunar = time.perf_counter() - inicio
+    amostra = 20000
+    inicio = time.perf_counter()
+    objetos = [resultados.resultado(k) for k in range(amostra)]
+    por_objeto = (time.perf_counter() - inicio) / amostra * len(resultados)
+    del objetos
+    print(f"{len(resultados)} pares: colunas em {colunar:.2f} s; como ResultadoCalculo seriam "
+          f"~{por_objeto:.0f} s ({por_objeto / colunar:.0f}× mais)")
+
+    with tempfile.TemporaryDirectory() as temporario:
+        # Preenchido direto no disco; aberto de novo sem ler os dados
+        diretorio = os.path.join(temporario, "pares")
+        em_disco = ResultadosLote.todos_os_pares(grande, diretorio)
+        inicio = time.perf_counter()
+        aberto = ResultadosLote.abrir(diretorio)
+        abertura = time.perf_counter() - inicio
+        assert isinstance(aberto.colunas["i"], np.memmap) and len(aberto) == len(resultados)
+        for campo in TIPOS_COLUNAS:
+            assert np.array_equal(getattr(aberto, campo), getattr(resultados, campo)), campo
+        assert aberto.resultado(5) == resultados.resultado(5)
+        bytes_total = sum(c.nbytes for c in aberto.colunas.values())
+        print(f"Diretório de {bytes_total / 2**20:.0f} MiB aberto em {abertura * 1e3:.1f} ms")
+        del em_disco
+
+        # Outro processo abre e lê o mesmo diretório
+        with ProcessPoolExecutor(1) as executor:
+            soma = executor.submit(_soma_distancias, diretorio).result()
+        assert soma == float(resultados.distancia_real_parsecs.sum())
+        print("Outro processo leu as mesmas colunas mapeadas")
+
+        # Cópia para outro diretório, .npz e crescimento em memória
+        copia = resultados.salvar(os.path.join(temporario, "copia"))
+        assert np.array_equal(copia.distancia_real_parsecs, resultados.distancia_real_parsecs)
+        caminho_npz = os.path.join(temporario, "pares.npz")
+        resultados.salvar_npz(caminho_npz)
+        with np.load(caminho_npz) as npz:
+            assert np.array_equal(npz["separacao_angular_graus"], resultados.separacao_angular_graus)
+        crescente = ResultadosLote(1)
+        crescente.preencher_pares(grande, resultados.i[:1000], resultados.j[:1000], pares_por_bloco=64)
+        assert np.array_equal(crescente.distancia_real_parsecs, resultados.distancia_real_parsecs[:1000])
+
+        if arrow_disponivel():
+            caminho_arrow = os.path.join(temporario, "pares.arrow")
+            resultados.salvar_arrow(caminho_arrow)
+            tabela = ResultadosLote.abrir_arrow(caminho_arrow)
+            assert np.array_equal(tabela["distancia_real_parsecs"].to_numpy(),
+                                  resultados.distancia_real_parsecs)
+            print("Arrow IPC: gravado e reaberto mapeado")
+        else:
+            for exportar in (resultados.tabela_arrow, lambda: ResultadosLote.abrir_arrow(caminho_npz)):
+                try:
+                    exportar()
+                except ImportError:
+                    pass
+                else:
+                    raise AssertionError("ImportError esperado sem pyarrow")
+            print("Arrow IPC: pyarrow não instalado (ImportError; exportação Arrow não testada)")
+
+    print("\n✅ Teste concluído com sucesso!")
+
+
+if __name__ == "__main__":
+    teste_resultados()
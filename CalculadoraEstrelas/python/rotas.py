@@ -0,0 +1,277 @@
+"""
+Calculadora Geométrica de Distância Entre Estrelas
+Rotas de Vários Saltos entre Estrelas (A* com Salto Máximo)
+
+Autor: Luiz Tiago Wilcke
+Data: 2025
+"""
+
+import heapq
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+from calculos import CalculadoraGeometrica, ResultadoCalculo, PARSEC_PARA_ANOS_LUZ
+from colunar import CatalogoColunar
+from espacial import GradeEspacial
+
+# Índice usado para o Sol nas rotas (ele não é uma linha do catálogo)
+SOL = -1
+
+# Folga relativa do raio da grade (a decisão final usa a distância real exata)
+FOLGA_GRADE = 1e-9
+
+# A heurística (reta até o destino) é reduzida nesta fração para continuar
+# admissível mesmo com o arredondamento da Lei dos Cossenos
+FOLGA_HEURISTICA = 1e-12
+
+No = Union[int, str]
+
+
+@dataclass
+class Rota:
+    """Sequência de estrelas e o cálculo de cada salto"""
+    indices: List[int]
+    nomes: List[str]
+    saltos: List[ResultadoCalculo] = field(default_factory=list)
+    nos_expandidos: int = 0
+
+    @property
+    def num_saltos(self) -> int:
+        return len(self.saltos)
+
+    @property
+    def distancia_total_parsecs(self) -> float:
+        return sum(s.distancia_real_parsecs for s in self.saltos)
+
+    @property
+    def distancia_total_anos_luz(self) -> float:
+        return self.distancia_total_parsecs * PARSEC_PARA_ANOS_LUZ
+
+    @property
+    def maior_salto_parsecs(self) -> float:
+        return max((s.distancia_real_parsecs for s in self.saltos), default=0.0)
+
+
+class PlanejadorRotas:
+    """
+    Rotas mais curtas em que nenhum salto passa de salto_maximo_pc
+
+    O grafo de vizinhança não é montado: a grade espacial é construída uma
+    vez (O(N log N)) e os vizinhos de cada estrela só são consultados quando
+    o A* a expande. Estrelas sem paralaxe positiva não participam.
+    """
+
+    def __init__(self, catalogo: CatalogoColunar, salto_maximo_pc: float):
+        if salto_maximo_pc <= 0:
+            raise ValueError("O salto máximo deve ser positivo")
+        self.catalogo = catalogo
+        self.salto_maximo = float(salto_maximo_pc)
+        self.validas = np.flatnonzero(catalogo.paralaxe_mas > 0)
+        # Nós locais: as estrelas válidas e, por último, o Sol na origem
+        self.sol = len(self.validas)
+        posicoes = np.vstack([catalogo.cartesianas[self.validas], np.zeros((1, 3))])
+        self.posicoes = posicoes
+        self.grade = GradeEspacial(posicoes, self.salto_maximo * (1.0 + FOLGA_GRADE))
+        self._distancia = catalogo.distancia_parsecs[self.validas]
+
+    def _no(self, no: No) -> int:
+        """Converter índice do catálogo, nome ou SOL para o nó local"""
+        if isinstance(no, str):
+            if no.strip().casefold() == "sol":
+                return self.sol
+            try:
+                no = self.catalogo.nomes.index(no)
+            except ValueError:
+                raise ValueError(f"Estrela não encontrada no catálogo: {no}") from None
+        if no == SOL:
+            return self.sol
+        local = int(np.searchsorted(self.validas, no))
+        if local == len(self.validas) or self.validas[local] != no:
+            raise ValueError(f"A estrela {self.catalogo.nomes[no]} não tem paralaxe positiva")
+        return local
+
+    def _indice(self, local: int) -> int:
+        return SOL if local == self.sol else int(self.validas[local])
+
+    def _vizinhos(self, local: int):
+        """Vizinhos a até salto_maximo e a distância real até cada um"""
+        candidatos, _ = self.grade.vizinhos(self.posicoes[local], self.grade.tamanho_celula)
+        candidatos = candidatos[candidatos != local]
+        estrelas = candidatos[candidatos != self.sol]
+        if local == self.sol:
+            distancias = self._distancia[estrelas]
+        else:
+            _, distancias = self._pares(np.full(len(estrelas), local), estrelas)
+        if len(estrelas) != len(candidatos):
+            # O Sol é vizinho: a distância é a da paralaxe da estrela
+            estrelas = np.append(estrelas, self.sol)
+            distancias = np.append(distancias, self._distancia[local])
+        dentro = distancias <= self.salto_maximo
+        return estrelas[dentro], distancias[dentro]
+
+    def _pares(self, i: np.ndarray, j: np.ndarray):
+        return self.catalogo.pares(self.validas[i], self.validas[j])
+
+    def rota(self, origem: No, destino: No) -> Optional[Rota]:
+        """
+        Rota mais curta (soma das distâncias reais) de origem até destino
+
+        origem e destino: índice no catálogo, nome da estrela ou SOL/"Sol".
+        Retorna None se nenhuma cadeia de saltos <= salto_maximo liga os dois.
+        """
+        inicio, fim = self._no(origem), self._no(destino)
+        alvo = self.posicoes[fim]
+
+        def heuristica(nos: np.ndarray) -> np.ndarray:
+            return np.linalg.norm(self.posicoes[nos] - alvo, axis=1) * (1.0 - FOLGA_HEURISTICA)
+
+        custo: Dict[int, float] = {inicio: 0.0}
+        anterior: Dict[int, int] = {}
+        fechados = set()
+        fronteira = [(float(heuristica(np.array([inicio]))[0]), 0.0, inicio)]
+        while fronteira:
+            _, g, no = heapq.heappop(fronteira)
+            if no in fechados:
+                continue
+            if no == fim:
+                break
+            fechados.add(no)
+            vizinhos, distancias = self._vizinhos(no)
+            novos = g + distancias
+            estimativas = novos + heuristica(vizinhos)
+            for vizinho, c, f in zip(vizinhos.tolist(), novos.tolist(), estimativas.tolist()):
+                if c < custo.get(vizinho, math.inf):
+                    custo[vizinho] = c
+                    anterior[vizinho] = no
+                    heapq.heappush(fronteira, (f, c, vizinho))
+        else:
+            return None
+
+        caminho = [fim]
+        while caminho[-1] != inicio:
+            caminho.append(anterior[caminho[-1]])
+        caminho.reverse()
+        indices = [self._indice(no) for no in caminho]
+        return Rota(indices=indices, nomes=[self._nome(i) for i in indices],
+                    saltos=[self._salto(a, b) for a, b in zip(indices, indices[1:])],
+                    nos_expandidos=len(fechados))
+
+    def _nome(self, indice: int) -> str:
+        return "Sol" if indice == SOL else self.catalogo.nomes[indice]
+
+    def _salto(self, a: int, b: int) -> ResultadoCalculo:
+        """ResultadoCalculo do salto a → b (o Sol entra com distância 0)"""
+        if SOL not in (a, b):
+            return CalculadoraGeometrica.calcular_distancia_entre_estrelas(
+                self.catalogo.estrela(a), self.catalogo.estrela(b))
+        estrela = b if a == SOL else a
+        distancia = float(self.catalogo.distancia_parsecs[estrela])
+        return ResultadoCalculo(
+            nome_estrela1=self._nome(a), nome_estrela2=self._nome(b),
+            distancia1_parsecs=0.0 if a == SOL else distancia,
+            distancia2_parsecs=0.0 if b == SOL else distancia,
+            distancia_real_parsecs=distancia,
+            distancia_real_anos_luz=distancia * PARSEC_PARA_ANOS_LUZ,
+            metodo_usado="Distância por Paralaxe",
+            equacao_usada=f"d = 1000 / p = {distancia:.4f} pc",
+        )
+
+
+def planejar_rota(catalogo: CatalogoColunar, origem: No, destino: No,
+                  salto_maximo_pc: float) -> Optional[Rota]:
+    """Rota mais curta entre duas estrelas (ou o Sol) com saltos <= salto_maximo_pc"""
+    return PlanejadorRotas(catalogo, salto_maximo_pc).rota(origem, destino)
+
+
+def _dijkstra_denso(posicoes: np.ndarray, inicio: int, fim: int, salto: float) -> float:
+    """Referência com a matriz completa de distâncias (apenas catálogos pequenos)"""
+    distancias = np.linalg.norm(posicoes[:, None] - posicoes[None], axis=2)
+    distancias[distancias > salto] = np.inf
+    custo = np.full(len(posicoes), np.inf)
+    custo[inicio] = 0.0
+    abertos = np.ones(len(posicoes), dtype=bool)
+    while abertos.any():
+        candidatos = np.where(abertos, custo, np.inf)
+        no = int(np.argmin(candidatos))
+        if not np.isfinite(candidatos[no]) or no == fim:
+            break
+        abertos[no] = False
+        custo = np.minimum(custo, custo[no] + distancias[no])
+    return float(custo[fim])
+
+
+def demonstracao_rotas():
+    """Sol → Vega no catálogo padrão e verificação com Dijkstra denso"""
+    print("=" * 60)
+    print("DEMONSTRAÇÃO: Rotas entre Estrelas")
+    print("=" * 60)
+
+    catalogo = CatalogoColunar.de_registros()
+    for salto in (5.0, 6.0):
+        rota = planejar_rota(catalogo, "Sol", "Vega", salto)
+        print(f"\nSol → Vega com saltos de até {salto} pc:")
+        if rota is None:
+            print("  nenhuma rota")
+            continue
+        for s in rota.saltos:
+            print(f"  {s.nome_estrela1:>16s} → {s.nome_estrela2:<16s} {s.distancia_real_parsecs:6.3f} pc")
+        print(f"  total {rota.distancia_total_parsecs:.3f} pc em {rota.num_saltos} saltos")
+
+    # Verificação: mesmo custo que Dijkstra sobre o grafo completo
+    gerador = np.random.default_rng(17)
+    n = 400
+    sintetico = CatalogoColunar(
+        nomes=[f"S{i}" for i in range(n)],
+        alfa_rad=gerador.uniform(0, 2 * math.pi, n),
+        delta_rad=np.arcsin(gerador.uniform(-1, 1, n)),
+        paralaxe_mas=np.where(gerador.random(n) < 0.03, 0.0, 1000.0 / gerador.uniform(1, 30, n)),
+    )
+    planejador = PlanejadorRotas(sintetico, 4.0)
+    resolvidas = 0
+    for _ in range(40):
+        origem, destino = (int(k) for k in gerador.choice(planejador.validas, 2, replace=False))
+        if gerador.random() < 0.25:
+            origem = SOL
+        rota = planejador.rota(origem, destino)
+        esperado = _dijkstra_denso(planejador.posicoes, planejador._no(origem),
+                                   planejador._no(destino), 4.0)
+        if rota is None:
+            assert not np.isfinite(esperado)
+            continue
+        assert rota.maior_salto_parsecs <= 4.0
+        assert abs(rota.distancia_total_parsecs - esperado) < 1e-9, (rota.distancia_total_parsecs,
+                                                                     esperado)
+        resolvidas += 1
+    print(f"\n40 consultas aleatórias (N={n}), {resolvidas} com rota: iguais ao Dijkstra denso")
+
+    # Escala: 10^6 estrelas em um cubo de 200 pc centrado no Sol
+    n = 1_000_000
+    posicoes = gerador.uniform(-100, 100, (n, 3))
+    distancia = np.linalg.norm(posicoes, axis=1)
+    grande = CatalogoColunar(
+        nomes=[""] * n,
+        alfa_rad=np.mod(np.arctan2(posicoes[:, 1], posicoes[:, 0]), 2 * math.pi),
+        delta_rad=np.arcsin(posicoes[:, 2] / distancia),
+        paralaxe_mas=1000.0 / distancia,
+    )
+    inicio = time.perf_counter()
+    planejador = PlanejadorRotas(grande, 3.0)
+    construcao = time.perf_counter() - inicio
+    destino = int(np.argmin(np.linalg.norm(posicoes - [60.0, 50.0, -40.0], axis=1)))
+    inicio = time.perf_counter()
+    rota = planejador.rota(SOL, destino)
+    busca = time.perf_counter() - inicio
+    print(f"N={n:,}: índice em {construcao:.2f} s; Sol → estrela a "
+          f"{distancia[destino]:.1f} pc em {rota.num_saltos} saltos "
+          f"({rota.distancia_total_parsecs:.1f} pc), {rota.nos_expandidos:,} nós expandidos "
+          f"em {busca:.2f} s")
+
+    print("\n✅ Demonstração concluída!")
+
+
+if __name__ == "__main__":
+    demonstracao_rotas()
@@ -0,0 +1,489 @@
+"""
+Calculadora Geométrica de Distância Entre Estrelas
+Tarefas de Todos os Pares em Ladrilhos Retomáveis
+
+Autor: Luiz Tiago Wilcke
+Data: 2025
+"""
+
+import hashlib
+import json
+import os
+import socket
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from colunar import CatalogoColunar, TIPO_REGISTRO_LOTE
+from resultados import ResultadosLote
+
+# Estrelas por lado de ladrilho: um ladrilho completo tem até 1 M pares (32 MB)
+TAMANHO_LADRILHO = 1024
+
+# Uma reivindicação sem ladrilho concluído depois deste tempo é considerada
+# abandonada (processo ou máquina que caiu) e pode ser tomada por outro
+EXPIRACAO_PADRAO_S = 3600.0
+
+VERSAO_MANIFESTO = 1
+ARQUIVO_MANIFESTO = "manifesto.json"
+ARQUIVO_CATALOGO = "catalogo.bin"
+DIRETORIO_RESULTADOS = "resultados"
+DIRETORIO_REIVINDICACOES = "reivindicacoes"
+
+
+# ============================================================================
+# Manifesto
+# ============================================================================
+
+@dataclass(frozen=True)
+class Ladrilho:
+    """Pares (i, j), i < j, com i em [inicio_i, fim_i) e j em [inicio_j, fim_j)"""
+    numero: int
+    inicio_i: int
+    fim_i: int
+    inicio_j: int
+    fim_j: int
+
+    @property
+    def nome(self) -> str:
+        return f"ladrilho_{self.numero:06d}"
+
+    @property
+    def diagonal(self) -> bool:
+        return self.inicio_i == self.inicio_j
+
+    @property
+    def numero_pares(self) -> int:
+        linhas = self.fim_i - self.inicio_i
+        if self.diagonal:
+            return linhas * (linhas - 1) // 2
+        return linhas * (self.fim_j - self.inicio_j)
+
+    def pares(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Índices (i, j) do ladrilho, ordenados por i e depois por j"""
+        if self.diagonal:
+            i, j = np.triu_indices(self.fim_i - self.inicio_i, 1)
+            return i + self.inicio_i, j + self.inicio_j
+        i = np.repeat(np.arange(self.inicio_i, self.fim_i), self.fim_j - self.inicio_j)
+        j = np.tile(np.arange(self.inicio_j, self.fim_j), self.fim_i - self.inicio_i)
+        return i, j
+
+
+def dividir_em_ladrilhos(n: int, tamanho: int = TAMANHO_LADRILHO) -> List[Ladrilho]:
+    """Ladrilhos (a, b), a <= b, da matriz triangular superior, sempre na mesma ordem"""
+    inicios = list(range(0, n, tamanho))
+    ladrilhos = []
+    for a, inicio_i in enumerate(inicios):
+        for inicio_j in inicios[a:]:
+            ladrilho = Ladrilho(len(ladrilhos), inicio_i, min(inicio_i + tamanho, n),
+                                inicio_j, min(inicio_j + tamanho, n))
+            if ladrilho.numero_pares:
+                ladrilhos.append(ladrilho)
+    return ladrilhos
+
+
+def _hash_arquivo(caminho: str) -> str:
+    resumo = hashlib.sha256()
+    with open(caminho, "rb") as arquivo:
+        for pedaco in iter(lambda: arquivo.read(1 << 20), b""):
+            resumo.update(pedaco)
+    return resumo.hexdigest()
+
+
+def _gravar_atomico(caminho: str, gravar):
+    """gravar(arquivo) em um temporário no mesmo diretório, depois os.replace"""
+    temporario = f"{caminho}.{socket.gethostname()}.{os.getpid()}.tmp"
+    try:
+        with open(temporario, "wb") as arquivo:
+            gravar(arquivo)
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+        os.replace(temporario, caminho)
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+
+
+def criar_tarefa(catalogo: CatalogoColunar, diretorio: str, tamanho_ladrilho: int = TAMANHO_LADRILHO,
+                 limite_pc: Optional[float] = None) -> dict:
+    """
+    Preparar (ou retomar) uma tarefa de todos os pares em 'diretorio'
+
+    Grava o catálogo (α, δ, paralaxe) e o manifesto com a lista de ladrilhos.
+    Com limite_pc, só os pares com distância real <= limite_pc são guardados
+    (como calculadora_lote --limite). Se o diretório já tem uma tarefa com o
+    mesmo catálogo e os mesmos parâmetros, ela é retomada sem mudanças; se os
+    parâmetros diferem, ValueError.
+    """
+    os.makedirs(os.path.join(diretorio, DIRETORIO_RESULTADOS), exist_ok=True)
+    os.makedirs(os.path.join(diretorio, DIRETORIO_REIVINDICACOES), exist_ok=True)
+    caminho_catalogo = os.path.join(diretorio, ARQUIVO_CATALOGO)
+    temporario = caminho_catalogo + f".{os.getpid()}.novo"
+    catalogo.salvar_binario(temporario)
+    manifesto = {
+        "versao": VERSAO_MANIFESTO,
+        "estrelas": len(catalogo),
+        "hash_catalogo": _hash_arquivo(temporario),
+        "tamanho_ladrilho": tamanho_ladrilho,
+        "limite_pc": limite_pc,
+        "ladrilhos": [[l.numero, l.inicio_i, l.fim_i, l.inicio_j, l.fim_j]
+                      for l in dividir_em_ladrilhos(len(catalogo), tamanho_ladrilho)],
+    }
+
+    caminho_manifesto = os.path.join(diretorio, ARQUIVO_MANIFESTO)
+    if os.path.exists(caminho_manifesto):
+        os.remove(temporario)
+        existente = ler_manifesto(diretorio)
+        if existente != manifesto:
+            raise ValueError(f"{diretorio} já contém uma tarefa com outro catálogo ou outros parâmetros")
+        return existente
+    os.replace(temporario, caminho_catalogo)
+    _gravar_atomico(caminho_manifesto,
+                    lambda arquivo: arquivo.write(json.dumps(manifesto).encode("utf-8")))
+    return manifesto
+
+
+def ler_manifesto(diretorio: str) -> dict:
+    with open(os.path.join(diretorio, ARQUIVO_MANIFESTO), encoding="utf-8") as arquivo:
+        manifesto = json.load(arquivo)
+    if manifesto.get("versao") != VERSAO_MANIFESTO:
+        raise ValueError(f"Versão de manifesto não suportada: {manifesto.get('versao')}")
+    return manifesto
+
+
+def ladrilhos_do_manifesto(manifesto: dict) -> List[Ladrilho]:
+    return [Ladrilho(*campos) for campos in manifesto["ladrilhos"]]
+
+
+def _caminho_resultado(diretorio: str, ladrilho: Ladrilho) -> str:
+    return os.path.join(diretorio, DIRETORIO_RESULTADOS, f"{ladrilho.nome}.npy")
+
+
+def _caminho_reivindicacao(diretorio: str, ladrilho: Ladrilho) -> str:
+    return os.path.join(diretorio, DIRETORIO_REIVINDICACOES, f"{ladrilho.nome}.json")
+
+
+# ============================================================================
+# Reivindicação e cálculo dos ladrilhos
+# ============================================================================
+
+def identificar_trabalhador() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _caminho_privado(caminho: str, trabalhador: str, sufixo: str) -> str:
+    return f"{caminho}.{trabalhador.replace(':', '_').replace(os.sep, '_')}.{sufixo}"
+
+
+def _restaurar(privado: str, caminho: str):
+    """Devolver uma reivindicação tirada do lugar sem sobrescrever outra que já esteja lá"""
+    try:
+        os.link(privado, caminho)
+    except FileExistsError:
+        pass
+    finally:
+        os.remove(privado)
+
+
+def _reivindicar(diretorio: str, ladrilho: Ladrilho, trabalhador: str, expiracao_s: float) -> bool:
+    """
+    Criar a reivindicação do ladrilho com O_EXCL (também entre máquinas num
+    diretório compartilhado)
+
+    Uma reivindicação mais antiga que expiracao_s é primeiro renomeada para
+    um caminho só deste trabalhador (o rename é atômico: só um trabalhador
+    a obtém) e a idade é conferida de novo no arquivo renomeado; se ela for
+    recente (outro trabalhador acabou de reivindicar o ladrilho), volta ao
+    lugar com os.link, que não sobrescreve. Em intercalações raras dois
+    trabalhadores ainda podem calcular o mesmo ladrilho; isso só custa
+    tempo, pois o resultado é determinístico e gravado atomicamente.
+    """
+    caminho = _caminho_reivindicacao(diretorio, ladrilho)
+    for _ in range(2):
+        try:
+            descritor = os.open(caminho, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            privado = _caminho_privado(caminho, trabalhador, "expirada")
+            try:
+                if time.time() - os.path.getmtime(caminho) < expiracao_s:
+                    return False
+                os.replace(caminho, privado)
+            except FileNotFoundError:
+                return False          # liberada agora: o ladrilho acabou de ser concluído
+            if time.time() - os.path.getmtime(privado) < expiracao_s:
+                _restaurar(privado, caminho)
+                return False
+            os.remove(privado)
+            continue
+        with os.fdopen(descritor, "w", encoding="utf-8") as arquivo:
+            json.dump({"trabalhador": trabalhador, "inicio": time.time()}, arquivo)
+        return True
+    return False
+
+
+def _liberar(diretorio: str, ladrilho: Ladrilho, trabalhador: str):
+    """Remover a reivindicação do ladrilho, se ainda for deste trabalhador"""
+    caminho = _caminho_reivindicacao(diretorio, ladrilho)
+    privado = _caminho_privado(caminho, trabalhador, "liberada")
+    try:
+        os.replace(caminho, privado)
+    except FileNotFoundError:
+        return
+    try:
+        with open(privado, encoding="utf-8") as arquivo:
+            dono = json.load(arquivo).get("trabalhador")
+    except ValueError:
+        dono = None
+    if dono == trabalhador:
+        os.remove(privado)
+    else:
+        _restaurar(privado, caminho)
+
+
+def calcular_ladrilho(catalogo: CatalogoColunar, ladrilho: Ladrilho,
+                      limite_pc: Optional[float] = None) -> np.ndarray:
+    """Registros (i, j, θ, D) do ladrilho, como calcular_distancia_entre_estrelas"""
+    i, j = ladrilho.pares()
+    theta, distancia = catalogo.pares(i, j)
+    if limite_pc is not None:
+        mantidos = distancia <= limite_pc
+        i, j, theta, distancia = i[mantidos], j[mantidos], theta[mantidos], distancia[mantidos]
+    registros = np.empty(len(i), dtype=TIPO_REGISTRO_LOTE)
+    for campo, coluna in zip(TIPO_REGISTRO_LOTE.names, (i, j, theta, distancia)):
+        registros[campo] = coluna
+    return registros
+
+
+def trabalhar(diretorio: str, trabalhador: Optional[str] = None,
+              expiracao_s: float = EXPIRACAO_PADRAO_S, maximo: Optional[int] = None) -> int:
+    """
+    Processar ladrilhos pendentes até não sobrar nenhum livre
+
+    Cada ladrilho concluído é gravado atomicamente (temporário + os.replace)
+    em resultados/; um ladrilho só é pulado se esse arquivo existe, então
+    uma queda no meio de um ladrilho apenas o deixa para ser refeito.
+    Vários trabalhadores (processos ou máquinas) podem rodar no mesmo
+    diretório. Retorna o número de ladrilhos calculados por este trabalhador.
+    """
+    trabalhador = trabalhador or identificar_trabalhador()
+    manifesto = ler_manifesto(diretorio)
+    catalogo = CatalogoColunar.de_binario(os.path.join(diretorio, ARQUIVO_CATALOGO))
+    if len(catalogo) != manifesto["estrelas"]:
+        raise ValueError(f"O catálogo de {diretorio} não corresponde ao manifesto")
+
+    calculados = 0
+    for ladrilho in ladrilhos_do_manifesto(manifesto):
+        if maximo is not None and calculados >= maximo:
+            break
+        resultado = _caminho_resultado(diretorio, ladrilho)
+        if os.path.exists(resultado) or not _reivindicar(diretorio, ladrilho, trabalhador, expiracao_s):
+            continue
+        try:
+            if not os.path.exists(resultado):
+                registros = calcular_ladrilho(catalogo, ladrilho, manifesto["limite_pc"])
+                _gravar_atomico(resultado, lambda arquivo: np.save(arquivo, registros))
+                calculados += 1
+        finally:
+            _liberar(diretorio, ladrilho, trabalhador)
+    return calculados
+
+
+def executar_tarefa(diretorio: str, processos: Optional[int] = None,
+                    expiracao_s: float = EXPIRACAO_PADRAO_S) -> int:
+    """Rodar 'processos' trabalhadores locais até a tarefa terminar; retorna os ladrilhos calculados"""
+    processos = processos or os.cpu_count() or 1
+    if processos == 1:
+        return trabalhar(diretorio, expiracao_s=expiracao_s)
+    with ProcessPoolExecutor(processos) as executor:
+        futuros = [executor.submit(trabalhar, diretorio, None, expiracao_s) for _ in range(processos)]
+        return sum(futuro.result() for futuro in futuros)
+
+
+@dataclass
+class EstadoTarefa:
+    ladrilhos: int
+    concluidos: int
+    em_andamento: int
+    pares_concluidos: int
+    pares_totais: int
+
+    @property
+    def completa(self) -> bool:
+        return self.concluidos == self.ladrilhos
+
+    def __str__(self) -> str:
+        fracao = self.pares_concluidos / self.pares_totais if self.pares_totais else 1.0
+        return (f"{self.concluidos}/{self.ladrilhos} ladrilhos concluídos, {self.em_andamento} em andamento "
+                f"({fracao:.1%} dos {self.pares_totais} pares)")
+
+
+def estado_tarefa(diretorio: str) -> EstadoTarefa:
+    ladrilhos = ladrilhos_do_manifesto(ler_manifesto(diretorio))
+    concluidos = [l for l in ladrilhos if os.path.exists(_caminho_resultado(diretorio, l))]
+    em_andamento = sum(os.path.exists(_caminho_reivindicacao(diretorio, l)) for l in ladrilhos)
+    return EstadoTarefa(ladrilhos=len(ladrilhos), concluidos=len(concluidos), em_andamento=em_andamento,
+                        pares_concluidos=sum(l.numero_pares for l in concluidos),
+                        pares_totais=sum(l.numero_pares for l in ladrilhos))
+
+
+# ============================================================================
+# Junção
+# ============================================================================
+
+def registros_tarefa(diretorio: str) -> Iterator[np.ndarray]:
+    """Registros de cada ladrilho, na ordem do manifesto (mapeados do disco)"""
+    for ladrilho in ladrilhos_do_manifesto(ler_manifesto(diretorio)):
+        yield np.load(_caminho_resultado(diretorio, ladrilho), mmap_mode="r")
+
+
+def juntar_tarefa(diretorio: str, destino: str) -> int:
+    """
+    Juntar os ladrilhos em um único .npy de TIPO_REGISTRO_LOTE, na ordem do
+    manifesto (por ladrilho; dentro de cada um, por i e depois j). Copia um
+    ladrilho por vez e grava o destino atomicamente. Retorna o número de pares.
+    """
+    estado = estado_tarefa(diretorio)
+    if not estado.completa:
+        raise RuntimeError(f"Tarefa incompleta: {estado}")
+    total = sum(len(registros) for registros in registros_tarefa(diretorio))
+    temporario = f"{destino}.{os.getpid()}.tmp"
+    try:
+        saida = np.lib.format.open_memmap(temporario, mode="w+", dtype=TIPO_REGISTRO_LOTE, shape=(total,))
+        posicao = 0
+        for registros in registros_tarefa(diretorio):
+            saida[posicao:posicao + len(registros)] = registros
+            posicao += len(registros)
+        saida.flush()
+        del saida
+        os.replace(temporario, destino)
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+    return total
+
+
+def juntar_tarefa_resultados(diretorio: str, destino: str,
+                             nomes: Optional[Sequence[str]] = None) -> ResultadosLote:
+    """
+    Juntar os ladrilhos em um diretório de ResultadosLote (um .npy mapeado
+    por coluna), na mesma ordem de juntar_tarefa, um ladrilho por vez.
+    As distâncias de cada estrela vêm do catálogo da tarefa; os nomes não
+    são guardados nela e podem ser passados em 'nomes'. Os metadados são
+    gravados por último: um destino interrompido não abre com
+    ResultadosLote.abrir.
+    """
+    estado = estado_tarefa(diretorio)
+    if not estado.completa:
+        raise RuntimeError(f"Tarefa incompleta: {estado}")
+    catalogo = CatalogoColunar.de_binario(os.path.join(diretorio, ARQUIVO_CATALOGO))
+    if nomes is not None and len(nomes) != len(catalogo):
+        raise ValueError(f"{len(nomes)} nomes para um catálogo de {len(catalogo)} estrelas")
+    total = sum(len(registros) for registros in registros_tarefa(diretorio))
+    resultados = ResultadosLote(total, destino, nomes)
+    for registros in registros_tarefa(diretorio):
+        resultados.adicionar(registros["i"], registros["j"], registros["separacao_rad"],
+                             registros["distancia_real_pc"], catalogo.distancia_parsecs)
+    return resultados.finalizar()
+
+
+# ============================================================================
+# Testes
+# ============================================================================
+
+def teste_tarefas():
+    """Queda no meio, retomada com vários processos e junção igual ao cálculo direto"""
+    print("=" * 60)
+    print("TESTE: Tarefas em Ladrilhos Retomáveis")
+    print("=" * 60)
+
+    import tempfile
+    from calculos import CalculadoraGeometrica
+    from paridade import catalogo_sintetico, executar_python
+    from resultados import TIPOS_COLUNAS
+
+    catalogo = catalogo_sintetico(2500)
+    with tempfile.TemporaryDirectory() as diretorio:
+        manifesto = criar_tarefa(catalogo, diretorio, tamanho_ladrilho=300)
+        assert criar_tarefa(catalogo, diretorio, tamanho_ladrilho=300) == manifesto
+        try:
+            criar_tarefa(catalogo, diretorio, tamanho_ladrilho=400)
+            raise AssertionError("Parâmetros diferentes deveriam ser recusados")
+        except ValueError:
+            pass
+        ladrilhos = ladrilhos_do_manifesto(manifesto)
+        assert sum(l.numero_pares for l in ladrilhos) == len(catalogo) * (len(catalogo) - 1) // 2
+        print(f"\n{len(catalogo)} estrelas em {len(ladrilhos)} ladrilhos")
+
+        # 1ª execução "cai" depois de 10 ladrilhos, deixando uma reivindicação
+        # órfã e um temporário pela metade
+        assert trabalhar(diretorio, "primeiro", maximo=10) == 10
+        orfa = ladrilhos[10]
+        with open(_caminho_reivindicacao(diretorio, orfa), "w") as arquivo:
+            json.dump({"trabalhador": "caiu", "inicio": 0}, arquivo)
+        with open(_caminho_resultado(diretorio, orfa) + ".caiu.tmp", "wb") as arquivo:
+            arquivo.write(b"\x93NUMPY pela metade")
+        print(f"Depois da queda: {estado_tarefa(diretorio)}")
+
+        # Reivindicação recente de outro trabalhador é respeitada...
+        assert trabalhar(diretorio, "segundo", expiracao_s=3600.0, maximo=1) == 1
+        assert os.path.exists(_caminho_reivindicacao(diretorio, orfa))
+        # ...e não é removida por quem não é o dono
+        _liberar(diretorio, orfa, "segundo")
+        assert os.path.exists(_caminho_reivindicacao(diretorio, orfa))
+        # ...e a expirada é retomada; os 10 concluídos não são refeitos
+        antigos = {l.numero: os.path.getmtime(_caminho_resultado(diretorio, l)) for l in ladrilhos[:10]}
+        os.utime(_caminho_reivindicacao(diretorio, orfa), (0, 0))
+        calculados = executar_tarefa(diretorio, processos=2, expiracao_s=60.0)
+        assert calculados == len(ladrilhos) - 11, calculados
+        assert all(os.path.getmtime(_caminho_resultado(diretorio, l)) == antigos[l.numero]
+                   for l in ladrilhos[:10])
+        estado = estado_tarefa(diretorio)
+        assert estado.completa and estado.em_andamento == 0
+        print(f"Retomada com 2 processos: {calculados} ladrilhos calculados, {estado}")
+        assert executar_tarefa(diretorio, processos=1) == 0
+
+        destino = os.path.join(diretorio, "pares.npy")
+        total = juntar_tarefa(diretorio, destino)
+        pares = np.load(destino)
+        direto = executar_python(catalogo, "numpy")
+        ordem = np.lexsort((pares["j"], pares["i"]))
+        for campo in TIPO_REGISTRO_LOTE.names:
+            assert np.array_equal(pares[campo][ordem], direto[campo]), campo
+        print(f"Junção: {total} pares, idênticos ao cálculo direto de todos os pares")
+
+        # Junção em colunas: igual a ResultadosLote.todos_os_pares
+        colunas = juntar_tarefa_resultados(diretorio, os.path.join(diretorio, "pares"), catalogo.nomes)
+        aberto = ResultadosLote.abrir(os.path.join(diretorio, "pares"))
+        ordem = np.lexsort((aberto.j, aberto.i))
+        referencia = ResultadosLote.todos_os_pares(catalogo)
+        for campo in TIPOS_COLUNAS:
+            assert np.array_equal(getattr(aberto, campo)[ordem], getattr(referencia, campo)), campo
+        assert aberto.resultado(0).nome_estrela1 == catalogo.nomes[int(aberto.i[0])]
+        print(f"Junção em colunas: {len(colunas)} pares, idênticos a ResultadosLote.todos_os_pares")
+
+        # Mesma semântica de calcular_distancia_entre_estrelas
+        for k in np.random.default_rng(46).choice(total, 20):
+            i, j = int(pares["i"][k]), int(pares["j"][k])
+            resultado = CalculadoraGeometrica.calcular_distancia_entre_estrelas(
+                catalogo.estrela(i), catalogo.estrela(j))
+            assert abs(resultado.distancia_real_parsecs - pares["distancia_real_pc"][k]) <= \
+                1e-9 * max(resultado.distancia_real_parsecs, 1.0)
+
+    # Tarefa com limite: só os pares próximos são guardados
+    with tempfile.TemporaryDirectory() as diretorio:
+        criar_tarefa(catalogo, diretorio, tamanho_ladrilho=1000, limite_pc=20.0)
+        executar_tarefa(diretorio, processos=1)
+        juntar_tarefa(diretorio, os.path.join(diretorio, "proximos.npy"))
+        proximos = np.load(os.path.join(diretorio, "proximos.npy"))
+        assert np.all(proximos["distancia_real_pc"] <= 20.0)
+        assert len(proximos) == int(np.count_nonzero(direto["distancia_real_pc"] <= 20.0))
+        print(f"Com limite de 20 pc: {len(proximos)} pares guardados")
+
+    print("\n✅ Teste concluído com sucesso!")
+
+
+if __name__ == "__main__":
+    teste_tarefas()
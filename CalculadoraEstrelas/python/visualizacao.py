@@ -6,26 +6,40 @@ Autor: Luiz Tiago Wilcke
 Data: 2025
 """
 
-import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.patches import Circle, FancyArrowPatch
-from matplotlib.colors import LinearSegmentedColormap
-from mpl_toolkits.mplot3d import Axes3D
+from __future__ import annotations
+
 import math
 
+from preguicoso import ModuloPreguicoso
 from calculos import (
     Estrela, CoordenadaHMS, CoordenadaDMS, 
     CalculadoraGeometrica, ResultadoCalculo,
     PARSEC_PARA_ANOS_LUZ, RADIANOS_POR_GRAU
 )
 
+# matplotlib e numpy só são importados quando a primeira figura é criada
+np = ModuloPreguicoso("numpy")
+plt = ModuloPreguicoso("matplotlib.pyplot",
+                       ao_carregar=lambda modulo: modulo.style.use('dark_background'))
+quadros = ModuloPreguicoso("quadros")
+
+
+def usar_canvas_agg(fig: plt.Figure) -> plt.Figure:
+    """
+    Desenhar 'fig' com o Agg (buffer_rgba, blitting), qualquer que seja o
+    backend do pyplot, sem trocá-lo: usado pelas renderizações em lote que
+    rodam no processo de quem chamou
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    FigureCanvasAgg(fig)
+    return fig
+
 
 class VisualizadorEstelar:
     """Classe para visualizações avançadas do sistema estelar"""
     
     def __init__(self):
-        # Configurar estilo
-        plt.style.use('dark_background')
+        # O estilo escuro é aplicado quando o pyplot é carregado
         self.cores = {
             'fundo': '#0a0a1a',
             'estrela1': '#ffd700',
@@ -36,9 +50,14 @@ class VisualizadorEstelar:
         }
     
     def criar_mapa_celeste(self, estrela1: Estrela, estrela2: Estrela,
-                           resultado: ResultadoCalculo) -> plt.Figure:
+                           resultado: ResultadoCalculo,
+                           quadro: str = "equatorial", observador: str = None) -> plt.Figure:
         """
         Criar mapa celeste mostrando as duas estrelas e sua conexão
+
+        quadro: 'equatorial', 'galactico' ou 'ecliptico' (ver quadros.py)
+        observador: nome da estrela de onde o céu é visto, para estrelas
+                    vindas de observadores.catalogo_visto_de (None = Sol)
         """
         fig, ax = plt.subplots(figsize=(12, 6), facecolor=self.cores['fundo'])
         ax.set_facecolor(self.cores['fundo'])
@@ -55,33 +74,31 @@ class VisualizadorEstelar:
             ax.scatter(ra_bg[i], dec_bg[i], c='white', s=sizes_bg[i], 
                       alpha=alphas_bg[i], marker='.')
         
-        # Converter coordenadas
-        ra1 = estrela1.ascensao_reta.para_graus()
-        dec1 = estrela1.declinacao.para_graus()
-        ra2 = estrela2.ascensao_reta.para_graus()
-        dec2 = estrela2.declinacao.para_graus()
+        # Converter coordenadas para o quadro pedido
+        ra1, dec1 = quadros.coordenadas_estrela(estrela1, quadro)
+        ra2, dec2 = quadros.coordenadas_estrela(estrela2, quadro)
         
         # Desenhar linha de conexão
         ax.plot([ra1, ra2], [dec1, dec2], color=self.cores['linha'], 
-               linewidth=2, alpha=0.7, linestyle='-', zorder=3)
+               linewidth=2, alpha=0.7, linestyle='-', zorder=3, gid='conexao')
         
         # Desenhar estrela 1 com efeito de brilho
         for size, alpha in [(400, 0.1), (250, 0.2), (150, 0.4), (80, 0.8)]:
             ax.scatter([ra1], [dec1], c=self.cores['estrela1'], s=size, 
-                      alpha=alpha, marker='*', zorder=4)
+                      alpha=alpha, marker='*', zorder=4, gid='estrela1')
         ax.annotate(f'{estrela1.nome}\n({estrela1.distancia_anos_luz:.1f} a.l.)', 
                    (ra1, dec1), textcoords="offset points", xytext=(15, 15),
                    fontsize=11, color=self.cores['estrela1'], fontweight='bold',
-                   ha='left', zorder=5)
+                   ha='left', zorder=5, gid='rotulo1')
         
         # Desenhar estrela 2 com efeito de brilho
         for size, alpha in [(400, 0.1), (250, 0.2), (150, 0.4), (80, 0.8)]:
             ax.scatter([ra2], [dec2], c=self.cores['estrela2'], s=size,
-                      alpha=alpha, marker='*', zorder=4)
+                      alpha=alpha, marker='*', zorder=4, gid='estrela2')
         ax.annotate(f'{estrela2.nome}\n({estrela2.distancia_anos_luz:.1f} a.l.)',
                    (ra2, dec2), textcoords="offset points", xytext=(15, 15),
                    fontsize=11, color=self.cores['estrela2'], fontweight='bold',
-                   ha='left', zorder=5)
+                   ha='left', zorder=5, gid='rotulo2')
         
         # Anotação de distância
         mid_ra = (ra1 + ra2) / 2
@@ -91,14 +108,16 @@ class VisualizadorEstelar:
                    (mid_ra, mid_dec), textcoords="offset points", xytext=(0, -30),
                    fontsize=10, color='#68d391', ha='center',
                    bbox=dict(boxstyle='round,pad=0.5', facecolor='#1a3a1a', 
-                            edgecolor='#68d391', alpha=0.8), zorder=5)
+                            edgecolor='#68d391', alpha=0.8), zorder=5, gid='distancia')
         
         # Configurações do gráfico
         ax.set_xlim(0, 360)
         ax.set_ylim(-90, 90)
-        ax.set_xlabel('Ascensão Reta (graus)', color=self.cores['texto'], fontsize=11)
-        ax.set_ylabel('Declinação (graus)', color=self.cores['texto'], fontsize=11)
-        ax.set_title('Mapa Celeste - Posição das Estrelas', 
+        rotulo_lon, rotulo_lat = quadros.ROTULOS[quadro]
+        ax.set_xlabel(f'{rotulo_lon} (graus)', color=self.cores['texto'], fontsize=11)
+        ax.set_ylabel(f'{rotulo_lat} (graus)', color=self.cores['texto'], fontsize=11)
+        vista = f' vistas de {observador}' if observador else ''
+        ax.set_title(f'Mapa Celeste - Posição das Estrelas{vista} ({quadros.NOMES[quadro]})',
                     color=self.cores['linha'], fontsize=14, fontweight='bold')
         
         # Grid
@@ -117,10 +136,17 @@ class VisualizadorEstelar:
         return fig
     
     def criar_visualizacao_3d(self, estrela1: Estrela, estrela2: Estrela,
-                               resultado: ResultadoCalculo) -> plt.Figure:
+                               resultado: ResultadoCalculo,
+                               quadro: str = "equatorial", observador: str = None) -> plt.Figure:
         """
         Criar visualização 3D das estrelas no espaço
+
+        quadro: orientação dos eixos X, Y, Z ('equatorial', 'galactico' ou 'ecliptico')
+        observador: nome da estrela na origem (None = Sol), ver observadores.py
         """
+        # Registrar a projeção '3d' (toolkit carregado somente aqui)
+        import mpl_toolkits.mplot3d  # noqa: F401
+        
         fig = plt.figure(figsize=(10, 8), facecolor=self.cores['fundo'])
         ax = fig.add_subplot(111, projection='3d', facecolor=self.cores['fundo'])
         
@@ -134,8 +160,8 @@ class VisualizadorEstelar:
             z = distancia * np.sin(dec_rad)
             return x, y, z
         
-        # Posição do Sol (origem)
-        ax.scatter([0], [0], [0], c='yellow', s=200, marker='o', label='Sol')
+        # Posição do Sol ou do observador (origem)
+        ax.scatter([0], [0], [0], c='yellow', s=200, marker='o', label=observador or 'Sol')
         
         # Posição da Estrela 1
         x1, y1, z1 = esfericas_para_cartesianas(
@@ -143,8 +169,6 @@ class VisualizadorEstelar:
             estrela1.declinacao.para_graus(),
             resultado.distancia1_parsecs
         )
-        ax.scatter([x1], [y1], [z1], c=self.cores['estrela1'], s=150, 
-                  marker='*', label=estrela1.nome)
         
         # Posição da Estrela 2
         x2, y2, z2 = esfericas_para_cartesianas(
@@ -152,22 +176,28 @@ class VisualizadorEstelar:
             estrela2.declinacao.para_graus(),
             resultado.distancia2_parsecs
         )
+        
+        # Rotacionar as posições para o quadro pedido
+        (x1, y1, z1), (x2, y2, z2) = quadros.converter_vetores(
+            [[x1, y1, z1], [x2, y2, z2]], "equatorial", quadro)
+        ax.scatter([x1], [y1], [z1], c=self.cores['estrela1'], s=150, 
+                  marker='*', label=estrela1.nome, gid='estrela1')
         ax.scatter([x2], [y2], [z2], c=self.cores['estrela2'], s=150,
-                  marker='*', label=estrela2.nome)
+                  marker='*', label=estrela2.nome, gid='estrela2')
         
         # Linhas conectando
         ax.plot([0, x1], [0, y1], [0, z1], color=self.cores['estrela1'], 
-               alpha=0.5, linestyle='--')
+               alpha=0.5, linestyle='--', gid='raio1')
         ax.plot([0, x2], [0, y2], [0, z2], color=self.cores['estrela2'],
-               alpha=0.5, linestyle='--')
+               alpha=0.5, linestyle='--', gid='raio2')
         ax.plot([x1, x2], [y1, y2], [z1, z2], color=self.cores['linha'],
-               linewidth=2, label=f'D = {resultado.distancia_real_parsecs:.2f} pc')
+               linewidth=2, label=f'D = {resultado.distancia_real_parsecs:.2f} pc', gid='conexao')
         
         # Configurações
         ax.set_xlabel('X (parsecs)', color=self.cores['texto'])
         ax.set_ylabel('Y (parsecs)', color=self.cores['texto'])
         ax.set_zlabel('Z (parsecs)', color=self.cores['texto'])
-        ax.set_title('Visualização 3D do Sistema Estelar',
+        ax.set_title(f'Visualização 3D do Sistema Estelar ({quadros.NOMES[quadro]})',
                     color=self.cores['linha'], fontsize=14, fontweight='bold')
         
         ax.tick_params(colors=self.cores['texto'])
@@ -184,9 +214,82 @@ class VisualizadorEstelar:
         
         return fig
     
-    def criar_diagrama_geometrico(self, resultado: ResultadoCalculo) -> plt.Figure:
+    @staticmethod
+    def artistas(fig: plt.Figure, gid: str) -> list:
+        """Artistas da figura marcados com o gid (estrela1, conexao, rotulo2...)"""
+        return fig.findobj(lambda artista: artista.get_gid() == gid)
+    
+    def atualizar_mapa_celeste(self, fig: plt.Figure, lon_lat1: tuple, lon_lat2: tuple,
+                               distancia1_pc: float, distancia2_pc: float,
+                               distancia_real_pc: float, separacao_graus: float,
+                               nomes: tuple = None) -> list:
+        """
+        Mover as estrelas de um mapa criado por criar_mapa_celeste (graus no
+        quadro do mapa) sem redesenhar o resto; retorna os artistas alterados
+
+        nomes: novos nomes das duas estrelas (mantidos quando None)
+        """
+        (ra1, dec1), (ra2, dec2) = lon_lat1, lon_lat2
+        alterados = []
+        for gid, posicao, distancia in [('1', (ra1, dec1), distancia1_pc),
+                                        ('2', (ra2, dec2), distancia2_pc)]:
+            for brilho in self.artistas(fig, 'estrela' + gid):
+                brilho.set_offsets([posicao])
+                alterados.append(brilho)
+            for rotulo in self.artistas(fig, 'rotulo' + gid):
+                nome = rotulo.get_text().split('\n')[0] if nomes is None else nomes[int(gid) - 1]
+                rotulo.xy = posicao
+                rotulo.set_text(f'{nome}\n({distancia * PARSEC_PARA_ANOS_LUZ:.1f} a.l.)')
+                alterados.append(rotulo)
+        for linha in self.artistas(fig, 'conexao'):
+            linha.set_data([ra1, ra2], [dec1, dec2])
+            alterados.append(linha)
+        for anotacao in self.artistas(fig, 'distancia'):
+            anotacao.xy = ((ra1 + ra2) / 2, (dec1 + dec2) / 2)
+            anotacao.set_text(f'Distância: {distancia_real_pc * PARSEC_PARA_ANOS_LUZ:.2f} anos-luz\n'
+                              f'Separação angular: {separacao_graus:.2f}°')
+            alterados.append(anotacao)
+        return alterados
+    
+    def atualizar_visualizacao_3d(self, fig: plt.Figure, posicao1, posicao2,
+                                  distancia_real_pc: float, nomes: tuple = None) -> list:
+        """
+        Mover as estrelas de uma figura criada por criar_visualizacao_3d
+        (posições em parsecs, já no quadro da figura); retorna os artistas alterados
+
+        nomes: novos nomes das duas estrelas na legenda (mantidos quando None)
+        """
+        (x1, y1, z1), (x2, y2, z2) = posicao1, posicao2
+        alterados = []
+        for gid, (x, y, z) in [('1', (x1, y1, z1)), ('2', (x2, y2, z2))]:
+            for estrela in self.artistas(fig, 'estrela' + gid):
+                estrela._offsets3d = ([x], [y], [z])
+                if nomes is not None:
+                    estrela.set_label(nomes[int(gid) - 1])
+                alterados.append(estrela)
+            for raio in self.artistas(fig, 'raio' + gid):
+                raio.set_data_3d([0, x], [0, y], [0, z])
+                alterados.append(raio)
+        rotulo = f'D = {distancia_real_pc:.2f} pc'
+        for linha in self.artistas(fig, 'conexao'):
+            linha.set_data_3d([x1, x2], [y1, y2], [z1, z2])
+            linha.set_label(rotulo)
+            alterados.append(linha)
+        for ax in fig.axes:
+            legenda = ax.get_legend()
+            if legenda is None:
+                continue
+            # A legenda segue a ordem dos artistas rotulados do eixo
+            originais, _ = ax.get_legend_handles_labels()
+            for texto, artista in zip(legenda.get_texts(), originais):
+                texto.set_text(artista.get_label())
+        return alterados
+    
+    def criar_diagrama_geometrico(self, resultado: ResultadoCalculo, observador: str = None) -> plt.Figure:
         """
         Criar diagrama geométrico mostrando o triângulo formado
+
+        observador: nome da estrela no vértice de origem (None = Sol), ver observadores.py
         """
         fig, ax = plt.subplots(figsize=(10, 8), facecolor=self.cores['fundo'])
         ax.set_facecolor(self.cores['fundo'])
@@ -224,7 +327,7 @@ class VisualizadorEstelar:
         
         # Desenhar pontos
         ax.scatter([sol_x], [sol_y], c='yellow', s=300, marker='o', zorder=5)
-        ax.annotate('Sol (Terra)', (sol_x, sol_y), textcoords="offset points",
+        ax.annotate(observador or 'Sol (Terra)', (sol_x, sol_y), textcoords="offset points",
                    xytext=(10, -20), fontsize=11, color='yellow', fontweight='bold')
         
         ax.scatter([e1_x], [e1_y], c=self.cores['estrela1'], s=200, marker='*', zorder=5)
@@ -263,7 +366,7 @@ class VisualizadorEstelar:
         # Configurações
         ax.set_xlabel('X (parsecs)', color=self.cores['texto'], fontsize=11)
         ax.set_ylabel('Y (parsecs)', color=self.cores['texto'], fontsize=11)
-        ax.set_title('Diagrama Geométrico - Triângulo Sol-Estrela1-Estrela2',
+        ax.set_title(f'Diagrama Geométrico - Triângulo {observador or "Sol"}-Estrela1-Estrela2',
                     color=self.cores['linha'], fontsize=14, fontweight='bold')
         ax.set_aspect('equal')
         ax.legend(loc='lower right', facecolor=self.cores['fundo'], 
@@ -330,6 +433,11 @@ def demonstracao():
                 bbox_inches='tight')
     print("✓ Diagrama geométrico salvo: diagrama_geometrico.png")
     
+    fig4 = viz.criar_mapa_celeste(sirius, betelgeuse, resultado, quadro="galactico")
+    fig4.savefig('mapa_galactico.png', dpi=150, facecolor=fig4.get_facecolor(),
+                bbox_inches='tight')
+    print("✓ Mapa celeste em coordenadas galácticas salvo: mapa_galactico.png")
+    
     print("\n✅ Demonstração concluída!")
     plt.show()
 